@@ -1,37 +1,89 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel
-from parser import parse_tasks, parse_recurring_tasks, check_off_task, check_off_recurring_task, parse_tasks_by_priority, parse_tasks_no_sort, create_task, edit_task, delete_task, create_subtask_for_task
+import parser as task_parser
+from parser import parse_tasks, check_off_task, check_off_recurring_task, parse_tasks_by_priority, parse_tasks_no_sort, create_task, edit_task, delete_task, create_subtask_for_task
+from recurrence import compile_task_rule, expected_occurrences, flatten_recurring_tasks, get_task_anchor, get_task_pattern, parse_filter_window, OccurrenceIndex
+from status_log import StatusLog
+from timeseries_store import TimeSeriesStore, from_seconds
+from downsample import BucketCache, RESOLUTIONS, aggregate_buckets, downsample, ordinals_from_strings, ordinals_to_strings
+from series_query import align, outer_join, parse_metric_list
+from stats_scheduler import SnapshotScheduler
+from live_stats import StatisticsAggregator, statistics_tasks
+from task_snapshot import read_snapshot
+from task_index import STATUSES as TASK_STATUSES, TaskFilter
+from task_query import QuerySyntaxError, conjoin, parse_query, query_from_filter
+from saved_views import SavedViewSet, parse_views_text
+from task_views import VIEWS as TASK_VIEWS, build_view
+from next_actions import UrgencyRanking
+from due_calendar import GRANULARITIES, due_calendar
+from calendar_feed import CalendarFeed
+from snapshot_file import cached_parse
+from shadow_index import ShadowIndex, archive_rows, list_item_rows, recurring_rows, task_rows
+from stats_backfill import backfill_statistics
+from statistics_csv import append_statistics_csv, format_statistic, latest_csv_snapshot
+from day_boundary import DayBoundaryScheduler
+from contextlib import asynccontextmanager
+import io
 import re
+import sqlite3
 import datetime
 import subprocess
-import sys
 import random
-from datetime import datetime, timedelta, date, time
-from collections import Counter, defaultdict
+from datetime import datetime, timedelta, date, time, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from collections import defaultdict
 import os
 import subprocess
 import csv
 import json
 from pathlib import Path
 
-# Configuration: Hour when the "day" starts (3 AM = 3)
-DAY_START_HOUR = 3
+import numpy as np
+
+# Configuration: When recurring status log writes are fsynced ("always", "interval" or "never")
+STATUS_LOG_FSYNC = "always"
+STATUS_LOG_FSYNC_INTERVAL = 5.0  # seconds, used by the "interval" policy
+
+# Configuration: Mirror the data files into a SQLite index for read-only SQL queries (False disables it)
+SHADOW_INDEX_ENABLED = True
+SHADOW_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../archive_files/shadow_index.sqlite3')
+SHADOW_INDEX_MAX_ROWS = 10000  # rows returned by one query
+SHADOW_INDEX_QUERY_TIMEOUT = 2.0  # seconds a query may run before it is interrupted
+
+# Configuration: Saved views served from /views/{name} ("name | query | sort" per line, see saved_views.py)
+SAVED_VIEWS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../saved_views.txt')
+
+# Configuration: Urgency score of /tasks/next (see next_actions.py). Due proximity counts in full when a task
+# is due today or overdue and fades out linearly over due_horizon_days; negative weights push tasks down.
+URGENCY_WEIGHTS = {
+    'priority': {'A': 6.0, 'B': 3.9, 'C': 1.8, 'D': 1.0, 'E': 0.5, 'F': 0.2},
+    'due': 12.0,
+    'due_horizon_days': 14,
+    'followup_due': 4.0,  # follow-up date reached (or none given)
+    'followup_waiting': -3.0,  # follow-up date still ahead
+    'onhold': -10.0,
+}
+NEXT_ACTIONS_MAX_K = 100
+CALENDAR_DEFAULT_DAYS = 30  # /calendar range when no end date is given
+CALENDAR_MAX_DAYS = 731  # Longest range /calendar serves
+CALENDAR_FEED_HORIZON_DAYS = 30  # Days of recurring occurrences in /calendar.ics (at most the occurrence index horizon)
+
+# Configuration: Minutes between scheduled statistics snapshots (0 disables the scheduler).
+# A snapshot is also taken at every day boundary (parser.DAY_START_HOUR).
+# Scheduled snapshots go to the time-series store; only the first of each adjusted day (and every
+# manual save) is also appended to the tracked CSV, which the store is rebuilt from.
+STATISTICS_SNAPSHOT_INTERVAL_MINUTES = 60
+STATISTICS_CSV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../archive_files/task_statistics.csv')
+STATISTICS_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../archive_files/timeseries')
 
 def get_adjusted_date(dt: datetime = None) -> date:
     """
-    Get the adjusted date considering 3 AM as the day boundary.
-    Times between midnight and 3 AM are considered part of the previous day.
+    Get the adjusted date considering parser.DAY_START_HOUR (3 AM by default) as the day boundary.
+    Times between midnight and the boundary are considered part of the previous day.
     """
-    if dt is None:
-        dt = datetime.now()
-    
-    # If it's before 3 AM, subtract one day
-    if dt.hour < DAY_START_HOUR:
-        return (dt - timedelta(days=1)).date()
-    else:
-        return dt.date()
+    return task_parser.get_adjusted_date(dt)
 
 def get_adjusted_today() -> date:
     """Get today's date using the adjusted day boundary"""
@@ -42,7 +94,11 @@ def get_adjusted_datetime_for_date(target_date: date) -> datetime:
     Get the datetime when the adjusted day starts for a given date.
     For example, for 2025-07-01, this returns 2025-07-01 03:00:00
     """
-    return datetime.combine(target_date, time(DAY_START_HOUR, 0, 0))
+    return datetime.combine(target_date, time(task_parser.DAY_START_HOUR, 0, 0))
+
+def days_cutoff(days: int = None) -> Optional[datetime]:
+    """Start of the adjusted day `days` days ago (None without days), the same all day so it can key caches"""
+    return get_adjusted_datetime_for_date(get_adjusted_today() - timedelta(days=days)) if days else None
 
 class CheckTaskRequest(BaseModel):
     task_id: str
@@ -51,6 +107,29 @@ class RecurringTaskStatusRequest(BaseModel):
     task_id: str
     status: str  # "completed", "missed", "deferred"
 
+class RecurringTaskStatusBatchRequest(BaseModel):
+    updates: List[RecurringTaskStatusRequest]
+
+class AnalyticsSubQuery(BaseModel):
+    id: Optional[str] = None  # echoed back so callers can match results
+    type: str  # "series", "compliance", "individual", "enhanced", "tag", "recurring_tasks" or "index"
+    metrics: Optional[List[str]] = None  # series: defaults to the standard chart metrics
+    task_id: Optional[str] = None
+    days: Optional[int] = None
+    start_date: Optional[str] = None  # Format: YYYY-MM-DD
+    end_date: Optional[str] = None  # Format: YYYY-MM-DD
+    resolution: str = "day"
+    max_points: Optional[int] = None
+    moving_average: Optional[int] = None
+    include_trend: bool = False
+    dimension: Optional[str] = None  # tag: "project" or "context"
+    tag: Optional[str] = None
+    sql: Optional[str] = None  # index: read-only SQL against the shadow index
+    params: Optional[List[Any]] = None
+
+class AnalyticsQueryRequest(BaseModel):
+    queries: List[AnalyticsSubQuery]
+
 class EditTaskRequest(BaseModel):
     area: str
     description: str
@@ -76,6 +155,11 @@ class CreateTaskRequest(BaseModel):
     onhold: Optional[str] = None  # e.g., "2025-07-15" or "waiting for approval"
     notes: Optional[List[str]] = None  # List of note strings
 
+class IndexQueryRequest(BaseModel):
+    sql: str
+    params: List[Any] = []
+    limit: Optional[int] = None  # capped at SHADOW_INDEX_MAX_ROWS
+
 class ListToggleRequest(BaseModel):
     item_index: int
 
@@ -85,68 +169,42 @@ class ListItemUpdateRequest(BaseModel):
     quantity: str = ""
     notes: str = ""
 
+# Shared writer/store for recurring_status_log.txt, created on first use
+_status_log = {'path': None, 'log': None}
+
+def get_status_log() -> StatusLog:
+    """Return the StatusLog for archive_files/recurring_status_log.txt"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    log_file = os.path.join(current_dir, '../../archive_files/recurring_status_log.txt')
+    if _status_log['log'] is None or _status_log['path'] != log_file:
+        # Use adjusted date for 3 AM boundary
+        _status_log['log'] = StatusLog(log_file, get_adjusted_date, STATUS_LOG_FSYNC, STATUS_LOG_FSYNC_INTERVAL)
+        _status_log['path'] = log_file
+    return _status_log['log']
+
 def log_recurring_task_status(task_id: str, status: str, task_description: str) -> bool:
     """Log recurring task status to tracking file"""
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        log_file = os.path.join(current_dir, '../../archive_files/recurring_status_log.txt')
-        
-        # Create log entry with timestamp
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_entry = f"{timestamp} | {status.upper()} | {task_id} | {task_description}\n"
-        
-        # Append to log file
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
-        
+        get_status_log().append(task_id, status, task_description)
         return True
     except Exception as e:
         print(f"Error logging recurring task status: {e}")
         return False
 
+def log_recurring_task_statuses(entries: List[tuple]) -> bool:
+    """Log a batch of (task_id, status, description) entries with a single append"""
+    try:
+        get_status_log().append_batch(entries)
+        return True
+    except Exception as e:
+        print(f"Error logging recurring task statuses: {e}")
+        return False
+
 def parse_recurring_status_log():
     """Parse the recurring status log file and return status data"""
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        log_file = os.path.join(current_dir, '../../archive_files/recurring_status_log.txt')
-        
-        status_data = {}  # {task_id: [(date, status, timestamp), ...]}
-        
-        if not os.path.exists(log_file):
-            return status_data
-        
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Parse format: "YYYY-MM-DD HH:MM:SS | STATUS | TASK_ID | TASK_DESCRIPTION"
-                parts = line.split(' | ')
-                if len(parts) >= 4:
-                    timestamp_str = parts[0]
-                    status = parts[1].upper()
-                    task_id = parts[2]
-                    
-                    # Parse timestamp
-                    try:
-                        timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                        # Use adjusted date for 3 AM boundary
-                        log_date = get_adjusted_date(timestamp)
-                        
-                        if task_id not in status_data:
-                            status_data[task_id] = []
-                        
-                        status_data[task_id].append((log_date, status, timestamp))
-                    except ValueError:
-                        continue
-        
-        # Sort entries by timestamp for each task
-        for task_id in status_data:
-            status_data[task_id].sort(key=lambda x: x[2])
-        
-        return status_data
-        
+        # {task_id: [(date, status, timestamp), ...]}, served from the in-memory store
+        return get_status_log().get_status_data()
     except Exception as e:
         print(f"Error parsing status log: {e}")
         return {}
@@ -213,13 +271,33 @@ def should_show_recurring_task(task, current_date: date, status_data: dict):
     
     return True
 
-def get_recurring_tasks_by_filter(filter_type: str = "today"):
-    """Get recurring tasks filtered by time period and status"""
+# Occurrence index for recurring_tasks.txt, rebuilt when the file changes
+_recurring_index_cache = {'signature': None, 'parsed': None, 'index': None}
+
+def get_recurring_occurrence_index():
+    """Return (parsed recurring tasks, OccurrenceIndex) for the current file and adjusted day"""
+    today = get_adjusted_today()
+    snapshot = task_parser.get_recurring_snapshot()
+    cache = _recurring_index_cache
+    if cache['index'] is None or cache['signature'] != snapshot['signature']:
+        cache['parsed'] = snapshot['tasks']
+        cache['index'] = OccurrenceIndex(flatten_recurring_tasks(snapshot['tasks']), today)
+        cache['signature'] = snapshot['signature']
+    elif cache['index'].start != today:
+        cache['index'].advance(today)
+    return cache['parsed'], cache['index']
+
+def get_recurring_tasks_by_filter(filter_type: str = "today", start: date = None, end: date = None):
+    """Get recurring tasks filtered by time period and status
+
+    filter_type is "all", "today", "next7days", any "nextNdays" window, or
+    "range" together with start/end dates.
+    """
     try:
-        all_recurring = parse_recurring_tasks()
-        
         if filter_type == "all":
-            return all_recurring
+            return task_parser.get_recurring_snapshot()['tasks']
+        
+        all_recurring, index = get_recurring_occurrence_index()
         
         # Use adjusted today for 3 AM boundary
         today = get_adjusted_today()
@@ -227,74 +305,11 @@ def get_recurring_tasks_by_filter(filter_type: str = "today"):
         # Parse status log
         status_data = parse_recurring_status_log()
         
-        def should_show_task(task, filter_type):
-            """Determine if a task should be shown based on its recurrence pattern and status"""
-            # First check if task should be visible based on status
-            if not should_show_recurring_task(task, today, status_data):
-                return False
-            
-            recurring = task.get('metadata', {}).get('every', '')
-            if not recurring:
-                return False
-            
-            # Parse the recurrence pattern
-            if recurring == 'daily':
-                return True  # Daily tasks always show (if not hidden by status)
-            
-            elif recurring.startswith('weekly:'):
-                day_part = recurring.split(':')[1] if ':' in recurring else ''
-                if day_part:
-                    # Map day names to weekday numbers (Monday=0, Sunday=6)
-                    day_map = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6}
-                    target_weekday = day_map.get(day_part)
-                    if target_weekday is not None:
-                        if filter_type == "today":
-                            return today.weekday() == target_weekday
-                        elif filter_type == "next7days":
-                            # Check if the target weekday occurs in the next 7 days
-                            for i in range(7):
-                                check_date = today + timedelta(days=i)
-                                if check_date.weekday() == target_weekday:
-                                    return True
-                            return False
-                return False
-            
-            elif recurring.startswith('monthly:'):
-                day_part = recurring.split(':')[1] if ':' in recurring else ''
-                if day_part.isdigit():
-                    target_day = int(day_part)
-                    if filter_type == "today":
-                        return today.day == target_day
-                    elif filter_type == "next7days":
-                        # Check if the target day occurs in the next 7 days
-                        for i in range(7):
-                            check_date = today + timedelta(days=i)
-                            if check_date.day == target_day:
-                                return True
-                        return False
-                return False
-            
-            elif recurring.startswith('yearly:'):
-                date_part = recurring.split(':')[1] if ':' in recurring else ''
-                if '-' in date_part:
-                    try:
-                        month, day = map(int, date_part.split('-'))
-                        target_date = date(today.year, month, day)
-                        if filter_type == "today":
-                            return today == target_date
-                        elif filter_type == "next7days":
-                            days_until = (target_date - today).days
-                            return 0 <= days_until <= 6
-                    except ValueError:
-                        pass
-                return False
-            
-            elif recurring.startswith('custom:'):
-                # Custom intervals like "183d" - these are typically longer periods
-                # For simplicity, only show them in "all" view
-                return False
-            
-            return False
+        if filter_type == "range" and start:
+            window_start, window_end = start, end or start
+        else:
+            window_start, window_end = parse_filter_window(filter_type, today) or (today, today)
+        due_ids = set(index.task_ids_between(window_start, window_end))
         
         # Filter tasks within each area
         filtered_areas = []
@@ -302,8 +317,9 @@ def get_recurring_tasks_by_filter(filter_type: str = "today"):
             if area_group.get('type') == 'area':
                 filtered_tasks = []
                 for task in area_group.get('tasks', []):
-                    if should_show_task(task, filter_type):
-                        filtered_tasks.append(task)
+                    if task.get('id') in due_ids and should_show_recurring_task(task, today, status_data):
+                        next_occurrence = index.next_occurrence(task['id'], window_start)
+                        filtered_tasks.append({**task, 'next_occurrence': next_occurrence.strftime('%Y-%m-%d')})
                 
                 # Only include area if it has tasks to show
                 if filtered_tasks:
@@ -327,52 +343,37 @@ def archive_completed_tasks():
     AREA_ORDER_KEY = ['Work', 'Personal', 'Health', 'Finances']
     
     try:
-        # Parse tasks using regex, similar to sort_tasks.py
-        with open(tasks_file, 'r') as f:
-            lines = f.readlines()
+        # Classify lines with the shared snapshot parser
+        snapshot = read_snapshot(tasks_file)
 
-        area = None
         completed_tasks = []
         output_lines = []
-        parent_task = None
         parent_task_line = None
-        parent_task_indent = None
         parent_task_completed = False
-        parent_task_idx = None
         parent_task_area = None
         parent_written = set()
 
-        for idx, line in enumerate(lines):
-            stripped = line.rstrip('\n')
-            area_match = re.match(r'^(\S.+):$', stripped)
-            task_match = re.match(r'^(\s*)- \[( |x)\] (.+)', line)
+        for entry in snapshot.lines:
+            line = entry.raw
             # Area header
-            if area_match:
-                area = area_match.group(1)
+            if entry.kind == 'area':
                 output_lines.append(line)
-                parent_task = None
                 parent_task_line = None
-                parent_task_indent = None
                 parent_task_completed = False
-                parent_task_idx = None
-                parent_task_area = area
+                parent_task_area = entry.area
                 continue
-            # Task or subtask
-            if task_match:
-                indent, completed, content = task_match.groups()
-                is_completed = completed == 'x'
-                if len(indent) == 4:
-                    parent_task = line
+            # Task or subtask (follow-up tasks stay in the file)
+            if entry.kind == 'task' and entry.status != '%':
+                is_completed = entry.completed
+                if len(entry.indent) == 4:
                     parent_task_line = line
-                    parent_task_indent = indent
                     parent_task_completed = is_completed
-                    parent_task_idx = len(completed_tasks)
-                    parent_task_area = area
+                    parent_task_area = entry.area
                     if is_completed:
-                        completed_tasks.append((line, area))
+                        completed_tasks.append((line, entry.area))
                     else:
                         output_lines.append(line)
-                elif len(indent) > 4:
+                elif len(entry.indent) > 4:
                     # Subtask
                     if is_completed:
                         # If parent is not completed and not already written, write parent first
@@ -437,124 +438,86 @@ def archive_completed_tasks():
     except Exception as e:
         return {"success": False, "message": f"Error archiving tasks: {str(e)}", "archived_count": 0}
 
+# Statistics counters for tasks.txt, updated from the diff of each re-parse
+_live_statistics = {'path': None, 'signature': None, 'aggregator': None}
+
 def compute_task_statistics():
-    """Compute statistics from the tasks, including subtasks with inherited metadata"""
-    # Read tasks file
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    tasks_file = os.path.join(current_dir, '../../tasks.txt')
-    
-    tasks = []
-    current_area = None
-    parent_stack = []  # Stack to track parent tasks and their metadata
+    """Compute statistics from the tasks, including subtasks with inherited metadata
+
+    Counters are only adjusted for tasks that changed since the last call, and
+    the date-relative counts are rebuilt when the adjusted day changes.
+    """
+    tasks_file = task_parser.tasks_file
+    if _live_statistics['aggregator'] is None or _live_statistics['path'] != tasks_file:
+        _live_statistics['aggregator'] = StatisticsAggregator()
+        _live_statistics['path'] = tasks_file
+        _live_statistics['signature'] = None
     
-    with open(tasks_file, 'r') as f:
-        for line in f:
-            original_line = line
-            line = line.rstrip()
-            if not line or line.startswith('#'):
-                continue
-                
-            # Check for area header
-            area_match = re.match(r'^(\S.+):$', line)
-            if area_match:
-                current_area = area_match.group(1)
-                parent_stack = []  # Reset parent stack for new area
-                continue
-                
-            # Check for task
-            task_match = re.match(r'^(\s*)- \[( |x)\] (.+)', original_line)
-            if not task_match:
-                continue
-                
-            indent, completed, content = task_match.groups()
-            indent_level = len(indent) // 4
-            
-            # Create task object
-            task = {'raw': line}
-            task['completed'] = completed.lower() == 'x'
-            task['area'] = current_area
-            task['indent_level'] = indent_level
-            
-            # Extract metadata from the current task
-            due_match = re.search(r'due:(\d{4}-\d{2}-\d{2})', content)
-            task['due'] = (
-                datetime.strptime(due_match.group(1), '%Y-%m-%d').date()
-                if due_match else None
-            )
-            
-            prio_match = re.search(r'priority:([A-F])', content)
-            task['priority'] = prio_match.group(1) if prio_match else None
-            
-            # Also check for standalone priority letters
-            if not task['priority']:
-                standalone_prio_match = re.search(r'\b([A-F])\b', content)
-                task['priority'] = standalone_prio_match.group(1) if standalone_prio_match else None
-            
-            task['projects'] = re.findall(r'\+(\w+)', content)
-            task['contexts'] = re.findall(r'@(\w+)', content)
-            
-            # Update parent stack based on indentation
-            while parent_stack and parent_stack[-1]['indent_level'] >= indent_level:
-                parent_stack.pop()
-            
-            # If this is a subtask, inherit metadata from parent
-            if indent_level > 1 and parent_stack:
-                parent = parent_stack[-1]
-                
-                # Inherit metadata only if not explicitly set on subtask
-                if not task['due'] and parent.get('due'):
-                    task['due'] = parent['due']
-                    
-                if not task['priority'] and parent.get('priority'):
-                    task['priority'] = parent['priority']
-                    
-                if not task['projects'] and parent.get('projects'):
-                    task['projects'] = parent['projects']
-                    
-                if not task['contexts'] and parent.get('contexts'):
-                    task['contexts'] = parent['contexts']
-            
-            # Add to parent stack for potential children
-            if indent_level >= 1:  # Only add actual tasks to stack
-                parent_stack.append(task)
-            
-            tasks.append(task)
+    aggregator = _live_statistics['aggregator']
+    signature = task_parser.get_file_signature(tasks_file)
+    if signature is None or signature != _live_statistics['signature']:
+        changed = aggregator.update(statistics_tasks(read_snapshot(tasks_file)))
+        _live_statistics['signature'] = signature
+        if changed:
+            reschedule_day_view('statistics')
     
-    # Compute statistics
     # Use adjusted today for 3 AM boundary
-    today = get_adjusted_today()
-    stats = {}
-    stats['total'] = len(tasks)
-    stats['completed'] = sum(t['completed'] for t in tasks)
-    stats['incomplete'] = stats['total'] - stats['completed']
-    stats['completion_pct'] = (
-        100 * stats['completed'] / stats['total'] if stats['total'] else 0
-    )
-    
-    # By priority
-    prio_counter = Counter(t['priority'] for t in tasks if t['priority'])
-    for prio, count in prio_counter.items():
-        stats[f'priority_{prio}'] = count
-    
-    # By project
-    project_counter = Counter(p for t in tasks for p in t['projects'])
-    for proj, count in project_counter.items():
-        stats[f'project_{proj}'] = count
-    
-    # By context
-    context_counter = Counter(c for t in tasks for c in t['contexts'])
-    for ctx, count in context_counter.items():
-        stats[f'context_{ctx}'] = count
-    
-    # Due dates
-    stats['with_due_date'] = sum(1 for t in tasks if t['due'])
-    stats['overdue'] = sum(1 for t in tasks if t['due'] and not t['completed'] and t['due'] < today)
-    stats['due_today'] = sum(1 for t in tasks if t['due'] == today and not t['completed'])
-    stats['due_this_week'] = sum(1 for t in tasks if t['due'] and not t['completed'] and 0 <= (t['due'] - today).days < 7)
-    
-    return stats
-
-app = FastAPI()
+    return aggregator.statistics(get_adjusted_today())
+
+# Running snapshot scheduler, started with the app
+_snapshot_scheduler = {'scheduler': None}
+
+# Refreshes date-dependent views when the adjusted day crosses one of their dates
+_day_scheduler = {'scheduler': None}
+
+def reschedule_day_view(name: str):
+    """Tell the day-boundary scheduler (if running) that a view's dates may have changed"""
+    if _day_scheduler['scheduler']:
+        _day_scheduler['scheduler'].reschedule(name)
+
+def reschedule_tasks_view():
+    reschedule_day_view('tasks')
+
+def create_day_scheduler() -> DayBoundaryScheduler:
+    """Day-boundary scheduler with the parsed tasks, statistics and recurring views registered"""
+    scheduler = DayBoundaryScheduler(task_parser.DAY_START_HOUR, get_adjusted_date)
+    # Parsed tasks change by date only when an onhold date is reached
+    scheduler.register('tasks', lambda today: task_parser.get_tasks_valid_until(),
+                       lambda today: task_parser.parse_tasks_raw())
+    # Due-date counters change when a due date enters the week, comes due or passes
+    scheduler.register('statistics',
+                       lambda today: _live_statistics['aggregator'].next_change(today) if _live_statistics['aggregator'] else None,
+                       lambda today: compute_task_statistics())
+    # Recurring filters slide with every day
+    scheduler.register('recurring', lambda today: today + timedelta(days=1),
+                       lambda today: get_recurring_occurrence_index())
+    return scheduler
+
+@asynccontextmanager
+async def lifespan(app):
+    """Start the statistics snapshot and day-boundary schedulers for the lifetime of the server
+
+    On shutdown, status log writes not yet synced by the "interval" fsync policy are synced.
+    """
+    day_scheduler = create_day_scheduler()
+    task_parser.add_tasks_listener(reschedule_tasks_view)
+    day_scheduler.start()
+    _day_scheduler['scheduler'] = day_scheduler
+    if STATISTICS_SNAPSHOT_INTERVAL_MINUTES > 0:
+        scheduler = SnapshotScheduler(take_scheduled_snapshot, STATISTICS_SNAPSHOT_INTERVAL_MINUTES,
+                                      task_parser.DAY_START_HOUR, get_adjusted_date, last_statistics_snapshot)
+        scheduler.start()
+        _snapshot_scheduler['scheduler'] = scheduler
+    yield
+    _day_scheduler['scheduler'] = None
+    day_scheduler.stop()
+    if _snapshot_scheduler['scheduler']:
+        _snapshot_scheduler['scheduler'].stop()
+        _snapshot_scheduler['scheduler'] = None
+    if _status_log['log']:
+        _status_log['log'].flush()
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow frontend dev server
 app.add_middleware(
@@ -565,24 +528,229 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def split_filter_values(value: Optional[str]) -> tuple:
+    """'a,b' query parameter -> ('a', 'b')"""
+    return tuple(part.strip() for part in value.split(',') if part.strip()) if value else ()
+
+def parse_task_filter(area: str = None, project: str = None, context: str = None, priority: str = None,
+                      status: str = None, due_before: str = None, due_after: str = None,
+                      has_notes: bool = None) -> TaskFilter:
+    """Validated TaskFilter from /tasks query parameters"""
+    statuses = split_filter_values(status)
+    unknown = [value for value in statuses if value not in TASK_STATUSES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown status: {', '.join(unknown)} (expected one of {', '.join(TASK_STATUSES)})")
+    try:
+        before = datetime.strptime(due_before, '%Y-%m-%d').date() if due_before else None
+        after = datetime.strptime(due_after, '%Y-%m-%d').date() if due_after else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    return TaskFilter(split_filter_values(area), split_filter_values(project), split_filter_values(context),
+                      split_filter_values(priority), statuses, before, after, has_notes)
+
+def build_task_view(raw_tasks: List[dict], sort: str) -> List[dict]:
+    """Grouped view of a raw task tree for a /tasks sort mode (unknown modes group by due date)"""
+    return build_view(raw_tasks, TASK_VIEWS.get(sort, TASK_VIEWS['due']))
+
 @app.get("/tasks")
-def get_tasks(sort: str = "due"):
-    """Get tasks with optional sorting
+def get_tasks(sort: str = "due", area: str = None, project: str = None, context: str = None, priority: str = None,
+              status: str = None, due_before: str = None, due_after: str = None, has_notes: bool = None,
+              q: str = None, explain: bool = False):
+    """Get tasks with optional sorting and filtering
     
     Args:
-        sort: Sorting method - 'due' (default), 'priority', or 'none'
+        sort: Grouping - 'due' (default), 'due_week', 'priority', 'context', 'project', or 'none' (by area)
+        area, project, context, priority, status: only tasks with one of these
+            comma-separated values (tags with or without +/@, case-insensitive)
+        due_before, due_after: YYYY-MM-DD, exclusive bounds on the due date
+        has_notes: only tasks with (true) or without (false) notes
+        q: query such as '+Reports @Office priority:A due<2025-08-01 -status:onhold'
+            (see task_query.py), combined with the filters above
+        explain: return {'plan': ..., 'tasks': ...} with the query plan and timings
+    
+    Filtered results keep the ancestors of every matching task.
     """
+    task_filter = parse_task_filter(area, project, context, priority, status, due_before, due_after, has_notes)
+    if q or explain:
+        started = datetime.now()
+        try:
+            query = conjoin(parse_query(q, get_adjusted_today()) if q else None, query_from_filter(task_filter))
+        except QuerySyntaxError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid query: {e}")
+        if query is None:
+            raise HTTPException(status_code=400, detail="explain needs a query or filter")
+        parsed = datetime.now()
+        raw_tasks, plan = task_parser.parse_tasks_query(query)
+        queried = datetime.now()
+        view = build_task_view(raw_tasks, sort)
+        if not explain:
+            return view
+        plan['timings_ms'] = {'parse_query': round((parsed - started).total_seconds() * 1000, 3),
+                              'load': round((queried - parsed).total_seconds() * 1000 - sum(plan['timings_ms'].values()), 3),
+                              **plan['timings_ms'],
+                              'build_view': round((datetime.now() - queried).total_seconds() * 1000, 3)}
+        return {'plan': plan, 'tasks': view}
+
+    if not task_filter.is_empty():
+        return build_task_view(task_parser.parse_tasks_filtered(task_filter), sort)
+    
     if sort == "priority":
         return parse_tasks_by_priority()
     elif sort == "none":
         return parse_tasks_no_sort()
+    elif sort in TASK_VIEWS and sort != "due":
+        return build_task_view(task_parser.parse_tasks_raw(), sort)
     else:
         return parse_tasks()  # Default due date sorting
 
+# Urgency scores of the open tasks, rebuilt when URGENCY_WEIGHTS is replaced
+_urgency_ranking = {'tasks_signature': None, 'ranking': None}
+
+def get_urgency_ranking() -> UrgencyRanking:
+    """Urgency scores, updated from the diff of tasks.txt whenever it changed or the adjusted day turned"""
+    ranking = _urgency_ranking['ranking']
+    if ranking is None or ranking.weights is not URGENCY_WEIGHTS:
+        ranking = _urgency_ranking['ranking'] = UrgencyRanking(URGENCY_WEIGHTS)
+        _urgency_ranking['tasks_signature'] = None
+    tasks_signature = task_parser.get_file_signature(task_parser.tasks_file)
+    today = get_adjusted_today()
+    if tasks_signature != _urgency_ranking['tasks_signature'] or today != ranking.today:
+        ranking.update(task_parser.parse_tasks_raw(), today)
+        _urgency_ranking['tasks_signature'] = tasks_signature
+    return ranking
+
+@app.get("/tasks/next")
+def get_next_tasks(k: int = 10):
+    """The k most urgent open tasks (flat, most urgent first), scored by URGENCY_WEIGHTS"""
+    if not 1 <= k <= NEXT_ACTIONS_MAX_K:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {NEXT_ACTIONS_MAX_K}")
+    ranking = get_urgency_ranking()
+    return {'today': ranking.today.isoformat(), 'candidates': len(ranking.scores),
+            'tasks': [{**task, 'subtasks': [], 'urgency': score} for score, task in ranking.top(k)]}
+
+@app.get("/calendar")
+def get_calendar(granularity: str = "day", start: str = Query(None, alias="from"), end: str = Query(None, alias="to")):
+    """Tasks by due date in day, week or month buckets, with per-bucket counts
+
+    Args:
+        granularity: 'day' (default), 'week' or 'month'
+        from, to: YYYY-MM-DD bounds (default: adjusted today and CALENDAR_DEFAULT_DAYS later),
+            widened to whole buckets
+    """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Granularity must be one of: {', '.join(GRANULARITIES)}")
+    try:
+        start_date = datetime.strptime(start, '%Y-%m-%d').date() if start else get_adjusted_today()
+        end_date = datetime.strptime(end, '%Y-%m-%d').date() if end else start_date + timedelta(days=CALENDAR_DEFAULT_DAYS)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="to must not be before from")
+    if (end_date - start_date).days >= CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Ranges are limited to {CALENDAR_MAX_DAYS} days")
+    return due_calendar(task_parser.get_task_index(), start_date, end_date, granularity)
+
+# iCalendar feed, re-rendered when the task or occurrence index changes
+_calendar_feed = {'feed': None}
+
+def get_calendar_feed() -> CalendarFeed:
+    """The iCalendar feed of the current task and recurring indexes"""
+    feed = _calendar_feed['feed']
+    if feed is None or feed.horizon_days != CALENDAR_FEED_HORIZON_DAYS:
+        feed = _calendar_feed['feed'] = CalendarFeed(CALENDAR_FEED_HORIZON_DAYS)
+    recurring_tasks, occurrences = get_recurring_occurrence_index()
+    feed.update(task_parser.get_task_index(), occurrences, recurring_tasks, get_adjusted_today(),
+                datetime.now(timezone.utc))
+    return feed
+
+@app.get("/calendar.ics")
+def get_calendar_ics(request: Request):
+    """Due dates, follow-ups, onhold releases and recurring occurrences as an iCalendar feed
+
+    Supports conditional requests (If-None-Match, If-Modified-Since), so
+    calendar clients can poll it cheaply.
+    """
+    feed = get_calendar_feed()
+    headers = {'ETag': feed.etag, 'Last-Modified': format_datetime(feed.last_modified, usegmt=True),
+               'Cache-Control': 'no-cache'}
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        not_modified = etag_matches(if_none_match, feed.etag)
+    else:
+        try:
+            not_modified = feed.not_modified_since(parsedate_to_datetime(request.headers.get('if-modified-since', '')))
+        except (TypeError, ValueError):
+            not_modified = False
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(content=feed.body, media_type='text/calendar; charset=utf-8', headers=headers)
+
+# Saved views with their results, reloaded when saved_views.txt changes
+_saved_views = {'signature': None, 'tasks_signature': None, 'views': None, 'errors': []}
+
+def get_saved_views() -> SavedViewSet:
+    """Saved views, updated from the diff of tasks.txt whenever it changed or the adjusted day turned"""
+    signature = task_parser.get_file_signature(SAVED_VIEWS_FILE)
+    if _saved_views['views'] is None or signature != _saved_views['signature']:
+        text = ''
+        if signature is not None:
+            with open(SAVED_VIEWS_FILE, 'r') as f:
+                text = f.read()
+        views, errors = parse_views_text(text)
+        for error in errors:
+            print(f"Error in saved views: {error}")
+        _saved_views.update({'signature': signature, 'tasks_signature': None, 'views': SavedViewSet(views),
+                             'errors': errors})
+    
+    view_set = _saved_views['views']
+    tasks_signature = task_parser.get_file_signature(task_parser.tasks_file)
+    today = get_adjusted_today()
+    if tasks_signature != _saved_views['tasks_signature'] or today != view_set.today:
+        view_set.update(task_parser.parse_tasks_raw(), today)
+        _saved_views['tasks_signature'] = tasks_signature
+    return view_set
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+
+@app.get("/views")
+def list_saved_views():
+    """Saved views with their match counts and any configuration errors"""
+    return {'views': get_saved_views().summary(), 'errors': _saved_views['errors']}
+
+@app.get("/views/{name}")
+def get_saved_view(name: str, request: Request):
+    """Matching tasks of a saved view, with an ETag for conditional requests"""
+    entry = get_saved_views().get(name)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No saved view named {name}")
+    if entry['error']:
+        raise HTTPException(status_code=400, detail=f"Invalid query in saved view {name}: {entry['error']}")
+    headers = {'ETag': entry['etag'], 'Cache-Control': 'no-cache'}
+    if etag_matches(request.headers.get('if-none-match'), entry['etag']):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry['body'], media_type='application/json', headers=headers)
+
 @app.get("/recurring")
-def get_recurring(filter: str = "today"):
-    """Get recurring tasks with optional filtering"""
-    return get_recurring_tasks_by_filter(filter)
+def get_recurring(filter: str = "today", start: str = None, end: str = None):
+    """Get recurring tasks with optional filtering
+
+    Args:
+        filter: 'all', 'today' (default), 'next7days', 'next30days', ... or 'range'
+        start, end: YYYY-MM-DD bounds for the 'range' filter
+    """
+    try:
+        start_date = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+        end_date = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if filter == "range" and not start_date:
+        raise HTTPException(status_code=400, detail="The range filter requires a start date")
+    return get_recurring_tasks_by_filter(filter, start_date, end_date)
 
 @app.get("/statistics")
 def get_statistics():
@@ -590,20 +758,63 @@ def get_statistics():
     return compute_task_statistics()
 
 @app.get("/recurring/compliance")
-def get_recurring_compliance():
-    """Get recurring task compliance data over time"""
-    return get_recurring_task_compliance_data()
+def get_recurring_compliance(resolution: str = "day", max_points: int = None, start_date: str = None, end_date: str = None):
+    """Get recurring task compliance data over time
+
+    Args:
+        resolution: 'day' (default), 'week' or 'month' buckets
+        max_points: Thin the series to at most this many points (LTTB)
+        start_date, end_date: Optional YYYY-MM-DD bounds
+    """
+    check_downsample_params(resolution, max_points)
+    start, end = parse_series_range(start_date, end_date)
+    if resolution == "day" and not max_points and not start and not end:
+        return get_recurring_task_compliance_data()
+    return get_downsampled_compliance(start, end, resolution, max_points)
 
 @app.get("/recurring/compliance/individual")
 def get_individual_compliance(task_id: str = None, days: int = None):
     """Get compliance data for individual recurring tasks"""
     return get_individual_recurring_task_compliance(task_id, days)
 
+@app.get("/api/recurring/compliance/enhanced")
+@app.get("/recurring/compliance/enhanced")
+def get_enhanced_compliance(task_id: str = None, days: int = None, start_date: str = None, end_date: str = None,
+                            moving_average: int = None, include_trend: bool = False):
+    """Get recurring task compliance measured against expected occurrences"""
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    return get_enhanced_recurring_task_compliance(task_id, days, start, end, moving_average, include_trend)
+
 @app.get("/statistics/time-series/filtered")
 def get_filtered_time_series(days: int = None):
     """Get filtered time series statistics"""
     return get_statistics_time_series_filtered(days)
 
+@app.get("/statistics/tags/{dimension}/{tag}")
+def get_tag_statistics(dimension: str, tag: str, days: int = None):
+    """Get the daily task count for one project or context tag"""
+    if dimension not in ('project', 'context'):
+        raise HTTPException(status_code=400, detail="Dimension must be 'project' or 'context'")
+    return get_tag_time_series(dimension, tag, days)
+
+@app.post("/statistics/backfill")
+def post_backfill_statistics(workers: int = None):
+    """Fill days missing from the statistics history using the git history of tasks.txt"""
+    if workers is not None and workers < 1:
+        raise HTTPException(status_code=400, detail="workers must be at least 1")
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    repo_dir = os.path.join(current_dir, '../..')
+    try:
+        result = backfill_statistics(get_statistics_store(), STATISTICS_CSV_FILE, repo_dir, 'tasks.txt',
+                                     get_adjusted_date, workers)
+    except subprocess.CalledProcessError as e:
+        raise HTTPException(status_code=500, detail=f"Git history unavailable: {e.stderr.strip()}")
+    return {"success": True, **result}
+
 @app.post("/tasks/archive")
 def post_archive_completed_tasks():
     """Archive all completed tasks"""
@@ -614,39 +825,18 @@ def post_archive_completed_tasks():
 
 @app.post("/tasks/save-statistics")
 def post_save_task_statistics():
-    """Run the statistics.py script to save current task statistics to CSV log"""
+    """Save a snapshot of the current task statistics to the CSV log and time-series store"""
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Change to the scripts directory so relative paths work correctly
-        scripts_dir = os.path.join(current_dir, '../../scripts')
-        
-        # Run the statistics script
-        result = subprocess.run([
-            sys.executable, 'statistics.py'
-        ], cwd=scripts_dir, capture_output=True, text=True, timeout=30)
-        
-        if result.returncode == 0:
-            return {
-                "success": True, 
-                "message": "Statistics saved to log successfully",
-                "output": result.stdout.strip()
-            }
-        else:
-            return {
-                "success": False,
-                "message": f"Statistics script failed: {result.stderr}",
-                "output": result.stdout.strip()
-            }
-    except subprocess.TimeoutExpired:
+        stats = save_statistics_snapshot()
         return {
-            "success": False,
-            "message": "Statistics script timed out after 30 seconds"
+            "success": True,
+            "message": "Statistics saved to log successfully",
+            "output": format_statistics(stats)
         }
     except Exception as e:
         return {
             "success": False,
-            "message": f"Error running statistics script: {str(e)}"
+            "message": f"Error saving statistics: {str(e)}"
         }
 
 @app.post("/tasks/check")
@@ -746,34 +936,11 @@ def create_subtask(task_id: str, request: CreateTaskRequest):
 def post_recurring_status(request: RecurringTaskStatusRequest):
     """Set status for a recurring task and log it"""
     try:
-        # First get the task details to log the description
-        # Try both all tasks and filtered tasks to ensure we find the task
-        all_recurring_tasks = parse_recurring_tasks()
-        filtered_recurring_tasks = get_recurring_tasks_by_filter("all")  # Get all, not just today
-        
-        task_description = None
-        
-        # Find the task description
-        def find_task_in_groups(groups, target_id):
-            for group in groups:
-                if group.get('type') == 'area':
-                    for task in group.get('tasks', []):
-                        if task.get('id') == target_id:
-                            return task.get('description', 'Unknown task')
-                        # Check subtasks
-                        if task.get('subtasks'):
-                            for subtask in task['subtasks']:
-                                if subtask.get('id') == target_id:
-                                    return subtask.get('description', 'Unknown subtask')
-            return None
-        
-        # Try finding in filtered tasks first, then all tasks
-        task_description = find_task_in_groups(filtered_recurring_tasks, request.task_id)
-        if not task_description:
-            task_description = find_task_in_groups(all_recurring_tasks, request.task_id)
-        
-        if not task_description:
+        # Look up the task description through the cached ID index
+        task = task_parser.get_recurring_snapshot()['by_id'].get(request.task_id)
+        if not task:
             raise HTTPException(status_code=404, detail="Recurring task not found")
+        task_description = task.get('description', 'Unknown task')
         
         # Log the status
         success = log_recurring_task_status(request.task_id, request.status, task_description)
@@ -787,6 +954,29 @@ def post_recurring_status(request: RecurringTaskStatusRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing status update: {str(e)}")
 
+@app.post("/recurring/status/batch")
+def post_recurring_status_batch(request: RecurringTaskStatusBatchRequest):
+    """Set status for several recurring tasks and log them in one write"""
+    try:
+        by_id = task_parser.get_recurring_snapshot()['by_id']
+        
+        # Validate the whole batch before writing anything
+        missing = [update.task_id for update in request.updates if update.task_id not in by_id]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Recurring tasks not found: {', '.join(missing)}")
+        
+        entries = [(update.task_id, update.status, by_id[update.task_id].get('description', 'Unknown task'))
+                   for update in request.updates]
+        if not log_recurring_task_statuses(entries):
+            raise HTTPException(status_code=500, detail="Failed to log task statuses")
+        
+        return {"success": True, "count": len(entries), "message": f"Logged {len(entries)} status updates"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing status batch: {str(e)}")
+
 @app.post("/git/commit")
 def post_git_commit(message: str):
     """Run git commit script for task files"""
@@ -940,198 +1130,493 @@ async def push_due_dates_to_calendar():
             "message": f"Error running calendar sync: {str(e)}"
         }
 
-def read_statistics_csv():
-    """Read historical statistics from CSV file"""
+# Metrics plotted by the statistics time series, in response order
+TIME_SERIES_METRICS = ['total', 'completed', 'incomplete', 'completion_pct',
+                       'with_due_date', 'overdue', 'due_today', 'due_this_week']
+
+# Columnar store for statistics snapshots, created on first use
+_statistics_store = {'directory': None, 'store': None}
+
+def get_statistics_store() -> TimeSeriesStore:
+    """Return the statistics store, importing any rows appended to task_statistics.csv"""
+    if _statistics_store['store'] is None or _statistics_store['directory'] != STATISTICS_STORE_DIR:
+        _statistics_store['store'] = TimeSeriesStore(STATISTICS_STORE_DIR)
+        _statistics_store['directory'] = STATISTICS_STORE_DIR
+    store = _statistics_store['store']
+    store.sync_csv(STATISTICS_CSV_FILE)
+    return store
+
+def format_statistics(stats: dict) -> str:
+    """Aligned 'name : value' listing of a statistics snapshot"""
+    width = max((len(key) for key in stats), default=0)
+    return '\n'.join(f"{key.ljust(width)} : {str(format_statistic(value)).rjust(10)}" for key, value in stats.items())
+
+def save_statistics_snapshot(timestamp: datetime = None) -> dict:
+    """Record the current statistics in task_statistics.csv and the time-series store"""
+    timestamp = (timestamp or datetime.now()).replace(microsecond=0)
+    stats = compute_task_statistics()
+    append_statistics_csv(stats, timestamp, STATISTICS_CSV_FILE)
+    # Importing the new CSV rows appends them to the store
+    get_statistics_store()
+    return stats
+
+def take_scheduled_snapshot(timestamp: datetime) -> dict:
+    """Scheduled snapshot: into the store, and into task_statistics.csv only once per adjusted day"""
+    timestamp = timestamp.replace(microsecond=0)
+    stats = compute_task_statistics()
+    latest = latest_csv_snapshot(STATISTICS_CSV_FILE)
+    if latest is None or get_adjusted_date(latest) < get_adjusted_date(timestamp):
+        append_statistics_csv(stats, timestamp, STATISTICS_CSV_FILE)
+        get_statistics_store()
+    else:
+        # Project/context counts become long tag rows in the store
+        get_statistics_store().append(timestamp, stats)
+    return stats
+
+def last_statistics_snapshot() -> Optional[datetime]:
+    """Timestamp of the latest stored statistics snapshot, if any"""
+    timestamps = get_statistics_store().timestamps()
+    return from_seconds(timestamps[-1]) if len(timestamps) else None
+
+def series_value(value: float, kind: str):
+    """Store value -> JSON value: NaN becomes 0 and integer metrics stay ints"""
+    if np.isnan(value):
+        return 0
+    return float(value) if kind == 'f' else int(value)
+
+# Downsampled series keyed on (source, metrics, range, resolution, max_points, data version)
+_series_cache = BucketCache()
+
+def parse_series_range(start_date: str = None, end_date: str = None):
+    """YYYY-MM-DD query bounds -> (start date, end date), raising 400 on bad input"""
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        csv_file = os.path.join(current_dir, '../../archive_files/task_statistics.csv')
-        
-        if not os.path.exists(csv_file):
-            return []
-        
-        data = []
-        current_headers = None
-        
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if not line:
-                i += 1
-                continue
-                
-            # Check if this line is a header (starts with 'timestamp')
-            if line.startswith('timestamp,'):
-                current_headers = line.split(',')
-                i += 1
-                continue
-            
-            # If we have headers, try to parse data rows
-            if current_headers:
-                values = line.split(',')
-                if len(values) == len(current_headers):
-                    row = dict(zip(current_headers, values))
-                    
-                    # Skip if timestamp is 'timestamp' (duplicate header)
-                    if row.get('timestamp') == 'timestamp':
-                        i += 1
-                        continue
-                    
-                    # Parse timestamp
-                    try:
-                        timestamp = datetime.strptime(row['timestamp'], '%Y-%m-%d %H:%M:%S')
-                        row['timestamp'] = timestamp
-                        
-                        # Convert numeric fields
-                        for key, value in row.items():
-                            if key != 'timestamp' and value and isinstance(value, str):
-                                # Check if it's a number (including negative and decimal)
-                                if value.replace('.', '').replace('-', '').isdigit():
-                                    row[key] = float(value) if '.' in value else int(value)
-                        
-                        data.append(row)
-                    except ValueError:
-                        pass
-            
-            i += 1
-        
-        # Sort by timestamp
-        data.sort(key=lambda x: x['timestamp'])
-        return data
+        start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    return start, end
+
+def check_downsample_params(resolution: str, max_points: int = None):
+    """Validate resolution/max_points query parameters"""
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"Resolution must be one of: {', '.join(RESOLUTIONS)}")
+    if max_points is not None and max_points < 3:
+        raise HTTPException(status_code=400, detail="max_points must be at least 3")
+
+def build_statistics_time_series(start: datetime = None, end: datetime = None, resolution: str = 'day',
+                                 max_points: int = None) -> List[dict]:
+    """Latest statistics snapshot per day from the columnar store
+
+    With resolution 'week' or 'month' each metric is averaged per bucket, and
+    max_points thins the result with LTTB on the first metric.
+    """
+    try:
+        store = get_statistics_store()
+        key = ('statistics', tuple(TIME_SERIES_METRICS), start, end, resolution, max_points, len(store))
+        return _series_cache.get_or_compute(
+            key, lambda: statistics_series_rows(store, start, end, resolution, max_points))
         
     except Exception as e:
-        print(f"Error reading statistics CSV: {e}")
+        print(f"Error reading statistics time series: {e}")
         return []
 
+def statistics_series_rows(store: TimeSeriesStore, start: datetime, end: datetime, resolution: str,
+                           max_points: int = None) -> List[dict]:
+    """Build (and optionally downsample) the statistics rows for a time range"""
+    series = store.daily_series(TIME_SERIES_METRICS, start, end)
+    ordinals = ordinals_from_strings(series['dates'])
+    columns = {metric: series[metric] for metric in TIME_SERIES_METRICS}
+    ordinals, columns = downsample(ordinals, columns, resolution, max_points, primary=TIME_SERIES_METRICS[0])
+    
+    # Bucket means are fractional; untouched daily values keep their integer kind
+    kinds = {metric: store.kind(metric) if resolution == 'day' else 'f' for metric in TIME_SERIES_METRICS}
+    columns = {metric: values.tolist() for metric, values in columns.items()}
+    
+    time_series = []
+    for i, date_str in enumerate(ordinals_to_strings(ordinals)):
+        entry = {'date': date_str}
+        for metric in TIME_SERIES_METRICS:
+            value = series_value(columns[metric][i], kinds[metric])
+            entry[metric] = round(value, 2) if resolution != 'day' else value
+        time_series.append(entry)
+    return time_series
+
+COMPLIANCE_COUNTS = ['completed', 'missed', 'deferred', 'total']
+
+def get_downsampled_compliance(start: date = None, end: date = None, resolution: str = 'day',
+                               max_points: int = None) -> List[dict]:
+    """Daily recurring compliance, optionally bucketed by week/month and thinned with LTTB"""
+    status_log = get_status_log()
+    key = ('compliance', start, end, resolution, max_points, status_log.version())
+    
+    def compute():
+        rows = status_log.get_daily_compliance()
+        if start:
+            rows = [row for row in rows if row['date'] >= start.strftime('%Y-%m-%d')]
+        if end:
+            rows = [row for row in rows if row['date'] <= end.strftime('%Y-%m-%d')]
+        if resolution == 'day' and (not max_points or len(rows) <= max_points):
+            return rows
+        
+        ordinals = ordinals_from_strings([row['date'] for row in rows])
+        columns = {name: np.array([row[name] for row in rows], dtype=np.float64) for name in COMPLIANCE_COUNTS}
+        if resolution != 'day':
+            # Counts add up across a bucket; the percentage is recomputed from the sums
+            ordinals, columns = aggregate_buckets(ordinals, columns, resolution, {name: 'sum' for name in COMPLIANCE_COUNTS})
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns['compliance_pct'] = np.where(columns['total'] > 0, columns['completed'] / columns['total'] * 100, 0.0)
+        ordinals, columns = downsample(ordinals, columns, 'day', max_points, primary='compliance_pct')
+        
+        result = []
+        for i, date_str in enumerate(ordinals_to_strings(ordinals)):
+            entry = {'date': date_str}
+            for name in COMPLIANCE_COUNTS:
+                entry[name] = int(columns[name][i])
+            entry['compliance_pct'] = round(float(columns['compliance_pct'][i]), 2)
+            result.append(entry)
+        return result
+    
+    return _series_cache.get_or_compute(key, compute)
+
 def get_recurring_task_compliance_data():
     """Calculate recurring task compliance over time"""
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        log_file = os.path.join(current_dir, '../../archive_files/recurring_status_log.txt')
-        
-        if not os.path.exists(log_file):
-            return []
-        
-        # Parse the log file
-        daily_stats = defaultdict(lambda: {'completed': 0, 'missed': 0, 'deferred': 0, 'total': 0})
-        
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                parts = line.split(' | ')
-                if len(parts) >= 4:
-                    timestamp_str = parts[0]
-                    status = parts[1].upper()
-                    task_id = parts[2]
-                    
-                    try:
-                        timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                        # Use adjusted date for 3 AM boundary
-                        adjusted_date = get_adjusted_date(timestamp)
-                        date_str = adjusted_date.strftime('%Y-%m-%d')
-                        
-                        daily_stats[date_str]['total'] += 1
-                        if status == 'COMPLETED':
-                            daily_stats[date_str]['completed'] += 1
-                        elif status == 'MISSED':
-                            daily_stats[date_str]['missed'] += 1
-                        elif status == 'DEFERRED':
-                            daily_stats[date_str]['deferred'] += 1
-                            
-                    except ValueError:
-                        continue
-        
-        # Convert to list and calculate compliance percentage
-        compliance_data = []
-        for date_str, stats in sorted(daily_stats.items()):
-            total = stats['total']
-            completed = stats['completed']
-            compliance_pct = (completed / total * 100) if total > 0 else 0
-            
-            compliance_data.append({
-                'date': date_str,
-                'completed': completed,
-                'missed': stats['missed'],
-                'deferred': stats['deferred'],
-                'total': total,
-                'compliance_pct': round(compliance_pct, 2)
-            })
-        
-        return compliance_data
+        # Daily counts are maintained by the status log store as entries are appended
+        return get_status_log().get_daily_compliance()
         
     except Exception as e:
         print(f"Error calculating compliance data: {e}")
         return []
 
 def get_statistics_time_series():
-    """Get statistics time series data from CSV"""
-    data = read_statistics_csv()
+    """Get statistics time series data from the statistics store"""
+    return build_statistics_time_series()
+
+def get_tag_time_series(dimension: str, tag: str, days: int = None) -> List[dict]:
+    """Count of one project/context tag in the latest snapshot of each day (0 when the tag was absent)"""
+    store = get_statistics_store()
+    prefix = '+' if dimension == 'project' else '@'
+    # Older snapshots spell tags with their +/@ prefix, newer ones without it
+    names = list(dict.fromkeys([f"{dimension}_{tag}", f"{dimension}_{prefix}{tag.lstrip(prefix)}",
+                                f"{dimension}_{tag.lstrip(prefix)}"]))
+    series = store.daily_series(names, days_cutoff(days))
     
-    # Group by date (in case there are multiple entries per day)
-    daily_data = defaultdict(list)
-    for row in data:
-        date_str = row['timestamp'].strftime('%Y-%m-%d')
-        daily_data[date_str].append(row)
+    counts = np.zeros(len(series['dates']))
+    for name in names:
+        present = ~np.isnan(series[name])
+        counts[present] = series[name][present]
+    return [{'date': date_str, 'count': int(count)} for date_str, count in zip(series['dates'], counts.tolist())]
+
+# Compliance metrics selectable through ?metrics=, mapped to their compliance count column
+COMPLIANCE_METRICS = {'compliance_pct': None, 'compliance_completed': 'completed', 'compliance_missed': 'missed',
+                      'compliance_deferred': 'deferred', 'compliance_total': 'total'}
+
+def compliance_columns(start: date = None, end: date = None, resolution: str = 'day'):
+    """Recurring compliance counts as (ordinals, columns), summed per bucket, with compliance_pct"""
+    rows = get_downsampled_compliance(start, end, 'day')
+    ordinals = ordinals_from_strings([row['date'] for row in rows])
+    columns = {name: np.array([row[name] for row in rows], dtype=np.float64) for name in COMPLIANCE_COUNTS}
+    if resolution != 'day':
+        ordinals, columns = aggregate_buckets(ordinals, columns, resolution, {name: 'sum' for name in COMPLIANCE_COUNTS})
+    with np.errstate(invalid='ignore', divide='ignore'):
+        columns['compliance_pct'] = np.where(columns['total'] > 0, columns['completed'] / columns['total'] * 100, 0.0)
+    return ordinals, columns
+
+def query_time_series(metrics: List[str], start: date = None, end: date = None, resolution: str = 'day',
+                      max_points: int = None):
+    """Selected statistics and compliance metrics aligned on one date axis
+
+    Returns (ordinals, {metric: float64 array}) with NaN where a source has no
+    value for a date. Statistics metrics are read from the columnar store and
+    averaged per bucket; compliance metrics are summed per bucket.
+    """
+    store = get_statistics_store()
+    key = ('query', tuple(metrics), start, end, resolution, max_points, len(store), get_status_log().version())
     
-    # Take the latest entry for each day and format for charting
-    time_series = []
-    for date_str in sorted(daily_data.keys()):
-        latest_entry = max(daily_data[date_str], key=lambda x: x['timestamp'])
-        
-        time_series.append({
-            'date': date_str,
-            'total': latest_entry.get('total', 0),
-            'completed': latest_entry.get('completed', 0),
-            'incomplete': latest_entry.get('incomplete', 0),
-            'completion_pct': latest_entry.get('completion_pct', 0),
-            'with_due_date': latest_entry.get('with_due_date', 0),
-            'overdue': latest_entry.get('overdue', 0),
-            'due_today': latest_entry.get('due_today', 0),
-            'due_this_week': latest_entry.get('due_this_week', 0)
-        })
+    def compute():
+        sources = []
+        stats_metrics = [metric for metric in metrics if metric not in COMPLIANCE_METRICS]
+        if stats_metrics:
+            series = store.daily_series(stats_metrics,
+                                        datetime.combine(start, time.min) if start else None,
+                                        datetime.combine(end, time.max) if end else None)
+            ordinals = ordinals_from_strings(series['dates'])
+            columns = {metric: series[metric] for metric in stats_metrics}
+            if resolution != 'day':
+                ordinals, columns = aggregate_buckets(ordinals, columns, resolution)
+            sources.append((ordinals, columns))
+        
+        wanted_compliance = [metric for metric in metrics if metric in COMPLIANCE_METRICS]
+        if wanted_compliance:
+            ordinals, columns = compliance_columns(start, end, resolution)
+            sources.append((ordinals, {metric: columns[COMPLIANCE_METRICS[metric] or 'compliance_pct']
+                                       for metric in wanted_compliance}))
+        
+        ordinals, columns = outer_join(*sources)
+        return downsample(ordinals, columns, 'day', max_points, primary=metrics[0])
     
-    return time_series
+    return _series_cache.get_or_compute(key, compute)
+
+def validate_metrics(metrics: List[str]):
+    """Raise 400 unless every metric is a known statistics, tag or compliance metric"""
+    if not metrics:
+        raise HTTPException(status_code=400, detail="No metrics requested")
+    store = get_statistics_store()
+    known = set(store.columns()) | set(store.tags()) | set(COMPLIANCE_METRICS)
+    unknown = [metric for metric in metrics if metric not in known]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}")
+
+def time_series_rows(metrics: List[str], ordinals: np.ndarray, columns: dict, resolution: str = 'day') -> List[dict]:
+    """Flat {date, metric: value} rows; missing values are null"""
+    store = get_statistics_store()
+    integral = {metric for metric in metrics
+                if resolution == 'day' and metric not in COMPLIANCE_METRICS and store.kind(metric) == 'i'}
+    integral.update(metric for metric in metrics if metric in COMPLIANCE_METRICS and COMPLIANCE_METRICS[metric])
+    values = {metric: columns[metric].tolist() for metric in metrics}
+    
+    rows = []
+    for i, date_str in enumerate(ordinals_to_strings(ordinals)):
+        row = {'date': date_str}
+        for metric in metrics:
+            value = values[metric][i]
+            if np.isnan(value):
+                row[metric] = None
+            else:
+                row[metric] = int(value) if metric in integral else round(value, 2)
+        rows.append(row)
+    return rows
 
 @app.get("/statistics/time-series")
-def get_statistics_time_series_endpoint():
-    """Get time-series statistics data for charts"""
+def get_statistics_time_series_endpoint(resolution: str = "day", max_points: int = None,
+                                        start_date: str = None, end_date: str = None, metrics: str = None):
+    """Get time-series statistics data for charts
+
+    Args:
+        resolution: 'day' (default), 'week' or 'month' buckets
+        max_points: Thin the series to at most this many points (LTTB)
+        start_date, end_date: Optional YYYY-MM-DD bounds
+        metrics: Comma-separated metrics to return as flat columns, e.g.
+            'overdue,compliance_pct' (statistics metrics, project_/context_ tags,
+            or compliance_pct/compliance_completed/_missed/_deferred/_total)
+    """
+    check_downsample_params(resolution, max_points)
+    start, end = parse_series_range(start_date, end_date)
+    
+    if metrics is not None:
+        selected = parse_metric_list(metrics)
+        validate_metrics(selected)
+        ordinals, columns = query_time_series(selected, start, end, resolution, max_points)
+        return time_series_rows(selected, ordinals, columns, resolution)
+    
     try:
-        # Get compliance data
-        compliance_data = get_recurring_task_compliance_data()
+        # Get compliance data, bucketed the same way as the statistics
+        compliance_data = get_downsampled_compliance(start, end, resolution)
         
         # Get general statistics time series
-        general_time_series = get_statistics_time_series()
-        
-        # Combine data: for each date, add compliance stats to the general stats
-        combined_data = {}
-        for entry in general_time_series:
-            date_str = entry['date']
-            combined_data[date_str] = {
-                'date': date_str,
-                'total': entry['total'],
-                'completed': entry['completed'],
-                'incomplete': entry['incomplete'],
-                'completion_pct': entry['completion_pct'],
-                'with_due_date': entry['with_due_date'],
-                'overdue': entry['overdue'],
-                'due_today': entry['due_today'],
-                'due_this_week': entry['due_this_week'],
-                'compliance': next((c for c in compliance_data if c['date'] == date_str), None)
-            }
+        general_time_series = build_statistics_time_series(
+            datetime.combine(start, time.min) if start else None,
+            datetime.combine(end, time.max) if end else None,
+            resolution, max_points)
+        
+        # Attach each day's compliance entry with one vectorized lookup over both date axes
+        stats_ordinals = ordinals_from_strings([entry['date'] for entry in general_time_series])
+        compliance_ordinals = ordinals_from_strings([entry['date'] for entry in compliance_data])
+        rows = align(stats_ordinals, compliance_ordinals,
+                     {'row': np.arange(len(compliance_data), dtype=np.float64)})['row']
         
-        # Convert back to sorted list
-        combined_list = sorted(combined_data.values(), key=lambda x: x['date'])
+        combined_list = []
+        for entry, row in zip(general_time_series, rows.tolist()):
+            combined_list.append({**entry, 'compliance': None if np.isnan(row) else compliance_data[int(row)]})
         
         return combined_list
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class AnalyticsContext:
+    """Data sources shared by the sub-queries of one analytics request, each loaded on first use"""
+    
+    def __init__(self):
+        self._sources = {}
+    
+    def _load(self, name: str, loader):
+        if name not in self._sources:
+            self._sources[name] = loader()
+        return self._sources[name]
+    
+    @property
+    def status_data(self) -> dict:
+        return self._load('status_data', lambda: get_status_log().get_status_data())
+    
+    @property
+    def descriptions(self) -> dict:
+        return self._load('descriptions', lambda: get_status_log().get_descriptions())
+    
+    @property
+    def recurring_tasks(self) -> list:
+        return self._load('recurring_tasks', lambda: flatten_recurring_tasks(task_parser.get_recurring_snapshot()['tasks']))
+    
+    @property
+    def shadow_index(self) -> ShadowIndex:
+        return self._load('shadow_index', get_shadow_index)
+
+def sub_query_range(query: AnalyticsSubQuery):
+    """Date bounds for a sub-query from start_date/end_date, or the last `days` days"""
+    start, end = parse_series_range(query.start_date, query.end_date)
+    if query.days and not start:
+        start = get_adjusted_today() - timedelta(days=query.days - 1)
+    return start, end
+
+def run_analytics_sub_query(query: AnalyticsSubQuery, context: AnalyticsContext):
+    """Answer one sub-query of POST /analytics/query"""
+    if query.type == 'series':
+        check_downsample_params(query.resolution, query.max_points)
+        metrics = list(dict.fromkeys(query.metrics)) if query.metrics else TIME_SERIES_METRICS
+        validate_metrics(metrics)
+        start, end = sub_query_range(query)
+        ordinals, columns = query_time_series(metrics, start, end, query.resolution, query.max_points)
+        return time_series_rows(metrics, ordinals, columns, query.resolution)
+    
+    if query.type == 'compliance':
+        check_downsample_params(query.resolution, query.max_points)
+        start, end = sub_query_range(query)
+        return get_downsampled_compliance(start, end, query.resolution, query.max_points)
+    
+    if query.type == 'individual':
+        return get_individual_recurring_task_compliance(query.task_id, query.days, context.status_data, context.descriptions)
+    
+    if query.type == 'enhanced':
+        start, end = parse_series_range(query.start_date, query.end_date)
+        return get_enhanced_recurring_task_compliance(query.task_id, query.days, start, end, query.moving_average,
+                                                      query.include_trend, context.recurring_tasks, context.status_data)
+    
+    if query.type == 'tag':
+        if query.dimension not in ('project', 'context') or not query.tag:
+            raise HTTPException(status_code=400, detail="Tag queries need dimension 'project' or 'context' and a tag")
+        return get_tag_time_series(query.dimension, query.tag, query.days)
+    
+    if query.type == 'recurring_tasks':
+        return [{'task_id': task['id'], 'description': task.get('description', '')} for task in context.recurring_tasks]
+    
+    if query.type == 'index':
+        if not query.sql:
+            raise HTTPException(status_code=400, detail="Index queries need an sql statement")
+        return run_index_query(context.shadow_index, query.sql, query.params)
+    
+    raise HTTPException(status_code=400, detail=f"Unknown query type: {query.type}")
+
+@app.post("/analytics/query")
+def post_analytics_query(request: AnalyticsQueryRequest):
+    """Run several statistics/compliance queries in one request
+
+    Each data source is loaded at most once and shared by all sub-queries.
+    Results come back in request order; a failing sub-query reports its own
+    error without failing the others.
+    """
+    context = AnalyticsContext()
+    results = []
+    for query in request.queries:
+        result = {'id': query.id, 'type': query.type}
+        try:
+            result['data'] = run_analytics_sub_query(query, context)
+        except HTTPException as e:
+            result['error'] = e.detail
+            result['status'] = e.status_code
+        except Exception as e:
+            result['error'] = str(e)
+            result['status'] = 500
+        results.append(result)
+    return {'results': results}
+
+# SQLite shadow index of the data files, created on first use
+_shadow_index = {'path': None, 'index': None}
+
+def get_shadow_index() -> ShadowIndex:
+    """Return the shadow index, synced with the data files that changed since the last call"""
+    if not SHADOW_INDEX_ENABLED:
+        raise HTTPException(status_code=404, detail="The shadow index is disabled")
+    if _shadow_index['index'] is None or _shadow_index['path'] != SHADOW_INDEX_FILE:
+        _shadow_index['index'] = ShadowIndex(SHADOW_INDEX_FILE)
+        _shadow_index['path'] = SHADOW_INDEX_FILE
+    index = _shadow_index['index']
+    sync_shadow_index(index)
+    return index
+
+def file_version(path: str) -> Optional[str]:
+    """Version of a data file for the shadow index (mtime and size), or None if it does not exist"""
+    signature = task_parser.get_file_signature(path)
+    return f"{signature[1]}:{signature[2]}" if signature else None
+
+def list_index_source(kind: str, filepath: str, parse):
+    """(kind, build) of a list or goals file for ShadowIndex.sync_source"""
+    name = os.path.basename(filepath)[:-4]
+    return kind, lambda: (list_item_rows(kind, name, parse(filepath)), None)
+
+def read_archive_rows(archive_file: str):
+    with open(archive_file, 'r', encoding='utf-8') as f:
+        return archive_rows(f.read()), None
+
+def sync_shadow_index(index: ShadowIndex):
+    """Mirror every data file whose version changed, and drop files that were removed"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    archive_file = os.path.join(current_dir, '../../archive_files/archive.txt')
+    sources = {
+        task_parser.tasks_file: ('tasks', lambda: (task_rows(task_parser.parse_tasks_raw()),
+                                                   task_parser.get_tasks_valid_until())),
+        task_parser.recurring_file: ('recurring', lambda: (recurring_rows(task_parser.get_recurring_snapshot()['tasks']),
+                                                           None)),
+        archive_file: ('archive', lambda: read_archive_rows(archive_file)),
+    }
+    for kind, directory, parse in (('list', '../../lists', parse_list_file), ('goal', '../../goals', parse_goals_file)):
+        directory = os.path.join(current_dir, directory)
+        if os.path.isdir(directory):
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith('.txt'):
+                    filepath = os.path.join(directory, filename)
+                    sources[filepath] = list_index_source(kind, filepath, parse)
+    
+    today = get_adjusted_today()
+    present = set()
+    for path, (kind, build) in sources.items():
+        version = file_version(path)
+        if version is None:
+            continue
+        present.add(os.path.abspath(path))
+        try:
+            index.sync_source(kind, path, version, build, today)
+        except Exception as e:
+            print(f"Error indexing {path}: {e}")
+    
+    status_log = get_status_log()
+    present.add(os.path.abspath(status_log.path))
+    try:
+        index.sync_status_log(status_log.path, get_adjusted_date)
+    except Exception as e:
+        print(f"Error indexing {status_log.path}: {e}")
+    
+    for path in index.sources():
+        if path not in present:
+            index.remove_source(path)
+
+def run_index_query(index: ShadowIndex, sql: str, params: List[Any] = None, limit: int = None) -> List[dict]:
+    """Rows of a read-only query against the shadow index, at most SHADOW_INDEX_MAX_ROWS and SHADOW_INDEX_QUERY_TIMEOUT"""
+    limit = min(limit, SHADOW_INDEX_MAX_ROWS) if limit else SHADOW_INDEX_MAX_ROWS
+    try:
+        return index.query(sql, params or (), limit, SHADOW_INDEX_QUERY_TIMEOUT)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid index query: {e}")
+
+@app.post("/index/query")
+def post_index_query(request: IndexQueryRequest):
+    """Run one read-only SQL statement against the shadow index of the data files
+
+    Tables: tasks, task_tags, notes, recurring, status_log, archive,
+    list_items and sources (see shadow_index.py).
+    """
+    rows = run_index_query(get_shadow_index(), request.sql, request.params, request.limit)
+    return {'rows': rows, 'count': len(rows)}
+
 @app.post("/generate-sample-data")
 def generate_sample_data():
     """Generate sample historical data for demonstration purposes"""
@@ -1184,16 +1669,19 @@ def generate_sample_data():
     except Exception as e:
         return {"success": False, "message": f"Error generating sample data: {str(e)}"}
 
-def get_individual_recurring_task_compliance(task_id: str = None, days: int = None):
-    """Get compliance data for individual recurring tasks"""
+def get_individual_recurring_task_compliance(task_id: str = None, days: int = None, status_data: dict = None,
+                                             descriptions: dict = None):
+    """Get compliance data for individual recurring tasks
+
+    status_data/descriptions default to the status log store; batch queries
+    pass them in so the log is only read once per request.
+    """
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        log_file = os.path.join(current_dir, '../../archive_files/recurring_status_log.txt')
-        
-        if not os.path.exists(log_file):
-            return []
+        if status_data is None:
+            status_data = get_status_log().get_status_data()
+        if descriptions is None:
+            descriptions = get_status_log().get_descriptions()
         
-        # Parse the log file
         task_stats = defaultdict(lambda: defaultdict(lambda: {'completed': 0, 'missed': 0, 'deferred': 0, 'total': 0}))
         task_descriptions = {}
         
@@ -1202,45 +1690,26 @@ def get_individual_recurring_task_compliance(task_id: str = None, days: int = No
         if days:
             cutoff_date = datetime.now() - timedelta(days=days)
         
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
+        for task_id_log, entries in status_data.items():
+            for _, status, timestamp in entries:
+                # Apply date filter if specified
+                if cutoff_date and timestamp < cutoff_date:
                     continue
                 
-                parts = line.split(' | ')
-                if len(parts) >= 4:
-                    timestamp_str = parts[0]
-                    status = parts[1].upper()
-                    task_id_log = parts[2]
-                    task_description = parts[3]
-                    
-                    try:
-                        timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                        
-                        # Apply date filter if specified
-                        if cutoff_date and timestamp < cutoff_date:
-                            continue
-                            
-                        date_str = timestamp.strftime('%Y-%m-%d')
-                        
-                        # Store task description
-                        task_descriptions[task_id_log] = task_description
-                        
-                        # Filter by specific task if requested
-                        if task_id and task_id_log != task_id:
-                            continue
-                        
-                        task_stats[task_id_log][date_str]['total'] += 1
-                        if status == 'COMPLETED':
-                            task_stats[task_id_log][date_str]['completed'] += 1
-                        elif status == 'MISSED':
-                            task_stats[task_id_log][date_str]['missed'] += 1
-                        elif status == 'DEFERRED':
-                            task_stats[task_id_log][date_str]['deferred'] += 1
-                            
-                    except ValueError:
-                        continue
+                date_str = timestamp.strftime('%Y-%m-%d')
+                task_descriptions[task_id_log] = descriptions.get(task_id_log, 'Unknown')
+                
+                # Filter by specific task if requested
+                if task_id and task_id_log != task_id:
+                    continue
+                
+                task_stats[task_id_log][date_str]['total'] += 1
+                if status == 'COMPLETED':
+                    task_stats[task_id_log][date_str]['completed'] += 1
+                elif status == 'MISSED':
+                    task_stats[task_id_log][date_str]['missed'] += 1
+                elif status == 'DEFERRED':
+                    task_stats[task_id_log][date_str]['deferred'] += 1
         
         # Convert to the desired format
         if task_id:
@@ -1296,76 +1765,200 @@ def get_individual_recurring_task_compliance(task_id: str = None, days: int = No
         print(f"Error getting individual task compliance: {e}")
         return []
 
-def get_statistics_time_series_filtered(days: int = None):
-    """Get statistics time series data with optional day filter"""
-    data = read_statistics_csv()
-    
-    # Apply date filter if specified
-    if days:
-        cutoff_date = datetime.now() - timedelta(days=days)
-        data = [row for row in data if row['timestamp'] >= cutoff_date]
-    
-    # Group by date (in case there are multiple entries per day)
-    daily_data = defaultdict(list)
-    for row in data:
-        date_str = row['timestamp'].strftime('%Y-%m-%d')
-        daily_data[date_str].append(row)
-    
-    # Take the latest entry for each day and format for charting
-    time_series = []
-    for date_str in sorted(daily_data.keys()):
-        latest_entry = max(daily_data[date_str], key=lambda x: x['timestamp'])
-        
-        time_series.append({
-            'date': date_str,
-            'total': latest_entry.get('total', 0),
-            'completed': latest_entry.get('completed', 0),
-            'incomplete': latest_entry.get('incomplete', 0),
-            'completion_pct': latest_entry.get('completion_pct', 0),
-            'with_due_date': latest_entry.get('with_due_date', 0),
-            'overdue': latest_entry.get('overdue', 0),
-            'due_today': latest_entry.get('due_today', 0),
-            'due_this_week': latest_entry.get('due_this_week', 0)
-        })
-    
-    return time_series
+STATUS_CODES = {'COMPLETED': 1, 'MISSED': 2, 'DEFERRED': 3}
 
-def post_save_task_statistics():
-    """Run the statistics.py script to save current task statistics to CSV log"""
-    try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        script_path = os.path.join(current_dir, '../../scripts/statistics.py')
-        
-        # Change to the scripts directory so relative paths work correctly
-        scripts_dir = os.path.join(current_dir, '../../scripts')
-        
-        # Run the statistics script
-        result = subprocess.run([
-            sys.executable, 'statistics.py'
-        ], cwd=scripts_dir, capture_output=True, text=True, timeout=30)
-        
-        if result.returncode == 0:
-            return {
-                "success": True, 
-                "message": "Statistics saved to log successfully",
-                "output": result.stdout.strip()
-            }
-        else:
-            return {
-                "success": False,
-                "message": f"Statistics script failed: {result.stderr}",
-                "output": result.stdout.strip()
-            }
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "message": "Statistics script timed out after 30 seconds"
+def first_log_date(entries) -> Optional[date]:
+    """Adjusted date of the earliest of a task's (date, status, timestamp) log entries"""
+    return min(entry[0] for entry in entries) if entries else None
+
+def compute_enhanced_compliance(tasks, status_data: dict, start: date, end: date, task_id: str = None,
+                                moving_average: int = None, include_trend: bool = False):
+    """
+    Join expected recurring task occurrences against logged statuses.
+
+    Every day on which a task's recurrence rule fires counts towards the
+    denominator, whether or not anything was logged that day, from the day the
+    task began (its start:/due: date or first log entry) on.  The latest
+    status logged for a (task, day) pair wins, and statuses logged on days
+    the task was not due are ignored.
+    """
+    if task_id:
+        tasks = [t for t in tasks if t.get('id') == task_id]
+    tasks = [t for t in tasks if compile_task_rule(t) is not None]
+
+    empty = {
+        'start_date': start.strftime('%Y-%m-%d'),
+        'end_date': end.strftime('%Y-%m-%d'),
+        'data': [],
+        'tasks': [],
+        'summary': {'expected': 0, 'completed': 0, 'missed': 0, 'deferred': 0, 'unlogged': 0, 'compliance_pct': 0}
+    }
+    if not tasks or end < start:
+        return empty
+
+    ordinals, expected = expected_occurrences([compile_task_rule(t) for t in tasks], start, end)
+    n_tasks, n_days = expected.shape
+    # Nothing is expected before a task existed: its start:/due: date, or its first log entry if earlier
+    for row, task in enumerate(tasks):
+        began = [day for day in (get_task_anchor(task), first_log_date(status_data.get(task['id']))) if day]
+        if began:
+            expected[row, :max(0, min(began).toordinal() - start.toordinal())] = False
+
+    # Gather log entries inside the window as parallel arrays
+    row_of = {t['id']: row for row, t in enumerate(tasks)}
+    rows, cols, codes, stamps = [], [], [], []
+    first_ordinal = int(ordinals[0])
+    for tid, entries in status_data.items():
+        row = row_of.get(tid)
+        if row is None:
+            continue
+        for log_date, status, timestamp in entries:
+            col = log_date.toordinal() - first_ordinal
+            if 0 <= col < n_days and status in STATUS_CODES:
+                rows.append(row)
+                cols.append(col)
+                codes.append(STATUS_CODES[status])
+                stamps.append(timestamp.timestamp())
+
+    status_matrix = np.zeros((n_tasks, n_days), dtype=np.int8)
+    if rows:
+        keys = np.asarray(rows, dtype=np.int64) * n_days + np.asarray(cols, dtype=np.int64)
+        order = np.argsort(np.asarray(stamps), kind='stable')[::-1]
+        # First hit in newest-first order is the latest status for each (task, day)
+        unique_keys, first = np.unique(keys[order], return_index=True)
+        status_matrix.flat[unique_keys] = np.asarray(codes, dtype=np.int8)[order][first]
+
+    completed = expected & (status_matrix == 1)
+    missed = expected & (status_matrix == 2)
+    deferred = expected & (status_matrix == 3)
+    unlogged = expected & (status_matrix == 0)
+
+    def pct(numerator, denominator):
+        numerator = np.asarray(numerator, dtype=float)
+        denominator = np.asarray(denominator, dtype=float)
+        return np.round(np.divide(numerator * 100, denominator, out=np.zeros_like(numerator), where=denominator > 0), 2)
+
+    day_expected = expected.sum(axis=0)
+    day_completed = completed.sum(axis=0)
+    day_missed = missed.sum(axis=0)
+    day_deferred = deferred.sum(axis=0)
+    day_unlogged = unlogged.sum(axis=0)
+    day_pct = pct(day_completed, day_expected)
+
+    if moving_average and moving_average > 1:
+        # Trailing window over calendar days, as a ratio of sums
+        cum_completed = np.concatenate(([0], np.cumsum(day_completed)))
+        cum_expected = np.concatenate(([0], np.cumsum(day_expected)))
+        lower = np.maximum(np.arange(1, n_days + 1) - moving_average, 0)
+        window_completed = cum_completed[1:] - cum_completed[lower]
+        window_expected = cum_expected[1:] - cum_expected[lower]
+        day_moving_average = pct(window_completed, window_expected)
+    else:
+        day_moving_average = None
+
+    active = np.flatnonzero(day_expected > 0)
+    trend = None
+    day_trend = None
+    if include_trend and len(active) >= 2:
+        slope, intercept = np.polyfit(active.astype(float), day_pct[active], 1)
+        day_trend = np.round(intercept + slope * np.arange(n_days), 2)
+        trend = {
+            'slope_pct_per_day': round(float(slope), 4),
+            'direction': 'improving' if slope > 0.01 else 'declining' if slope < -0.01 else 'stable'
         }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": f"Error running statistics script: {str(e)}"
+
+    if len(tasks) == 1:
+        label_id, label_description = tasks[0]['id'], tasks[0].get('description', '')
+    else:
+        label_id, label_description = None, 'All recurring tasks'
+
+    data = []
+    for col in active:
+        entry = {
+            'date': date.fromordinal(int(ordinals[col])).strftime('%Y-%m-%d'),
+            'task_id': label_id,
+            'task_description': label_description,
+            'expected': int(day_expected[col]),
+            'completed': int(day_completed[col]),
+            'missed': int(day_missed[col]),
+            'deferred': int(day_deferred[col]),
+            'unlogged': int(day_unlogged[col]),
+            'total': int(day_expected[col]),
+            'compliance_pct': float(day_pct[col])
         }
+        if day_moving_average is not None:
+            entry['moving_average_pct'] = float(day_moving_average[col])
+        if day_trend is not None:
+            entry['trend_pct'] = float(day_trend[col])
+        data.append(entry)
+
+    task_expected = expected.sum(axis=1)
+    task_completed = completed.sum(axis=1)
+    task_pct = pct(task_completed, task_expected)
+    task_summaries = []
+    for row, task in enumerate(tasks):
+        task_summaries.append({
+            'task_id': task['id'],
+            'task_description': task.get('description', ''),
+            'recurring': get_task_pattern(task),
+            'expected': int(task_expected[row]),
+            'completed': int(task_completed[row]),
+            'missed': int(missed[row].sum()),
+            'deferred': int(deferred[row].sum()),
+            'unlogged': int(unlogged[row].sum()),
+            'compliance_pct': float(task_pct[row])
+        })
+    task_summaries.sort(key=lambda x: x['compliance_pct'], reverse=True)
+
+    total_expected = int(day_expected.sum())
+    total_completed = int(day_completed.sum())
+    summary = {
+        'expected': total_expected,
+        'completed': total_completed,
+        'missed': int(day_missed.sum()),
+        'deferred': int(day_deferred.sum()),
+        'unlogged': int(day_unlogged.sum()),
+        'compliance_pct': float(pct(total_completed, total_expected))
+    }
+    if trend:
+        summary['trend'] = trend
+
+    return {
+        'start_date': start.strftime('%Y-%m-%d'),
+        'end_date': end.strftime('%Y-%m-%d'),
+        'data': data,
+        'tasks': task_summaries,
+        'summary': summary
+    }
+
+def get_enhanced_recurring_task_compliance(task_id: str = None, days: int = None, start: date = None, end: date = None,
+                                           moving_average: int = None, include_trend: bool = False,
+                                           tasks: list = None, status_data: dict = None):
+    """Get compliance for recurring tasks over a window, counting days with nothing logged"""
+    try:
+        if tasks is None:
+            tasks = flatten_recurring_tasks(task_parser.get_recurring_snapshot()['tasks'])
+        if status_data is None:
+            status_data = parse_recurring_status_log()
+
+        end = end or get_adjusted_today()
+        if not start:
+            if days:
+                start = end - timedelta(days=days - 1)
+            else:
+                # Default to the span of the log, or the last 30 days without one
+                logged_dates = [entry[0] for entries in status_data.values() for entry in entries]
+                start = min(logged_dates) if logged_dates else end - timedelta(days=29)
+
+        return compute_enhanced_compliance(tasks, status_data, start, end, task_id, moving_average, include_trend)
+
+    except Exception as e:
+        print(f"Error getting enhanced compliance: {e}")
+        return {'data': [], 'tasks': [], 'summary': {}}
+
+def get_statistics_time_series_filtered(days: int = None):
+    """Get statistics time series data with optional day filter"""
+    return build_statistics_time_series(days_cutoff(days))
 
 # Goals Management Endpoints
 
@@ -1564,79 +2157,90 @@ async def toggle_goals_item(goals_name: str, request: ListToggleRequest):
 
 # Lists Management Endpoints
 
+# Bumped whenever parse_list_text() output changes
+LIST_ITEMS_VERSION = 1
+
 def parse_list_file(filepath: str):
     """Parse a list file and extract items with area headers and indentation levels"""
     items = []
-    current_area = None
     
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+            text = f.read()
+        # Parsed items are kept in the snapshot beside the list file
+        items = cached_parse(filepath, text, 'list', LIST_ITEMS_VERSION, parse_list_text)
+                
+    except Exception as e:
+        print(f"Error parsing list file {filepath}: {e}")
+        
+    return items
+
+def parse_list_text(list_text: str):
+    """List file content -> items with area headers and indentation levels"""
+    items = []
+    current_area = None
+    
+    for line_num, line in enumerate(io.StringIO(list_text), 1):
+        stripped = line.strip()
+        
+        # Skip empty lines and comments
+        if not stripped or stripped.startswith('#'):
+            continue
             
-        for line_num, line in enumerate(lines, 1):
-            stripped = line.strip()
+        # Check if this is an area header (ends with :)
+        if stripped.endswith(':') and not line.startswith(' '):
+            current_area = stripped[:-1]  # Remove the :
+            items.append({
+                'id': line_num,
+                'text': current_area,
+                'completed': False,
+                'line_number': line_num,
+                'is_area_header': True,
+                'area': current_area,
+                'indent_level': 0
+            })
+        # Check if this is a checkbox item (starts with indentation)
+        elif ('- [ ]' in stripped or '- [x]' in stripped):
+            # Calculate indentation level (4 spaces = 1 level, 8 spaces = 2 levels, etc.)
+            leading_spaces = len(line) - len(line.lstrip(' '))
+            indent_level = max(1, leading_spaces // 4)  # Minimum level 1 for list items
             
-            # Skip empty lines and comments
-            if not stripped or stripped.startswith('#'):
-                continue
+            # Only process if there's some indentation
+            if leading_spaces > 0:
+                is_completed = '- [x]' in stripped
+                # Extract the text after the checkbox
+                text_with_meta = stripped.replace('- [ ]', '').replace('- [x]', '').strip()
+                
+                # Extract metadata from parentheses (similar to task parsing)
+                import re
+                all_meta = re.findall(r'\([^)]*\)', text_with_meta)
+                metadata = {}
+                for meta_str in all_meta:
+                    # Remove parentheses and parse content
+                    content = meta_str.strip('()')
+                    # Split on commas first, then on spaces for key:value pairs
+                    parts = content.split(',')
+                    for part in parts:
+                        part = part.strip()
+                        if ':' in part:
+                            key, value = part.split(':', 1)
+                            metadata[key.strip()] = value.strip()
+                
+                # Remove metadata parentheses from display text
+                text = re.sub(r'\([^)]*\)', '', text_with_meta).strip()
                 
-            # Check if this is an area header (ends with :)
-            if stripped.endswith(':') and not line.startswith(' '):
-                current_area = stripped[:-1]  # Remove the :
                 items.append({
                     'id': line_num,
-                    'text': current_area,
-                    'completed': False,
+                    'text': text,
+                    'completed': is_completed,
                     'line_number': line_num,
-                    'is_area_header': True,
-                    'area': current_area,
-                    'indent_level': 0
+                    'is_area_header': False,
+                    'area': current_area or 'General',
+                    'indent_level': indent_level,
+                    'quantity': metadata.get('quantity', ''),
+                    'metadata': metadata
                 })
-            # Check if this is a checkbox item (starts with indentation)
-            elif ('- [ ]' in stripped or '- [x]' in stripped):
-                # Calculate indentation level (4 spaces = 1 level, 8 spaces = 2 levels, etc.)
-                leading_spaces = len(line) - len(line.lstrip(' '))
-                indent_level = max(1, leading_spaces // 4)  # Minimum level 1 for list items
-                
-                # Only process if there's some indentation
-                if leading_spaces > 0:
-                    is_completed = '- [x]' in stripped
-                    # Extract the text after the checkbox
-                    text_with_meta = stripped.replace('- [ ]', '').replace('- [x]', '').strip()
-                    
-                    # Extract metadata from parentheses (similar to task parsing)
-                    import re
-                    all_meta = re.findall(r'\([^)]*\)', text_with_meta)
-                    metadata = {}
-                    for meta_str in all_meta:
-                        # Remove parentheses and parse content
-                        content = meta_str.strip('()')
-                        # Split on commas first, then on spaces for key:value pairs
-                        parts = content.split(',')
-                        for part in parts:
-                            part = part.strip()
-                            if ':' in part:
-                                key, value = part.split(':', 1)
-                                metadata[key.strip()] = value.strip()
-                    
-                    # Remove metadata parentheses from display text
-                    text = re.sub(r'\([^)]*\)', '', text_with_meta).strip()
-                    
-                    items.append({
-                        'id': line_num,
-                        'text': text,
-                        'completed': is_completed,
-                        'line_number': line_num,
-                        'is_area_header': False,
-                        'area': current_area or 'General',
-                        'indent_level': indent_level,
-                        'quantity': metadata.get('quantity', ''),
-                        'metadata': metadata
-                    })
-                
-    except Exception as e:
-        print(f"Error parsing list file {filepath}: {e}")
-        
+    
     return items
 
 def get_list_title(filepath: str):
@@ -2135,6 +2739,7 @@ def update_recurring_file(request: FileEditRequest):
         # Write the new content
         with open(recurring_file, 'w', encoding='utf-8') as f:
             f.write(request.content)
+        task_parser.invalidate_recurring_snapshot()
         
         return {"success": True, "message": "recurring_tasks.txt updated successfully"}
         
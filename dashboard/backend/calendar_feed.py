@@ -0,0 +1,145 @@
+"""
+iCalendar (RFC 5545) feed of the dated tasks, for calendar subscriptions.
+
+The feed holds one all-day event for:
+
+- every open task with a due date (done tasks are left out)
+- every follow-up with a date
+- every dated onhold, on the day the task comes off hold
+- every recurring occurrence from today to the end of the feed horizon
+
+All of it comes from indexes that are already maintained: the due dates,
+follow-ups and release dates from the TaskIndex of the current parse
+(task_index.py), the occurrences from the OccurrenceIndex of
+recurring_tasks.txt (recurrence.py). CalendarFeed renders the feed only when
+one of those indexes is replaced or moves to a new day, and keeps the body
+with its ETag and Last-Modified time. Last-Modified only moves when the body
+actually changes, so conditional requests stay cheap for subscribers.
+
+Event UIDs come from the event's kind, area, description and date, so they
+survive lines being moved around in the files.
+"""
+
+import hashlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from recurrence import OccurrenceIndex, flatten_recurring_tasks
+from task_index import TaskIndex
+
+PRODID = '-//ToDoText//Task Dashboard//EN'
+EVENT_PREFIXES = {'due': '', 'followup': 'Follow up: ', 'release': 'Off hold: ', 'recurring': ''}
+
+
+class CalendarEvent(NamedTuple):
+    kind: str  # due, followup, release or recurring
+    day: date
+    task: Dict[str, Any]
+
+
+def escape_text(value: str) -> str:
+    """TEXT value escaping of RFC 5545 3.3.11"""
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def fold(line: str) -> str:
+    """Content line folded to at most 75 octets per line (RFC 5545 3.1)"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1  # Never split a UTF-8 sequence
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74  # Continuation lines start with a space
+    return '\r\n '.join(parts)
+
+
+def task_events(index: TaskIndex) -> List[CalendarEvent]:
+    """Due, follow-up and release events of a parse"""
+    events = [CalendarEvent('due', date.fromordinal(ordinal), task)
+              for ordinal, task in zip(index.due_ordinals, index.due_tasks) if task['status'] != 'done']
+    events.extend(CalendarEvent('followup', day, task) for day, task in index.followups)
+    events.extend(CalendarEvent('release', day, task) for day, task in index.releases)
+    return events
+
+
+def recurring_events(occurrences: OccurrenceIndex, recurring_tasks: List[Dict[str, Any]], start: date,
+                     end: date) -> List[CalendarEvent]:
+    """Recurring occurrences from start to end inclusive, as far as the occurrence index reaches"""
+    by_id = {task['id']: task for task in flatten_recurring_tasks(recurring_tasks)}
+    events = []
+    day, end = max(start, occurrences.start), min(end, occurrences.end)
+    while day <= end:
+        events.extend(CalendarEvent('recurring', day, by_id[task_id])
+                      for task_id in occurrences.task_ids_on(day) if task_id in by_id)
+        day += timedelta(days=1)
+    return events
+
+
+def event_lines(event: CalendarEvent, uid: str, stamp: str) -> List[str]:
+    task = event.task
+    details = [f"Area: {task['area']}"] if task['area'] else []
+    if task['priority']:
+        details.append(f"Priority: {task['priority']}")
+    details.extend(tag for tag in (f"+{task['project']}" if task['project'] else '',
+                                   f"@{task['context']}" if task['context'] else '') if tag)
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', f'DTSTAMP:{stamp}',
+             f"DTSTART;VALUE=DATE:{event.day.strftime('%Y%m%d')}",
+             f"DTEND;VALUE=DATE:{(event.day + timedelta(days=1)).strftime('%Y%m%d')}",
+             'SUMMARY:' + escape_text(EVENT_PREFIXES[event.kind] + task['description'])]
+    if details:
+        lines.append('DESCRIPTION:' + escape_text('\n'.join(details)))
+    if task['area']:
+        lines.append('CATEGORIES:' + escape_text(task['area']))
+    lines.append('END:VEVENT')
+    return lines
+
+
+def render_calendar(events: List[CalendarEvent], today: date) -> bytes:
+    """The VCALENDAR of events, ordered by day; DTSTAMP is the adjusted day so equal input renders equal bytes"""
+    stamp = today.strftime('%Y%m%dT000000Z')
+    seen = defaultdict(int)
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN', 'METHOD:PUBLISH',
+             'X-WR-CALNAME:Tasks']
+    for event in sorted(events, key=lambda event: event.day):
+        identity = '\x1f'.join((event.kind, event.task['area'], event.task['description'], event.day.isoformat()))
+        uid = hashlib.blake2b(f'{identity}\x1f{seen[identity]}'.encode('utf-8'), digest_size=12).hexdigest()
+        seen[identity] += 1
+        lines.extend(event_lines(event, f'{uid}@todotext', stamp))
+    lines.append('END:VCALENDAR')
+    return ('\r\n'.join(fold(line) for line in lines) + '\r\n').encode('utf-8')
+
+
+class CalendarFeed:
+    """The rendered feed, regenerated only when its source indexes change"""
+
+    def __init__(self, horizon_days: int):
+        self.horizon_days = horizon_days
+        self.sources = None  # (task index, occurrence index, occurrence start) the body was rendered from
+        self.body = None
+        self.etag = None
+        self.last_modified = None
+
+    def update(self, index: TaskIndex, occurrences: OccurrenceIndex, recurring_tasks: List[Dict[str, Any]],
+               today: date, now: datetime) -> bool:
+        """Re-render if an index changed; returns whether the body changed"""
+        if self.sources is not None and self.sources[0] is index and self.sources[1] is occurrences \
+                and self.sources[2] == occurrences.start:
+            return False
+        self.sources = (index, occurrences, occurrences.start)
+        events = task_events(index)
+        events.extend(recurring_events(occurrences, recurring_tasks, today,
+                                       today + timedelta(days=self.horizon_days - 1)))
+        body = render_calendar(events, today)
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        if etag == self.etag:
+            return False
+        self.body, self.etag, self.last_modified = body, etag, now.replace(microsecond=0)
+        return True
+
+    def not_modified_since(self, if_modified_since: Optional[datetime]) -> bool:
+        return if_modified_since is not None and self.last_modified <= if_modified_since
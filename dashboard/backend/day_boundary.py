@@ -0,0 +1,115 @@
+"""
+Day-boundary-aware refresh of date-dependent cached views.
+
+Everything derived from "today" (onhold expiry, overdue/due-today counts,
+recurring filters) changes only when the adjusted day changes, and usually
+not even then: a view only changes on the days its own dates are crossed.
+Each view registers a next_change(today) callback returning the next
+adjusted day on which its output can differ (None if never by date alone)
+and a refresh(today) callback that invalidates or recomputes it.
+
+DayBoundaryScheduler sleeps until the start of the earliest such day, then
+refreshes only the views that are due. When the data behind a view changes,
+reschedule() wakes it to recompute the next instant.
+"""
+
+import threading
+from datetime import datetime, date, time, timedelta
+from typing import Callable, List, Optional
+
+
+def boundary_instant(day: date, day_start_hour: int) -> datetime:
+    """Moment the adjusted day `day` begins"""
+    return datetime.combine(day, time(day_start_hour, 0, 0))
+
+
+def next_day_after(today: date, days) -> Optional[date]:
+    """Earliest of days strictly after today, or None"""
+    later = [day for day in days if day > today]
+    return min(later) if later else None
+
+
+class DayBoundaryScheduler:
+    """Background thread refreshing registered views when their dates are crossed"""
+
+    def __init__(self, day_start_hour: int = 3, date_of: Callable[[datetime], date] = None):
+        self.day_start_hour = day_start_hour
+        self.date_of = date_of or (lambda timestamp: timestamp.date())
+        self._views = {}  # {name: {'next_change', 'refresh', 'due'}}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name: str, next_change: Callable[[date], Optional[date]],
+                 refresh: Callable[[date], object], now: datetime = None):
+        with self._lock:
+            self._views[name] = {'next_change': next_change, 'refresh': refresh, 'due': None}
+            self._plan(name, self.date_of(now or datetime.now()))
+        self._wake.set()
+
+    def _plan(self, name: str, today: date):
+        view = self._views[name]
+        try:
+            view['due'] = view['next_change'](today)
+        except Exception as e:
+            print(f"Error computing next change for {name}: {e}")
+            view['due'] = today + timedelta(days=1)
+
+    def reschedule(self, name: str = None, now: datetime = None):
+        """Recompute when the named view (or every view) next changes, e.g. after its source data changed"""
+        today = self.date_of(now or datetime.now())
+        with self._lock:
+            for view_name in ([name] if name else list(self._views)):
+                if view_name in self._views:
+                    self._plan(view_name, today)
+        self._wake.set()
+
+    def next_instant(self) -> Optional[datetime]:
+        """When the earliest registered view can next change"""
+        with self._lock:
+            days = [view['due'] for view in self._views.values() if view['due'] is not None]
+        return boundary_instant(min(days), self.day_start_hour) if days else None
+
+    def due_views(self, now: datetime) -> List[str]:
+        today = self.date_of(now)
+        with self._lock:
+            return [name for name, view in self._views.items() if view['due'] is not None and view['due'] <= today]
+
+    def run_due(self, now: datetime = None) -> List[str]:
+        """Refresh the views whose change day has been reached; returns their names"""
+        now = now or datetime.now()
+        today = self.date_of(now)
+        refreshed = self.due_views(now)
+        for name in refreshed:
+            with self._lock:
+                refresh = self._views[name]['refresh']
+            try:
+                refresh(today)
+            except Exception as e:
+                print(f"Error refreshing {name} at day boundary: {e}")
+            with self._lock:
+                self._plan(name, today)
+        return refreshed
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_due()
+            instant = self.next_instant()
+            timeout = None if instant is None else max(0.0, (instant - datetime.now()).total_seconds())
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="day-boundary", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,163 @@
+"""
+Downsampling for long daily time series.
+
+Two reductions are provided, both operating on a shared day axis given as
+proleptic Gregorian ordinals (date.toordinal()):
+
+- Calendar buckets ("week" starting Monday, "month"): every column is reduced
+  per bucket with NumPy (mean, sum or last value) and labelled with the
+  bucket's first day.
+- Largest-Triangle-Three-Buckets (LTTB): picks at most max_points rows that
+  preserve the visual shape of one series, always keeping the first and last
+  point. Other columns are taken at the same rows so a response stays aligned.
+
+BucketCache memoizes results per (metric, range, resolution) key so panning
+and zooming a chart does not recompute the same buckets.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, Hashable, Tuple
+
+import numpy as np
+
+RESOLUTIONS = ('day', 'week', 'month')
+AGGREGATIONS = ('mean', 'sum', 'last')
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def ordinals_from_strings(dates) -> np.ndarray:
+    """YYYY-MM-DD strings -> int64 ordinals"""
+    return np.array(dates, dtype='datetime64[D]').astype(np.int64) + EPOCH_ORDINAL
+
+
+def ordinals_to_strings(ordinals: np.ndarray):
+    """int64 ordinals -> YYYY-MM-DD strings"""
+    days = (np.asarray(ordinals, dtype=np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+    return np.datetime_as_string(days, unit='D').tolist()
+
+
+def bucket_starts(ordinals: np.ndarray, resolution: str) -> np.ndarray:
+    """First-day ordinal of the week/month bucket each ordinal falls into"""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if resolution == 'day':
+        return ordinals
+    if resolution == 'week':
+        # date.fromordinal(1) is a Monday, so (ordinal - 1) % 7 is the weekday
+        return ordinals - (ordinals - 1) % 7
+    if resolution == 'month':
+        days = (ordinals - EPOCH_ORDINAL).astype('datetime64[D]')
+        month_starts = days.astype('datetime64[M]').astype('datetime64[D]')
+        return month_starts.astype(np.int64) + EPOCH_ORDINAL
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def aggregate_buckets(ordinals: np.ndarray, columns: Dict[str, np.ndarray], resolution: str,
+                      how: Dict[str, str] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Reduce sorted daily columns to one row per calendar bucket
+
+    how maps column name to 'mean' (default), 'sum' or 'last'; NaN values are
+    ignored, and a bucket with no values for a column yields NaN.
+    """
+    how = how or {}
+    starts = bucket_starts(ordinals, resolution)
+    if len(starts) == 0:
+        return starts, {name: np.empty(0) for name in columns}
+    keys, inverse = np.unique(starts, return_inverse=True)
+    size = len(keys)
+
+    reduced = {}
+    for name, values in columns.items():
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        counts = np.bincount(inverse, weights=present, minlength=size)
+        method = how.get(name, 'mean')
+        if method == 'last':
+            # Rows are sorted, so the highest row index with a value is the latest
+            last_row = np.full(size, -1)
+            np.maximum.at(last_row, inverse[present], np.flatnonzero(present))
+            result = np.where(last_row >= 0, values[np.maximum(last_row, 0)], np.nan)
+        else:
+            sums = np.bincount(inverse, weights=np.where(present, values, 0.0), minlength=size)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = sums / counts if method == 'mean' else sums
+            result = np.where(counts > 0, result, np.nan)
+        reduced[name] = result
+    return keys, reduced
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Row indices chosen by Largest-Triangle-Three-Buckets
+
+    x must be increasing. NaN y values are treated as 0 for point selection.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    n = len(x)
+    if threshold >= n or threshold <= 0:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1])[:threshold]
+
+    # Interior points split into threshold - 2 buckets of (nearly) equal size
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+            avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(ordinals: np.ndarray, columns: Dict[str, np.ndarray], resolution: str = 'day',
+               max_points: int = None, how: Dict[str, str] = None,
+               primary: str = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Bucket to the requested resolution, then thin to max_points with LTTB on the primary column"""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if resolution != 'day':
+        ordinals, columns = aggregate_buckets(ordinals, columns, resolution, how)
+    if max_points and len(ordinals) > max_points:
+        primary = primary if primary in columns else next(iter(columns), None)
+        y = columns[primary] if primary else np.zeros(len(ordinals))
+        rows = lttb_indices(ordinals, y, max_points)
+        ordinals = ordinals[rows]
+        columns = {name: np.asarray(values)[rows] for name, values in columns.items()}
+    return ordinals, columns
+
+
+class BucketCache:
+    """Small LRU cache for downsampled series"""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
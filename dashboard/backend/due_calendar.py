@@ -0,0 +1,63 @@
+"""
+Calendar buckets over the due-date index.
+
+The due dates of a parse are kept by TaskIndex (task_index.py) as a sorted
+array of date ordinals with an aligned array of task summaries.
+A calendar range is two bisects and a slice of those arrays; the slice is
+then cut into day, week (Monday to Sunday) or month buckets with one more
+bisect per bucket, within the slice. Nothing walks the task tree.
+
+Buckets are whole: a range is widened to the start of its first bucket and
+the end of its last, so a week view of a month covers full weeks.
+"""
+
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import Any, Dict, Tuple
+
+from task_index import TaskIndex
+
+GRANULARITIES = ('day', 'week', 'month')
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """First day of the bucket day falls into"""
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def next_bucket(start: date, granularity: str) -> date:
+    """First day of the bucket after the one starting on start"""
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def bucket_range(start: date, end: date, granularity: str) -> Tuple[date, date]:
+    """(first day, last day) of the whole buckets covering start..end"""
+    return bucket_start(start, granularity), next_bucket(bucket_start(end, granularity), granularity) - timedelta(days=1)
+
+
+def due_calendar(index: TaskIndex, start: date, end: date, granularity: str) -> Dict[str, Any]:
+    """Tasks due from start to end inclusive, in buckets of granularity, by due date then file order"""
+    first, last = bucket_range(start, end, granularity)
+    lo, hi = index.due_between(first, last)
+    ordinals, tasks = index.due_ordinals, index.due_tasks
+
+    buckets = []
+    bucket = first
+    while bucket <= last:
+        following = next_bucket(bucket, granularity)
+        stop = bisect_left(ordinals, following.toordinal(), lo, hi)
+        buckets.append({'start': bucket.isoformat(), 'end': (following - timedelta(days=1)).isoformat(),
+                        'count': stop - lo, 'tasks': tasks[lo:stop]})
+        bucket, lo = following, stop
+    return {'from': first.isoformat(), 'to': last.isoformat(), 'granularity': granularity,
+            'count': sum(entry['count'] for entry in buckets), 'buckets': buckets}
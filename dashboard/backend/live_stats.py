@@ -0,0 +1,197 @@
+"""
+Incrementally maintained task statistics.
+
+statistics_tasks() reduces a tasks.txt snapshot to one StatTask per task
+line with subtask metadata (due, priority, projects, contexts) inherited from
+the parent. StatisticsAggregator keeps running counters over those records:
+update() diffs the new parse against the previous one as multisets and only
+adjusts the counters for tasks that were added or removed (an edited task is
+one of each).
+
+The date-relative counters (overdue, due_today, due_this_week) are kept per
+adjusted day: open tasks are also counted per due date, and the three
+buckets are rebuilt from those per-date counts only when the day changes.
+Reading the statistics is then independent of the size of the file.
+"""
+
+import re
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from task_snapshot import TaskSnapshot, parse_date, parse_lines
+
+
+class StatTask(NamedTuple):
+    completed: bool
+    due: Optional[date]
+    priority: Optional[str]
+    projects: Tuple[str, ...]
+    contexts: Tuple[str, ...]
+
+
+DUE_PATTERN = re.compile(r'due:(\d{4}-\d{2}-\d{2})')
+PRIORITY_PATTERN = re.compile(r'priority:([A-F])')
+STANDALONE_PRIORITY_PATTERN = re.compile(r'\b([A-F])\b')
+PROJECT_PATTERN = re.compile(r'\+(\w+)')
+CONTEXT_PATTERN = re.compile(r'@(\w+)')
+
+
+def statistics_tasks(snapshot: TaskSnapshot) -> List[StatTask]:
+    """Snapshot -> StatTask records, with subtasks inheriting unset metadata from their parent"""
+    tasks = []
+    parent_stack = []  # (indent_level, task) of the enclosing tasks
+
+    for line in snapshot.lines:
+        # Area header (commented-out headers do not start a new area)
+        if line.kind == 'area' and not line.raw.startswith('#'):
+            parent_stack = []
+            continue
+        if line.kind != 'task' or line.status == '%':
+            continue
+
+        content = line.content
+        indent_level = line.indent_level
+
+        due_match = DUE_PATTERN.search(content)
+        due = parse_date(due_match.group(1)) if due_match else None
+
+        prio_match = PRIORITY_PATTERN.search(content)
+        priority = prio_match.group(1) if prio_match else None
+        # Also check for standalone priority letters
+        if not priority:
+            standalone_prio_match = STANDALONE_PRIORITY_PATTERN.search(content)
+            priority = standalone_prio_match.group(1) if standalone_prio_match else None
+
+        projects = tuple(PROJECT_PATTERN.findall(content))
+        contexts = tuple(CONTEXT_PATTERN.findall(content))
+
+        while parent_stack and parent_stack[-1][0] >= indent_level:
+            parent_stack.pop()
+
+        # Subtasks inherit metadata only if not explicitly set
+        if indent_level > 1 and parent_stack:
+            parent = parent_stack[-1][1]
+            due = due or parent.due
+            priority = priority or parent.priority
+            projects = projects or parent.projects
+            contexts = contexts or parent.contexts
+
+        task = StatTask(line.completed, due, priority, projects, contexts)
+        if indent_level >= 1:
+            parent_stack.append((indent_level, task))
+        tasks.append(task)
+    return tasks
+
+
+def parse_statistics_tasks(lines: Iterable[str]) -> List[StatTask]:
+    """Task file lines -> StatTask records"""
+    return statistics_tasks(TaskSnapshot(None, '', parse_lines(''.join(lines))))
+
+
+def _bump(counts: Dict, key, delta: int):
+    """Add delta to counts[key], dropping keys that reach zero (insertion order is kept otherwise)"""
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+class StatisticsAggregator:
+    """Running statistics over a multiset of StatTask records"""
+
+    def __init__(self):
+        self.tasks = Counter()
+        self.total = 0
+        self.completed = 0
+        self.with_due_date = 0
+        self.priorities = {}
+        self.projects = {}
+        self.contexts = {}
+        self.open_due = {}  # {due date: incomplete tasks due that day}
+        self.bucket_day = None
+        self.buckets = {'overdue': 0, 'due_today': 0, 'due_this_week': 0}
+        self._result = None
+
+    def _due_buckets(self, due: date, today: date) -> List[str]:
+        """Date-relative counters a task due on `due` falls into"""
+        days = (due - today).days
+        names = []
+        if days < 0:
+            names.append('overdue')
+        if days == 0:
+            names.append('due_today')
+        if 0 <= days < 7:
+            names.append('due_this_week')
+        return names
+
+    def _count(self, task: StatTask, delta: int):
+        """Add (delta > 0) or remove (delta < 0) copies of one task from every counter"""
+        self._result = None
+        self.total += delta
+        self.completed += delta * task.completed
+        if task.priority:
+            _bump(self.priorities, task.priority, delta)
+        for project in task.projects:
+            _bump(self.projects, project, delta)
+        for context in task.contexts:
+            _bump(self.contexts, context, delta)
+        if task.due:
+            self.with_due_date += delta
+            if not task.completed:
+                _bump(self.open_due, task.due, delta)
+                if self.bucket_day is not None:
+                    for name in self._due_buckets(task.due, self.bucket_day):
+                        self.buckets[name] += delta
+
+    def update(self, tasks: Iterable[StatTask]) -> int:
+        """Replace the task set, adjusting counters only for changed tasks; returns the number changed"""
+        new = Counter(tasks)
+        added = new - self.tasks
+        removed = self.tasks - new
+        for task, count in removed.items():
+            self._count(task, -count)
+        for task, count in added.items():
+            self._count(task, count)
+        self.tasks = new
+        return sum(added.values()) + sum(removed.values())
+
+    def rebucket(self, today: date):
+        """Recompute the date-relative counters for a new adjusted day"""
+        buckets = {'overdue': 0, 'due_today': 0, 'due_this_week': 0}
+        for due, count in self.open_due.items():
+            for name in self._due_buckets(due, today):
+                buckets[name] += count
+        self.buckets = buckets
+        self.bucket_day = today
+        self._result = None
+
+    def next_change(self, today: date) -> Optional[date]:
+        """Next adjusted day on which a due date enters the week, comes due or passes"""
+        days = [day for due in self.open_due
+                for day in (due - timedelta(days=6), due, due + timedelta(days=1)) if day > today]
+        return min(days) if days else None
+
+    def statistics(self, today: date) -> Dict:
+        """Statistics in the /statistics response layout"""
+        if today != self.bucket_day:
+            self.rebucket(today)
+        if self._result is not None:
+            return dict(self._result)
+        stats = {
+            'total': self.total,
+            'completed': self.completed,
+            'incomplete': self.total - self.completed,
+            'completion_pct': 100 * self.completed / self.total if self.total else 0,
+        }
+        for prio, count in self.priorities.items():
+            stats[f'priority_{prio}'] = count
+        for proj, count in self.projects.items():
+            stats[f'project_{proj}'] = count
+        for ctx, count in self.contexts.items():
+            stats[f'context_{ctx}'] = count
+        stats['with_due_date'] = self.with_due_date
+        stats.update(self.buckets)
+        self._result = stats
+        return dict(stats)
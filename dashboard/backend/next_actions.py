@@ -0,0 +1,97 @@
+"""
+Top-K "next actions" by urgency score.
+
+urgency() scores an open task from weights (see URGENCY_WEIGHTS in app.py):
+
+- its priority letter
+- how close its due date is to the adjusted today: the full due weight when
+  due today or overdue, falling linearly to nothing at due_horizon_days
+- its state: follow-ups that are due (or have no date) and ones still
+  waiting, and onhold tasks, each add their own weight (negative to push
+  them down)
+
+Done tasks are never candidates.
+
+UrgencyRanking keeps the score of every open task, keyed on the fields the
+score depends on (as in saved_views.py). A new parse is diffed against the
+previous one, so only added tasks are scored. All scores are recomputed
+only when the adjusted day changes. top(k) is a heap selection over the
+scores, O(n log k), and never sorts all tasks.
+"""
+
+import heapq
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from task_index import keyed_tasks
+
+# Task fields urgency() depends on
+SCORE_FIELDS = ('status', 'completed', 'priority', 'due_date_obj', 'followup_date')
+
+
+def parse_day(value: str) -> Optional[date]:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def urgency(task: Dict[str, Any], today: date, weights: Dict[str, Any]) -> Optional[float]:
+    """Urgency score of a task, or None for tasks that are not candidates (done)"""
+    if task['status'] == 'done':
+        return None
+    score = weights['priority'].get(task['priority'].upper(), 0.0) if task['priority'] else 0.0
+
+    due = task['due_date_obj']
+    if due:
+        days = (due - today).days
+        horizon = weights['due_horizon_days']
+        if days <= 0:
+            score += weights['due']
+        elif days < horizon:
+            score += weights['due'] * (1 - days / horizon)
+
+    if task['status'] == 'followup':
+        followup = parse_day(task['followup_date']) if task['followup_date'] else None
+        score += weights['followup_due'] if followup is None or followup <= today else weights['followup_waiting']
+    elif task['status'] == 'onhold':
+        score += weights['onhold']
+    return round(score, 4)
+
+
+def score_key(task: Dict[str, Any]) -> tuple:
+    return tuple(task[field] for field in SCORE_FIELDS)
+
+
+class UrgencyRanking:
+    """Urgency scores of the open tasks of the last parse, updated from parse diffs"""
+
+    def __init__(self, weights: Dict[str, Any]):
+        self.weights = weights
+        self.tasks = {}  # {key: (number, task)} of the last parse
+        self.scores = {}  # {key: score} of the candidates among them
+        self.today = None
+
+    def update(self, tasks: List[Dict[str, Any]], today: date) -> int:
+        """Apply a new parse; returns how many tasks had to be scored"""
+        current = keyed_tasks(tasks, score_key)
+        if today != self.today:
+            self.today = today
+            self.scores = {}
+            added = current.keys()
+        else:
+            added = current.keys() - self.tasks.keys()
+            for key in self.tasks.keys() - current.keys():
+                self.scores.pop(key, None)
+        for key in added:
+            score = urgency(current[key][1], today, self.weights)
+            if score is not None:
+                self.scores[key] = score
+        self.tasks = current
+        return len(added)
+
+    def top(self, k: int) -> List[Tuple[float, Dict[str, Any]]]:
+        """(score, task) of the k most urgent tasks, earlier in the file first on equal scores"""
+        tasks = self.tasks
+        best = heapq.nsmallest(k, self.scores.items(), key=lambda item: (-item[1], tasks[item[0]][0]))
+        return [(score, tasks[key][1]) for key, score in best]
@@ -1,23 +1,45 @@
+import io
+import pickle
 import re
 import uuid
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
 
 import os
 
+from snapshot_file import cached_parse, content_digest, load_section, store_section
+from task_index import TaskFilter, TaskIndex
+from task_query import Node, run_query
+from task_views import VIEWS as TASK_VIEWS, build_view
+from task_snapshot import TaskSnapshot, parse_date, snapshot_from_text
+
 # Get the absolute path to the tasks.txt file
 current_dir = os.path.dirname(os.path.abspath(__file__))
 tasks_file = os.path.join(current_dir, '../../tasks.txt')
 recurring_file = os.path.join(current_dir, '../../recurring_tasks.txt')
 
-def get_adjusted_date(dt: datetime) -> date:
-    """Get the adjusted date for 3 AM boundary (tasks completed before 3 AM count for previous day)"""
-    if dt.hour < 3:
+# Configuration: Hour when the "day" starts (3 AM = 3). Times before it count
+# for the previous day everywhere (onhold expiry, due dates, recurring status).
+DAY_START_HOUR = 3
+
+def get_file_signature(path: str):
+    """Cheap change detector for a data file: (path, mtime_ns, size), or None if missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+def get_adjusted_date(dt: datetime = None) -> date:
+    """Get the adjusted date for the DAY_START_HOUR boundary (tasks completed before it count for previous day)"""
+    if dt is None:
+        dt = datetime.now()
+    if dt.hour < DAY_START_HOUR:
         return (dt - timedelta(days=1)).date()
     return dt.date()
 
 def get_adjusted_today() -> date:
-    """Get today's date adjusted for 3 AM boundary"""
+    """Get today's date adjusted for the DAY_START_HOUR boundary"""
     return get_adjusted_date(datetime.now())
 
 def generate_stable_task_id(area, description, indent_level, line_number):
@@ -26,193 +48,265 @@ def generate_stable_task_id(area, description, indent_level, line_number):
     content = f"{area}:{description}:{indent_level}:{line_number}"
     return hashlib.md5(content.encode()).hexdigest()[:16]
 
+# Bumped whenever tasks_from_snapshot() output changes, so stored task trees of older versions are ignored
+TASK_TREE_VERSION = 1
+
+# Last parse of tasks.txt: pickled tasks, keyed on file content, valid for adjusted days [today, valid_until),
+# with the inverted index of its tasks (built on first use)
+_tasks_snapshot = {'key': None, 'tasks': None, 'today': None, 'valid_until': None, 'index': None}
+_tasks_listeners = []
+
+def add_tasks_listener(listener: Callable[[], None]):
+    """Call listener() whenever tasks.txt had to be parsed again"""
+    if listener not in _tasks_listeners:
+        _tasks_listeners.append(listener)
+
+def onhold_expiry(tasks: List[Dict[str, Any]]) -> Optional[date]:
+    """Earliest date on which an active dated onhold expires, i.e. when the parse next changes by itself"""
+    earliest = None
+    for item in tasks:
+        children = item.get('tasks', []) + item.get('subtasks', [])
+        if item.get('onhold_date'):
+            try:
+                onhold_date = datetime.strptime(item['onhold_date'], '%Y-%m-%d').date()
+                earliest = onhold_date if earliest is None else min(earliest, onhold_date)
+            except ValueError:
+                pass  # Text condition, never expires by date
+        child_expiry = onhold_expiry(children)
+        if child_expiry and (earliest is None or child_expiry < earliest):
+            earliest = child_expiry
+    return earliest
+
+def get_tasks_valid_until() -> Optional[date]:
+    """Adjusted day on which the cached parse stops being valid (None: only a file change invalidates it)"""
+    return _tasks_snapshot['valid_until']
+
+def invalidate_tasks_snapshot():
+    """Drop the cached parse of tasks.txt"""
+    _tasks_snapshot['key'] = None
+    _tasks_snapshot['tasks'] = None
+    _tasks_snapshot['index'] = None
+
+def _tree_valid_on(entry: Dict[str, Any], today: date) -> bool:
+    """Whether a parse made on entry['today'] is still correct on the adjusted day today"""
+    return entry['today'] <= today and (entry['valid_until'] is None or today < entry['valid_until'])
+
 def parse_tasks_raw() -> List[Dict[str, Any]]:
-    """Parse tasks into raw nested structure"""
+    """Parse tasks into raw nested structure
+
+    The parse is cached per file content, in memory and in the snapshot beside
+    tasks.txt (so it survives restarts). The only part that depends on the
+    date is onhold expiry, so a cached parse stays valid until the adjusted
+    day reaches the earliest active onhold date. Callers get their own copy.
+    """
+    tasks = _refresh_tasks_snapshot()
+    return tasks if tasks is not None else pickle.loads(_tasks_snapshot['tasks'])
+
+def _refresh_tasks_snapshot() -> Optional[List[Dict[str, Any]]]:
+    """Bring the cached parse up to date with tasks.txt; returns the new tasks if it had to change, else None"""
+    with open(tasks_file, 'r') as f:
+        text = f.read()
+    today = get_adjusted_today()
+    digest = content_digest(text)
+    key = (os.path.abspath(tasks_file), digest)
+    cache = _tasks_snapshot
+    if cache['key'] == key and _tree_valid_on(cache, today):
+        return None
+    
+    stored = load_section(tasks_file, digest, 'tree', TASK_TREE_VERSION)
+    if stored is not None and _tree_valid_on(stored, today):
+        tasks = pickle.loads(stored['tasks'])
+        cache.update(stored)
+    else:
+        tasks = tasks_from_snapshot(snapshot_from_text(text, tasks_file), today)
+        cache['tasks'] = pickle.dumps(tasks, pickle.HIGHEST_PROTOCOL)
+        cache['today'] = today
+        cache['valid_until'] = onhold_expiry(tasks)
+        store_section(tasks_file, digest, 'tree', TASK_TREE_VERSION,
+                      {'tasks': cache['tasks'], 'today': today, 'valid_until': cache['valid_until']})
+    cache['key'] = key
+    cache['index'] = None
+    for listener in _tasks_listeners:
+        listener()
+    return tasks
+
+def parse_tasks_filtered(task_filter: TaskFilter) -> List[Dict[str, Any]]:
+    """Raw nested structure reduced to the tasks matching task_filter and their ancestors
+
+    Matches come from the inverted index of the current parse, built once per parse.
+    """
+    tasks = parse_tasks_raw()
+    return current_task_index(tasks).select(tasks, task_filter)
+
+def parse_tasks_query(query: Node) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Raw nested structure reduced to the tasks matching a parsed query, with the plan used"""
+    tasks = parse_tasks_raw()
+    return run_query(tasks, current_task_index(tasks), query)
+
+def current_task_index(tasks: List[Dict[str, Any]]) -> TaskIndex:
+    """Inverted index of the current parse (tasks as just returned by parse_tasks_raw), built once per parse"""
+    index = _tasks_snapshot['index']
+    if index is None:
+        index = _tasks_snapshot['index'] = TaskIndex(tasks)
+    return index
+
+def get_task_index() -> TaskIndex:
+    """Inverted index of the current parse of tasks.txt, for callers that only need the index"""
+    tasks = _refresh_tasks_snapshot()
+    if _tasks_snapshot['index'] is None:
+        return current_task_index(tasks if tasks is not None else pickle.loads(_tasks_snapshot['tasks']))
+    return _tasks_snapshot['index']
+
+def tasks_from_snapshot(snapshot: TaskSnapshot, today: date = None) -> List[Dict[str, Any]]:
+    """Build the raw nested structure from a parsed snapshot, with onhold expiry relative to today"""
+    today = today or get_adjusted_today()
     tasks = []
-    area = None
     task_stack = []  # Stack to track parent tasks at different indent levels
     
-    with open(tasks_file, 'r') as f:
-        for line_number, line in enumerate(f, 1):
-            stripped = line.rstrip()
-            if not stripped:
-                continue
-                
-            area_match = re.match(r'^(\S.+):$', stripped)
-            task_match = re.match(r'^(\s*)- \[( |x|%)\] (.+)', line)
-            note_match = re.match(r'^(\s+)[^-\[].+', line)
+    for line in snapshot.lines:
+        if line.kind == 'area':
+            # Add area header to structure
+            tasks.append({
+                'type': 'area',
+                'area': line.area,
+                'content': line.raw.rstrip(),
+                'tasks': []
+            })
+            task_stack = []  # Reset task stack for new area
             
-            if area_match:
-                area = area_match.group(1)
-                # Add area header to structure
-                tasks.append({
-                    'type': 'area',
-                    'area': area,
-                    'content': stripped,
-                    'tasks': []
-                })
-                task_stack = []  # Reset task stack for new area
+        elif line.kind == 'task':
+            try:
+                area = line.area
+                line_number = line.number
+                indent_level = line.indent_level
+                metadata = line.metadata
                 
-            elif task_match:
-                try:
-                    indent, completed, content = task_match.groups()
-                    indent_level = len(indent) // 4
-                    
-                    # Skip malformed content (like just "?")
-                    if not content.strip() or content.strip() == '?':
-                        print(f"Skipping malformed task on line {line_number}: {line.strip()}")
-                        continue
-                    
-                    # Extract metadata from all sets of parentheses
-                    all_meta = re.findall(r'\(([^)]*)\)', content)
-                    metadata = {}
-                    for meta_str in all_meta:
-                        # Parse key:value pairs, handling spaces in values
-                        parts = meta_str.split()
-                        i = 0
-                        while i < len(parts):
-                            if ':' in parts[i]:
-                                key, first_val = parts[i].split(':', 1)
-                                value_parts = [first_val] if first_val else []
-                                
-                                # Look ahead to collect continuation of this value
-                                j = i + 1
-                                while j < len(parts) and ':' not in parts[j]:
-                                    value_parts.append(parts[j])
-                                    j += 1
-                                
-                                metadata[key] = ' '.join(value_parts)
-                                i = j
-                            else:
-                                i += 1
-                    
-                    # Remove all metadata parentheses from content for display
-                    content_no_meta = re.sub(r'\([^)]*\)', '', content).strip()
-                    
-                    # Parse dates safely
-                    due_date = None
-                    if metadata.get('due'):
-                        try:
-                            due_date = datetime.strptime(metadata['due'], '%Y-%m-%d').date()
-                        except ValueError:
-                            print(f"Invalid due date on line {line_number}: {metadata['due']}")
-                    
-                    done_date = None
-                    if metadata.get('done'):
-                        try:
-                            done_date = datetime.strptime(metadata['done'], '%Y-%m-%d').date()
-                        except ValueError:
-                            print(f"Invalid done date on line {line_number}: {metadata['done']}")
-                    elif metadata.get('done_date'):
-                        try:
-                            done_date = datetime.strptime(metadata['done_date'], '%Y-%m-%d').date()
-                        except ValueError:
-                            print(f"Invalid done_date on line {line_number}: {metadata['done_date']}")
-                    
-                    # Extract project and context tags
-                    project_tags = list(dict.fromkeys(re.findall(r'\+(\w+)', content_no_meta)))
-                    context_tags = list(dict.fromkeys(re.findall(r'@(\w+)', content_no_meta)))
-                    
-                    # Clean content by removing tags
-                    clean_content = re.sub(r'([+@&]\w+)', '', content_no_meta).strip()
-                    
-                    # Determine task status
-                    onhold_value = metadata.get('onhold', '')
-                    is_onhold_active = False
-                    effective_onhold_value = None
-                    
-                    if onhold_value:
-                        # Check if onhold is a date that has passed
-                        try:
-                            onhold_date = datetime.strptime(onhold_value, '%Y-%m-%d').date()
-                            today = get_adjusted_today()
-                            is_onhold_active = onhold_date > today
-                            # Only keep onhold value if still active
-                            effective_onhold_value = onhold_value if is_onhold_active else None
-                        except ValueError:
-                            # Not a date, treat as text condition - always active
-                            is_onhold_active = True
-                            effective_onhold_value = onhold_value
-                    
-                    if completed == '%':
-                        task_status = 'followup'
-                        is_completed = False  # Follow-up tasks are not truly completed
-                    elif completed == 'x':
-                        if metadata.get('followup') or metadata.get('followup_date'):
-                            task_status = 'followup'
-                            is_completed = True  # Task is completed, but still needs follow-up
-                        else:
-                            task_status = 'done'
-                            is_completed = True
-                    elif metadata.get('followup') or metadata.get('followup_date'):
-                        # Task has follow-up date but is not checked - it's in follow-up state
+                # Skip malformed content (like just "?")
+                if not line.content.strip() or line.content.strip() == '?':
+                    print(f"Skipping malformed task on line {line_number}: {line.raw.strip()}")
+                    continue
+                
+                # Parse dates safely
+                due_date = None
+                if metadata.get('due'):
+                    try:
+                        due_date = parse_date(metadata['due'])
+                    except ValueError:
+                        print(f"Invalid due date on line {line_number}: {metadata['due']}")
+                
+                done_date = None
+                if metadata.get('done'):
+                    try:
+                        done_date = parse_date(metadata['done'])
+                    except ValueError:
+                        print(f"Invalid done date on line {line_number}: {metadata['done']}")
+                elif metadata.get('done_date'):
+                    try:
+                        done_date = parse_date(metadata['done_date'])
+                    except ValueError:
+                        print(f"Invalid done_date on line {line_number}: {metadata['done_date']}")
+                
+                project_tags = line.projects
+                context_tags = line.contexts
+                clean_content = line.description
+                
+                # Determine task status
+                onhold_value = metadata.get('onhold', '')
+                is_onhold_active = False
+                effective_onhold_value = None
+                
+                if onhold_value:
+                    # Check if onhold is a date that has passed
+                    try:
+                        onhold_date = datetime.strptime(onhold_value, '%Y-%m-%d').date()
+                        is_onhold_active = onhold_date > today
+                        # Only keep onhold value if still active
+                        effective_onhold_value = onhold_value if is_onhold_active else None
+                    except ValueError:
+                        # Not a date, treat as text condition - always active
+                        is_onhold_active = True
+                        effective_onhold_value = onhold_value
+                
+                completed = line.status
+                if completed == '%':
+                    task_status = 'followup'
+                    is_completed = False  # Follow-up tasks are not truly completed
+                elif completed == 'x':
+                    if metadata.get('followup') or metadata.get('followup_date'):
                         task_status = 'followup'
-                        is_completed = False
-                    elif is_onhold_active:
-                        # Task is on hold (either future date or text condition)
-                        task_status = 'onhold'
-                        is_completed = False
-                    else:
-                        task_status = 'incomplete'
-                        is_completed = False
-                    
-                    task = {
-                        'id': generate_stable_task_id(area, clean_content, indent_level, line_number),
-                        'type': 'task',
-                        'description': clean_content,
-                        'completed': is_completed,
-                        'status': task_status,
-                        'area': area,
-                        'context': context_tags[0] if context_tags else '',
-                        'project': project_tags[0] if project_tags else '',
-                        'due_date': due_date.strftime('%Y-%m-%d') if due_date else '',
-                        'done_date': done_date.strftime('%Y-%m-%d') if done_date else '',
-                        'priority': metadata.get('priority', ''),
-                        'recurring': metadata.get('every', ''),
-                        'followup_date': metadata.get('followup_date', metadata.get('followup', '')),
-                        'onhold_date': effective_onhold_value or '',
-                        'indent_level': indent_level,
-                        'subtasks': [],
-                        'notes': [],
-                        'due_date_obj': due_date,  # Keep for sorting
-                        'done_date_obj': done_date,
-                        'extra_projects': project_tags[1:] if len(project_tags) > 1 else [],
-                        'extra_contexts': context_tags[1:] if len(context_tags) > 1 else [],
-                        'metadata': {**metadata, 'onhold': effective_onhold_value} if effective_onhold_value else {k: v for k, v in metadata.items() if k != 'onhold'}
-                    }
-                    
-                    # Maintain task stack for proper nesting
-                    # Remove tasks from stack that are at same or deeper level
-                    while task_stack and task_stack[-1]['indent_level'] >= indent_level:
-                        task_stack.pop()
-                    
-                    # If this is a subtask (indent > 1), add to parent
-                    if indent_level > 1 and task_stack:
-                        parent = task_stack[-1]
-                        parent['subtasks'].append(task)
+                        is_completed = True  # Task is completed, but still needs follow-up
                     else:
-                        # Top-level task (indent 0 or 1), add to current area or main tasks
-                        if tasks and tasks[-1]['type'] == 'area':
-                            tasks[-1]['tasks'].append(task)
-                        else:
-                            tasks.append(task)
-                    
-                    # Add to stack for potential children
-                    task_stack.append(task)
-                    
-                except Exception as e:
-                    print(f"Error parsing task on line {line_number}: {line.strip()} - {e}")
-                    continue
-                    
-            elif note_match and task_stack:
-                # Add note to the current task
-                note = {
-                    'type': 'note',
-                    'content': stripped,
-                    'indent': note_match.group(1)
+                        task_status = 'done'
+                        is_completed = True
+                elif metadata.get('followup') or metadata.get('followup_date'):
+                    # Task has follow-up date but is not checked - it's in follow-up state
+                    task_status = 'followup'
+                    is_completed = False
+                elif is_onhold_active:
+                    # Task is on hold (either future date or text condition)
+                    task_status = 'onhold'
+                    is_completed = False
+                else:
+                    task_status = 'incomplete'
+                    is_completed = False
+                
+                task = {
+                    'id': generate_stable_task_id(area, clean_content, indent_level, line_number),
+                    'type': 'task',
+                    'description': clean_content,
+                    'completed': is_completed,
+                    'status': task_status,
+                    'area': area,
+                    'context': context_tags[0] if context_tags else '',
+                    'project': project_tags[0] if project_tags else '',
+                    'due_date': due_date.strftime('%Y-%m-%d') if due_date else '',
+                    'done_date': done_date.strftime('%Y-%m-%d') if done_date else '',
+                    'priority': metadata.get('priority', ''),
+                    'recurring': metadata.get('every', ''),
+                    'followup_date': metadata.get('followup_date', metadata.get('followup', '')),
+                    'onhold_date': effective_onhold_value or '',
+                    'indent_level': indent_level,
+                    'subtasks': [],
+                    'notes': [],
+                    'due_date_obj': due_date,  # Keep for sorting
+                    'done_date_obj': done_date,
+                    'extra_projects': list(project_tags[1:]),
+                    'extra_contexts': list(context_tags[1:]),
+                    'metadata': {**metadata, 'onhold': effective_onhold_value} if effective_onhold_value else {k: v for k, v in metadata.items() if k != 'onhold'}
                 }
-                task_stack[-1]['notes'].append(note)
-    
+                
+                # Maintain task stack for proper nesting
+                # Remove tasks from stack that are at same or deeper level
+                while task_stack and task_stack[-1]['indent_level'] >= indent_level:
+                    task_stack.pop()
+                
+                # If this is a subtask (indent > 1), add to parent
+                if indent_level > 1 and task_stack:
+                    parent = task_stack[-1]
+                    parent['subtasks'].append(task)
+                else:
+                    # Top-level task (indent 0 or 1), add to current area or main tasks
+                    if tasks and tasks[-1]['type'] == 'area':
+                        tasks[-1]['tasks'].append(task)
+                    else:
+                        tasks.append(task)
+                
+                # Add to stack for potential children
+                task_stack.append(task)
+                
+            except Exception as e:
+                print(f"Error parsing task on line {line.number}: {line.raw.strip()} - {e}")
+                continue
+                
+        elif line.kind == 'note' and task_stack:
+            # Add note to the current task
+            note = {
+                'type': 'note',
+                'content': line.raw.rstrip(),
+                'indent': line.indent
+            }
+            task_stack[-1]['notes'].append(note)
+
     return tasks
 
 def parse_tasks() -> List[Dict[str, Any]]:
@@ -222,391 +316,176 @@ def parse_tasks() -> List[Dict[str, Any]]:
 
 def build_sorted_structure(parsed_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Build a sorted structure that groups tasks by due date and maintains hierarchy"""
-    # Extract all tasks from the parsed structure, including subtasks
-    def extract_all_tasks(items):
-        tasks = []
-        for item in items:
-            if item['type'] == 'area':
-                tasks.extend(extract_all_tasks(item['tasks']))
-            elif item['type'] == 'task':
-                tasks.append(item)
-                # Also extract subtasks
-                if item.get('subtasks'):
-                    tasks.extend(extract_all_tasks(item['subtasks']))
-        return tasks
-    
-    all_tasks = extract_all_tasks(parsed_data)
-    
-    # Separate tasks by status: incomplete, onhold, follow-up, and completed
-    incomplete_tasks = [t for t in all_tasks if t['status'] == 'incomplete']
-    onhold_tasks = [t for t in all_tasks if t['status'] == 'onhold']
-    followup_tasks = [t for t in all_tasks if t['status'] == 'followup']
-    completed_tasks = [t for t in all_tasks if t['status'] == 'done']
-    
-    # Also include parent tasks that have completed subtasks in the Done group
-    def find_completed_subtask_hierarchies(items):
-        """Find all parent tasks that have completed subtasks and create copies with only completed subtasks"""
-        hierarchies = []
-        
-        def has_completed_subtasks_recursively(task):
-            """Check if task has any completed subtasks at any depth"""
-            if task.get('subtasks'):
-                for subtask in task['subtasks']:
-                    if subtask['completed'] or has_completed_subtasks_recursively(subtask):
-                        return True
-            return False
-        
-        def create_completed_only_copy(task):
-            """Create a copy of task containing only completed subtasks (recursively)"""
-            import copy
-            task_copy = copy.deepcopy(task)
-            
-            if task_copy.get('subtasks'):
-                completed_subtasks = []
-                for subtask in task_copy['subtasks']:
-                    if subtask['completed']:
-                        # Include the completed subtask
-                        completed_subtasks.append(subtask)
-                    elif has_completed_subtasks_recursively(subtask):
-                        # Include incomplete subtask but filter its children
-                        filtered_subtask = create_completed_only_copy(subtask)
-                        if filtered_subtask['subtasks']:  # Only add if it has completed children
-                            completed_subtasks.append(filtered_subtask)
-                
-                task_copy['subtasks'] = completed_subtasks
-            
-            return task_copy
-        
-        for item in items:
-            if item['type'] == 'area':
-                for task in item['tasks']:
-                    if not task['completed'] and has_completed_subtasks_recursively(task):
-                        filtered_task = create_completed_only_copy(task)
-                        if filtered_task['subtasks']:  # Only add if it actually has completed subtasks
-                            hierarchies.append(filtered_task)
-            elif item['type'] == 'task' and not item['completed'] and has_completed_subtasks_recursively(item):
-                filtered_task = create_completed_only_copy(item)
-                if filtered_task['subtasks']:
-                    hierarchies.append(filtered_task)
-        
-        return hierarchies
-    
-    parent_tasks_with_completed_subtasks = find_completed_subtask_hierarchies(parsed_data)
-    
-    # Find parent tasks that have onhold subtasks and create copies
-    def find_onhold_subtask_hierarchies(items):
-        """Find all parent tasks that have onhold subtasks and create copies with only onhold subtasks"""
-        hierarchies = []
-        
-        def has_onhold_subtasks_recursively(task):
-            """Check if task has any onhold subtasks at any depth"""
-            if task.get('subtasks'):
-                for subtask in task['subtasks']:
-                    if subtask['status'] == 'onhold' or has_onhold_subtasks_recursively(subtask):
-                        return True
-            return False
-        
-        def create_onhold_only_copy(task):
-            """Create a copy of task containing only onhold subtasks (recursively)"""
-            import copy
-            task_copy = copy.deepcopy(task)
-            
-            if task_copy.get('subtasks'):
-                onhold_subtasks = []
-                for subtask in task_copy['subtasks']:
-                    if subtask['status'] == 'onhold':
-                        # Include the onhold subtask
-                        onhold_subtasks.append(subtask)
-                    elif has_onhold_subtasks_recursively(subtask):
-                        # Include incomplete subtask but filter its children
-                        filtered_subtask = create_onhold_only_copy(subtask)
-                        if filtered_subtask['subtasks']:  # Only add if it has onhold children
-                            onhold_subtasks.append(filtered_subtask)
-                
-                task_copy['subtasks'] = onhold_subtasks
-            
-            return task_copy
-        
-        for item in items:
-            if item['type'] == 'area':
-                for task in item['tasks']:
-                    if task['status'] != 'onhold' and has_onhold_subtasks_recursively(task):
-                        filtered_task = create_onhold_only_copy(task)
-                        if filtered_task['subtasks']:  # Only add if it actually has onhold subtasks
-                            hierarchies.append(filtered_task)
-            elif item['type'] == 'task' and task['status'] != 'onhold' and has_onhold_subtasks_recursively(item):
-                filtered_task = create_onhold_only_copy(item)
-                if filtered_task['subtasks']:
-                    hierarchies.append(filtered_task)
-        
-        return hierarchies
-    
-    parent_tasks_with_onhold_subtasks = find_onhold_subtask_hierarchies(parsed_data)
-    
-    # Sort completed tasks by done date
-    completed_tasks.sort(key=lambda x: x.get('done_date_obj') or date.max)
-    
-    # Group incomplete tasks by due date
-    due_groups = {}
-    no_due_tasks = []
-    
-    for task in incomplete_tasks:
-        if task.get('due_date_obj'):
-            due_str = task['due_date_obj'].strftime('%Y-%m-%d')
-            if due_str not in due_groups:
-                due_groups[due_str] = []
-            due_groups[due_str].append(task)
-        else:
-            no_due_tasks.append(task)
-    
-    # Sort due date groups
-    sorted_due_dates = sorted(due_groups.keys())
-    
-    # Build final structure
-    result = []
-    
-    # Add due date groups first
-    for due_date in sorted_due_dates:
-        result.append({
-            'type': 'group', 
-            'title': due_date,
-            'tasks': add_hierarchy_to_tasks(due_groups[due_date], include_completed_subtasks=False)
-        })
-     # Add no due date group
-    if no_due_tasks:
-        result.append({
-            'type': 'group',
-            'title': 'No Due Date',
-            'tasks': add_hierarchy_to_tasks(no_due_tasks, include_completed_subtasks=False)
-        })
-
-    # Add on hold tasks group (sorted by onhold date, upcoming first)
-    if onhold_tasks or parent_tasks_with_onhold_subtasks:
-        # Combine onhold tasks and parent tasks with onhold subtasks
-        all_onhold_tasks = onhold_tasks + parent_tasks_with_onhold_subtasks
-        
-        # Parse onhold dates and sort - prioritize upcoming dates over past ones
-        def parse_onhold_date(task):
-            onhold_str = task.get('onhold_date', '')
-            if onhold_str:
-                try:
-                    onhold_date = datetime.strptime(onhold_str, '%Y-%m-%d').date()
-                    today = date.today()
-                    
-                    # Prioritize upcoming dates: put them first, then past dates
-                    if onhold_date >= today:
-                        # Future/today dates: sort normally (earliest first)
-                        return (0, onhold_date)
-                    else:
-                        # Past dates: sort by reverse date (most recent past first)
-                        return (1, -onhold_date.toordinal())
-                except ValueError:
-                    pass
-            return (2, 0)  # Put tasks with invalid dates at the end
-        
-        all_onhold_tasks.sort(key=parse_onhold_date)
-        
-        result.append({
-            'type': 'group',
-            'title': 'On Hold',
-            'tasks': add_hierarchy_to_tasks(all_onhold_tasks, include_completed_subtasks=False, preserve_order=True, include_onhold_subtasks=True)
-        })
-
-    # Add follow-up tasks group (sorted by follow-up date, upcoming first)
-    if followup_tasks:
-        # Parse follow-up dates and sort - prioritize upcoming dates over past ones
-        def parse_followup_date(task):
-            followup_str = task.get('followup_date', '')
-            if followup_str:
-                try:
-                    followup_date = datetime.strptime(followup_str, '%Y-%m-%d').date()
-                    today = date.today()
-                    
-                    # Prioritize upcoming dates: put them first, then past dates
-                    if followup_date >= today:
-                        # Future/today dates: sort normally (earliest first)
-                        return (0, followup_date)
-                    else:
-                        # Past dates: sort by reverse date (most recent past first)
-                        return (1, -followup_date.toordinal())
-                except ValueError:
-                    pass
-            return (2, 0)  # Put tasks with invalid dates at the end
-        
-        followup_tasks.sort(key=parse_followup_date)
-        
-        result.append({
-            'type': 'group',
-            'title': 'Follow-up Required',
-            'tasks': add_hierarchy_to_tasks(followup_tasks, include_completed_subtasks=False, preserve_order=True)
-        })
-    
-    # Add completed tasks group at the bottom
-    if completed_tasks or parent_tasks_with_completed_subtasks:
-        # Combine completed tasks and parent tasks with completed subtasks
-        done_group_tasks = completed_tasks + parent_tasks_with_completed_subtasks
-        result.append({
-            'type': 'group',
-            'title': 'Done',
-            'tasks': add_hierarchy_to_tasks(done_group_tasks, include_completed_subtasks=True)
-        })
-    
-    return result
-
-def add_hierarchy_to_tasks(task_list: List[Dict[str, Any]], include_completed_subtasks: bool = False, preserve_order: bool = False, include_onhold_subtasks: bool = False) -> List[Dict[str, Any]]:
-    """Add subtasks back to their parent tasks and return only top-level tasks"""
-    # Find all top-level tasks (indent_level 0 or 1, since our top-level tasks are at level 1)
-    top_level_tasks = [t for t in task_list if t['indent_level'] <= 1]
-    
-    # Create a deep copy of tasks to avoid modifying the original data
-    import copy
-    result_tasks = []
-    
-    def filter_subtasks_recursively(subtasks, include_completed):
-        """Recursively filter subtasks based on completion status"""
-        filtered = []
-        for subtask in subtasks:
-            # For active tasks, exclude onhold subtasks (they appear in onhold group)
-            # For onhold group, include onhold subtasks
-            if subtask['status'] == 'onhold' and not include_completed and not include_onhold_subtasks:
-                continue  # Skip onhold subtasks in active task groups
-            elif include_completed or not subtask['completed'] or (include_onhold_subtasks and subtask['status'] == 'onhold'):
-                subtask_copy = copy.deepcopy(subtask)
-                if subtask_copy.get('subtasks'):
-                    subtask_copy['subtasks'] = filter_subtasks_recursively(subtask_copy['subtasks'], include_completed)
-                filtered.append(subtask_copy)
-        return filtered
-    
-    for task in top_level_tasks:
-        task_copy = copy.deepcopy(task)
-        
-        if task_copy.get('subtasks'):
-            task_copy['subtasks'] = filter_subtasks_recursively(task_copy['subtasks'], include_completed_subtasks)
-        
-        result_tasks.append(task_copy)
-    
-    # Sort by priority and content for consistent ordering (unless preserve_order is True)
-    if not preserve_order:
-        priority_order = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, '': 99}
-        result_tasks.sort(key=lambda x: (
-            priority_order.get(x.get('priority', ''), 99),
-            x['description']
-        ))
-    
-    return result_tasks
+    return build_view(parsed_data, TASK_VIEWS['due'])
 
 def parse_recurring_tasks() -> List[Dict[str, Any]]:
     """Parse recurring tasks with similar structure"""
+    with open(recurring_file, 'r') as f:
+        return parse_recurring_lines(f)
+
+def parse_recurring_lines(lines) -> List[Dict[str, Any]]:
+    """Parse the lines of a recurring tasks file into the nested area/task structure"""
     tasks = []
     area = None
     task_stack = []
     
-    with open(recurring_file, 'r') as f:
-        for line_number, line in enumerate(f, 1):
-            stripped = line.rstrip()
-            if not stripped:
-                continue
-                
-            area_match = re.match(r'^(\S.+):$', stripped)
-            markdown_area_match = re.match(r'^#+\s+(.+)$', stripped)
-            task_match = re.match(r'^(\s*)- \[( |x)\] (.+)', line)
+    for line_number, line in enumerate(lines, 1):
+        stripped = line.rstrip()
+        if not stripped:
+            continue
             
-            if area_match:
-                area = area_match.group(1)
-                # Add area header to structure
-                tasks.append({
-                    'type': 'area',
-                    'area': area,
-                    'content': stripped,
-                    'tasks': []
-                })
-                task_stack = []  # Reset task stack for new area
+        area_match = re.match(r'^(\S.+):$', stripped)
+        markdown_area_match = re.match(r'^#+\s+(.+)$', stripped)
+        task_match = re.match(r'^(\s*)- \[( |x)\] (.+)', line)
+        
+        if area_match:
+            area = area_match.group(1)
+            # Add area header to structure
+            tasks.append({
+                'type': 'area',
+                'area': area,
+                'content': stripped,
+                'tasks': []
+            })
+            task_stack = []  # Reset task stack for new area
+            
+        elif markdown_area_match:
+            area = markdown_area_match.group(1)
+            # Add markdown area header to structure
+            tasks.append({
+                'type': 'area',
+                'area': area,
+                'content': stripped,
+                'tasks': []
+            })
+            task_stack = []  # Reset task stack for new area
+            
+        elif task_match:
+            try:
+                indent, completed, content = task_match.groups()
+                indent_level = len(indent) // 4
                 
-            elif markdown_area_match:
-                area = markdown_area_match.group(1)
-                # Add markdown area header to structure
-                tasks.append({
-                    'type': 'area',
+                # Skip malformed content
+                if not content.strip() or content.strip() == '?':
+                    print(f"Skipping malformed recurring task on line {line_number}: {line.strip()}")
+                    continue
+                
+                # Extract metadata
+                all_meta = re.findall(r'\(([^)]*)\)', content)
+                metadata = {}
+                for meta_str in all_meta:
+                    for pair in re.findall(r'(\w+:[^\s)]+)', meta_str):
+                        key, value = pair.split(':', 1)
+                        metadata[key] = value
+                
+                content_no_meta = re.sub(r'\([^)]*\)', '', content).strip()
+                
+                # Extract recurring pattern from square brackets
+                recurring_match = re.search(r'\[([^\]]+)\]', content_no_meta)
+                recurring_pattern = recurring_match.group(1) if recurring_match else ''
+                
+                # Remove recurring pattern from content
+                content_no_recurring = re.sub(r'\[[^\]]+\]', '', content_no_meta).strip()
+                
+                # Extract tags
+                project_tags = list(dict.fromkeys(re.findall(r'\+(\w+)', content_no_recurring)))
+                context_tags = list(dict.fromkeys(re.findall(r'@(\w+)', content_no_recurring)))
+                clean_content = re.sub(r'([+@&]\w+)', '', content_no_recurring).strip()
+                
+                task = {
+                    'id': generate_stable_task_id(area, clean_content, indent_level, line_number),
+                    'type': 'recurring_task',
+                    'description': clean_content,
+                    'completed': completed == 'x',
                     'area': area,
-                    'content': stripped,
-                    'tasks': []
-                })
-                task_stack = []  # Reset task stack for new area
+                    'context': context_tags[0] if context_tags else '',
+                    'project': project_tags[0] if project_tags else '',
+                    'due_date': '',  # Recurring tasks typically don't have due dates
+                    'priority': metadata.get('priority', ''),
+                    'recurring': recurring_pattern,
+                    'indent_level': indent_level,
+                    'subtasks': [],
+                    'notes': [],
+                    'due_date_obj': None,
+                    'done_date_obj': '',
+                    'extra_projects': project_tags[1:] if len(project_tags) > 1 else [],
+                    'extra_contexts': context_tags[1:] if len(context_tags) > 1 else [],
+                    'metadata': metadata,
+                    'line_number': line_number
+                }
                 
-            elif task_match:
-                try:
-                    indent, completed, content = task_match.groups()
-                    indent_level = len(indent) // 4
-                    
-                    # Skip malformed content
-                    if not content.strip() or content.strip() == '?':
-                        print(f"Skipping malformed recurring task on line {line_number}: {line.strip()}")
-                        continue
-                    
-                    # Extract metadata
-                    all_meta = re.findall(r'\(([^)]*)\)', content)
-                    metadata = {}
-                    for meta_str in all_meta:
-                        for pair in re.findall(r'(\w+:[^\s)]+)', meta_str):
-                            key, value = pair.split(':', 1)
-                            metadata[key] = value
-                    
-                    content_no_meta = re.sub(r'\([^)]*\)', '', content).strip()
-                    
-                    # Extract recurring pattern from square brackets
-                    recurring_match = re.search(r'\[([^\]]+)\]', content_no_meta)
-                    recurring_pattern = recurring_match.group(1) if recurring_match else ''
-                    
-                    # Remove recurring pattern from content
-                    content_no_recurring = re.sub(r'\[[^\]]+\]', '', content_no_meta).strip()
-                    
-                    # Extract tags
-                    project_tags = list(dict.fromkeys(re.findall(r'\+(\w+)', content_no_recurring)))
-                    context_tags = list(dict.fromkeys(re.findall(r'@(\w+)', content_no_recurring)))
-                    clean_content = re.sub(r'([+@&]\w+)', '', content_no_recurring).strip()
-                    
-                    task = {
-                        'id': generate_stable_task_id(area, clean_content, indent_level, line_number),
-                        'type': 'recurring_task',
-                        'description': clean_content,
-                        'completed': completed == 'x',
-                        'area': area,
-                        'context': context_tags[0] if context_tags else '',
-                        'project': project_tags[0] if project_tags else '',
-                        'due_date': '',  # Recurring tasks typically don't have due dates
-                        'priority': metadata.get('priority', ''),
-                        'recurring': recurring_pattern,
-                        'indent_level': indent_level,
-                        'subtasks': [],
-                        'notes': [],
-                        'due_date_obj': None,
-                        'done_date_obj': '',
-                        'extra_projects': project_tags[1:] if len(project_tags) > 1 else [],
-                        'extra_contexts': context_tags[1:] if len(context_tags) > 1 else [],
-                        'metadata': metadata
-                    }
-                    
-                    # Handle nesting
-                    while task_stack and task_stack[-1]['indent_level'] >= indent_level:
-                        task_stack.pop()
-                    
-                    if indent_level > 0 and task_stack:
-                        task_stack[-1]['subtasks'].append(task)
+                # Handle nesting
+                while task_stack and task_stack[-1]['indent_level'] >= indent_level:
+                    task_stack.pop()
+                
+                if indent_level > 0 and task_stack:
+                    task_stack[-1]['subtasks'].append(task)
+                else:
+                    # Top-level task, add to current area or main tasks
+                    if tasks and tasks[-1]['type'] == 'area':
+                        tasks[-1]['tasks'].append(task)
                     else:
-                        # Top-level task, add to current area or main tasks
-                        if tasks and tasks[-1]['type'] == 'area':
-                            tasks[-1]['tasks'].append(task)
-                        else:
-                            tasks.append(task)
-                    
-                    task_stack.append(task)
-                    
-                except Exception as e:
-                    print(f"Error parsing recurring task on line {line_number}: {line.strip()} - {e}")
-                    continue
+                        tasks.append(task)
+                
+                task_stack.append(task)
+                
+            except Exception as e:
+                print(f"Error parsing recurring task on line {line_number}: {line.strip()} - {e}")
+                continue
     
     return tasks
 
+# Bumped whenever parse_recurring_index() output changes
+RECURRING_VERSION = 1
+
+# Parsed recurring file keyed on its signature so repeated lookups skip the re-parse
+_recurring_snapshot = {'signature': None, 'snapshot': None}
+
+def index_recurring_tasks(tasks: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Map every recurring task ID (including subtasks) to its task dict"""
+    by_id = {}
+    def add_items(items):
+        for item in items:
+            if item.get('type') == 'recurring_task':
+                by_id[item['id']] = item
+                add_items(item.get('subtasks', []))
+            elif item.get('type') == 'area':
+                add_items(item.get('tasks', []))
+    add_items(tasks)
+    return by_id
+
+def parse_recurring_index(text: str) -> Dict[str, Any]:
+    """Parsed recurring tasks with their ID index"""
+    tasks = parse_recurring_lines(io.StringIO(text))
+    return {'tasks': tasks, 'by_id': index_recurring_tasks(tasks)}
+
+def get_recurring_snapshot() -> Dict[str, Any]:
+    """Return the parsed recurring file with its lines and an ID index, re-parsing only when the file changes"""
+    signature = get_file_signature(recurring_file)
+    cached = _recurring_snapshot['snapshot']
+    if cached is not None and signature is not None and _recurring_snapshot['signature'] == signature:
+        return cached
+    
+    with open(recurring_file, 'r') as f:
+        text = f.read()
+    lines = io.StringIO(text).readlines()
+    # The parsed tasks and their ID index are also kept in the snapshot beside the file
+    parsed = cached_parse(recurring_file, text, 'recurring', RECURRING_VERSION, parse_recurring_index)
+    snapshot = {
+        'signature': signature,
+        'lines': lines,
+        'tasks': parsed['tasks'],
+        'by_id': parsed['by_id']
+    }
+    _recurring_snapshot['signature'] = signature
+    _recurring_snapshot['snapshot'] = snapshot
+    return snapshot
+
+def invalidate_recurring_snapshot():
+    """Drop the cached recurring snapshot after the file has been rewritten"""
+    _recurring_snapshot['signature'] = None
+    _recurring_snapshot['snapshot'] = None
+
 def check_off_task(task_id: str) -> dict:
     """Check off a task - toggle its completion status in the file"""
     try:
@@ -642,25 +521,25 @@ def check_off_task(task_id: str) -> dict:
 def check_off_recurring_task(task_id: str) -> bool:
     """Check off a recurring task - toggle its completion status in the file"""
     try:
-        # First, parse all recurring tasks to find the one with the matching ID
-        raw_tasks = parse_recurring_tasks()
-        task_to_toggle = find_task_by_id(raw_tasks, task_id)
+        # Look the task up in the cached snapshot instead of re-parsing the file
+        snapshot = get_recurring_snapshot()
+        task_to_toggle = snapshot['by_id'].get(task_id)
         
         if not task_to_toggle:
             print(f"Recurring task with ID {task_id} not found")
             return False
-            
-        # Read the current file content
-        with open(recurring_file, 'r') as f:
-            lines = f.readlines()
         
-        # Find and toggle the task
-        success = toggle_task_in_lines(lines, task_to_toggle)
+        # The snapshot records which line each task came from, so toggle it directly
+        lines = list(snapshot['lines'])
+        index = task_to_toggle['line_number'] - 1
+        task_match = re.match(r'^(\s*)- \[( |x|%)\] (.+)', lines[index]) if index < len(lines) else None
         
-        if success:
+        if task_match:
+            lines[index] = toggle_task_line(lines[index], task_match.group(2), task_to_toggle['indent_level'])
             # Write the modified content back to the file
             with open(recurring_file, 'w') as f:
                 f.writelines(lines)
+            invalidate_recurring_snapshot()
             print(f"Successfully toggled recurring task: {task_to_toggle['description']}")
             return True
         else:
@@ -730,162 +609,165 @@ def toggle_task_in_lines(lines, task_info):
             
             # Compare with the task description
             if clean_content == description:
-                # Found the task! Handle toggle based on current status and follow-up metadata
-                # FIX: Ensure proper indentation regardless of current state
-                proper_indent = '    ' * indent_level  # 4 spaces per level
-                
-                # Extract the task content (everything after the checkbox and space)
-                task_content_match = re.match(r'^(\s*)- \[( |x|%)\] (.+)', line)
-                if task_content_match:
-                    current_indent, checkbox_state, task_content = task_content_match.groups()
-                    # Reconstruct line with proper indentation
-                    new_line = f"{proper_indent}- [{checkbox_state}] {task_content}"
-                    if not new_line.endswith('\n'):
-                        new_line += '\n'
+                lines[i] = toggle_task_line(line, completed, indent_level)
+                return True
+    
+    return False
+
+def toggle_task_line(line: str, completed: str, indent_level: int) -> str:
+    """Return a task line with its completion status toggled"""
+    # FIX: Ensure proper indentation regardless of current state
+    proper_indent = '    ' * indent_level  # 4 spaces per level
+    
+    # Extract the task content (everything after the checkbox and space)
+    task_content_match = re.match(r'^(\s*)- \[( |x|%)\] (.+)', line)
+    if task_content_match:
+        current_indent, checkbox_state, task_content = task_content_match.groups()
+        # Reconstruct line with proper indentation
+        new_line = f"{proper_indent}- [{checkbox_state}] {task_content}"
+        if not new_line.endswith('\n'):
+            new_line += '\n'
+    else:
+        new_line = line  # Fallback to original line
+    
+    # Check if task has follow-up metadata
+    has_followup = 'followup:' in new_line or 'followup_date:' in new_line
+    
+    if completed == ' ':  # Unchecked task
+        # Mark as completed and add done date (regardless of follow-up status)
+        new_line = new_line.replace('[ ]', '[x]', 1)
+        
+        # If this task has follow-up metadata, remove it when completing
+        if has_followup:
+            # Remove follow-up metadata
+            def clean_followup_metadata(match):
+                content = match.group(1)
+                # Remove follow-up date but keep other metadata
+                content = re.sub(r'\s*followup:\d{4}-\d{2}-\d{2}\s*', ' ', content)
+                content = re.sub(r'\s*followup_date:\d{4}-\d{2}-\d{2}\s*', ' ', content)
+                content = re.sub(r'^\s+|\s+$', '', content)  # trim
+                content = re.sub(r'\s+', ' ', content)  # normalize spaces
+                if content.strip():
+                    return f'({content})'
                 else:
-                    new_line = line  # Fallback to original line
-                
-                # Check if task has follow-up metadata
-                has_followup = 'followup:' in new_line or 'followup_date:' in new_line
-                
-                if completed == ' ':  # Unchecked task
-                    # Mark as completed and add done date (regardless of follow-up status)
-                    new_line = new_line.replace('[ ]', '[x]', 1)
-                    
-                    # If this task has follow-up metadata, remove it when completing
-                    if has_followup:
-                        # Remove follow-up metadata
-                        def clean_followup_metadata(match):
-                            content = match.group(1)
-                            # Remove follow-up date but keep other metadata
-                            content = re.sub(r'\s*followup:\d{4}-\d{2}-\d{2}\s*', ' ', content)
-                            content = re.sub(r'\s*followup_date:\d{4}-\d{2}-\d{2}\s*', ' ', content)
-                            content = re.sub(r'^\s+|\s+$', '', content)  # trim
-                            content = re.sub(r'\s+', ' ', content)  # normalize spaces
-                            if content.strip():
-                                return f'({content})'
-                            else:
-                                return ''  # Remove empty parentheses
-                        
-                        new_line = re.sub(r'\(([^)]*)\)', clean_followup_metadata, new_line)
-                        # Clean up any extra spaces that might be left, but preserve leading indentation
-                        if '] ' in new_line:
-                            prefix, content = new_line.split('] ', 1)
-                            content = re.sub(r'\s+', ' ', content)
-                            new_line = prefix + '] ' + content
-                        else:
-                            # Fallback - clean up spaces but preserve leading whitespace
-                            match = re.match(r'^(\s*- \[[x ]\] )(.*)', new_line)
-                            if match:
-                                leading_part, content_part = match.groups()
-                                content_part = re.sub(r'\s+', ' ', content_part)
-                                new_line = leading_part + content_part
-                    
-                    # Add done date if not present (use adjusted date for 3 AM boundary)
-                    done_date = get_adjusted_today().strftime('%Y-%m-%d')
-                    if 'done:' not in new_line:
-                        if re.search(r'\([^)]*\)', new_line):
-                            # Add to existing metadata
-                            new_line = re.sub(r'\(([^)]*)\)', rf'(\1 done:{done_date})', new_line, 1)
-                            # Clean up double spaces
-                            new_line = re.sub(r'\(\s+', '(', new_line)
-                            new_line = re.sub(r'\s+\)', ')', new_line)
-                            # Only clean up multiple spaces within the content, not at the beginning
-                            # Split on '] ' to preserve indentation before the checkbox
-                            if '] ' in new_line:
-                                prefix, content = new_line.split('] ', 1)
-                                content = re.sub(r'\s+', ' ', content)
-                                new_line = prefix + '] ' + content
-                            else:
-                                # Fallback - clean up spaces but preserve leading whitespace
-                                match = re.match(r'^(\s*- \[[x ]\] )(.*)', new_line)
-                                if match:
-                                    leading_part, content_part = match.groups()
-                                    content_part = re.sub(r'\s+', ' ', content_part)
-                                    new_line = leading_part + content_part
-                        else:
-                            # Add new metadata at the end before any tags
-                            # Find the position right after ']' to preserve exact spacing
-                            bracket_pos = new_line.find(']')
-                            if bracket_pos != -1:
-                                # Find the start of content (after the space(s) following ']')
-                                content_start = bracket_pos + 1
-                                while content_start < len(new_line) and new_line[content_start] == ' ':
-                                    content_start += 1
-                                
-                                prefix = new_line[:content_start]  # Includes indentation, checkbox, and original spacing
-                                content_part = new_line[content_start:].rstrip('\n')
-                                
-                                # Insert before the first tag or at the end
-                                tag_match = re.search(r'([+@]\w+)', content_part)
-                                if tag_match:
-                                    insert_pos = tag_match.start()
-                                    content_before = content_part[:insert_pos].rstrip()
-                                    content_after = content_part[insert_pos:]
-                                    new_content = f"{content_before} (done:{done_date}) {content_after}"
-                                else:
-                                    new_content = f"{content_part.rstrip()} (done:{done_date})"
-                                
-                                new_line = prefix + new_content
-                            else:
-                                # Fallback to original logic if ']' not found
-                                content_part = new_line.split('] ', 1)[1] if '] ' in new_line else new_line
-                                tag_match = re.search(r'([+@]\w+)', content_part)
-                                if tag_match:
-                                    insert_pos = tag_match.start()
-                                    content_before = content_part[:insert_pos].rstrip()
-                                    content_after = content_part[insert_pos:]
-                                    new_content = f"{content_before} (done:{done_date}) {content_after}"
-                                else:
-                                    new_content = f"{content_part.rstrip()} (done:{done_date})"
-                                
-                                new_line = new_line.split('] ', 1)[0] + '] ' + new_content
+                    return ''  # Remove empty parentheses
+            
+            new_line = re.sub(r'\(([^)]*)\)', clean_followup_metadata, new_line)
+            # Clean up any extra spaces that might be left, but preserve leading indentation
+            if '] ' in new_line:
+                prefix, content = new_line.split('] ', 1)
+                content = re.sub(r'\s+', ' ', content)
+                new_line = prefix + '] ' + content
+            else:
+                # Fallback - clean up spaces but preserve leading whitespace
+                match = re.match(r'^(\s*- \[[x ]\] )(.*)', new_line)
+                if match:
+                    leading_part, content_part = match.groups()
+                    content_part = re.sub(r'\s+', ' ', content_part)
+                    new_line = leading_part + content_part
+        
+        # Add done date if not present (use adjusted date for 3 AM boundary)
+        done_date = get_adjusted_today().strftime('%Y-%m-%d')
+        if 'done:' not in new_line:
+            if re.search(r'\([^)]*\)', new_line):
+                # Add to existing metadata
+                new_line = re.sub(r'\(([^)]*)\)', rf'(\1 done:{done_date})', new_line, 1)
+                # Clean up double spaces
+                new_line = re.sub(r'\(\s+', '(', new_line)
+                new_line = re.sub(r'\s+\)', ')', new_line)
+                # Only clean up multiple spaces within the content, not at the beginning
+                # Split on '] ' to preserve indentation before the checkbox
+                if '] ' in new_line:
+                    prefix, content = new_line.split('] ', 1)
+                    content = re.sub(r'\s+', ' ', content)
+                    new_line = prefix + '] ' + content
+                else:
+                    # Fallback - clean up spaces but preserve leading whitespace
+                    match = re.match(r'^(\s*- \[[x ]\] )(.*)', new_line)
+                    if match:
+                        leading_part, content_part = match.groups()
+                        content_part = re.sub(r'\s+', ' ', content_part)
+                        new_line = leading_part + content_part
+            else:
+                # Add new metadata at the end before any tags
+                # Find the position right after ']' to preserve exact spacing
+                bracket_pos = new_line.find(']')
+                if bracket_pos != -1:
+                    # Find the start of content (after the space(s) following ']')
+                    content_start = bracket_pos + 1
+                    while content_start < len(new_line) and new_line[content_start] == ' ':
+                        content_start += 1
                     
-                    if not new_line.endswith('\n'):
-                        new_line += '\n'
-                            
-                elif completed == 'x':  # Completed task
-                    # Uncheck completed task and remove done date
-                    new_line = new_line.replace('[x]', '[ ]', 1)
+                    prefix = new_line[:content_start]  # Includes indentation, checkbox, and original spacing
+                    content_part = new_line[content_start:].rstrip('\n')
                     
-                    # Remove done date metadata
-                    def clean_metadata(match):
-                        content = match.group(1)
-                        # Remove done date but keep other metadata
-                        content = re.sub(r'\s*done:\d{4}-\d{2}-\d{2}\s*', ' ', content)
-                        content = re.sub(r'^\s+|\s+$', '', content)  # trim
-                        content = re.sub(r'\s+', ' ', content)  # normalize spaces
-                        if content.strip():
-                            return f'({content})'
-                        else:
-                            return ''  # Remove empty parentheses
+                    # Insert before the first tag or at the end
+                    tag_match = re.search(r'([+@]\w+)', content_part)
+                    if tag_match:
+                        insert_pos = tag_match.start()
+                        content_before = content_part[:insert_pos].rstrip()
+                        content_after = content_part[insert_pos:]
+                        new_content = f"{content_before} (done:{done_date}) {content_after}"
+                    else:
+                        new_content = f"{content_part.rstrip()} (done:{done_date})"
                     
-                    new_line = re.sub(r'\(([^)]*)\)', clean_metadata, new_line)
-                    # Clean up any extra spaces that might be left, but preserve leading indentation
-                    if '] ' in new_line:
-                        prefix, content = new_line.split('] ', 1)
-                        content = re.sub(r'\s+', ' ', content)
-                        new_line = prefix + '] ' + content
+                    new_line = prefix + new_content
+                else:
+                    # Fallback to original logic if ']' not found
+                    content_part = new_line.split('] ', 1)[1] if '] ' in new_line else new_line
+                    tag_match = re.search(r'([+@]\w+)', content_part)
+                    if tag_match:
+                        insert_pos = tag_match.start()
+                        content_before = content_part[:insert_pos].rstrip()
+                        content_after = content_part[insert_pos:]
+                        new_content = f"{content_before} (done:{done_date}) {content_after}"
                     else:
-                        # Fallback - clean up spaces but preserve leading whitespace
-                        match = re.match(r'^(\s*- \[[x ]\] )(.*)', new_line)
-                        if match:
-                            leading_part, content_part = match.groups()
-                            content_part = re.sub(r'\s+', ' ', content_part)
-                            new_line = leading_part + content_part
-                    if not new_line.endswith('\n'):
-                        new_line += '\n'
-                        
-                elif completed == '%':  # Follow-up task (legacy)
-                    # Convert legacy follow-up format to unchecked with follow-up metadata
-                    new_line = new_line.replace('[%]', '[ ]', 1)
-                    if not new_line.endswith('\n'):
-                        new_line += '\n'
+                        new_content = f"{content_part.rstrip()} (done:{done_date})"
+                    
+                    new_line = new_line.split('] ', 1)[0] + '] ' + new_content
+        
+        if not new_line.endswith('\n'):
+            new_line += '\n'
                 
-                lines[i] = new_line
-                return True
+    elif completed == 'x':  # Completed task
+        # Uncheck completed task and remove done date
+        new_line = new_line.replace('[x]', '[ ]', 1)
+        
+        # Remove done date metadata
+        def clean_metadata(match):
+            content = match.group(1)
+            # Remove done date but keep other metadata
+            content = re.sub(r'\s*done:\d{4}-\d{2}-\d{2}\s*', ' ', content)
+            content = re.sub(r'^\s+|\s+$', '', content)  # trim
+            content = re.sub(r'\s+', ' ', content)  # normalize spaces
+            if content.strip():
+                return f'({content})'
+            else:
+                return ''  # Remove empty parentheses
+        
+        new_line = re.sub(r'\(([^)]*)\)', clean_metadata, new_line)
+        # Clean up any extra spaces that might be left, but preserve leading indentation
+        if '] ' in new_line:
+            prefix, content = new_line.split('] ', 1)
+            content = re.sub(r'\s+', ' ', content)
+            new_line = prefix + '] ' + content
+        else:
+            # Fallback - clean up spaces but preserve leading whitespace
+            match = re.match(r'^(\s*- \[[x ]\] )(.*)', new_line)
+            if match:
+                leading_part, content_part = match.groups()
+                content_part = re.sub(r'\s+', ' ', content_part)
+                new_line = leading_part + content_part
+        if not new_line.endswith('\n'):
+            new_line += '\n'
+            
+    elif completed == '%':  # Follow-up task (legacy)
+        # Convert legacy follow-up format to unchecked with follow-up metadata
+        new_line = new_line.replace('[%]', '[ ]', 1)
+        if not new_line.endswith('\n'):
+            new_line += '\n'
     
-    return False
+    return new_line
 
 def extract_context(content: str) -> str:
     """Legacy function for backward compatibility"""
@@ -924,175 +806,11 @@ def parse_tasks_no_sort() -> List[Dict[str, Any]]:
 
 def build_priority_sorted_structure(parsed_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Build a structure grouped by priority"""
-    # Extract all tasks from the parsed structure, including subtasks
-    def extract_all_tasks(items):
-        tasks = []
-        for item in items:
-            if item['type'] == 'area':
-                tasks.extend(extract_all_tasks(item['tasks']))
-            elif item['type'] == 'task':
-                tasks.append(item)
-                # Also extract subtasks
-                if item.get('subtasks'):
-                    tasks.extend(extract_all_tasks(item['subtasks']))
-        return tasks
-    
-    all_tasks = extract_all_tasks(parsed_data)
-    
-    # Separate tasks by status: incomplete, follow-up, and completed  
-    incomplete_tasks = [t for t in all_tasks if not t.get('followup_date') and not t['completed']]
-    followup_tasks = [t for t in all_tasks if t.get('followup_date')]  # Any task with follow-up date
-    completed_tasks = [t for t in all_tasks if t['completed'] and not t.get('followup_date')]  # Only truly completed tasks
-    
-    # Also include parent tasks that have completed subtasks in the Done group
-    def find_completed_subtask_hierarchies_priority(items):
-        """Find all parent tasks that have completed subtasks and create copies with only completed subtasks"""
-        hierarchies = []
-        
-        def has_completed_subtasks_recursively(task):
-            """Check if task has any completed subtasks at any depth"""
-            if task.get('subtasks'):
-                for subtask in task['subtasks']:
-                    if subtask['completed'] or has_completed_subtasks_recursively(subtask):
-                        return True
-            return False
-        
-        def create_completed_only_copy(task):
-            """Create a copy of task containing only completed subtasks (recursively)"""
-            import copy
-            task_copy = copy.deepcopy(task)
-            
-            if task_copy.get('subtasks'):
-                completed_subtasks = []
-                for subtask in task_copy['subtasks']:
-                    if subtask['completed']:
-                        # Include the completed subtask
-                        completed_subtasks.append(subtask)
-                    elif has_completed_subtasks_recursively(subtask):
-                        # Include incomplete subtask but filter its children
-                        filtered_subtask = create_completed_only_copy(subtask)
-                        if filtered_subtask['subtasks']:  # Only add if it has completed children
-                            completed_subtasks.append(filtered_subtask)
-                
-                task_copy['subtasks'] = completed_subtasks
-            
-            return task_copy
-        
-        for item in items:
-            if item['type'] == 'area':
-                for task in item['tasks']:
-                    if not task['completed'] and has_completed_subtasks_recursively(task):
-                        filtered_task = create_completed_only_copy(task)
-                        if filtered_task['subtasks']:  # Only add if it actually has completed subtasks
-                            hierarchies.append(filtered_task)
-            elif item['type'] == 'task' and not item['completed'] and has_completed_subtasks_recursively(item):
-                filtered_task = create_completed_only_copy(item)
-                if filtered_task['subtasks']:
-                    hierarchies.append(filtered_task)
-        
-        return hierarchies
-    
-    parent_tasks_with_completed_subtasks = find_completed_subtask_hierarchies_priority(parsed_data)
-    
-    # Sort completed tasks by priority
-    priority_order = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6}
-    completed_tasks.sort(key=lambda x: (
-        priority_order.get(x.get('priority', ''), 99),
-        x['description']
-    ))
-    
-    # Group incomplete tasks by priority
-    priority_groups = {}
-    no_priority_tasks = []
-    
-    for task in incomplete_tasks:
-        priority = task.get('priority', '')
-        if priority:
-            if priority not in priority_groups:
-                priority_groups[priority] = []
-            priority_groups[priority].append(task)
-        else:
-            no_priority_tasks.append(task)
-    
-    # Sort priority groups
-    sorted_priorities = sorted(priority_groups.keys(), key=lambda x: priority_order.get(x, 99))
-    
-    # Build final structure
-    result = []
-    
-    # Add priority groups first
-    for priority in sorted_priorities:
-        result.append({
-            'type': 'group', 
-            'title': f'Priority {priority}',
-            'tasks': add_hierarchy_to_tasks(priority_groups[priority], include_completed_subtasks=False)
-        })
-    
-    # Add no priority group
-    if no_priority_tasks:
-        result.append({
-            'type': 'group',
-            'title': 'No Priority',
-            'tasks': add_hierarchy_to_tasks(no_priority_tasks, include_completed_subtasks=False)
-        })
-    
-    # Add follow-up tasks group (sorted by follow-up date, upcoming first)
-    if followup_tasks:
-        # Parse follow-up dates and sort - prioritize upcoming dates over past ones
-        def parse_followup_date(task):
-            followup_str = task.get('followup_date', '')
-            if followup_str:
-                try:
-                    followup_date = datetime.strptime(followup_str, '%Y-%m-%d').date()
-                    today = date.today()
-                    
-                    # Prioritize upcoming dates: put them first, then past dates
-                    if followup_date >= today:
-                        # Future/today dates: sort normally (earliest first)
-                        return (0, followup_date)
-                    else:
-                        # Past dates: sort by reverse date (most recent past first)
-                        return (1, -followup_date.toordinal())
-                except ValueError:
-                    pass
-            return (2, 0)  # Put tasks with invalid dates at the end
-        
-        followup_tasks.sort(key=parse_followup_date)
-        
-        result.append({
-            'type': 'group',
-            'title': 'Follow-up Required',
-            'tasks': add_hierarchy_to_tasks(followup_tasks, include_completed_subtasks=False, preserve_order=True)
-        })
-    
-    # Add completed tasks group at the bottom
-    if completed_tasks or parent_tasks_with_completed_subtasks:
-        # Combine completed tasks and parent tasks with completed subtasks
-        done_group_tasks = completed_tasks + parent_tasks_with_completed_subtasks
-        result.append({
-            'type': 'group',
-            'title': 'Done',
-            'tasks': add_hierarchy_to_tasks(done_group_tasks, include_completed_subtasks=True)
-        })
-    
-    return result
+    return build_view(parsed_data, TASK_VIEWS['priority'])
 
 def build_area_sorted_structure(parsed_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Build a structure grouped by area (no additional sorting)"""
-    result = []
-    
-    for item in parsed_data:
-        if item['type'] == 'area' and item['tasks']:
-            # Sort tasks within area by priority for consistency
-            sorted_tasks = add_hierarchy_to_tasks(item['tasks'])
-            
-            result.append({
-                'type': 'group',
-                'title': item['area'],
-                'tasks': sorted_tasks
-            })
-    
-    return result
+    return build_view(parsed_data, TASK_VIEWS['none'])
 
 def create_task(task_request) -> dict:
     """Create a new task and add it to the tasks.txt file"""
@@ -0,0 +1,358 @@
+"""Recurrence rules for recurring_tasks.txt patterns.
+
+Each pattern string (the ``[daily]`` / ``[weekly:Mon,Wed,Fri]`` part of a
+recurring task, or an ``every:`` metadata value) is compiled once into a rule
+object.  Rules answer ``occurs_on``, ``next_after`` and
+``occurrences_between`` with date arithmetic rather than day-by-day loops,
+and can expand themselves over a whole array of date ordinals in one NumPy
+operation, which is what the compliance calculations use.
+
+Supported patterns:
+    daily
+    weekly:Mon,Wed,Fri
+    monthly:15          (clamped to the last day of shorter months)
+    yearly:MM-DD        (Feb 29 falls on Feb 28 in non-leap years)
+    custom:Nd           (every N days from the task's start:/due: date on)
+"""
+import re
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+WEEKDAY_NAMES = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6}
+
+# Anchor for custom:Nd rules on tasks without a start:/due: date
+CUSTOM_EPOCH = date(1970, 1, 1)
+
+# How many days ahead the occurrence index is precomputed
+OCCURRENCE_HORIZON_DAYS = 90
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def day_components(ordinals: np.ndarray):
+    """Return (weekday, day_of_month, month, days_in_month) arrays for date ordinals"""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    days = (ordinals - _EPOCH_ORDINAL).astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    weekday = (ordinals - 1) % 7  # date.fromordinal(1) is a Monday
+    day_of_month = (days - months.astype('datetime64[D]')).astype(np.int64) + 1
+    month = months.astype(np.int64) % 12 + 1
+    days_in_month = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+    return weekday, day_of_month, month, days_in_month
+
+
+def _days_in_month(year: int, month: int) -> int:
+    if month == 12:
+        return 31
+    return (date(year, month + 1, 1) - date(year, month, 1)).days
+
+
+class RecurrenceRule:
+    """Base class for compiled recurrence patterns"""
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+
+    def occurs_on(self, day: date) -> bool:
+        return self.next_on_or_after(day) == day
+
+    def next_on_or_after(self, day: date) -> date:
+        """First occurrence on or after the given date"""
+        raise NotImplementedError
+
+    def next_after(self, day: date) -> date:
+        """First occurrence strictly after the given date"""
+        return self.next_on_or_after(day + timedelta(days=1))
+
+    def occurs_between(self, start: date, end: date) -> bool:
+        """Whether there is at least one occurrence in [start, end]"""
+        return start <= end and self.next_on_or_after(start) <= end
+
+    def occurrences_between(self, start: date, end: date) -> List[date]:
+        """All occurrences in [start, end], stepping from one occurrence to the next"""
+        occurrences = []
+        if start > end:
+            return occurrences
+        current = self.next_on_or_after(start)
+        while current <= end:
+            occurrences.append(current)
+            current = self.next_after(current)
+        return occurrences
+
+    def mask(self, ordinals: np.ndarray) -> np.ndarray:
+        """Boolean array marking which of the given date ordinals are occurrences"""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.pattern!r})"
+
+
+class DailyRule(RecurrenceRule):
+    def occurs_on(self, day: date) -> bool:
+        return True
+
+    def next_on_or_after(self, day: date) -> date:
+        return day
+
+    def mask(self, ordinals: np.ndarray) -> np.ndarray:
+        return np.ones(len(ordinals), dtype=bool)
+
+
+class WeeklyRule(RecurrenceRule):
+    def __init__(self, pattern: str, weekdays: List[int]):
+        super().__init__(pattern)
+        self.weekdays = sorted(set(weekdays))
+
+    def occurs_on(self, day: date) -> bool:
+        return day.weekday() in self.weekdays
+
+    def next_on_or_after(self, day: date) -> date:
+        offset = min((weekday - day.weekday()) % 7 for weekday in self.weekdays)
+        return day + timedelta(days=offset)
+
+    def mask(self, ordinals: np.ndarray) -> np.ndarray:
+        weekday = (np.asarray(ordinals, dtype=np.int64) - 1) % 7
+        return np.isin(weekday, self.weekdays)
+
+
+class MonthlyRule(RecurrenceRule):
+    def __init__(self, pattern: str, day_of_month: int):
+        super().__init__(pattern)
+        self.day_of_month = day_of_month
+
+    def occurs_on(self, day: date) -> bool:
+        return day.day == min(self.day_of_month, _days_in_month(day.year, day.month))
+
+    def next_on_or_after(self, day: date) -> date:
+        year, month = day.year, day.month
+        candidate = date(year, month, min(self.day_of_month, _days_in_month(year, month)))
+        if candidate >= day:
+            return candidate
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return date(year, month, min(self.day_of_month, _days_in_month(year, month)))
+
+    def mask(self, ordinals: np.ndarray) -> np.ndarray:
+        _, day_of_month, _, days_in_month = day_components(ordinals)
+        return day_of_month == np.minimum(self.day_of_month, days_in_month)
+
+
+class YearlyRule(RecurrenceRule):
+    def __init__(self, pattern: str, month: int, day_of_month: int):
+        super().__init__(pattern)
+        self.month = month
+        self.day_of_month = day_of_month
+
+    def occurs_on(self, day: date) -> bool:
+        if day.month != self.month:
+            return False
+        return day.day == min(self.day_of_month, _days_in_month(day.year, day.month))
+
+    def next_on_or_after(self, day: date) -> date:
+        candidate = self._in_year(day.year)
+        return candidate if candidate >= day else self._in_year(day.year + 1)
+
+    def _in_year(self, year: int) -> date:
+        return date(year, self.month, min(self.day_of_month, _days_in_month(year, self.month)))
+
+    def mask(self, ordinals: np.ndarray) -> np.ndarray:
+        _, day_of_month, month, days_in_month = day_components(ordinals)
+        return (month == self.month) & (day_of_month == np.minimum(self.day_of_month, days_in_month))
+
+
+class IntervalRule(RecurrenceRule):
+    """Every interval_days days from the anchor on; nothing before the anchor"""
+
+    def __init__(self, pattern: str, interval_days: int, anchor: date):
+        super().__init__(pattern)
+        self.interval_days = interval_days
+        self.anchor = anchor
+
+    def occurs_on(self, day: date) -> bool:
+        return day >= self.anchor and (day.toordinal() - self.anchor.toordinal()) % self.interval_days == 0
+
+    def next_on_or_after(self, day: date) -> date:
+        if day < self.anchor:
+            return self.anchor
+        offset = (day.toordinal() - self.anchor.toordinal()) % self.interval_days
+        return day if offset == 0 else day + timedelta(days=self.interval_days - offset)
+
+    def mask(self, ordinals: np.ndarray) -> np.ndarray:
+        offsets = np.asarray(ordinals, dtype=np.int64) - self.anchor.toordinal()
+        return (offsets >= 0) & (offsets % self.interval_days == 0)
+
+
+@lru_cache(maxsize=1024)
+def compile_rule(pattern: str, anchor: Optional[date] = None) -> Optional[RecurrenceRule]:
+    """Compile a recurrence pattern string into a rule, or None if unsupported"""
+    pattern = (pattern or '').strip()
+    if not pattern:
+        return None
+
+    kind, _, arg = pattern.partition(':')
+    kind = kind.strip().lower()
+    arg = arg.strip()
+
+    if kind == 'daily' and not arg:
+        return DailyRule(pattern)
+
+    if kind == 'weekly':
+        names = [name.strip().capitalize()[:3] for name in arg.split(',') if name.strip()]
+        if names and all(name in WEEKDAY_NAMES for name in names):
+            return WeeklyRule(pattern, [WEEKDAY_NAMES[name] for name in names])
+        return None
+
+    if kind == 'monthly':
+        if arg.isdigit() and 1 <= int(arg) <= 31:
+            return MonthlyRule(pattern, int(arg))
+        return None
+
+    if kind == 'yearly':
+        match = re.fullmatch(r'(\d{1,2})-(\d{1,2})', arg)
+        if match:
+            month, day_of_month = int(match.group(1)), int(match.group(2))
+            if 1 <= month <= 12 and 1 <= day_of_month <= _days_in_month(2000, month):
+                return YearlyRule(pattern, month, day_of_month)
+        return None
+
+    if kind == 'custom':
+        match = re.fullmatch(r'(\d+)d', arg)
+        if match and int(match.group(1)) > 0:
+            return IntervalRule(pattern, int(match.group(1)), anchor or CUSTOM_EPOCH)
+        return None
+
+    return None
+
+
+def get_task_pattern(task: Dict[str, Any]) -> str:
+    """Get the recurrence pattern of a parsed recurring task"""
+    return task.get('metadata', {}).get('every', '') or task.get('recurring', '')
+
+
+def get_task_anchor(task: Dict[str, Any]) -> Optional[date]:
+    """Get the start date used to anchor custom:Nd intervals, if the task has one"""
+    metadata = task.get('metadata', {})
+    for key in ('start', 'due'):
+        value = metadata.get(key)
+        if value:
+            try:
+                return datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                continue
+    return None
+
+
+def compile_task_rule(task: Dict[str, Any]) -> Optional[RecurrenceRule]:
+    """Compile the recurrence rule for a parsed recurring task"""
+    return compile_rule(get_task_pattern(task), get_task_anchor(task))
+
+
+def flatten_recurring_tasks(parsed: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flatten the area/subtask structure from parse_recurring_tasks into a task list"""
+    tasks = []
+
+    def visit(items):
+        for item in items:
+            if item.get('type') == 'area':
+                visit(item.get('tasks', []))
+            elif item.get('type') == 'recurring_task':
+                tasks.append(item)
+                visit(item.get('subtasks', []))
+
+    visit(parsed)
+    return tasks
+
+
+def parse_filter_window(filter_type: str, today: date):
+    """Translate a /recurring filter into an inclusive (start, end) date window.
+
+    Accepts "today", "next7days" and any "nextNdays"; returns None otherwise.
+    """
+    if filter_type == 'today':
+        return today, today
+    match = re.fullmatch(r'next(\d+)days', filter_type or '')
+    if match and int(match.group(1)) > 0:
+        return today, today + timedelta(days=int(match.group(1)) - 1)
+    return None
+
+
+def expected_occurrences(rules: List[Optional[RecurrenceRule]], start: date, end: date):
+    """Expand rules over [start, end] into a (tasks x days) boolean matrix.
+
+    Returns (ordinals, matrix); rows for tasks without a rule are all False.
+    """
+    ordinals = np.arange(start.toordinal(), end.toordinal() + 1, dtype=np.int64)
+    matrix = np.zeros((len(rules), len(ordinals)), dtype=bool)
+    for row, rule in enumerate(rules):
+        if rule is not None and len(ordinals):
+            matrix[row] = rule.mask(ordinals)
+    return ordinals, matrix
+
+
+class OccurrenceIndex:
+    """Precomputed date -> sorted task ID list map over a rolling horizon.
+
+    Built once per version of recurring_tasks.txt.  When the adjusted day
+    rolls over, ``advance`` drops the days that have passed and expands the
+    rules only for the newly uncovered days at the end of the horizon.
+    """
+
+    def __init__(self, tasks: List[Dict[str, Any]], start: date, horizon_days: int = OCCURRENCE_HORIZON_DAYS):
+        self.horizon_days = horizon_days
+        self.rules = {}
+        for task in tasks:
+            rule = compile_task_rule(task)
+            if rule is not None and task.get('id'):
+                self.rules[task['id']] = rule
+        self.start = start
+        self.end = start + timedelta(days=horizon_days - 1)
+        self.by_date: Dict[date, List[str]] = {}
+        self._lock = threading.Lock()
+        self._fill(self.start, self.end)
+
+    def _fill(self, start: date, end: date):
+        added = {}
+        for task_id, rule in self.rules.items():
+            for day in rule.occurrences_between(start, end):
+                added.setdefault(day, []).append(task_id)
+        day = start
+        while day <= end:
+            self.by_date[day] = sorted(added.get(day, []))
+            day += timedelta(days=1)
+
+    def advance(self, new_start: date):
+        """Move the horizon forward so that it starts at new_start"""
+        with self._lock:
+            if new_start <= self.start:
+                return
+            new_end = new_start + timedelta(days=self.horizon_days - 1)
+            for day in [d for d in self.by_date if d < new_start]:
+                del self.by_date[day]
+            fill_from = max(self.end + timedelta(days=1), new_start)
+            self.start, self.end = new_start, new_end
+            self._fill(fill_from, new_end)
+
+    def covers(self, start: date, end: date) -> bool:
+        return self.start <= start and end <= self.end
+
+    def task_ids_on(self, day: date) -> List[str]:
+        return self.by_date.get(day, [])
+
+    def task_ids_between(self, start: date, end: date) -> List[str]:
+        """Sorted IDs of tasks with at least one occurrence in [start, end]"""
+        if self.covers(start, end):
+            ids = set()
+            day = start
+            while day <= end:
+                ids.update(self.by_date.get(day, ()))
+                day += timedelta(days=1)
+            return sorted(ids)
+        # Outside the precomputed horizon: fall back to the rules themselves
+        return sorted(task_id for task_id, rule in self.rules.items() if rule.occurs_between(start, end))
+
+    def next_occurrence(self, task_id: str, day: date) -> Optional[date]:
+        rule = self.rules.get(task_id)
+        return rule.next_on_or_after(day) if rule else None
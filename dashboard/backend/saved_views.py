@@ -0,0 +1,159 @@
+"""
+Named saved views over tasks.txt with incrementally maintained results.
+
+Views are read from saved_views.txt, one per line:
+
+    # name | query | sort (due, priority or none; default due)
+    phone-this-week | @Phone due<+7d -status:done
+    work-a | &Work priority:A | priority
+
+The query uses the task query language of task_query.py. A view's result is
+the flat list of matching tasks.
+
+Each query term only looks at the task's own fields, so whether a task
+matches is a function of those fields. SavedViewSet therefore keys every
+parsed task on them (plus an occurrence count for identical tasks) and
+diffs each new parse against the previous one as sets of keys. A view only
+evaluates its predicate on the added keys and drops the removed ones.
+Unchanged matches just pick up their current task dict, since IDs move with
+line numbers.
+
+Each view's JSON body and ETag are rendered when its results change, so
+serving a view is a dictionary lookup. Relative dates (today, +7d) are
+re-resolved, and every view rebuilt, when the adjusted day changes.
+"""
+
+import hashlib
+import json
+import re
+from datetime import date
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from task_index import keyed_tasks
+from task_query import QuerySyntaxError, compile_node, parse_query
+
+VIEW_SORTS = ('due', 'priority', 'none')
+VIEW_NAME_PATTERN = re.compile(r'^[\w-]+$')
+
+# Task fields query terms can look at; tasks equal on these match the same queries
+MATCH_FIELDS = ('area', 'description', 'status', 'priority', 'project', 'extra_projects', 'context',
+                'extra_contexts', 'due_date_obj', 'done_date_obj')
+
+
+class SavedView(NamedTuple):
+    name: str
+    query: str
+    sort: str = 'due'
+
+
+def parse_views_text(text: str) -> Tuple[List[SavedView], List[str]]:
+    """(views, errors) from the lines of saved_views.txt"""
+    views, errors, names = [], [], set()
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) not in (2, 3) or not parts[1]:
+            errors.append(f"Line {number}: expected 'name | query | sort'")
+            continue
+        name, query, sort = parts[0], parts[1], parts[2] if len(parts) == 3 and parts[2] else 'due'
+        if not VIEW_NAME_PATTERN.match(name):
+            errors.append(f"Line {number}: view names may only contain letters, digits, _ and -")
+        elif name in names:
+            errors.append(f"Line {number}: duplicate view {name}")
+        elif sort not in VIEW_SORTS:
+            errors.append(f"Line {number}: sort must be one of {', '.join(VIEW_SORTS)}")
+        else:
+            names.add(name)
+            views.append(SavedView(name, query, sort))
+    return views, errors
+
+
+def match_key(task: Dict[str, Any]) -> tuple:
+    """The fields of a task that decide which queries it matches"""
+    values = [tuple(task[field]) if isinstance(task[field], list) else task[field] for field in MATCH_FIELDS]
+    values.append(bool(task['notes']))
+    return tuple(values)
+
+
+def sort_key(sort: str, number: int, task: Dict[str, Any]) -> tuple:
+    due = task['due_date_obj'] or date.max
+    priority = task['priority'] or '~'
+    if sort == 'due':
+        return due, priority, number
+    if sort == 'priority':
+        return priority, due, number
+    return (number,)
+
+
+class SavedViewSet:
+    """Saved views kept up to date with diffs of the parsed task tree"""
+
+    def __init__(self, views: List[SavedView]):
+        self.views = {view.name: {'view': view, 'predicate': None, 'error': None, 'matches': {},
+                                  'body': None, 'etag': None} for view in views}
+        self.tasks = {}  # {key: (number, task)} of the last parse
+        self.today = None
+
+    def _compile(self, today: date):
+        """(Re)resolve every query for today"""
+        for entry in self.views.values():
+            try:
+                entry['predicate'] = compile_node(parse_query(entry['view'].query, today))
+                entry['error'] = None
+            except QuerySyntaxError as e:
+                entry['predicate'], entry['error'] = None, str(e)
+
+    def update(self, tasks: List[Dict[str, Any]], today: date) -> List[str]:
+        """Apply a new parse; returns the names of the views whose body changed"""
+        current = keyed_tasks(tasks, match_key)
+
+        if today != self.today:
+            self._compile(today)
+            self.today = today
+            added, removed = current.keys(), ()
+            for entry in self.views.values():
+                entry['matches'] = {}
+        else:
+            added = current.keys() - self.tasks.keys()
+            removed = self.tasks.keys() - current.keys()
+        self.tasks = current
+
+        changed = []
+        for name, entry in self.views.items():
+            matches = entry['matches']
+            for key in removed:
+                matches.pop(key, None)
+            predicate = entry['predicate']
+            if predicate is not None:
+                for key in added:
+                    if predicate(current[key][1]):
+                        matches[key] = None
+            if self._render(entry, current):
+                changed.append(name)
+        return changed
+
+    def _render(self, entry: Dict[str, Any], current: Dict[tuple, Tuple[int, Dict[str, Any]]]) -> bool:
+        view = entry['view']
+        ordered = sorted((current[key] for key in entry['matches']),
+                         key=lambda item: sort_key(view.sort, *item))
+        payload = {'name': view.name, 'query': view.query, 'sort': view.sort, 'count': len(ordered),
+                   'tasks': [{**task, 'subtasks': []} for _, task in ordered]}
+        if entry['error']:
+            payload['error'] = entry['error']
+        body = json.dumps(payload, default=str).encode('utf-8')
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        if etag == entry['etag']:
+            return False
+        entry['body'], entry['etag'] = body, etag
+        return True
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """{'view', 'error', 'body', 'etag', ...} of a view, or None if there is no such view"""
+        return self.views.get(name)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [{'name': name, 'query': entry['view'].query, 'sort': entry['view'].sort,
+                 'count': len(entry['matches']), 'error': entry['error']}
+                for name, entry in self.views.items()]
@@ -0,0 +1,51 @@
+"""
+Date-axis alignment for combining time series from different sources.
+
+Series are (ordinals, {name: float64 array}) pairs with sorted, unique day
+ordinals. align() places a series onto a shared axis with one binary search
+per series instead of a per-day lookup, leaving NaN where the source has no
+value; union_axis() builds the axis for an outer join.
+"""
+
+from functools import reduce
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+Series = Tuple[np.ndarray, Dict[str, np.ndarray]]
+
+
+def union_axis(*ordinal_arrays: np.ndarray) -> np.ndarray:
+    """Sorted union of several day axes"""
+    arrays = [np.asarray(ordinals, dtype=np.int64) for ordinals in ordinal_arrays]
+    if not arrays:
+        return np.empty(0, dtype=np.int64)
+    return reduce(np.union1d, arrays).astype(np.int64)
+
+
+def align(axis: np.ndarray, ordinals: np.ndarray, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Reindex columns from their own day axis onto axis (NaN where absent)"""
+    axis = np.asarray(axis, dtype=np.int64)
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    aligned = {name: np.full(len(axis), np.nan) for name in columns}
+    if len(ordinals) == 0 or len(axis) == 0:
+        return aligned
+    positions = np.minimum(np.searchsorted(ordinals, axis), len(ordinals) - 1)
+    found = ordinals[positions] == axis
+    for name, values in columns.items():
+        aligned[name][found] = np.asarray(values, dtype=np.float64)[positions[found]]
+    return aligned
+
+
+def outer_join(*series: Series) -> Series:
+    """Combine series on the union of their day axes"""
+    axis = union_axis(*[ordinals for ordinals, _ in series])
+    columns = {}
+    for ordinals, source_columns in series:
+        columns.update(align(axis, ordinals, source_columns))
+    return axis, columns
+
+
+def parse_metric_list(text: str) -> List[str]:
+    """'overdue, compliance_pct' -> ['overdue', 'compliance_pct'] (order kept, duplicates dropped)"""
+    return list(dict.fromkeys(name.strip() for name in (text or '').split(',') if name.strip()))
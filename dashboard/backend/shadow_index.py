@@ -0,0 +1,363 @@
+"""
+Optional SQLite shadow index of the text data files.
+
+The text files stay the source of truth. ShadowIndex mirrors what the
+backend parses from them into a SQLite database, so filters and aggregations
+can run as indexed SQL instead of dict scans. Mirrored data: tasks with their
+tags and notes, recurring tasks, the recurring status log, archived tasks,
+and list and goal items.
+
+Each data file is a source with a version (its file signature). Syncing a
+source costs one row lookup while its version is unchanged. Otherwise its
+rows are rebuilt from the parse and diffed against the stored rows, and only
+the rows that changed are deleted or inserted. The status log is append-only,
+so only the lines appended since the last sync are read. The database runs
+in WAL mode, so readers are not blocked while a sync writes.
+
+query() runs on a separate connection that is only allowed to read.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from status_log import TIMESTAMP_FORMAT, parse_entry
+from task_snapshot import (CONTEXT_PATTERN, METADATA_PATTERN, PROJECT_PATTERN, TAG_PATTERN,
+                           parse_lines, parse_metadata)
+
+# Bumped whenever the schema or the meaning of a column changes; older databases are rebuilt
+SCHEMA_VERSION = 1
+
+# Mirrored tables: {name: (columns after `source`, key columns within one source)}
+TABLES = {
+    'tasks': (['id', 'parent_id', 'area', 'indent_level', 'description', 'status', 'completed', 'priority',
+               'due_date', 'done_date', 'followup_date', 'onhold_date', 'recurring'], ['id']),
+    'task_tags': (['task_id', 'kind', 'tag'], ['task_id', 'kind', 'tag']),
+    'notes': (['task_id', 'position', 'content'], ['task_id', 'position']),
+    'recurring': (['id', 'parent_id', 'line_number', 'area', 'description', 'pattern', 'completed', 'priority',
+                   'project', 'context'], ['id']),
+    'status_log': (['byte_offset', 'timestamp', 'date', 'status', 'task_id', 'description'], ['byte_offset']),
+    'archive': (['archived_on', 'position', 'indent_level', 'completed', 'area', 'description', 'priority',
+                 'due_date', 'done_date', 'project', 'context'], ['archived_on', 'position']),
+    'list_items': (['line_number', 'kind', 'name', 'area', 'text', 'completed', 'indent_level', 'quantity',
+                    'is_area_header'], ['line_number']),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY, kind TEXT NOT NULL, version TEXT, valid_until TEXT, byte_offset INTEGER NOT NULL DEFAULT 0,
+    synced_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    source TEXT NOT NULL, id TEXT NOT NULL, parent_id TEXT, area TEXT, indent_level INTEGER, description TEXT,
+    status TEXT, completed INTEGER, priority TEXT, due_date TEXT, done_date TEXT, followup_date TEXT,
+    onhold_date TEXT, recurring TEXT, PRIMARY KEY (source, id)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+CREATE INDEX IF NOT EXISTS tasks_area ON tasks (area, priority);
+CREATE INDEX IF NOT EXISTS tasks_parent ON tasks (parent_id);
+CREATE TABLE IF NOT EXISTS task_tags (
+    source TEXT NOT NULL, task_id TEXT NOT NULL, kind TEXT NOT NULL, tag TEXT NOT NULL,
+    PRIMARY KEY (source, task_id, kind, tag)
+);
+CREATE INDEX IF NOT EXISTS task_tags_tag ON task_tags (kind, tag);
+CREATE TABLE IF NOT EXISTS notes (
+    source TEXT NOT NULL, task_id TEXT NOT NULL, position INTEGER NOT NULL, content TEXT,
+    PRIMARY KEY (source, task_id, position)
+);
+CREATE TABLE IF NOT EXISTS recurring (
+    source TEXT NOT NULL, id TEXT NOT NULL, parent_id TEXT, line_number INTEGER, area TEXT, description TEXT,
+    pattern TEXT, completed INTEGER, priority TEXT, project TEXT, context TEXT, PRIMARY KEY (source, id)
+);
+CREATE TABLE IF NOT EXISTS status_log (
+    source TEXT NOT NULL, byte_offset INTEGER NOT NULL, timestamp TEXT, date TEXT, status TEXT, task_id TEXT,
+    description TEXT, PRIMARY KEY (source, byte_offset)
+);
+CREATE INDEX IF NOT EXISTS status_log_task ON status_log (task_id, date);
+CREATE INDEX IF NOT EXISTS status_log_date ON status_log (date, status);
+CREATE TABLE IF NOT EXISTS archive (
+    source TEXT NOT NULL, archived_on TEXT NOT NULL, position INTEGER NOT NULL, indent_level INTEGER,
+    completed INTEGER, area TEXT, description TEXT, priority TEXT, due_date TEXT, done_date TEXT, project TEXT,
+    context TEXT, PRIMARY KEY (source, archived_on, position)
+);
+CREATE INDEX IF NOT EXISTS archive_done_date ON archive (done_date);
+CREATE TABLE IF NOT EXISTS list_items (
+    source TEXT NOT NULL, line_number INTEGER NOT NULL, kind TEXT, name TEXT, area TEXT, text TEXT,
+    completed INTEGER, indent_level INTEGER, quantity TEXT, is_area_header INTEGER,
+    PRIMARY KEY (source, line_number)
+);
+CREATE INDEX IF NOT EXISTS list_items_name ON list_items (kind, name);
+"""
+
+# Authorizer actions a query() connection may perform
+READ_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+# SQLite VM instructions between deadline checks of a query
+PROGRESS_STEPS = 10000
+
+ARCHIVE_HEADER_PATTERN = re.compile(r'^Archived on (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})')
+LEGACY_ARCHIVE_PATTERN = re.compile(r'^\[(\d{4}-\d{2}-\d{2})\] (.+)')
+AREA_TAG_PATTERN = re.compile(r'&(\w+)')
+
+Rows = Dict[str, List[tuple]]
+
+
+def _text(value) -> Optional[str]:
+    """Empty strings are stored as NULL"""
+    return value if value else None
+
+
+def task_rows(tasks: List[Dict[str, Any]]) -> Rows:
+    """Rows of the tasks, task_tags and notes tables for a parsed task tree"""
+    rows = {'tasks': [], 'task_tags': [], 'notes': []}
+
+    def add(items, parent_id):
+        for item in items:
+            if item['type'] == 'area':
+                add(item['tasks'], None)
+            elif item['type'] == 'task':
+                rows['tasks'].append((
+                    item['id'], parent_id, item['area'], item['indent_level'], item['description'], item['status'],
+                    int(item['completed']), _text(item['priority']), _text(item['due_date']),
+                    _text(item['done_date']), _text(item['followup_date']), _text(item['onhold_date']),
+                    _text(item['recurring'])))
+                projects = [item['project']] + item['extra_projects']
+                contexts = [item['context']] + item['extra_contexts']
+                rows['task_tags'].extend((item['id'], 'project', tag) for tag in dict.fromkeys(projects) if tag)
+                rows['task_tags'].extend((item['id'], 'context', tag) for tag in dict.fromkeys(contexts) if tag)
+                rows['notes'].extend((item['id'], position, note['content'].strip())
+                                     for position, note in enumerate(item['notes']))
+                add(item['subtasks'], item['id'])
+
+    add(tasks, None)
+    return rows
+
+
+def recurring_rows(tasks: List[Dict[str, Any]]) -> Rows:
+    """Rows of the recurring table for a parsed recurring tasks file"""
+    rows = []
+
+    def add(items, parent_id):
+        for item in items:
+            if item.get('type') == 'area':
+                add(item.get('tasks', []), None)
+            elif item.get('type') == 'recurring_task':
+                rows.append((item['id'], parent_id, item['line_number'], item['area'], item['description'],
+                             _text(item['recurring']), int(item['completed']), _text(item['priority']),
+                             _text(item['project']), _text(item['context'])))
+                add(item.get('subtasks', []), item['id'])
+
+    add(tasks, None)
+    return {'recurring': rows}
+
+
+def _archive_row(archived_on: str, position: int, indent_level: int, completed: bool, content: str,
+                 area: Optional[str]) -> tuple:
+    metadata = parse_metadata(content)
+    text = METADATA_PATTERN.sub('', content).strip()
+    projects = PROJECT_PATTERN.findall(text)
+    contexts = CONTEXT_PATTERN.findall(text)
+    return (archived_on, position, indent_level, int(completed), area, TAG_PATTERN.sub('', text).strip(),
+            _text(metadata.get('priority')), _text(metadata.get('due')),
+            _text(metadata.get('done', metadata.get('done_date'))),
+            projects[0] if projects else None, contexts[0] if contexts else None)
+
+
+def archive_rows(text: str) -> Rows:
+    """Rows of the archive table for archive.txt
+
+    Tasks are keyed on the "Archived on" batch they belong to and their
+    position in it, so prepending a new batch leaves the older rows as they
+    are. Subtasks inherit the &Area of their top-level task. Lines of the
+    older "[YYYY-MM-DD] task" format count as completed records of that day.
+    """
+    rows = []
+    archived_on = ''
+    positions = {}
+    area = None
+    for line in parse_lines(text):
+        if line.kind == 'task':
+            if line.indent_level <= 1:
+                area_tag = AREA_TAG_PATTERN.search(line.text)
+                area = area_tag.group(1) if area_tag else None
+            position = positions.get(archived_on, 0)
+            positions[archived_on] = position + 1
+            rows.append(_archive_row(archived_on, position, line.indent_level, line.completed, line.content, area))
+            continue
+        header = ARCHIVE_HEADER_PATTERN.match(line.raw)
+        if header:
+            archived_on = header.group(1)
+            area = None
+            continue
+        legacy = LEGACY_ARCHIVE_PATTERN.match(line.raw)
+        if legacy:
+            day, content = legacy.groups()
+            position = positions.get(day, 0)
+            positions[day] = position + 1
+            rows.append(_archive_row(day, position, 0, True, content, None))
+    return {'archive': rows}
+
+
+def list_item_rows(kind: str, name: str, items: List[Dict[str, Any]]) -> Rows:
+    """Rows of the list_items table for the parsed items of a list ('list') or goals ('goal') file"""
+    return {'list_items': [
+        (item['line_number'], kind, name, _text(item['area']), item['text'], int(item['completed']),
+         item['indent_level'], _text(item.get('quantity')), int(item['is_area_header']))
+        for item in items
+    ]}
+
+
+class ShadowIndex:
+    """SQLite mirror of the data files, synced per source"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            if self._conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                tables = [row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+                for table in tables:
+                    self._conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _source(self, path: str) -> Optional[Tuple[str, Optional[str], int]]:
+        """(version, valid_until, byte_offset) stored for a source, or None"""
+        return self._conn.execute('SELECT version, valid_until, byte_offset FROM sources WHERE path = ?',
+                                  (path,)).fetchone()
+
+    def _save_source(self, path: str, kind: str, version: Optional[str], valid_until: Optional[str] = None,
+                     offset: int = 0):
+        self._conn.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)',
+                           (path, kind, version, valid_until, offset, datetime.now().strftime(TIMESTAMP_FORMAT)))
+
+    def _replace_rows(self, table: str, source: str, rows: Sequence[tuple]) -> int:
+        """Make the stored rows of source equal rows, touching only those that differ; returns rows changed"""
+        columns, key = TABLES[table]
+        stored = set(self._conn.execute(f'SELECT {", ".join(columns)} FROM {table} WHERE source = ?', (source,)))
+        new = set(rows)
+        removed = stored - new
+        added = new - stored
+        key_index = [columns.index(column) for column in key]
+        self._conn.executemany(
+            f'DELETE FROM {table} WHERE source = ? AND ' + ' AND '.join(f'{column} = ?' for column in key),
+            [(source, *(row[i] for i in key_index)) for row in removed])
+        self._conn.executemany(
+            f'INSERT OR REPLACE INTO {table} (source, {", ".join(columns)}) VALUES ({", ".join("?" * (len(columns) + 1))})',
+            [(source, *row) for row in added])
+        return len(removed) + len(added)
+
+    def sync_source(self, kind: str, path: str, version: Optional[str], build: Callable[[], Tuple[Rows, Optional[date]]],
+                    today: date = None) -> bool:
+        """Mirror one data file if its version changed, or its rows expired by today
+
+        build() returns the rows for every table of the source and the first
+        day (or None) on which they can change without the file changing,
+        e.g. when an onhold date is reached. Returns whether it was called.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            state = self._source(path)
+            if state and state[0] == version and (
+                    state[1] is None or (today is not None and today.isoformat() < state[1])):
+                return False
+            rows, valid_until = build()
+            with self._conn:
+                for table, table_rows in rows.items():
+                    self._replace_rows(table, path, table_rows)
+                self._save_source(path, kind, version, valid_until.isoformat() if valid_until else None)
+            return True
+
+    def sync_status_log(self, path: str, date_of: Callable[[datetime], date] = None) -> int:
+        """Mirror the lines appended to the status log since the last sync; returns entries added"""
+        path = os.path.abspath(path)
+        date_of = date_of or (lambda timestamp: timestamp.date())
+        with self._lock:
+            state = self._source(path)
+            offset = state[2] if state else 0
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size == offset:
+                return 0
+            with self._conn:
+                if size < offset:
+                    # The log was rewritten; read it again from the start
+                    self._conn.execute('DELETE FROM status_log WHERE source = ?', (path,))
+                    offset = 0
+                    if size == 0:
+                        self._save_source(path, 'status_log', None)
+                        return 0
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    chunk = f.read()
+                complete = chunk.rfind(b'\n') + 1
+                rows = []
+                position = offset
+                for raw in chunk[:complete].splitlines(True):
+                    parsed = parse_entry(raw.decode('utf-8', 'replace'))
+                    if parsed:
+                        timestamp, status, task_id, description = parsed
+                        rows.append((path, position, timestamp.strftime(TIMESTAMP_FORMAT),
+                                     date_of(timestamp).isoformat(), status, task_id, description))
+                    position += len(raw)
+                self._conn.executemany('INSERT OR REPLACE INTO status_log VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+                self._save_source(path, 'status_log', None, offset=offset + complete)
+            return len(rows)
+
+    def remove_source(self, path: str):
+        """Drop a data file that no longer exists from the mirror"""
+        path = os.path.abspath(path)
+        with self._lock, self._conn:
+            for table in TABLES:
+                self._conn.execute(f'DELETE FROM {table} WHERE source = ?', (path,))
+            self._conn.execute('DELETE FROM sources WHERE path = ?', (path,))
+
+    def sources(self, kind: str = None) -> List[str]:
+        """Paths of the mirrored sources, optionally of one kind"""
+        with self._lock:
+            if kind is None:
+                cursor = self._conn.execute('SELECT path FROM sources ORDER BY path')
+            else:
+                cursor = self._conn.execute('SELECT path FROM sources WHERE kind = ? ORDER BY path', (kind,))
+            return [row[0] for row in cursor]
+
+    def query(self, sql: str, params: Sequence = (), limit: int = None, timeout: float = None) -> List[Dict[str, Any]]:
+        """Rows of one read-only SQL statement as dicts (at most `limit`)
+
+        Statements that would write, attach databases or change settings are
+        refused with sqlite3.DatabaseError. A statement still running after
+        `timeout` seconds is interrupted with sqlite3.OperationalError.
+        """
+        conn = sqlite3.connect(f'file:{quote(os.path.abspath(self.path))}?mode=ro', uri=True, check_same_thread=False)
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            conn.execute('PRAGMA query_only = ON')
+            conn.set_authorizer(lambda action, *args: sqlite3.SQLITE_OK if action in READ_ACTIONS else sqlite3.SQLITE_DENY)
+            if deadline is not None:
+                conn.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+            cursor = conn.execute(sql, params)
+            if cursor.description is None:
+                return []
+            names = [column[0] for column in cursor.description]
+            rows = cursor.fetchmany(limit) if limit else cursor.fetchall()
+            return [dict(zip(names, row)) for row in rows]
+        except sqlite3.OperationalError:
+            if deadline is not None and time.monotonic() > deadline:
+                raise sqlite3.OperationalError(f"Query took longer than {timeout:g}s and was interrupted")
+            raise
+        finally:
+            conn.close()
@@ -0,0 +1,110 @@
+"""
+Persistent binary snapshots of parsed data files.
+
+A freshly started process (the backend after a deploy or restart, or any of
+the scripts) pays a full parse of tasks.txt, recurring_tasks.txt and the list
+files before it can answer anything. Parsers store their output in a
+snapshot file beside the data file (tasks.txt -> .tasks.txt.snapshot). The
+snapshot is keyed on a hash of the data file's content, and processes load it
+instead of re-parsing while the hash still matches.
+
+One snapshot file holds named sections, e.g. the typed task lines and the
+parsed task tree of tasks.txt, each with the version of the parser that
+produced it. Sections of an older parser version, or written for different
+content, are ignored and rebuilt.
+
+File layout:
+
+    magic    8 bytes   b'TODOSNAP'
+    format   uint16    SNAPSHOT_FILE_FORMAT (this layout)
+    digest   16 bytes  BLAKE2b of the data file's text
+    payload            pickle of {section: (version, pickled data)}
+
+Each section is pickled on its own, so loading one does not unpickle the
+others.
+
+Snapshots are a cache: a missing, damaged or stale one only costs a parse,
+and the text files stay the source of truth.
+"""
+
+import hashlib
+import os
+import pickle
+import struct
+from typing import Any, Callable, Dict, Optional
+
+# Configuration: Write parsed snapshots beside the data files (False disables them)
+PERSISTENT_SNAPSHOTS = True
+
+SNAPSHOT_FILE_FORMAT = 1
+MAGIC = b'TODOSNAP'
+HEADER = struct.Struct('<8sH16s')
+
+
+def content_digest(text: str) -> bytes:
+    """Hash identifying one version of a data file's text"""
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def snapshot_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f'.{name}.snapshot')
+
+
+def _read_sections(path: str, digest: bytes) -> Dict[str, Any]:
+    """Sections of the snapshot beside path if it was written for content with this digest"""
+    try:
+        with open(snapshot_path(path), 'rb') as f:
+            data = f.read()
+        magic, file_format, stored_digest = HEADER.unpack_from(data)
+        if magic != MAGIC or file_format != SNAPSHOT_FILE_FORMAT or stored_digest != digest:
+            return {}
+        sections = pickle.loads(data[HEADER.size:])
+        return sections if isinstance(sections, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        # A damaged or foreign snapshot is only a cache miss
+        print(f"Ignoring unreadable snapshot for {path}: {e}")
+        return {}
+
+
+def load_section(path: str, digest: bytes, section: str, version: int) -> Optional[Any]:
+    """Data stored under section by parser version `version` for this content, or None"""
+    if not PERSISTENT_SNAPSHOTS:
+        return None
+    stored = _read_sections(path, digest).get(section)
+    if not stored or stored[0] != version:
+        return None
+    return pickle.loads(stored[1])
+
+
+def store_section(path: str, digest: bytes, section: str, version: int, data: Any):
+    """Save data under section, keeping the other sections written for the same content"""
+    if not PERSISTENT_SNAPSHOTS:
+        return
+    target = snapshot_path(path)
+    sections = _read_sections(path, digest)
+    sections[section] = (version, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+    temp_file = f'{target}.{os.getpid()}.tmp'
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, SNAPSHOT_FILE_FORMAT, digest))
+            pickle.dump(sections, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, target)
+    except OSError as e:
+        print(f"Error writing snapshot for {path}: {e}")
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+
+
+def cached_parse(path: str, text: str, section: str, version: int, parse: Callable[[str], Any]) -> Any:
+    """parse(text), loaded from the snapshot beside path when it holds this content"""
+    digest = content_digest(text)
+    data = load_section(path, digest, section, version)
+    if data is None:
+        data = parse(text)
+        store_section(path, digest, section, version, data)
+    return data
@@ -0,0 +1,64 @@
+"""
+The statistics log, archive_files/task_statistics.csv.
+
+The CSV is the tracked, durable record of statistics snapshots; the
+time-series store (timeseries_store.py) is rebuilt from it. Rows are only
+ever appended, since the store imports the file incrementally from the byte
+offset it last read, so they are not necessarily in timestamp order (the
+backfill appends older days). A header line is written when new columns
+appear, and rows after it follow that header until the next one.
+"""
+
+import csv
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def format_statistic(value):
+    """CSV/display formatting used by scripts/statistics.py: floats to 2 decimals"""
+    return f"{value:.2f}" if isinstance(value, float) else value
+
+
+def append_statistics_rows(rows: Iterable[Tuple[datetime, Dict]], csv_file: str):
+    """Append snapshot rows, writing a new header line only when new columns appear
+
+    Columns of the current header keep their order; those missing from a row are left empty.
+    """
+    header = None
+    if os.path.exists(csv_file):
+        with open(csv_file, 'r', newline='') as f:
+            for row in csv.reader(f):
+                if row and row[0] == 'timestamp':
+                    header = row
+    with open(csv_file, 'a' if header else 'w', newline='') as f:
+        writer = csv.writer(f)
+        for timestamp, stats in rows:
+            if not header or not set(stats) <= set(header[1:]):
+                header = ['timestamp'] + list(stats)
+                writer.writerow(header)
+            writer.writerow([timestamp.strftime(TIMESTAMP_FORMAT)] +
+                            [format_statistic(stats[key]) if key in stats else '' for key in header[1:]])
+
+
+def append_statistics_csv(stats: Dict, timestamp: datetime, csv_file: str):
+    """Append one snapshot row"""
+    append_statistics_rows([(timestamp, stats)], csv_file)
+
+
+def latest_csv_snapshot(csv_file: str) -> Optional[datetime]:
+    """Newest timestamp in the statistics CSV; backfilled rows are appended after newer ones"""
+    if not os.path.exists(csv_file):
+        return None
+    latest = None
+    with open(csv_file, 'r', newline='') as f:
+        for line in f:
+            try:
+                timestamp = datetime.strptime(line.split(',', 1)[0], TIMESTAMP_FORMAT)
+            except ValueError:
+                continue
+            if latest is None or timestamp > latest:
+                latest = timestamp
+    return latest
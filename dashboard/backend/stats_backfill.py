@@ -0,0 +1,123 @@
+"""
+Historical statistics backfill from the git history of tasks.txt.
+
+The statistics log only has snapshots for the moments someone saved
+statistics (or, since the scheduler, while the backend was running). Every
+commit of tasks.txt is a snapshot too, so the backfill:
+
+1. lists the commits touching the file with their blob IDs (one `git log`),
+2. keeps the last commit of each adjusted day that has no snapshot yet,
+3. reads those blobs through a single `git cat-file --batch` process,
+4. parses and computes statistics with the columnar engine in a process
+   pool, with "today" being the adjusted day of the commit, and
+5. appends one row per day to task_statistics.csv, which the store then
+   imports. The rows land in the tracked log, so they survive a rebuild of
+   the store and reach other clones.
+
+Re-running it only fills days that are still missing.
+"""
+
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from statistics_csv import append_statistics_rows
+from stats_engine import compute_statistics, parse_columns
+from timeseries_store import TimeSeriesStore, from_seconds
+
+ZERO_BLOB = '0' * 40
+
+
+def tasks_history(repo_dir: str, path: str = 'tasks.txt') -> List[Tuple[datetime, str]]:
+    """(commit time, blob ID) for every commit that changed path, oldest first"""
+    result = subprocess.run(
+        ['git', 'log', '--reverse', '--no-renames', '--raw', '--no-abbrev', '--format=commit %ct', '--', path],
+        cwd=repo_dir, capture_output=True, text=True, check=True)
+    history = []
+    timestamp = None
+    for line in result.stdout.splitlines():
+        if line.startswith('commit '):
+            timestamp = datetime.fromtimestamp(int(line.split()[1]))
+        elif line.startswith(':') and timestamp is not None:
+            # :<old mode> <new mode> <old blob> <new blob> <status>\t<path>
+            blob = line.split('\t')[0].split()[3]
+            if blob != ZERO_BLOB:
+                history.append((timestamp, blob))
+    return history
+
+
+def read_blobs(repo_dir: str, blob_ids: Iterable[str]) -> Dict[str, str]:
+    """Contents of the given blobs, read through one `git cat-file --batch` process"""
+    blob_ids = list(dict.fromkeys(blob_ids))
+    if not blob_ids:
+        return {}
+    process = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=repo_dir,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    output, _ = process.communicate(''.join(f"{blob_id}\n" for blob_id in blob_ids).encode())
+    blobs = {}
+    position = 0
+    for blob_id in blob_ids:
+        header_end = output.index(b'\n', position)
+        header = output[position:header_end].split()
+        if len(header) < 3 or header[1] != b'blob':
+            position = header_end + 1
+            continue
+        size = int(header[2])
+        content = output[header_end + 1:header_end + 1 + size]
+        # Normalize line endings as reading the file in text mode would
+        blobs[blob_id] = content.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+        position = header_end + 1 + size + 1
+    return blobs
+
+
+def select_days(history: List[Tuple[datetime, str]], skip_days: Iterable[date] = (),
+                date_of: Callable[[datetime], date] = None) -> List[Tuple[datetime, str]]:
+    """Last commit of each day (by date_of, calendar days by default), leaving out days in skip_days"""
+    date_of = date_of or (lambda timestamp: timestamp.date())
+    skip_days = set(skip_days)
+    latest = {}
+    for timestamp, blob_id in history:
+        day = date_of(timestamp)
+        if day not in skip_days and (day not in latest or latest[day][0] <= timestamp):
+            latest[day] = (timestamp, blob_id)
+    return [latest[day] for day in sorted(latest)]
+
+
+def snapshot_statistics(job: Tuple[str, int]) -> Dict:
+    """Statistics for one (tasks.txt content, today's ordinal) pair; runs in a worker process"""
+    text, today = job
+    return compute_statistics(parse_columns(text), date.fromordinal(today))
+
+
+def compute_snapshots(jobs: List[Tuple[str, int]], workers: Optional[int] = None) -> List[Dict]:
+    """snapshot_statistics over jobs, spread over a process pool unless one worker is requested"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 2:
+        return [snapshot_statistics(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(snapshot_statistics, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def backfill_statistics(store: TimeSeriesStore, csv_file: str, repo_dir: str, path: str = 'tasks.txt',
+                        date_of: Callable[[datetime], date] = None, workers: Optional[int] = None) -> Dict:
+    """Append one statistics snapshot per missing day from the git history of path to csv_file and the store"""
+    date_of = date_of or (lambda timestamp: timestamp.date())
+    store.sync_csv(csv_file)
+    history = tasks_history(repo_dir, path)
+    stored_days = {date_of(from_seconds(seconds)) for seconds in store.timestamps()}
+    selected = select_days(history, stored_days, date_of)
+    blobs = read_blobs(repo_dir, [blob_id for _, blob_id in selected])
+    selected = [(timestamp, blob_id) for timestamp, blob_id in selected if blob_id in blobs]
+
+    jobs = [(blobs[blob_id], date_of(timestamp).toordinal()) for timestamp, blob_id in selected]
+    snapshots = compute_snapshots(jobs, workers)
+    # Tags absent from a day count 0 there; one set of columns keeps the log to one new header
+    columns = list(dict.fromkeys(key for stats in snapshots for key in stats))
+    rows = [(timestamp, {key: stats.get(key, 0) for key in columns})
+            for (timestamp, _), stats in zip(selected, snapshots)]
+    if rows:
+        append_statistics_rows(rows, csv_file)
+    written = store.sync_csv(csv_file)
+    return {'commits': len(history), 'days': len(selected), 'written': written}
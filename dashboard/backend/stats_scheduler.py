@@ -0,0 +1,80 @@
+"""
+In-process scheduler for periodic statistics snapshots.
+
+Snapshots are taken on a fixed cadence aligned to midnight (e.g. every hour
+on the hour) plus at the adjusted day boundary, so every adjusted day gets a
+snapshot while the backend is running. On start, a snapshot is taken right
+away if the latest stored one belongs to an earlier adjusted day, so a
+restart never leaves the current day empty.
+
+The scheduler only decides *when*; the snapshot itself is a callable that
+receives the timestamp to record.
+"""
+
+import threading
+from datetime import datetime, date, timedelta
+from typing import Callable, Optional
+
+
+class SnapshotScheduler:
+    """Background thread calling take_snapshot(timestamp) on schedule"""
+
+    def __init__(self, take_snapshot: Callable[[datetime], object], interval_minutes: int = 60,
+                 day_start_hour: int = 3, date_of: Callable[[datetime], date] = None,
+                 last_snapshot: Callable[[], Optional[datetime]] = None):
+        if interval_minutes <= 0:
+            raise ValueError("interval_minutes must be positive")
+        self.take_snapshot = take_snapshot
+        self.interval = timedelta(minutes=interval_minutes)
+        self.day_start_hour = day_start_hour
+        self.date_of = date_of or (lambda timestamp: timestamp.date())
+        self.last_snapshot = last_snapshot or (lambda: None)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def next_run(self, after: datetime) -> datetime:
+        """First interval mark or day boundary strictly after `after`"""
+        midnight = datetime.combine(after.date(), datetime.min.time())
+        marks = (after - midnight) // self.interval + 1
+        next_mark = midnight + marks * self.interval
+        boundary = midnight + timedelta(hours=self.day_start_hour)
+        if boundary <= after:
+            boundary += timedelta(days=1)
+        return min(next_mark, boundary)
+
+    def needs_catch_up(self, now: datetime) -> bool:
+        """True if no snapshot has been stored for the current adjusted day"""
+        last = self.last_snapshot()
+        return last is None or self.date_of(last) < self.date_of(now)
+
+    def run_once(self, now: datetime):
+        """Take one snapshot, logging (not raising) failures"""
+        try:
+            self.take_snapshot(now.replace(microsecond=0))
+        except Exception as e:
+            print(f"Error taking scheduled statistics snapshot: {e}")
+
+    def _run(self):
+        now = datetime.now()
+        if self.needs_catch_up(now):
+            self.run_once(now)
+        due = now
+        while not self._stop.is_set():
+            # Never schedule at or before the previous run, even if the wait woke early
+            due = self.next_run(max(datetime.now(), due))
+            if self._stop.wait(max(0.0, (due - datetime.now()).total_seconds())):
+                break
+            self.run_once(due)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="statistics-snapshots", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,205 @@
+"""
+Buffered writer and in-memory store for recurring_status_log.txt.
+
+Each line of the log has the form
+"YYYY-MM-DD HH:MM:SS | STATUS | TASK_ID | TASK_DESCRIPTION". The store parses
+the file once, keeps per-task status history plus per-day compliance counts in
+memory, and appends new entries (single or batched) with one write call while
+updating both in the same step. If the file is changed by something else, the
+store notices via its signature and re-reads it.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, date
+from typing import Callable, Dict, List, Optional, Tuple
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+def _file_signature(path: str):
+    """(mtime_ns, size) of the log file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def format_entry(timestamp: datetime, status: str, task_id: str, task_description: str) -> str:
+    """Format one log line"""
+    return f"{timestamp.strftime(TIMESTAMP_FORMAT)} | {status.upper()} | {task_id} | {task_description}\n"
+
+
+def parse_entry(line: str) -> Optional[Tuple[datetime, str, str, str]]:
+    """Parse one log line into (timestamp, STATUS, task_id, description), or None if malformed"""
+    parts = line.strip().split(' | ')
+    if len(parts) < 4:
+        return None
+    try:
+        timestamp = datetime.strptime(parts[0], TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+    return timestamp, parts[1].upper(), parts[2], parts[3]
+
+
+class StatusLog:
+    """Append-only recurring status log with an in-memory status store
+
+    fsync is one of:
+    - "always": fsync after every write (each batch is durable on return)
+    - "interval": fsync at most once every fsync_interval seconds; a write
+      left unsynced is synced by a timer when the interval is up, so a crash
+      loses at most the last fsync_interval seconds of entries
+    - "never": leave flushing to the operating system
+    """
+
+    def __init__(self, path: str, date_of: Callable[[datetime], date] = None,
+                 fsync: str = 'always', fsync_interval: float = 5.0):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.path = path
+        self.date_of = date_of or (lambda timestamp: timestamp.date())
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._last_fsync = 0.0
+        self._flush_timer = None
+        self._lock = threading.Lock()
+        self._signature = None
+        self._loaded = False
+        self.status_data = {}  # {task_id: [(date, status, timestamp), ...]} sorted by timestamp
+        self.descriptions = {}  # {task_id: latest description}
+        self.daily_stats = defaultdict(lambda: {'completed': 0, 'missed': 0, 'deferred': 0, 'total': 0})
+
+    def _reset(self):
+        self.status_data = {}
+        self.descriptions = {}
+        self.daily_stats = defaultdict(lambda: {'completed': 0, 'missed': 0, 'deferred': 0, 'total': 0})
+
+    def _add(self, timestamp: datetime, status: str, task_id: str, task_description: str):
+        """Fold one entry into the status history and daily counts"""
+        log_date = self.date_of(timestamp)
+        history = self.status_data.setdefault(task_id, [])
+        entry = (log_date, status, timestamp)
+        if history and history[-1][2] > timestamp:
+            # Out-of-order line (e.g. hand-edited log): keep history sorted
+            history.append(entry)
+            history.sort(key=lambda x: x[2])
+        else:
+            history.append(entry)
+        self.descriptions[task_id] = task_description
+
+        stats = self.daily_stats[log_date.strftime('%Y-%m-%d')]
+        stats['total'] += 1
+        key = status.lower()
+        if key in ('completed', 'missed', 'deferred'):
+            stats[key] += 1
+
+    def _refresh(self):
+        """Re-read the file if it was never loaded or changed outside this writer"""
+        signature = _file_signature(self.path)
+        if self._loaded and signature == self._signature:
+            return
+        self._reset()
+        if signature is not None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parsed = parse_entry(line)
+                    if parsed:
+                        self._add(*parsed)
+        self._signature = signature
+        self._loaded = True
+
+    def _sync(self, f):
+        if self.fsync == 'never':
+            return
+        now = time.monotonic()
+        if self.fsync == 'always' or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(f.fileno())
+            self._last_fsync = now
+            self._cancel_flush()
+        elif self._flush_timer is None:
+            # Nothing may be appended after this batch, so sync it when the interval is up
+            self._flush_timer = threading.Timer(self.fsync_interval - (now - self._last_fsync), self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _cancel_flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def flush(self):
+        """fsync writes the "interval" policy has not synced yet"""
+        with self._lock:
+            if self._flush_timer is None:
+                return
+            self._cancel_flush()
+            if os.path.exists(self.path):
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    os.fsync(f.fileno())
+            self._last_fsync = time.monotonic()
+
+    def append_batch(self, entries: List[Tuple[str, str, str]], timestamp: datetime = None) -> int:
+        """Append (task_id, status, description) entries with a single write
+
+        All entries share one timestamp. Returns the number of entries written.
+        """
+        if not entries:
+            return 0
+        timestamp = (timestamp or datetime.now()).replace(microsecond=0)
+        with self._lock:
+            self._refresh()
+            payload = ''.join(format_entry(timestamp, status, task_id, description)
+                              for task_id, status, description in entries)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(payload)
+                f.flush()
+                self._sync(f)
+            for task_id, status, description in entries:
+                self._add(timestamp, status.upper(), task_id, description)
+            self._signature = _file_signature(self.path)
+        return len(entries)
+
+    def append(self, task_id: str, status: str, task_description: str, timestamp: datetime = None) -> int:
+        """Append a single entry"""
+        return self.append_batch([(task_id, status, task_description)], timestamp)
+
+    def version(self):
+        """Signature of the log as last read or written, for keying derived caches"""
+        with self._lock:
+            self._refresh()
+            return self._signature
+
+    def get_status_data(self) -> Dict[str, list]:
+        """Per-task status history, {task_id: [(date, status, timestamp), ...]}"""
+        with self._lock:
+            self._refresh()
+            return {task_id: list(history) for task_id, history in self.status_data.items()}
+
+    def get_descriptions(self) -> Dict[str, str]:
+        """Latest logged description per task ID"""
+        with self._lock:
+            self._refresh()
+            return dict(self.descriptions)
+
+    def get_daily_compliance(self) -> List[Dict]:
+        """Per-day completed/missed/deferred counts with compliance percentage"""
+        with self._lock:
+            self._refresh()
+            rows = []
+            for date_str, stats in sorted(self.daily_stats.items()):
+                total = stats['total']
+                compliance_pct = (stats['completed'] / total * 100) if total > 0 else 0
+                rows.append({
+                    'date': date_str,
+                    'completed': stats['completed'],
+                    'missed': stats['missed'],
+                    'deferred': stats['deferred'],
+                    'total': total,
+                    'compliance_pct': round(compliance_pct, 2)
+                })
+            return rows
@@ -0,0 +1,229 @@
+"""
+Inverted indexes over the parsed task tree for server-side filtering.
+
+TaskIndex numbers the tasks of one parse of tasks.txt in tree order (each
+task before its subtasks, as tasks_from_snapshot nests them). For every
+filterable value (area, project, context, priority, status, has notes) it
+keeps the numbers of the matching tasks as an integer bitset. Due dates are
+kept as a sorted array of date ordinals with aligned arrays of task numbers
+and summaries, so a due range is two bisects and a slice. Dated
+follow-ups and onhold release dates are listed alongside for the calendar
+feed.
+
+A filter is answered set-wise: the bitsets of the requested values are OR-ed
+per field and AND-ed across fields, smallest first. The matches are then
+widened with their ancestors so the hierarchy can be rebuilt around them,
+and the tree is walked once to copy out the kept tasks.
+
+parser.py builds the index once per parse and keeps it with the parse cache.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime
+from itertools import count
+from typing import Any, Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+FILTER_FIELDS = ('area', 'project', 'context', 'priority', 'status')
+STATUSES = ('incomplete', 'done', 'onhold', 'followup')
+NO_PARENT = -1
+DUE_SUMMARY_FIELDS = ('id', 'description', 'area', 'status', 'priority', 'due_date', 'project', 'context')
+
+
+class TaskFilter(NamedTuple):
+    """Conditions a task must all meet; several values of one field match any of them"""
+    area: Tuple[str, ...] = ()
+    project: Tuple[str, ...] = ()
+    context: Tuple[str, ...] = ()
+    priority: Tuple[str, ...] = ()
+    status: Tuple[str, ...] = ()
+    due_before: Optional[date] = None  # due strictly before
+    due_after: Optional[date] = None  # due strictly after
+    has_notes: Optional[bool] = None
+
+    def is_empty(self) -> bool:
+        return all(value in ((), None) for value in self)
+
+
+def normalize(field: str, value: str) -> str:
+    """Index key of a value: tags without their +/@ sigil, case-insensitive"""
+    value = value.strip()
+    if field in ('project', 'context'):
+        value = value.lstrip('+@')
+    return value.upper() if field == 'priority' else value.lower()
+
+
+def bitset(numbers) -> int:
+    """Integer with the bits of numbers set"""
+    numbers = list(numbers)
+    if not numbers:
+        return 0
+    bits = bytearray(max(numbers) // 8 + 1)
+    for number in numbers:
+        bits[number >> 3] |= 1 << (number & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bit_numbers(bits: int) -> List[int]:
+    """Numbers of the set bits, ascending"""
+    numbers = []
+    for offset, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+        if byte:
+            base = offset * 8
+            numbers.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return numbers
+
+
+def walk_tasks(items: List[Dict[str, Any]], parent: int = NO_PARENT,
+               counter: Iterator[int] = None) -> Iterator[Tuple[int, Dict[str, Any], int]]:
+    """(number, task, parent number) for every task of the tree, in tree order"""
+    counter = counter if counter is not None else count()
+    for item in items:
+        if item['type'] == 'area':
+            yield from walk_tasks(item['tasks'], NO_PARENT, counter)
+        elif item['type'] == 'task':
+            number = next(counter)
+            yield number, item, parent
+            yield from walk_tasks(item['subtasks'], number, counter)
+
+
+def keyed_tasks(items: List[Dict[str, Any]], key: Callable[[Dict[str, Any]], Hashable]) -> Dict[tuple, Tuple[int, Dict[str, Any]]]:
+    """{(key(task), occurrence): (number, task)} for every task of the tree
+
+    Keys depend only on content, not on line numbers, so two parses can be
+    diffed as sets of keys; identical tasks are told apart by occurrence.
+    """
+    keyed = {}
+    seen = defaultdict(int)
+    for number, task, _ in walk_tasks(items):
+        value = key(task)
+        keyed[(value, seen[value])] = (number, task)
+        seen[value] += 1
+    return keyed
+
+
+def prune_tasks(items: List[Dict[str, Any]], keep: Set[int], counter: Iterator[int] = None) -> List[Dict[str, Any]]:
+    """Copy of the tree with only the tasks numbered in keep, and only the areas still holding tasks"""
+    counter = counter if counter is not None else count()
+    kept = []
+    for item in items:
+        if item['type'] == 'area':
+            tasks = prune_tasks(item['tasks'], keep, counter)
+            if tasks:
+                kept.append({**item, 'tasks': tasks})
+        elif item['type'] == 'task':
+            number = next(counter)
+            subtasks = prune_tasks(item['subtasks'], keep, counter)
+            if number in keep:
+                kept.append({**item, 'subtasks': subtasks})
+    return kept
+
+
+def iso_day(value: str) -> Optional[date]:
+    """YYYY-MM-DD metadata value as a date, None for empty values and text conditions"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
+
+
+def due_summary(task: Dict[str, Any]) -> Dict[str, Any]:
+    """What the due-date index keeps of a task"""
+    return {field: task[field] for field in DUE_SUMMARY_FIELDS}
+
+
+class TaskIndex:
+    """Bitset postings and a sorted due-date array over one parsed task tree"""
+
+    def __init__(self, tasks: List[Dict[str, Any]]):
+        self.parents = []
+        postings = {field: defaultdict(list) for field in FILTER_FIELDS}
+        with_notes = []
+        due = []
+        self.followups = []  # (date, summary) of follow-ups with a date, in tree order
+        self.releases = []  # (date, summary) of tasks on hold until a date, in tree order
+        for number, task, parent in walk_tasks(tasks):
+            self.parents.append(parent)
+            if task['area']:
+                postings['area'][normalize('area', task['area'])].append(number)
+            for tag in dict.fromkeys([task['project']] + task['extra_projects']):
+                if tag:
+                    postings['project'][normalize('project', tag)].append(number)
+            for tag in dict.fromkeys([task['context']] + task['extra_contexts']):
+                if tag:
+                    postings['context'][normalize('context', tag)].append(number)
+            if task['priority']:
+                postings['priority'][normalize('priority', task['priority'])].append(number)
+            postings['status'][task['status']].append(number)
+            if task['notes']:
+                with_notes.append(number)
+            if task['due_date_obj']:
+                due.append((task['due_date_obj'].toordinal(), number, due_summary(task)))
+            day = iso_day(task['followup_date']) if task['status'] == 'followup' else None
+            if day:
+                self.followups.append((day, due_summary(task)))
+            day = iso_day(task['onhold_date']) if task['status'] == 'onhold' else None
+            if day:
+                self.releases.append((day, due_summary(task)))
+
+        self.all = (1 << len(self.parents)) - 1
+        self.postings = {field: {value: bitset(numbers) for value, numbers in values.items()}
+                         for field, values in postings.items()}
+        self.with_notes = bitset(with_notes)
+        due.sort(key=lambda entry: entry[:2])
+        self.due_ordinals = [ordinal for ordinal, _, _ in due]
+        self.due_numbers = [number for _, number, _ in due]
+        self.due_tasks = [summary for _, _, summary in due]
+
+    def __len__(self):
+        return len(self.parents)
+
+    def lookup(self, field: str, values) -> int:
+        """Tasks matching any of the values of field"""
+        bits = 0
+        for value in values:
+            bits |= self.postings[field].get(normalize(field, value), 0)
+        return bits
+
+    def due_range(self, after: date = None, before: date = None) -> int:
+        """Tasks due strictly after `after` and strictly before `before`"""
+        start = bisect_right(self.due_ordinals, after.toordinal()) if after else 0
+        end = bisect_left(self.due_ordinals, before.toordinal()) if before else len(self.due_ordinals)
+        return bitset(self.due_numbers[start:end]) if start < end else 0
+
+    def due_between(self, start: date, end: date, lo: int = 0, hi: int = None) -> Tuple[int, int]:
+        """[lo, hi) positions in the due arrays of the tasks due from start to end inclusive"""
+        hi = len(self.due_ordinals) if hi is None else hi
+        first = bisect_left(self.due_ordinals, start.toordinal(), lo, hi)
+        return first, bisect_right(self.due_ordinals, end.toordinal(), first, hi)
+
+    def match(self, task_filter: TaskFilter) -> int:
+        """Tasks meeting every condition of task_filter"""
+        clauses = [self.lookup(field, getattr(task_filter, field)) for field in FILTER_FIELDS
+                   if getattr(task_filter, field)]
+        if task_filter.due_before or task_filter.due_after:
+            clauses.append(self.due_range(task_filter.due_after, task_filter.due_before))
+        if task_filter.has_notes is not None:
+            clauses.append(self.with_notes if task_filter.has_notes else self.all & ~self.with_notes)
+
+        # Most selective first, so the running intersection shrinks fastest
+        clauses.sort(key=lambda bits: bin(bits).count('1'))
+        result = self.all
+        for bits in clauses:
+            result &= bits
+            if not result:
+                break
+        return result
+
+    def with_ancestors(self, bits: int) -> Set[int]:
+        """Numbers of the tasks in bits and of all their ancestors"""
+        keep = set()
+        for number in bit_numbers(bits):
+            while number != NO_PARENT and number not in keep:
+                keep.add(number)
+                number = self.parents[number]
+        return keep
+
+    def select(self, tasks: List[Dict[str, Any]], task_filter: TaskFilter) -> List[Dict[str, Any]]:
+        """The tree this index was built from, reduced to the matching tasks and their ancestors"""
+        return prune_tasks(tasks, self.with_ancestors(self.match(task_filter)))
@@ -0,0 +1,328 @@
+"""
+todo.txt-style task queries, planned against the task index.
+
+    +Reports @Office priority:A due<2025-08-01 -status:onhold
+
+Terms separated by spaces must all hold. OR (upper case) separates
+alternatives, parentheses group, and a leading - negates a term or group.
+
+    +tag  @tag  &Area          project, context, area
+    key:value                  area, project, context, priority, status,
+                               due, done, has (notes, due, priority,
+                               project, context)
+    due<D  due<=D  due>D  due>=D  (also done)
+                               D is YYYY-MM-DD, today, tomorrow, yesterday
+                               or +Nd / -Nd days from today
+    word  "some words"         text in the description (case-insensitive)
+
+parse_query() turns the text into an AST of Term/Not/And/Or nodes.
+plan_query() picks the most selective access the TaskIndex offers (a tag,
+area, priority or status bitset, or a slice of the sorted due-date array) as
+the candidate set. It compiles the remaining predicates into Python closures
+that run_query() applies to the candidates only. The plan, candidate counts
+and timings are returned for ?explain=1.
+"""
+
+import operator
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from task_index import (STATUSES, TaskFilter, TaskIndex, bit_numbers, bitset, normalize, prune_tasks,
+                        walk_tasks)
+
+TAG_PREFIXES = {'+': 'project', '@': 'context', '&': 'area'}
+INDEXED_FIELDS = ('area', 'project', 'context', 'priority', 'status')
+DATE_FIELDS = {'due': 'due_date_obj', 'done': 'done_date_obj'}
+HAS_VALUES = {'notes': 'notes', 'due': 'due_date_obj', 'priority': 'priority', 'project': 'project',
+              'context': 'context'}
+COMPARISONS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge, '=': operator.eq}
+
+TOKEN_PATTERN = re.compile(r'-?"[^"]*"|[()]|-(?=\()|[^\s()]+')
+COMPARISON_PATTERN = re.compile(r'^(\w+)(<=|>=|<|>)(.+)$')
+RELATIVE_DATE_PATTERN = re.compile(r'^([+-]\d+)d$')
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+class Term(NamedTuple):
+    field: str  # area, project, context, priority, status, due, done, has or text
+    op: str  # '=' or a comparison for dates
+    value: Any  # normalized value, a date for date fields
+
+
+class Not(NamedTuple):
+    node: Any
+
+
+class And(NamedTuple):
+    nodes: Tuple[Any, ...]
+
+
+class Or(NamedTuple):
+    nodes: Tuple[Any, ...]
+
+
+Node = Union[Term, Not, And, Or]
+
+
+def describe(node: Node) -> str:
+    """Query text of a node"""
+    if isinstance(node, Term):
+        if node.field == 'text':
+            return f'"{node.value}"'
+        value = node.value.isoformat() if isinstance(node.value, date) else node.value
+        return f"{node.field}{':' if node.op == '=' else node.op}{value}"
+    if isinstance(node, Not):
+        return f"-{describe(node.node)}"
+    joiner = ' ' if isinstance(node, And) else ' OR '
+    return '(' + joiner.join(describe(child) for child in node.nodes) + ')'
+
+
+def parse_query_date(value: str, today: date) -> date:
+    """YYYY-MM-DD, today/tomorrow/yesterday or +Nd/-Nd relative to today"""
+    named = {'today': 0, 'tomorrow': 1, 'yesterday': -1}
+    if value.lower() in named:
+        return today + timedelta(days=named[value.lower()])
+    relative = RELATIVE_DATE_PATTERN.match(value)
+    if relative:
+        return today + timedelta(days=int(relative.group(1)))
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise QuerySyntaxError(f"Invalid date: {value}")
+
+
+def parse_term(word: str, today: date) -> Node:
+    if word.startswith('-') and len(word) > 1:
+        return Not(parse_term(word[1:], today))
+    if word.startswith('"'):
+        if len(word) < 2 or not word.endswith('"'):
+            raise QuerySyntaxError(f"Unterminated quote: {word}")
+        return Term('text', '=', word[1:-1].lower())
+    if word[0] in TAG_PREFIXES and len(word) > 1:
+        field = TAG_PREFIXES[word[0]]
+        return Term(field, '=', normalize(field, word[1:]))
+
+    comparison = COMPARISON_PATTERN.match(word)
+    if comparison:
+        field, op, value = comparison.groups()
+        if field not in DATE_FIELDS:
+            raise QuerySyntaxError(f"Only {' and '.join(DATE_FIELDS)} can be compared: {word}")
+        return Term(field, op, parse_query_date(value, today))
+
+    if ':' in word:
+        field, value = word.split(':', 1)
+        if not value:
+            raise QuerySyntaxError(f"Missing value: {word}")
+        if field in DATE_FIELDS:
+            return Term(field, '=', parse_query_date(value, today))
+        if field == 'has':
+            if value not in HAS_VALUES:
+                raise QuerySyntaxError(f"has: expects one of {', '.join(HAS_VALUES)}")
+            return Term('has', '=', value)
+        if field == 'status':
+            if value not in STATUSES:
+                raise QuerySyntaxError(f"status: expects one of {', '.join(STATUSES)}")
+            return Term('status', '=', value)
+        if field in INDEXED_FIELDS:
+            return Term(field, '=', normalize(field, value))
+        raise QuerySyntaxError(f"Unknown field: {field}")
+
+    return Term('text', '=', word.lower())
+
+
+def parse_query(text: str, today: date) -> Node:
+    """Query text -> AST (QuerySyntaxError if malformed)"""
+    tokens = TOKEN_PATTERN.findall(text)
+    position = 0
+
+    def parse_or():
+        nonlocal position
+        alternatives = [parse_and()]
+        while position < len(tokens) and tokens[position] == 'OR':
+            position += 1
+            alternatives.append(parse_and())
+        return alternatives[0] if len(alternatives) == 1 else Or(tuple(alternatives))
+
+    def parse_and():
+        terms = []
+        while position < len(tokens) and tokens[position] not in (')', 'OR'):
+            terms.append(parse_unary())
+        if not terms:
+            raise QuerySyntaxError("Expected a term" + (f" before '{tokens[position]}'" if position < len(tokens) else ""))
+        return terms[0] if len(terms) == 1 else And(tuple(terms))
+
+    def parse_unary():
+        nonlocal position
+        token = tokens[position]
+        position += 1
+        if token == '-':
+            if position >= len(tokens) or tokens[position] != '(':
+                raise QuerySyntaxError("'-' must be followed by a term or '('")
+            return Not(parse_unary())
+        if token == '(':
+            node = parse_or()
+            if position >= len(tokens) or tokens[position] != ')':
+                raise QuerySyntaxError("Missing ')'")
+            position += 1
+            return node
+        return parse_term(token, today)
+
+    if not tokens:
+        raise QuerySyntaxError("Empty query")
+    node = parse_or()
+    if position < len(tokens):
+        raise QuerySyntaxError(f"Unexpected '{tokens[position]}'")
+    return node
+
+
+def conjoin(*nodes: Optional[Node]) -> Optional[Node]:
+    """AND of the nodes, with nested ANDs flattened"""
+    terms = []
+    for node in nodes:
+        if isinstance(node, And):
+            terms.extend(node.nodes)
+        elif node is not None:
+            terms.append(node)
+    if not terms:
+        return None
+    return terms[0] if len(terms) == 1 else And(tuple(terms))
+
+
+def query_from_filter(task_filter: TaskFilter) -> Optional[Node]:
+    """The query equivalent of a TaskFilter (e.g. the /tasks filter parameters)"""
+    terms = []
+    for field in INDEXED_FIELDS:
+        values = [Term(field, '=', value if field == 'status' else normalize(field, value))
+                  for value in getattr(task_filter, field)]
+        if values:
+            terms.append(values[0] if len(values) == 1 else Or(tuple(values)))
+    if task_filter.due_before:
+        terms.append(Term('due', '<', task_filter.due_before))
+    if task_filter.due_after:
+        terms.append(Term('due', '>', task_filter.due_after))
+    if task_filter.has_notes is not None:
+        has_notes = Term('has', '=', 'notes')
+        terms.append(has_notes if task_filter.has_notes else Not(has_notes))
+    return conjoin(*terms)
+
+
+def compile_node(node: Node) -> Callable[[Dict[str, Any]], bool]:
+    """Predicate over task dicts equivalent to node"""
+    if isinstance(node, Not):
+        inner = compile_node(node.node)
+        return lambda task: not inner(task)
+    if isinstance(node, And):
+        predicates = [compile_node(child) for child in node.nodes]
+        return lambda task: all(predicate(task) for predicate in predicates)
+    if isinstance(node, Or):
+        predicates = [compile_node(child) for child in node.nodes]
+        return lambda task: any(predicate(task) for predicate in predicates)
+
+    field, op, value = node
+    if field in ('project', 'context'):
+        extra = 'extra_projects' if field == 'project' else 'extra_contexts'
+        return lambda task: any(normalize(field, tag) == value for tag in [task[field]] + task[extra] if tag)
+    if field in ('area', 'priority'):
+        return lambda task: bool(task[field]) and normalize(field, task[field]) == value
+    if field == 'status':
+        return lambda task: task['status'] == value
+    if field in DATE_FIELDS:
+        key, compare = DATE_FIELDS[field], COMPARISONS[op]
+        return lambda task: task[key] is not None and task[key] != '' and compare(task[key], value)
+    if field == 'has':
+        key = HAS_VALUES[value]
+        return lambda task: bool(task[key])
+    return lambda task: value in task['description'].lower()
+
+
+def count_bits(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+def index_access(node: Node, index: TaskIndex) -> Optional[Tuple[int, str, bool]]:
+    """(candidate bitset, description, exact) the index offers for node, or None if it would need a full scan"""
+    if isinstance(node, Term):
+        if node.field in INDEXED_FIELDS:
+            return index.lookup(node.field, [node.value]), f"{node.field} index [{node.value}]", True
+        if node.field == 'due':
+            day = timedelta(days=1)
+            after, before = {'<': (None, node.value), '<=': (None, node.value + day),
+                             '>': (node.value, None), '>=': (node.value - day, None),
+                             '=': (node.value - day, node.value + day)}[node.op]
+            return index.due_range(after, before), f"due-date array {describe(node)}", True
+        if node.field == 'has' and node.value == 'notes':
+            return index.with_notes, "notes index", True
+        return None
+    if isinstance(node, Or):
+        accesses = [index_access(child, index) for child in node.nodes]
+        if any(access is None for access in accesses):
+            return None
+        bits = 0
+        for access in accesses:
+            bits |= access[0]
+        return bits, ' | '.join(access[1] for access in accesses), all(access[2] for access in accesses)
+    if isinstance(node, And):
+        accesses = [access for access in (index_access(child, index) for child in node.nodes) if access]
+        if not accesses:
+            return None
+        bits, description, _ = min(accesses, key=lambda access: count_bits(access[0]))
+        return bits, description, False
+    return None
+
+
+class Plan(NamedTuple):
+    access: str  # index used for the candidates, or 'full scan'
+    candidates: int  # bitset of the tasks to test
+    residual: List[Node]  # predicates applied to each candidate
+    predicate: Callable[[Dict[str, Any]], bool]
+
+
+def plan_query(node: Node, index: TaskIndex) -> Plan:
+    """Start from the most selective index access and check the rest of the query per candidate"""
+    terms = list(node.nodes) if isinstance(node, And) else [node]
+    best = None
+    for position, term in enumerate(terms):
+        access = index_access(term, index)
+        if access and (best is None or count_bits(access[0]) < count_bits(best[1][0])):
+            best = (position, access)
+
+    if best is None:
+        access, candidates, residual = 'full scan', index.all, terms
+    else:
+        position, (candidates, access, exact) = best
+        residual = [term for i, term in enumerate(terms) if i != position or not exact]
+    residual_and = conjoin(*residual)
+    predicate = compile_node(residual_and) if residual_and is not None else (lambda task: True)
+    return Plan(access, candidates, residual, predicate)
+
+
+def run_query(tasks: List[Dict[str, Any]], index: TaskIndex, node: Node) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """(tree reduced to the matches and their ancestors, explanation of the plan)"""
+    started = time.perf_counter()
+    plan = plan_query(node, index)
+    planned = time.perf_counter()
+
+    candidates = bit_numbers(plan.candidates)
+    by_number = [task for _, task, _ in walk_tasks(tasks)] if candidates else []
+    matches = [number for number in candidates if plan.predicate(by_number[number])]
+    keep = index.with_ancestors(bitset(matches))
+    result = prune_tasks(tasks, keep) if keep else []
+    executed = time.perf_counter()
+
+    explanation = {
+        'query': describe(node),
+        'access': plan.access,
+        'residual': [describe(term) for term in plan.residual],
+        'tasks': len(index),
+        'candidates': len(candidates),
+        'matches': len(matches),
+        'returned': len(keep),
+        'timings_ms': {'plan': round((planned - started) * 1000, 3),
+                       'execute': round((executed - planned) * 1000, 3)},
+    }
+    return result, explanation
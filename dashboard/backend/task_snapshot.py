@@ -0,0 +1,186 @@
+"""
+Shared parsed snapshot of tasks.txt.
+
+The backend (task tree, statistics, archive) and every script in scripts/
+read tasks.txt. Instead of each re-reading it with its own copy of the same
+regexes, they all start from a TaskSnapshot: one typed TaskLine per line of
+the file, classified once as area header, task, note, blank or other, with
+the checkbox, indent, enclosing area, parenthesised metadata, tags and the
+enclosing parent task already resolved. Consumers derive their own
+structures from the lines.
+
+Snapshots are keyed on a hash of the file content:
+
+- in-process, the latest snapshot of each path is reused while the content
+  is unchanged, so the endpoints share one parse per version of the file
+- on disk, the lines are stored in the binary snapshot beside the file
+  (snapshot_file.py), so a freshly started process or a run of several
+  scripts does not parse the same content again
+
+Snapshots are shared, so consumers must treat the lines (including their
+metadata dicts) as read-only.
+"""
+
+import io
+import os
+import re
+from datetime import datetime, date
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from snapshot_file import content_digest, load_section, store_section
+
+# Bumped whenever TaskLine or the parse changes, so stored snapshots of older lines are ignored
+TASK_LINES_VERSION = 1
+
+AREA_PATTERN = re.compile(r'^(\S.+):$')
+TASK_PATTERN = re.compile(r'^(\s*)- \[( |x|%)\] (.+)')
+NOTE_PATTERN = re.compile(r'^(\s+)[^-\[].+')
+METADATA_PATTERN = re.compile(r'\(([^)]*)\)')
+PROJECT_PATTERN = re.compile(r'\+(\w+)')
+CONTEXT_PATTERN = re.compile(r'@(\w+)')
+TAG_PATTERN = re.compile(r'([+@&]\w+)')
+
+NO_PARENT = -1
+
+
+class TaskLine(NamedTuple):
+    number: int  # 1-based line number
+    kind: str  # 'area', 'task', 'note', 'blank' or 'other'
+    raw: str  # the line as read, newline included
+    area: Optional[str]  # enclosing area (its own name for area headers)
+    indent: str  # leading whitespace of tasks and notes
+    status: str  # task checkbox: ' ', 'x' or '%'
+    content: str  # task text after the checkbox, metadata included
+    text: str  # content without the metadata groups
+    description: str  # text without +project, @context and &area tags
+    metadata: Dict[str, str]  # key:value pairs from the parenthesised groups
+    projects: Tuple[str, ...]  # unique projects of text, in order
+    contexts: Tuple[str, ...]  # unique contexts of text, in order
+    parent: int  # index of the nearest earlier task in the area with a smaller indent level, or NO_PARENT
+
+    @property
+    def indent_level(self) -> int:
+        return len(self.indent) // 4
+
+    @property
+    def completed(self) -> bool:
+        return self.status == 'x'
+
+
+class TaskSnapshot(NamedTuple):
+    path: Optional[str]
+    digest: str  # content hash
+    lines: List[TaskLine]
+
+    def tasks(self) -> Iterator[TaskLine]:
+        return (line for line in self.lines if line.kind == 'task')
+
+    def __len__(self):
+        return len(self.lines)
+
+
+def parse_metadata(content: str) -> Dict[str, str]:
+    """key:value pairs from all parenthesised groups; a value runs until the next key"""
+    metadata = {}
+    for meta_str in METADATA_PATTERN.findall(content):
+        parts = meta_str.split()
+        i = 0
+        while i < len(parts):
+            if ':' in parts[i]:
+                key, first_val = parts[i].split(':', 1)
+                value_parts = [first_val] if first_val else []
+
+                # Look ahead to collect continuation of this value
+                j = i + 1
+                while j < len(parts) and ':' not in parts[j]:
+                    value_parts.append(parts[j])
+                    j += 1
+
+                metadata[key] = ' '.join(value_parts)
+                i = j
+            else:
+                i += 1
+    return metadata
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value: str) -> date:
+    """YYYY-MM-DD metadata value -> date (ValueError if invalid); memoized, as files repeat a few dates a lot"""
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def parse_lines(text: str) -> List[TaskLine]:
+    """Classify and parse every line of tasks.txt content"""
+    lines = []
+    area = None
+    task_stack = []  # (indent level, index) of the enclosing tasks
+
+    # Iterating a StringIO splits lines exactly as iterating the file does
+    for number, raw in enumerate(io.StringIO(text), 1):
+        stripped = raw.rstrip()
+        if not stripped:
+            lines.append(TaskLine(number, 'blank', raw, area, '', '', '', '', '', {}, (), (), NO_PARENT))
+            continue
+
+        area_match = AREA_PATTERN.match(stripped)
+        if area_match:
+            area = area_match.group(1)
+            task_stack = []
+            lines.append(TaskLine(number, 'area', raw, area, '', '', '', '', '', {}, (), (), NO_PARENT))
+            continue
+
+        task_match = TASK_PATTERN.match(raw)
+        if task_match:
+            indent, status, content = task_match.groups()
+            text_no_meta = METADATA_PATTERN.sub('', content).strip()
+            indent_level = len(indent) // 4
+            while task_stack and task_stack[-1][0] >= indent_level:
+                task_stack.pop()
+            parent = task_stack[-1][1] if task_stack else NO_PARENT
+            task_stack.append((indent_level, len(lines)))
+            lines.append(TaskLine(
+                number, 'task', raw, area, indent, status, content, text_no_meta,
+                TAG_PATTERN.sub('', text_no_meta).strip(), parse_metadata(content),
+                tuple(dict.fromkeys(PROJECT_PATTERN.findall(text_no_meta))),
+                tuple(dict.fromkeys(CONTEXT_PATTERN.findall(text_no_meta))), parent))
+            continue
+
+        note_match = NOTE_PATTERN.match(raw)
+        kind = 'note' if note_match else 'other'
+        indent = note_match.group(1) if note_match else ''
+        parent = task_stack[-1][1] if task_stack else NO_PARENT
+        lines.append(TaskLine(number, kind, raw, area, indent, '', '', '', '', {}, (), (), parent))
+    return lines
+
+
+# Latest snapshot per path, reused while the content hash matches
+_snapshots: Dict[Optional[str], TaskSnapshot] = {}
+
+
+def snapshot_from_text(text: str, path: Optional[str] = None) -> TaskSnapshot:
+    """Snapshot of tasks.txt content, reusing the previous parse of path when the content is unchanged"""
+    path = os.path.abspath(path) if path else None
+    digest = content_digest(text)
+    snapshot = _snapshots.get(path)
+    if snapshot is not None and snapshot.digest == digest.hex():
+        return snapshot
+
+    stored = load_section(path, digest, 'lines', TASK_LINES_VERSION) if path else None
+    if stored is not None:
+        # Stored as plain tuples so the file does not depend on the module's import name
+        lines = [TaskLine._make(line) for line in stored]
+    else:
+        lines = parse_lines(text)
+        if path:
+            store_section(path, digest, 'lines', TASK_LINES_VERSION, [tuple(line) for line in lines])
+    snapshot = TaskSnapshot(path, digest.hex(), lines)
+    _snapshots[path] = snapshot
+    return snapshot
+
+
+def read_snapshot(path: str) -> TaskSnapshot:
+    """Snapshot of the tasks file at path"""
+    with open(path, 'r') as f:
+        text = f.read()
+    return snapshot_from_text(text, path)
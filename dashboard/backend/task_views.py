@@ -0,0 +1,216 @@
+"""
+Grouped views of the parsed task tree (the /tasks sort modes).
+
+Every view is a GroupBy: a key function naming the group(s) of each task, a
+function giving each group's sort key, title and subtask filter, and a
+function giving each entry's sort key within its group. build_view() walks
+the tree once. Each task is numbered in tree order and dropped into its
+groups with its sort key computed there and then. Top-level tasks
+(indent_level <= 1) become entries, copied with only the subtasks their
+group's filter keeps; subtasks only open their group. Sorting then uses the
+stored keys.
+
+A view can also collect partial hierarchies: top-level tasks that are not
+themselves e.g. done but have done subtasks appear in the Done group, copied
+down to the branches leading to those subtasks. Which subtrees contain such
+subtasks is worked out bottom-up during the same walk.
+
+Entries are new dicts sharing the unchanged values (notes, metadata) of the
+tree they were built from. parse_tasks_raw() hands out a fresh tree per
+call, so nothing is shared with the parse cache.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+PRIORITY_RANKS = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6}
+
+# Which subtasks stay under an entry
+SUBTASK_FILTERS = {
+    'open': lambda task: task['status'] != 'onhold' and not task['completed'],
+    'unfinished': lambda task: not task['completed'],
+    'all': None,
+}
+
+
+class GroupBy(NamedTuple):
+    key: Callable[[Dict[str, Any]], Iterable[Hashable]]  # groups of a task (none to leave it out)
+    group: Callable[[Hashable, date], Tuple[Any, str, str]]  # (sort key, title, SUBTASK_FILTERS name) of a group
+    entry_order: Callable[[Hashable, Dict[str, Any], int, bool, date], Any]  # sort key of an entry: (group, task, number, partial, today)
+    partials: Tuple[Tuple[Callable[[Dict[str, Any]], bool], Hashable], ...] = ()  # (wanted, group) partial hierarchies
+
+
+def priority_rank(task: Dict[str, Any]) -> int:
+    return PRIORITY_RANKS.get(task.get('priority', ''), 99)
+
+
+def upcoming_first(value: str, today: date) -> tuple:
+    """Sort key putting today and later dates first (earliest first), then past dates (latest first), then the rest"""
+    if value:
+        try:
+            day = datetime.strptime(value, '%Y-%m-%d').date()
+            return (0, day.toordinal()) if day >= today else (1, -day.toordinal())
+        except ValueError:
+            pass
+    return (2, 0)
+
+
+def copy_tree(task: Dict[str, Any], keep: Optional[Callable]) -> Dict[str, Any]:
+    """Copy of task with only the subtasks keep() accepts, at every depth"""
+    return {**task, 'subtasks': [copy_tree(subtask, keep) for subtask in task['subtasks']
+                                 if keep is None or keep(subtask)]}
+
+
+def build_view(items: List[Dict[str, Any]], group_by: GroupBy, today: date = None) -> List[Dict[str, Any]]:
+    """[{'type': 'group', 'title', 'tasks'}] of the tree grouped by group_by, in one walk"""
+    today = today or date.today()
+    groups = {}  # {key: [sort key, first seen, title, subtask filter, [(entry sort key, entry)]]}
+    below = {}  # {id(task): bitmask of the partials wanted somewhere among its subtasks}
+    counter = [0]
+
+    def group_for(key):
+        group = groups.get(key)
+        if group is None:
+            order, title, subtasks = group_by.group(key, today)
+            group = groups[key] = [order, len(groups), title, SUBTASK_FILTERS[subtasks], []]
+        return group
+
+    def partial_copy(task, wanted, bit, keep):
+        subtasks = []
+        for subtask in task['subtasks']:
+            if keep is not None and not keep(subtask):
+                continue
+            if wanted(subtask):
+                subtasks.append(copy_tree(subtask, keep))
+            elif below[id(subtask)] >> bit & 1:
+                subtasks.append(partial_copy(subtask, wanted, bit, keep))
+        return {**task, 'subtasks': subtasks}
+
+    def visit(task, top):
+        number = counter[0]
+        counter[0] += 1
+        for key in group_by.key(task):
+            group = group_for(key)
+            if task['indent_level'] <= 1:
+                group[4].append((group_by.entry_order(key, task, number, False, today), copy_tree(task, group[3])))
+
+        mask = 0
+        for subtask in task['subtasks']:
+            mask |= visit(subtask, False)
+        below[id(task)] = mask
+
+        own = 0
+        for bit, (wanted, key) in enumerate(group_by.partials):
+            if wanted(task):
+                own |= 1 << bit
+            elif top and mask >> bit & 1:
+                group = group_for(key)
+                if task['indent_level'] <= 1:
+                    group[4].append((group_by.entry_order(key, task, number, True, today),
+                                     partial_copy(task, wanted, bit, group[3])))
+        return mask | own
+
+    for item in items:
+        if item['type'] == 'area':
+            for task in item['tasks']:
+                visit(task, True)
+        elif item['type'] == 'task':
+            visit(item, True)
+
+    result = []
+    for order, _, title, _, entries in sorted(groups.values(), key=lambda group: (group[0], group[1])):
+        entries.sort(key=lambda entry: entry[0])
+        result.append({'type': 'group', 'title': title, 'tasks': [entry for _, entry in entries]})
+    return result
+
+
+def by_priority_and_description(key, task, number, partial, today):
+    return priority_rank(task), task['description'], partial, number
+
+
+def completed(task: Dict[str, Any]) -> bool:
+    return task['completed']
+
+
+def onhold(task: Dict[str, Any]) -> bool:
+    return task['status'] == 'onhold'
+
+
+def due_view(bucket: Callable[[date], date], title: Callable[[date], str]) -> GroupBy:
+    """Open tasks by due date bucket, then No Due Date, On Hold, Follow-up Required and Done"""
+    sections = {'none': (1, 'No Due Date', 'open'), 'onhold': (2, 'On Hold', 'unfinished'),
+                'followup': (3, 'Follow-up Required', 'open'), 'done': (4, 'Done', 'all')}
+
+    def key(task):
+        status = task['status']
+        if status == 'incomplete':
+            return [bucket(task['due_date_obj'])] if task.get('due_date_obj') else ['none']
+        return [status] if status in sections else []
+
+    def group(key, today):
+        return ((0, key), title(key), 'open') if isinstance(key, date) else ((sections[key][0],),) + sections[key][1:]
+
+    def entry_order(key, task, number, partial, today):
+        if key == 'onhold':
+            return upcoming_first(task.get('onhold_date', ''), today), partial, number
+        if key == 'followup':
+            return upcoming_first(task.get('followup_date', ''), today), number
+        if key == 'done':
+            # Done tasks by done date among equal priority and description, partial hierarchies last
+            done = task.get('done_date_obj') if not partial else None
+            return priority_rank(task), task['description'], partial, done or date.max, number
+        return priority_rank(task), task['description'], number
+
+    return GroupBy(key, group, entry_order, ((completed, 'done'), (onhold, 'onhold')))
+
+
+def open_tasks_view(field: str, titles: Callable[[str], str], none_title: str,
+                    order: Callable[[str], Any] = None) -> GroupBy:
+    """Open tasks by the values of field (lists of values put a task in several groups),
+    then tasks without one, Follow-up Required (any task with a follow-up date) and Done"""
+    sections = {'none': (1, none_title, 'open'), 'followup': (2, 'Follow-up Required', 'open'),
+                'done': (3, 'Done', 'all')}
+    extra = {'project': 'extra_projects', 'context': 'extra_contexts'}.get(field)
+
+    def key(task):
+        if task.get('followup_date'):
+            return ['followup']
+        if task['completed']:
+            return ['done']
+        values = [task[field]] + task[extra] if extra else [task.get(field, '')]
+        values = [('value', value) for value in dict.fromkeys(values) if value]
+        return values or ['none']
+
+    def group(key, today):
+        if key in sections:
+            return ((sections[key][0],),) + sections[key][1:]
+        return (0, order(key[1]) if order else key[1]), titles(key[1]), 'open'
+
+    def entry_order(key, task, number, partial, today):
+        if key == 'followup':
+            return upcoming_first(task.get('followup_date', ''), today), number
+        return by_priority_and_description(key, task, number, partial, today)
+
+    return GroupBy(key, group, entry_order, ((completed, 'done'),))
+
+
+def area_view() -> GroupBy:
+    """Tasks of every status by area, in file order of the areas"""
+    return GroupBy(key=lambda task: [task['area']] if task['area'] else [],
+                   group=lambda key, today: (0, key, 'open'),
+                   entry_order=by_priority_and_description)
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+VIEWS = {
+    'due': due_view(lambda day: day, lambda day: day.strftime('%Y-%m-%d')),
+    'due_week': due_view(week_start, lambda day: f"Week of {day.strftime('%Y-%m-%d')}"),
+    'priority': open_tasks_view('priority', lambda priority: f'Priority {priority}', 'No Priority',
+                                lambda priority: PRIORITY_RANKS.get(priority, 99)),
+    'context': open_tasks_view('context', lambda context: f'@{context}', 'No Context', str.lower),
+    'project': open_tasks_view('project', lambda project: f'+{project}', 'No Project', str.lower),
+    'none': area_view(),
+}
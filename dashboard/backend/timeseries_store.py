@@ -0,0 +1,419 @@
+"""
+Columnar store for task statistics snapshots.
+
+Each snapshot is one row: an int64 timestamp (seconds since 1970-01-01, naive
+local time) plus one float64 value per fixed metric (total, overdue, ...).
+Every column lives in its own append-only binary file under the store
+directory and is read back through np.memmap; schema.json records the column
+names, their files and the row count. A fixed metric that appears for the
+first time gets a new file backfilled with NaN, so older rows read as missing.
+
+Per-project and per-context counts (the project_+X / context_@Y metrics) are
+sparse and open-ended, so they are not stored as columns. Instead each non-empty
+count is one row of a long table (timestamp, dimension, tag_id, count), with
+tag_id pointing into a tag dictionary kept in schema.json. A query for one tag
+reads only that tag's rows through a per-tag row index.
+
+Rows are kept sorted by timestamp so range filters are binary searches and the
+latest-per-day reduction is a single vectorized pass.
+
+The legacy archive_files/task_statistics.csv (with its repeated header lines)
+is imported incrementally: the store remembers how many bytes of the CSV it
+has consumed and only parses what was appended since.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SCHEMA_VERSION = 2
+SCHEMA_FILE = 'schema.json'
+TIMESTAMP_FILE = 'timestamp.i8'
+TAG_FILES = {'timestamp': ('tag_timestamp.i8', '<i8'), 'dimension': ('tag_dimension.u1', 'u1'),
+             'tag_id': ('tag_id.i4', '<i4'), 'count': ('tag_count.f8', '<f8')}
+TAG_DIMENSIONS = ['project', 'context']
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+
+def to_seconds(dt: datetime) -> int:
+    """Naive datetime -> integer seconds since EPOCH"""
+    return int((dt - EPOCH).total_seconds())
+
+
+def from_seconds(seconds: int) -> datetime:
+    """Integer seconds since EPOCH -> naive datetime"""
+    return EPOCH + timedelta(seconds=int(seconds))
+
+
+def day_strings(seconds: np.ndarray) -> List[str]:
+    """Vectorized YYYY-MM-DD strings for an array of timestamps"""
+    return np.datetime_as_string(np.asarray(seconds, dtype='datetime64[s]'), unit='D').tolist()
+
+
+def split_tag_metric(name: str) -> Optional[Tuple[str, str]]:
+    """'project_+Work' -> ('project', '+Work'); None for fixed metrics"""
+    dimension, _, tag = name.partition('_')
+    if dimension in TAG_DIMENSIONS and tag:
+        return dimension, tag
+    return None
+
+
+def parse_value(text: str) -> Tuple[float, bool]:
+    """CSV cell -> (value, is_float); empty or non-numeric cells are NaN"""
+    text = text.strip()
+    if not text:
+        return np.nan, False
+    try:
+        return float(text), '.' in text
+    except ValueError:
+        return np.nan, False
+
+
+class TimeSeriesStore:
+    """Append-friendly columnar time series backed by memory-mapped files"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._maps = {}
+        self._tag_index = None
+        os.makedirs(directory, exist_ok=True)
+        self.schema = self._load_schema()
+
+    # -- schema and files -------------------------------------------------
+
+    def _load_schema(self) -> Dict:
+        path = os.path.join(self.directory, SCHEMA_FILE)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                schema = json.load(f)
+            if schema.get('version') == SCHEMA_VERSION:
+                return schema
+            print(f"Unsupported time-series store version in {path}, rebuilding")
+            for filename in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, filename))
+        return {'version': SCHEMA_VERSION, 'rows': 0, 'columns': [], 'tag_rows': 0, 'tags': [],
+                'csv': {'offset': 0, 'header': None}}
+
+    def _save_schema(self):
+        path = os.path.join(self.directory, SCHEMA_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.schema, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def _column_entry(self, name: str) -> Optional[Dict]:
+        for column in self.schema['columns']:
+            if column['name'] == name:
+                return column
+        return None
+
+    def _add_column(self, name: str, kind: str) -> Dict:
+        """Register a new metric and backfill its file with NaN for existing rows"""
+        column = {'name': name, 'file': f"c{len(self.schema['columns']):04d}.f8", 'kind': kind}
+        np.full(self.schema['rows'], np.nan, dtype='<f8').tofile(self._path(column['file']))
+        self.schema['columns'].append(column)
+        return column
+
+    def _tag_id(self, dimension: str, tag: str) -> Optional[int]:
+        for tag_id, entry in enumerate(self.schema['tags']):
+            if entry == [dimension, tag]:
+                return tag_id
+        return None
+
+    def _map(self, filename: str, dtype: str, rows: int = None) -> np.ndarray:
+        rows = self.schema['rows'] if rows is None else rows
+        key = (filename, rows)
+        if key not in self._maps:
+            if rows == 0:
+                return np.empty(0, dtype=dtype)
+            self._maps[key] = np.memmap(self._path(filename), dtype=dtype, mode='r', shape=(rows,))
+        return self._maps[key]
+
+    def _drop_maps(self):
+        self._maps = {}
+        self._tag_index = None
+
+    def _tag_column(self, field: str) -> np.ndarray:
+        filename, dtype = TAG_FILES[field]
+        return self._map(filename, dtype, self.schema['tag_rows'])
+
+    # -- reads -------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.schema['rows']
+
+    def columns(self) -> List[str]:
+        """Fixed metric names in first-seen order"""
+        return [column['name'] for column in self.schema['columns']]
+
+    def tags(self, dimension: str = None) -> List[str]:
+        """Tag metric names ('project_+Work', ...) in tag_id order"""
+        return [f"{entry[0]}_{entry[1]}" for entry in self.schema['tags']
+                if dimension is None or entry[0] == dimension]
+
+    def kind(self, name: str) -> str:
+        """'i' for metrics that have only ever held integers, 'f' otherwise"""
+        column = self._column_entry(name)
+        return column['kind'] if column else 'i'
+
+    def timestamps(self) -> np.ndarray:
+        """Sorted int64 seconds since EPOCH"""
+        with self._lock:
+            return self._map(TIMESTAMP_FILE, '<i8')
+
+    def column(self, name: str) -> np.ndarray:
+        """float64 values for one metric (NaN where the metric was not recorded)
+
+        Tag metrics are expanded from their long-format rows onto the snapshot axis.
+        """
+        with self._lock:
+            if split_tag_metric(name):
+                return self._dense_tag_values(name, np.arange(self.schema['rows']))
+            column = self._column_entry(name)
+            if column is None:
+                return np.full(self.schema['rows'], np.nan)
+            return self._map(column['file'], '<f8')
+
+    def _tag_rows(self, tag_id: int) -> np.ndarray:
+        """Long-table row numbers belonging to one tag, in timestamp order"""
+        if self._tag_index is None:
+            tag_ids = self._tag_column('tag_id')
+            order = np.argsort(tag_ids, kind='stable')
+            bounds = np.searchsorted(tag_ids[order], np.arange(len(self.schema['tags']) + 1))
+            self._tag_index = (order, bounds)
+        order, bounds = self._tag_index
+        if tag_id + 1 >= len(bounds):
+            return np.empty(0, dtype=np.int64)
+        return order[bounds[tag_id]:bounds[tag_id + 1]]
+
+    def tag_series(self, name: str, start: datetime = None, end: datetime = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, counts) for one tag metric, reading only that tag's rows"""
+        with self._lock:
+            parts = split_tag_metric(name)
+            tag_id = self._tag_id(*parts) if parts else None
+            if tag_id is None:
+                return np.empty(0, dtype=np.int64), np.empty(0)
+            rows = self._tag_rows(tag_id)
+            timestamps = self._tag_column('timestamp')[rows]
+            lo = int(np.searchsorted(timestamps, to_seconds(start), side='left')) if start else 0
+            hi = int(np.searchsorted(timestamps, to_seconds(end), side='right')) if end else len(timestamps)
+            rows = rows[lo:max(lo, hi)]
+            return timestamps[lo:max(lo, hi)], np.asarray(self._tag_column('count')[rows], dtype=np.float64)
+
+    def _dense_tag_values(self, name: str, snapshot_rows: np.ndarray) -> np.ndarray:
+        """Tag counts at the given snapshot rows, NaN where the tag had no count"""
+        values = np.full(len(snapshot_rows), np.nan)
+        tag_timestamps, counts = self.tag_series(name)
+        if len(tag_timestamps) == 0 or len(snapshot_rows) == 0:
+            return values
+        wanted = self.timestamps()[snapshot_rows]
+        positions = np.minimum(np.searchsorted(tag_timestamps, wanted), len(tag_timestamps) - 1)
+        found = tag_timestamps[positions] == wanted
+        values[found] = counts[positions[found]]
+        return values
+
+    def range_indices(self, start: datetime = None, end: datetime = None) -> Tuple[int, int]:
+        """[lo, hi) row slice whose timestamps fall within start..end (inclusive)"""
+        timestamps = self.timestamps()
+        lo = int(np.searchsorted(timestamps, to_seconds(start), side='left')) if start else 0
+        hi = int(np.searchsorted(timestamps, to_seconds(end), side='right')) if end else len(timestamps)
+        return lo, max(lo, hi)
+
+    def latest_per_day(self, lo: int = 0, hi: int = None) -> np.ndarray:
+        """Row indices of the last snapshot of each calendar day within [lo, hi)"""
+        timestamps = self.timestamps()
+        hi = len(timestamps) if hi is None else hi
+        days = timestamps[lo:hi] // SECONDS_PER_DAY
+        if len(days) == 0:
+            return np.empty(0, dtype=np.int64)
+        is_last = np.empty(len(days), dtype=bool)
+        is_last[:-1] = days[1:] != days[:-1]
+        is_last[-1] = True
+        return np.flatnonzero(is_last) + lo
+
+    def daily_series(self, names: Iterable[str], start: datetime = None, end: datetime = None) -> Dict[str, object]:
+        """Latest value per day for the requested metrics
+
+        Returns {'dates': [YYYY-MM-DD, ...], name: float64 array, ...}.
+        """
+        with self._lock:
+            lo, hi = self.range_indices(start, end)
+            rows = self.latest_per_day(lo, hi)
+            series = {'dates': day_strings(self.timestamps()[rows])}
+            for name in names:
+                if split_tag_metric(name):
+                    series[name] = self._dense_tag_values(name, rows)
+                else:
+                    series[name] = np.asarray(self.column(name)[rows], dtype=np.float64)
+            return series
+
+    # -- writes ------------------------------------------------------------
+
+    def _truncate_to_rows(self):
+        """Drop any bytes past the recorded row count (e.g. from an interrupted append)"""
+        rows, tag_rows = self.schema['rows'], self.schema['tag_rows']
+        files = [(TIMESTAMP_FILE, rows * 8)] + [(column['file'], rows * 8) for column in self.schema['columns']]
+        files += [(filename, tag_rows * np.dtype(dtype).itemsize) for filename, dtype in TAG_FILES.values()]
+        for filename, size in files:
+            path = self._path(filename)
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+            if os.path.getsize(path) != size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def append_rows(self, rows: List[Tuple[datetime, Dict[str, float]]], float_columns: Iterable[str] = ()) -> int:
+        """Append snapshots given as (timestamp, {metric: value}) pairs
+
+        Rows whose timestamp is already stored are skipped. Returns the number
+        of rows written.
+        """
+        float_columns = set(float_columns)
+        with self._lock:
+            self._drop_maps()
+            self._truncate_to_rows()
+            existing = np.array(self.timestamps())  # copy before the files grow
+
+            seconds = np.array([to_seconds(ts) for ts, _ in rows], dtype='<i8')
+            keep = ~np.isin(seconds, existing)
+            _, first = np.unique(seconds, return_index=True)
+            unique = np.zeros(len(seconds), dtype=bool)
+            unique[first] = True
+            keep &= unique
+            if not keep.any():
+                return 0
+            rows = [(timestamp, dict(values)) for (timestamp, values), kept in zip(rows, keep) if kept]
+            seconds = seconds[keep]
+
+            # Tag metrics become long-format rows; everything else is a dense column
+            tag_rows = []
+            for (_, values), second in zip(rows, seconds):
+                for name in [name for name in values if split_tag_metric(name)]:
+                    value = values.pop(name)
+                    if np.isnan(value):
+                        continue
+                    dimension, tag = split_tag_metric(name)
+                    tag_id = self._tag_id(dimension, tag)
+                    if tag_id is None:
+                        self.schema['tags'].append([dimension, tag])
+                        tag_id = len(self.schema['tags']) - 1
+                    tag_rows.append((second, TAG_DIMENSIONS.index(dimension), tag_id, value))
+
+            for _, values in rows:
+                for name, value in values.items():
+                    column = self._column_entry(name)
+                    if column is None:
+                        column = self._add_column(name, 'f' if name in float_columns else 'i')
+                    elif name in float_columns:
+                        column['kind'] = 'f'
+
+            with open(self._path(TIMESTAMP_FILE), 'ab') as f:
+                seconds.tofile(f)
+            for column in self.schema['columns']:
+                name = column['name']
+                values = np.array([row_values.get(name, np.nan) for _, row_values in rows], dtype='<f8')
+                with open(self._path(column['file']), 'ab') as f:
+                    values.tofile(f)
+            if tag_rows:
+                for field, values in zip(TAG_FILES, zip(*tag_rows)):
+                    filename, dtype = TAG_FILES[field]
+                    with open(self._path(filename), 'ab') as f:
+                        np.array(values, dtype=dtype).tofile(f)
+
+            out_of_order = len(existing) > 0 and seconds.min() < existing[-1]
+            self.schema['rows'] += len(rows)
+            self.schema['tag_rows'] += len(tag_rows)
+            if out_of_order or np.any(np.diff(seconds) < 0):
+                self._resort()
+            self._save_schema()
+            self._drop_maps()
+            return len(rows)
+
+    def append(self, timestamp: datetime, values: Dict[str, float]) -> int:
+        """Append one snapshot"""
+        float_columns = [name for name, value in values.items() if isinstance(value, float)]
+        return self.append_rows([(timestamp, values)], float_columns)
+
+    def _resort(self):
+        """Rewrite every column in timestamp order after an out-of-order append"""
+        self._drop_maps()
+        rows = self.schema['rows']
+        timestamps = np.fromfile(self._path(TIMESTAMP_FILE), dtype='<i8', count=rows)
+        order = np.argsort(timestamps, kind='stable')
+        timestamps[order].tofile(self._path(TIMESTAMP_FILE))
+        for column in self.schema['columns']:
+            path = self._path(column['file'])
+            np.fromfile(path, dtype='<f8', count=rows)[order].tofile(path)
+
+        tag_rows = self.schema['tag_rows']
+        filename, dtype = TAG_FILES['timestamp']
+        order = np.argsort(np.fromfile(self._path(filename), dtype=dtype, count=tag_rows), kind='stable')
+        for filename, dtype in TAG_FILES.values():
+            path = self._path(filename)
+            np.fromfile(path, dtype=dtype, count=tag_rows)[order].tofile(path)
+
+    # -- CSV import --------------------------------------------------------
+
+    def sync_csv(self, csv_file: str) -> int:
+        """Import rows appended to the statistics CSV since the last sync"""
+        with self._lock:
+            if not os.path.exists(csv_file):
+                return 0
+            state = self.schema['csv']
+            size = os.path.getsize(csv_file)
+            if size == state['offset']:
+                return 0
+            if size < state['offset']:
+                # The CSV was rewritten; re-read it (already stored timestamps are skipped)
+                state['offset'], state['header'] = 0, None
+
+            with open(csv_file, 'rb') as f:
+                f.seek(state['offset'])
+                chunk = f.read()
+            complete = chunk.rfind(b'\n') + 1
+            if complete == 0:
+                return 0
+
+            header = state['header']
+            rows = []
+            float_columns = set()
+            for raw in chunk[:complete].decode('utf-8').splitlines():
+                line = raw.strip()
+                if not line:
+                    continue
+                if line.startswith('timestamp,'):
+                    header = line.split(',')
+                    continue
+                if not header:
+                    continue
+                values = line.split(',')
+                if len(values) != len(header):
+                    continue
+                try:
+                    timestamp = datetime.strptime(values[0], TIMESTAMP_FORMAT)
+                except ValueError:
+                    continue
+                row = {}
+                for name, text in zip(header[1:], values[1:]):
+                    value, is_float = parse_value(text)
+                    if not np.isnan(value):
+                        row[name] = value
+                        if is_float:
+                            float_columns.add(name)
+                rows.append((timestamp, row))
+
+            written = self.append_rows(rows, float_columns) if rows else 0
+            state['offset'] += complete
+            state['header'] = header
+            self._save_schema()
+            return written
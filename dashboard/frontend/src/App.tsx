@@ -32,17 +32,29 @@ function App() {
   const { filters, sortBy, taskTypeFilter, recurringFilter, panelStates, formStates, listsState, goalsState } = dashboardState;
   const { isCommitExpanded, isStatisticsExpanded, isTimeSeriesExpanded, isListsExpanded, isGoalsExpanded } = panelStates;
 
+  // Filter choices seen in unfiltered responses; a filtered /tasks response only holds the matching tasks
+  const [filterChoices, setFilterChoices] = useState<{ areas: string[]; contexts: string[]; projects: string[] }>({ areas: [], contexts: [], projects: [] });
+  const hasFilters = Boolean(filters.area || filters.context || filters.project);
+
+  // /tasks URL for the current sort, with the area/context/project filters applied by the server
+  const getTasksUrl = () => {
+    const params = new URLSearchParams();
+    if (sortBy === 'none' || sortBy === 'priority') params.set('sort', sortBy);
+    if (filters.area) params.set('area', filters.area);
+    if (filters.context) params.set('context', filters.context);
+    if (filters.project) params.set('project', filters.project);
+    const query = params.toString();
+    return query ? `/tasks?${query}` : '/tasks';
+  };
+
   useEffect(() => {
     // Only fetch tasks once the dashboard state is loaded
     if (!isLoaded) return;
 
     const fetchTasks = async () => {
       try {
-        const tasksUrl = sortBy === 'none' ? '/tasks?sort=none' : 
-                        sortBy === 'priority' ? '/tasks?sort=priority' : '/tasks';
-        
         const [tasksRes, recurringRes] = await Promise.all([
-          fetch(`${API_URL}${tasksUrl}`),
+          fetch(`${API_URL}${getTasksUrl()}`),
           fetch(`${API_URL}/recurring?filter=${recurringFilter}`)
         ]);
         
@@ -66,7 +78,7 @@ function App() {
     };
     
     fetchTasks();
-  }, [sortBy, recurringFilter, isLoaded]);
+  }, [sortBy, recurringFilter, isLoaded, filters.area, filters.context, filters.project]);
 
   // Fetch available files for editing
   useEffect(() => {
@@ -133,11 +145,8 @@ function App() {
 
   const refreshTasks = async () => {
     try {
-      const tasksUrl = sortBy === 'none' ? '/tasks?sort=none' : 
-                      sortBy === 'priority' ? '/tasks?sort=priority' : '/tasks';
-      
       const [tasksRes, recurringRes] = await Promise.all([
-        fetch(`${API_URL}${tasksUrl}`),
+        fetch(`${API_URL}${getTasksUrl()}`),
         fetch(`${API_URL}/recurring?filter=${recurringFilter}`)
       ]);
       
@@ -388,9 +397,22 @@ function App() {
 
   const allTasks = getAllTasks();
   const unique = (arr: (string | undefined)[]) => Array.from(new Set(arr.filter((item): item is string => Boolean(item))));
-  const areas = unique(allTasks.map(t => t.area));
-  const contexts = unique(allTasks.map(t => t.context));
-  const projects = unique(allTasks.map(t => t.project));
+  const areas = unique([...filterChoices.areas, ...allTasks.map(t => t.area)]);
+  const contexts = unique([...filterChoices.contexts, ...allTasks.map(t => t.context)]);
+  const projects = unique([...filterChoices.projects, ...allTasks.map(t => t.project)]);
+
+  // Refresh the filter choices whenever an unfiltered response arrives
+  useEffect(() => {
+    if (hasFilters) return;
+    setFilterChoices({
+      areas: unique(allTasks.map(t => t.area)),
+      contexts: unique(allTasks.map(t => t.context)),
+      projects: unique(allTasks.map(t => t.project))
+    });
+  }, [tasks, recurring]);
+
+  // /tasks already applied the filters, so the regular task list shows everything it gets
+  const noFilters = { area: '', context: '', project: '' };
 
   // Show loading spinner while state is being loaded
   if (!isLoaded) {
@@ -991,7 +1013,7 @@ function App() {
             onEdit={handleEditTask}
             onDelete={handleDeleteTask}
             onAddSubtask={handleAddSubtask}
-            filters={filters}
+            filters={noFilters}
             areas={areas}
             onTaskEdited={handleTaskEdited}
             editingTaskId={formStates.editingTaskId}
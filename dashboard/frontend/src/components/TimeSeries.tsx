@@ -15,6 +15,9 @@ import {
 import { Line, Bar } from 'react-chartjs-2';
 import 'chartjs-adapter-date-fns';
 
+// Upper bound on points requested for the daily statistics chart
+const MAX_CHART_POINTS = 500;
+
 // Add CSS animations for fantasy effects
 const animationStyles = document.createElement('style');
 animationStyles.textContent = `
@@ -305,7 +308,8 @@ const TimeSeries: React.FC<Props> = ({ refreshTrigger, isExpanded: externalIsExp
 
   const fetchBasicTimeSeriesData = async () => {
     try {
-      const response = await fetch(`${API_URL}/statistics/time-series`);
+      // Let the backend thin long histories; a chart can't show more points than this anyway
+      const response = await fetch(`${API_URL}/statistics/time-series?max_points=${MAX_CHART_POINTS}`);
       if (!response.ok) {
         throw new Error(`Failed to fetch time series data: ${response.status}`);
       }
@@ -325,68 +329,49 @@ const TimeSeries: React.FC<Props> = ({ refreshTrigger, isExpanded: externalIsExp
       // First fetch the basic time series data
       await fetchBasicTimeSeriesData();
       
-      // Try to fetch enhanced analytics, but don't fail if they don't exist
+      // Fetch compliance, per-task summaries and the task list in one batched request
       try {
-        // Build URLs with timeframe filter
-        const timeframeParam = timeframe ? `?days=${timeframe}` : '';
-        const enhancedParam = timeframe ? `?days=${timeframe}&moving_average=${movingAverageWindow}&include_trend=${showTrend}` : `?moving_average=${movingAverageWindow}&include_trend=${showTrend}`;
-        
-        const urls = [
-          `${API_URL}/api/statistics/time-series/enhanced${enhancedParam}`,
-          `${API_URL}/api/recurring/compliance`,
-          `${API_URL}/api/recurring/compliance/individual${timeframeParam}`,
-          `${API_URL}/api/recurring/task-list`,
-          `${API_URL}/api/analytics/heatmap${timeframeParam}`,
-          `${API_URL}/api/analytics/day-of-week${timeframeParam}`,
-          `${API_URL}/api/analytics/correlation${timeframeParam}`,
-          `${API_URL}/api/analytics/streaks`,
-          `${API_URL}/api/gamification/badges`,
-          `${API_URL}/api/analytics/behavioral${timeframeParam}`,
-          `${API_URL}/api/gamification/challenges`
+        const days = timeframe ?? undefined;
+        const queries = [
+          { id: 'compliance', type: 'compliance', days, max_points: MAX_CHART_POINTS },
+          { id: 'individual', type: 'individual', days },
+          { id: 'recurring_tasks', type: 'recurring_tasks' },
+          ...(selectedTaskId ? [{
+            id: 'selected_task', type: 'enhanced', task_id: selectedTaskId, days,
+            moving_average: movingAverageWindow, include_trend: showTrend
+          }] : [])
         ];
         
-        const responses = await Promise.all(urls.map(url => fetch(url)));
-        
-        const allResponses = await Promise.all(responses.map(response => response.json()));
+        const response = await fetch(`${API_URL}/analytics/query`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ queries })
+        });
+        if (!response.ok) {
+          throw new Error(`Failed to fetch analytics: ${response.status}`);
+        }
         
-        // Set all data if available, otherwise use empty arrays
-        setComplianceData(allResponses[1]?.data || []);
-        setAvailableTasks(allResponses[2]?.data || []);
-        setRecurringTasks(allResponses[3]?.data || []);
-        setHeatmapData(allResponses[4]?.data || []);
-        setDayOfWeekData(allResponses[5]?.data || []);
-        setCorrelationData(allResponses[6]?.data || []);
-        setStreakData(allResponses[7]?.data || []);
-        setBadgeData(allResponses[8]?.data || []);
-        setBehavioralData(allResponses[9]?.data || null);
-        setChallengeData(allResponses[10]?.data || []);
+        const { results } = await response.json();
+        const data: Record<string, any> = {};
+        results.forEach((result: { id: string; data?: any }) => {
+          data[result.id] = result.data;
+        });
         
-        // If no advanced analytics data was returned, generate fallback data
-        if (!allResponses[4]?.data?.length || !allResponses[5]?.data?.length || !allResponses[6]?.data?.length || !allResponses[7]?.data?.length) {
-          console.log('Some advanced analytics data missing, generating fallback data');
-          console.log('Heatmap data length:', allResponses[4]?.data?.length || 0);
-          console.log('Day of week data length:', allResponses[5]?.data?.length || 0);
-          console.log('Correlation data length:', allResponses[6]?.data?.length || 0);
-          console.log('Streak data length:', allResponses[7]?.data?.length || 0);
-          
-          if (!allResponses[4]?.data?.length) {
-            const heatmapFallback = generateHeatmapDataFromBasic();
-            console.log('Generated heatmap fallback data:', heatmapFallback.length, 'items');
-            setHeatmapData(heatmapFallback);
-          }
-          if (!allResponses[5]?.data?.length) setDayOfWeekData(generateDayOfWeekDataFromBasic());
-          if (!allResponses[6]?.data?.length) setCorrelationData(generateSampleCorrelationData());
-          if (!allResponses[7]?.data?.length) setStreakData(generateStreakDataFromBasic());
-          if (!allResponses[8]?.data?.length) setBadgeData(generateSampleBadgeData());
-          if (!allResponses[9]?.data) setBehavioralData(generateSampleBehavioralData());
-          if (!allResponses[10]?.data?.length) setChallengeData(generateSampleChallengeData());
-          if (!allResponses[2]?.data?.length) setAvailableTasks(generateSampleAvailableTasks());
+        setComplianceData(data.compliance || []);
+        setAvailableTasks(data.individual?.length ? data.individual : generateSampleAvailableTasks());
+        setRecurringTasks(data.recurring_tasks || []);
+        if (selectedTaskId && data.individual?.some((t: IndividualTaskData) => t.task_id === selectedTaskId)) {
+          setIndividualTaskData(data.selected_task?.data || []);
         }
         
-        // If a specific task is selected, fetch its individual data
-        if (selectedTaskId && allResponses[2].data?.some((t: IndividualTaskData) => t.task_id === selectedTaskId)) {
-          await fetchIndividualTaskData(selectedTaskId);
-        }
+        // The backend has no heatmap/streak/gamification analytics; derive them from the basic series
+        setHeatmapData(generateHeatmapDataFromBasic());
+        setDayOfWeekData(generateDayOfWeekDataFromBasic());
+        setCorrelationData(generateSampleCorrelationData());
+        setStreakData(generateStreakDataFromBasic());
+        setBadgeData(generateSampleBadgeData());
+        setBehavioralData(generateSampleBehavioralData());
+        setChallengeData(generateSampleChallengeData());
       } catch (enhancedError) {
         console.log('Enhanced analytics not available, generating synthetic data from basic time series');
         
@@ -1,57 +1,48 @@
 import datetime
+import os
 import re
+import sys
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dashboard/backend'))
+
+from task_snapshot import read_snapshot
+
 area_as_suffix = True  # Set this to True for suffix mode, False for header mode
 AREA_ORDER_KEY = ['Work', 'Personal', 'Health', 'Finances']
 
 def archive_completed_tasks(tasks_file='../tasks.txt', archive_file='../archive_files/archive.txt', area_as_suffix=area_as_suffix):
-    # Parse tasks using regex, similar to sort_tasks.py
-    with open(tasks_file, 'r') as f:
-        lines = f.readlines()
+    # Classify lines with the shared snapshot parser
+    snapshot = read_snapshot(tasks_file)
 
-    area = None
     completed_tasks = []
     output_lines = []
-    parent_task = None
     parent_task_line = None
-    parent_task_indent = None
     parent_task_completed = False
-    parent_task_idx = None
     parent_task_area = None
     parent_written = set()
 
-    for idx, line in enumerate(lines):
-        stripped = line.rstrip('\n')
-        area_match = re.match(r'^(\S.+):$', stripped)
-        task_match = re.match(r'^(\s*)- \[( |x)\] (.+)', line)
+    for entry in snapshot.lines:
+        line = entry.raw
         # Area header
-        if area_match:
-            area = area_match.group(1)
+        if entry.kind == 'area':
             output_lines.append(line)
-            parent_task = None
             parent_task_line = None
-            parent_task_indent = None
             parent_task_completed = False
-            parent_task_idx = None
-            parent_task_area = area
+            parent_task_area = entry.area
             continue
-        # Task or subtask
-        if task_match:
-            indent, completed, content = task_match.groups()
-            is_completed = completed == 'x'
-            if len(indent) == 4:
-                parent_task = line
+        # Task or subtask (follow-up tasks stay in the file)
+        if entry.kind == 'task' and entry.status != '%':
+            is_completed = entry.completed
+            if len(entry.indent) == 4:
                 parent_task_line = line
-                parent_task_indent = indent
                 parent_task_completed = is_completed
-                parent_task_idx = len(completed_tasks)
-                parent_task_area = area
+                parent_task_area = entry.area
                 if is_completed:
-                    completed_tasks.append((line, area))
+                    completed_tasks.append((line, entry.area))
                 else:
                     output_lines.append(line)
-            elif len(indent) > 4:
+            elif len(entry.indent) > 4:
                 # Subtask
                 if is_completed:
                     # If parent is not completed and not already written, write parent first
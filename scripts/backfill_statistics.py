@@ -0,0 +1,32 @@
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '../dashboard/backend'))
+
+from parser import get_adjusted_date
+from stats_backfill import backfill_statistics
+from timeseries_store import TimeSeriesStore
+
+REPO_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '..'))
+STORE_DIR = os.path.join(REPO_DIR, 'archive_files/timeseries')
+CSV_FILE = os.path.join(REPO_DIR, 'archive_files/task_statistics.csv')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Backfill daily task statistics from the git history of tasks.txt. "
+                    "Run it with the dashboard backend stopped (or use POST /statistics/backfill).")
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--path', default='tasks.txt', help='Task file path within the repository')
+    args = parser.parse_args()
+
+    store = TimeSeriesStore(STORE_DIR)
+    result = backfill_statistics(store, CSV_FILE, REPO_DIR, args.path, get_adjusted_date, args.workers)
+    print(f"Scanned {result['commits']} commits, computed {result['days']} missing days, "
+          f"wrote {result['written']} snapshots to {CSV_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmark_statistics import generate_tasks
+
+SIZES = [1000, 5000, 20000]
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dashboard/backend')
+
+# Run in a fresh interpreter: time the import of the app, the task tree on its own, then the first /tasks
+# (with the in-memory caches dropped again, so it pays the same load plus building the view)
+CHILD = """
+import sys, time, json
+sys.path.insert(0, {backend!r})
+start = time.perf_counter()
+import parser
+import snapshot_file
+import task_snapshot
+parser.tasks_file = {tasks_file!r}
+snapshot_file.PERSISTENT_SNAPSHOTS = {persistent!r}
+import app
+from fastapi.testclient import TestClient
+client = TestClient(app.app)
+imported = time.perf_counter()
+parser.parse_tasks_raw()
+loaded = time.perf_counter()
+parser.invalidate_tasks_snapshot()
+task_snapshot._snapshots.clear()
+before_request = time.perf_counter()
+response = client.get('/tasks')
+done = time.perf_counter()
+assert response.status_code == 200, response.text
+print(json.dumps({{'import': imported - start, 'tree': loaded - imported, 'first': done - before_request}}))
+"""
+
+
+def cold_start(tasks_file, persistent):
+    """Import, task tree and first /tasks times (seconds) of a fresh process"""
+    code = CHILD.format(backend=os.path.abspath(BACKEND_DIR), tasks_file=tasks_file, persistent=persistent)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def best_of(fn, repeat):
+    runs = [fn() for _ in range(repeat)]
+    return {key: min(run[key] for run in runs) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the first /tasks of a freshly started backend with and without the persisted snapshot.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='Task counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Processes per measurement (best is reported)')
+    args = parser.parse_args()
+
+    print(f"{'':>8}  {'':>8}  {'task tree':^34}  {'first /tasks':^24}")
+    print(f"{'tasks':>8}  {'import':>8}  {'parse':>8}  {'write':>8}  {'load':>8}  {'speedup':>6}  "
+          f"{'parse':>8}  {'load':>8}  {'speedup':>6}")
+    for size in args.sizes:
+        work_dir = tempfile.mkdtemp(prefix='cold_start_')
+        try:
+            tasks_file = os.path.join(work_dir, 'tasks.txt')
+            with open(tasks_file, 'w') as f:
+                f.write(generate_tasks(size))
+
+            disabled = best_of(lambda: cold_start(tasks_file, False), args.repeat)
+            # The first persistent run parses and writes the snapshot, later ones load it
+            writing = cold_start(tasks_file, True)
+            loaded = best_of(lambda: cold_start(tasks_file, True), args.repeat)
+        finally:
+            shutil.rmtree(work_dir)
+
+        ms = lambda seconds: f"{seconds * 1000:>6.1f}ms"
+        print(f"{size:>8}  {ms(disabled['import'])}  {ms(disabled['tree'])}  {ms(writing['tree'])}  "
+              f"{ms(loaded['tree'])}  {disabled['tree'] / loaded['tree']:>5.1f}x  "
+              f"{ms(disabled['first'])}  {ms(loaded['first'])}  {disabled['first'] / loaded['first']:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import io
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dashboard/backend'))
+
+from stats_engine import compute_statistics, parse_columns
+
+SIZES = [1000, 10000, 100000]
+TODAY = date(2025, 7, 1)
+
+
+def generate_tasks(count, seed=0):
+    """Synthetic tasks.txt content with areas, subtasks and metadata"""
+    rng = random.Random(seed)
+    projects = [f'+Project{i}' for i in range(40)]
+    contexts = [f'@Context{i}' for i in range(15)]
+    lines = []
+    for i in range(count):
+        if i % 50 == 0:
+            lines.append(f'Area{i // 50}:')
+        level = rng.choice([1, 1, 2, 2, 3])
+        parts = [f'Task number {i}']
+        if rng.random() < 0.4:
+            parts.append(f'(priority:{rng.choice("ABCDEF")} due:{TODAY + timedelta(days=rng.randint(-30, 30))})')
+        if rng.random() < 0.5:
+            parts.append(rng.choice(projects))
+        if rng.random() < 0.5:
+            parts.append(rng.choice(contexts))
+        lines.append(f"{'    ' * level}- [{rng.choice(' x')}] {' '.join(parts)}")
+    return '\n'.join(lines) + '\n'
+
+
+def baseline_statistics(text, today):
+    """compute_task_statistics as it was before the incremental and columnar engines
+
+    Kept verbatim apart from reading text instead of tasks.txt and taking today as an argument.
+    """
+    tasks = []
+    current_area = None
+    parent_stack = []  # Stack to track parent tasks and their metadata
+
+    for line in io.StringIO(text):
+        original_line = line
+        line = line.rstrip()
+        if not line or line.startswith('#'):
+            continue
+
+        # Check for area header
+        area_match = re.match(r'^(\S.+):$', line)
+        if area_match:
+            current_area = area_match.group(1)
+            parent_stack = []  # Reset parent stack for new area
+            continue
+
+        # Check for task
+        task_match = re.match(r'^(\s*)- \[( |x)\] (.+)', original_line)
+        if not task_match:
+            continue
+
+        indent, completed, content = task_match.groups()
+        indent_level = len(indent) // 4
+
+        # Create task object
+        task = {'raw': line}
+        task['completed'] = completed.lower() == 'x'
+        task['area'] = current_area
+        task['indent_level'] = indent_level
+
+        # Extract metadata from the current task
+        due_match = re.search(r'due:(\d{4}-\d{2}-\d{2})', content)
+        task['due'] = (
+            datetime.strptime(due_match.group(1), '%Y-%m-%d').date()
+            if due_match else None
+        )
+
+        prio_match = re.search(r'priority:([A-F])', content)
+        task['priority'] = prio_match.group(1) if prio_match else None
+
+        # Also check for standalone priority letters
+        if not task['priority']:
+            standalone_prio_match = re.search(r'\b([A-F])\b', content)
+            task['priority'] = standalone_prio_match.group(1) if standalone_prio_match else None
+
+        task['projects'] = re.findall(r'\+(\w+)', content)
+        task['contexts'] = re.findall(r'@(\w+)', content)
+
+        # Update parent stack based on indentation
+        while parent_stack and parent_stack[-1]['indent_level'] >= indent_level:
+            parent_stack.pop()
+
+        # If this is a subtask, inherit metadata from parent
+        if indent_level > 1 and parent_stack:
+            parent = parent_stack[-1]
+
+            # Inherit metadata only if not explicitly set on subtask
+            if not task['due'] and parent.get('due'):
+                task['due'] = parent['due']
+
+            if not task['priority'] and parent.get('priority'):
+                task['priority'] = parent['priority']
+
+            if not task['projects'] and parent.get('projects'):
+                task['projects'] = parent['projects']
+
+            if not task['contexts'] and parent.get('contexts'):
+                task['contexts'] = parent['contexts']
+
+        # Add to parent stack for potential children
+        if indent_level >= 1:  # Only add actual tasks to stack
+            parent_stack.append(task)
+
+        tasks.append(task)
+
+    # Compute statistics
+    stats = {}
+    stats['total'] = len(tasks)
+    stats['completed'] = sum(t['completed'] for t in tasks)
+    stats['incomplete'] = stats['total'] - stats['completed']
+    stats['completion_pct'] = (
+        100 * stats['completed'] / stats['total'] if stats['total'] else 0
+    )
+
+    # By priority
+    prio_counter = Counter(t['priority'] for t in tasks if t['priority'])
+    for prio, count in prio_counter.items():
+        stats[f'priority_{prio}'] = count
+
+    # By project
+    project_counter = Counter(p for t in tasks for p in t['projects'])
+    for proj, count in project_counter.items():
+        stats[f'project_{proj}'] = count
+
+    # By context
+    context_counter = Counter(c for t in tasks for c in t['contexts'])
+    for ctx, count in context_counter.items():
+        stats[f'context_{ctx}'] = count
+
+    # Due dates
+    stats['with_due_date'] = sum(1 for t in tasks if t['due'])
+    stats['overdue'] = sum(1 for t in tasks if t['due'] and not t['completed'] and t['due'] < today)
+    stats['due_today'] = sum(1 for t in tasks if t['due'] == today and not t['completed'])
+    stats['due_this_week'] = sum(1 for t in tasks if t['due'] and not t['completed'] and 0 <= (t['due'] - today).days < 7)
+
+    return stats
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar statistics engine against the original compute_task_statistics.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='Task counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8}  {'baseline':>10}  {'columnar':>10}  {'kernel':>10}  {'speedup':>8}")
+    for size in args.sizes:
+        text = generate_tasks(size)
+        old_time, expected = best_of(lambda: baseline_statistics(text, TODAY), args.repeat)
+        new_time, result = best_of(lambda: compute_statistics(parse_columns(text), TODAY), args.repeat)
+        columns = parse_columns(text)
+        kernel_time, _ = best_of(lambda: compute_statistics(columns, TODAY), args.repeat)
+        # Same values and the same key order
+        if list(result.items()) != list(expected.items()):
+            print(f"Results differ at {size} tasks")
+            sys.exit(1)
+        print(f"{size:>8}  {old_time * 1000:>8.1f}ms  {new_time * 1000:>8.1f}ms  {kernel_time * 1000:>8.2f}ms  {old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmark_statistics import TODAY, generate_tasks
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dashboard/backend')
+sys.path.insert(0, BACKEND_DIR)
+
+import parser as task_parser
+from task_snapshot import snapshot_from_text
+from task_views import VIEWS, build_view
+
+SIZES = [1000, 5000, 20000]
+BUILDERS = {'due': 'build_sorted_structure', 'priority': 'build_priority_sorted_structure',
+            'none': 'build_area_sorted_structure'}
+
+
+def load_baseline(ref):
+    """parser.py as of a git ref (e.g. the commit before the group-by engine), imported on its own"""
+    source = subprocess.run(['git', 'show', f'{ref}:dashboard/backend/parser.py'], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location('baseline_parser', f.name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    os.unlink(f.name)
+    return module
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass group-by views, optionally against the builders of an older parser.py.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='Task counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    parser.add_argument('--baseline', help='Git ref whose parser.py builders to compare against (output must match)')
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    ms = lambda seconds: f"{seconds * 1000:>8.1f}ms"
+    print(f"{'tasks':>8}  {'view':>9}  {'groups':>6}  {'engine':>10}" + (f"  {'baseline':>10}  {'speedup':>7}" if baseline else ''))
+    for size in args.sizes:
+        tree = task_parser.tasks_from_snapshot(snapshot_from_text(generate_tasks(size)), TODAY)
+        for sort, group_by in VIEWS.items():
+            engine, groups = best_of(lambda: build_view(tree, group_by), args.repeat)
+            line = f"{size:>8}  {sort:>9}  {len(groups):>6}  {ms(engine)}"
+            if baseline and sort in BUILDERS:
+                old, old_groups = best_of(lambda: getattr(baseline, BUILDERS[sort])(tree), args.repeat)
+                if json.dumps(old_groups, default=str) != json.dumps(groups, default=str):
+                    line += "  OUTPUT DIFFERS"
+                line += f"  {ms(old)}  {old / engine:>6.1f}x"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,31 @@
 # check_syntax.py
 
-import re
 import datetime
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dashboard/backend'))
+
+from task_snapshot import read_snapshot
 
 # Syntax checking function with error reporting, note handling, and spacing check
 def check_syntax(file_path):
-    line_number = 0
     valid_keys = ['priority', 'due', 'progress', 'rec', 'done']
 
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-
     indent_stack = []
 
-    for idx, line in enumerate(lines):
-        line_number += 1
-        stripped = line.rstrip()
-        if not stripped:
+    for line in read_snapshot(file_path).lines:
+        line_number = line.number
+        if line.kind == 'blank':
             continue
 
-        area_match = re.match(r'^(\s*)(\S.+):$', line)
-        task_match = re.match(r'^(\s*)- \[( |x)\] (.+)', line)
-        note_match = re.match(r'^(\s+)[^-\[].+', line)
-
-        if area_match:
-            area_indent = len(area_match.group(1))
-            indent_stack = [area_indent]
+        if line.kind == 'area':
+            indent_stack = [0]
 
-        elif task_match:
-            indent, completed, content = task_match.groups()
-            current_indent = len(indent)
+        elif line.kind == 'task':
+            content = line.content
+            current_indent = len(line.indent)
 
             while len(indent_stack) > 1 and current_indent <= indent_stack[-1]:
                 indent_stack.pop()
@@ -64,9 +60,8 @@ def check_syntax(file_path):
                 if key == 'progress' and not re.match(r'^\d{1,3}%$', value):
                     print(f"Line {line_number}: Invalid progress '{value}'. Suggestion: use a percentage between 0% and 100%.")
 
-        elif note_match:
-            indent = note_match.group(1)
-            current_indent = len(indent)
+        elif line.kind == 'note':
+            current_indent = len(line.indent)
 
             if not indent_stack or current_indent <= indent_stack[-1]:
                 print(f"Line {line_number}: Note indentation error. Should be indented further than its parent task.")
@@ -5,132 +5,63 @@ CSV Export Script for Todo Tasks
 This script parses tasks.txt and exports tasks to a CSV file with metadata and tags as columns.
 """
 
+import os
 import re
 import csv
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import sys
+from typing import Dict, List, Any
 import argparse
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dashboard/backend'))
 
-def parse_task_line(line: str) -> Optional[Dict[str, Any]]:
-    """Parse a single task line and extract all components"""
-    
-    # Skip empty lines and area headers
-    stripped = line.strip()
-    if not stripped or stripped.startswith('## '):
-        return None
-    
-    # Task pattern: optional completion (x), optional date, priority in parens, description, metadata in parens, tags
-    task_pattern = r'^(\s*)(x\s+)?(\d{4}-\d{2}-\d{2}\s+)?(?:\(([A-Z])\)\s+)?(.+?)(?:\s+\(([^)]+)\))?\s*$'
-    
-    match = re.match(task_pattern, line)
-    if not match:
-        return None
-    
-    indent, completed, completion_date, priority, description_and_tags, metadata_str = match.groups()
+from task_snapshot import TaskLine, read_snapshot
+
+
+# Metadata keys with a dedicated column; any other key gets a column of its own
+METADATA_COLUMNS = {'due': 'due_date', 'created': 'created_date', 'done': 'done_date',
+                    'every': 'recurring', 'progress': 'progress', 'priority': 'priority'}
+
+
+def task_row(line: TaskLine) -> Dict[str, Any]:
+    """Extract all components of one parsed task line"""
+    projects = line.projects
+    contexts = line.contexts
+    areas = list(dict.fromkeys(re.findall(r'&(\w+)', line.text)))
     
-    # Initialize task data
     task_data = {
-        'completed': bool(completed),
-        'completion_date': completion_date.strip() if completion_date else '',
-        'priority': priority or '',
-        'description': '',
-        'project': '',
-        'extra_projects': '',
-        'context': '',
-        'extra_contexts': '',
-        'area': '',
+        'completed': line.completed,
+        'completion_date': line.metadata.get('done', ''),
+        'priority': '',
+        'description': ' '.join(line.description.split()),
+        'project': projects[0] if projects else '',
+        'extra_projects': ' '.join(projects[1:]),
+        'context': contexts[0] if contexts else '',
+        'extra_contexts': ' '.join(contexts[1:]),
+        'area': line.area or '',
         'due_date': '',
         'created_date': '',
         'done_date': '',
         'recurring': '',
         'progress': '',
-        'indent_level': len(indent) if indent else 0
+        'indent_level': line.indent_level
     }
     
-    # Parse metadata (content within parentheses)
-    if metadata_str:
-        for item in metadata_str.split():
-            if ':' in item:
-                key, value = item.split(':', 1)
-                if key == 'due':
-                    task_data['due_date'] = value
-                elif key == 'created':
-                    task_data['created_date'] = value
-                elif key == 'done':
-                    task_data['done_date'] = value
-                elif key == 'every':
-                    task_data['recurring'] = value
-                elif key == 'progress':
-                    task_data['progress'] = value
-                elif key == 'priority':
-                    task_data['priority'] = value
-                else:
-                    # Store any other metadata
-                    task_data[key] = value
+    for key, value in line.metadata.items():
+        # Store any other metadata under its own key
+        task_data[METADATA_COLUMNS.get(key, key)] = value
     
-    # Parse description and tags
-    if description_and_tags:
-        # Extract projects (+Project), contexts (@Context), and areas (&Area)
-        projects = re.findall(r'\+(\w+)', description_and_tags)
-        contexts = re.findall(r'@(\w+)', description_and_tags)
-        areas = re.findall(r'&(\w+)', description_and_tags)
-        
-        # Set primary project and context
-        if projects:
-            task_data['project'] = projects[0]
-            if len(projects) > 1:
-                task_data['extra_projects'] = ' '.join(projects[1:])
-        
-        if contexts:
-            task_data['context'] = contexts[0]
-            if len(contexts) > 1:
-                task_data['extra_contexts'] = ' '.join(contexts[1:])
-        
-        if areas:
-            task_data['area_tag'] = areas[0]
-            if len(areas) > 1:
-                task_data['extra_areas'] = ' '.join(areas[1:])
-        
-        # Clean description by removing tags
-        description = description_and_tags
-        description = re.sub(r'\+\w+', '', description)  # Remove projects
-        description = re.sub(r'@\w+', '', description)   # Remove contexts
-        description = re.sub(r'&\w+', '', description)   # Remove areas
-        description = re.sub(r'\s+', ' ', description).strip()  # Clean whitespace
-        
-        task_data['description'] = description
+    if areas:
+        task_data['area_tag'] = areas[0]
+        if len(areas) > 1:
+            task_data['extra_areas'] = ' '.join(areas[1:])
     
     return task_data
 
 
-def get_current_area(line: str) -> Optional[str]:
-    """Extract area name from area header line"""
-    area_match = re.match(r'^## (.+)$', line.strip())
-    return area_match.group(1) if area_match else None
-
-
 def parse_tasks_file(file_path: str) -> List[Dict[str, Any]]:
     """Parse the entire tasks.txt file and return list of task dictionaries"""
-    tasks = []
-    current_area = ''
-    
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                # Check for area header
-                area = get_current_area(line)
-                if area:
-                    current_area = area
-                    continue
-                
-                # Parse task line
-                task_data = parse_task_line(line)
-                if task_data:
-                    task_data['area'] = current_area
-                    task_data['line_number'] = line_num
-                    tasks.append(task_data)
-                    
+        snapshot = read_snapshot(file_path)
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         return []
@@ -138,6 +69,11 @@ def parse_tasks_file(file_path: str) -> List[Dict[str, Any]]:
         print(f"Error reading file: {e}")
         return []
     
+    tasks = []
+    for line in snapshot.tasks():
+        task_data = task_row(line)
+        task_data['line_number'] = line.number
+        tasks.append(task_data)
     return tasks
 
 
@@ -1,6 +1,11 @@
 import datetime
 import os.path
 import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dashboard/backend'))
+
+from task_snapshot import read_snapshot
 
 # IMPORTANT: Ensure these Google API client libraries are installed
 # If you get ModuleNotFoundError, run:
@@ -71,16 +76,10 @@ def get_tasks_from_file(file_path="../tasks.txt"):
     """
     tasks = []
     try:
-        with open(file_path, 'r') as file:
-            for line in file:
-                # Regex to match lines like: "- [ ] Task content" or "    - [x] Subtask content"
-                # It captures the content after the checkbox.
-                task_match = re.match(r'^\s*- \[( |x)\] (.+)', line)
-                if task_match:
-                    content = task_match.group(2).strip() # group(2) contains the task description
-                    tasks.append(content)
-                # else:
-                    # print(f"Skipping non-task line: {line.strip()}") # Uncomment for debugging ignored lines
+        # The shared snapshot classifies the lines; "- [ ]" and "- [x]" tasks at any indent are kept
+        for line in read_snapshot(file_path).tasks():
+            if line.status != '%':
+                tasks.append(line.content.strip())
     except FileNotFoundError:
         print(f"Error: tasks.txt not found at {file_path}")
     return tasks
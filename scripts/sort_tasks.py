@@ -1,8 +1,12 @@
-import re
 import os
+import sys
 import datetime
 import shutil
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../dashboard/backend'))
+
+from task_snapshot import NOTE_PATTERN, parse_date, read_snapshot
+
 AREA_ORDER_KEY = ['Work', 'Personal', 'Health', 'Finances']
 
 # Remove all files in the outputs directory if it exists
@@ -11,113 +15,75 @@ if os.path.exists('outputs'):
 
 
 def parse_tasks(file_path):
-    tasks, current_area, current_task_group = [], None, {}
-    with open(file_path, 'r') as file:
-        for line_number, line in enumerate(file, 1):
-            stripped = line.rstrip()
-            if not stripped:
-                continue
-
-            area_match = re.match(r'^(\S.+):$', stripped)
-            task_match = re.match(r'^(\s*)- \[( |x)\] (.+)', line)
-            note_match = re.match(r'^(\s+)[^-\[].+', line)
-
-            if area_match:
-                current_area = area_match.group(1)
-                tasks.append({'type': 'area', 'area': current_area, 'content': stripped})
-            elif task_match:
-                indent, completed, content = task_match.groups()
-                # Extract metadata from all sets of parentheses
-                all_meta = re.findall(r'\(([^)]*)\)', content)
-                metadata = {}
-                for meta_str in all_meta:
-                    # Parse key:value pairs, handling spaces in values
-                    parts = meta_str.split()
-                    i = 0
-                    while i < len(parts):
-                        if ':' in parts[i]:
-                            key, first_val = parts[i].split(':', 1)
-                            value_parts = [first_val] if first_val else []
-                            
-                            # Look ahead to collect continuation of this value
-                            j = i + 1
-                            while j < len(parts) and ':' not in parts[j]:
-                                value_parts.append(parts[j])
-                                j += 1
-                            
-                            metadata[key] = ' '.join(value_parts)
-                            i = j
-                        else:
-                            i += 1
-                # Remove all metadata parentheses from content for display
-                content_no_meta = re.sub(r'\([^)]*\)', '', content).strip()
-                # Parse recognized metadata
-                priority = metadata.get('priority')
-                due = metadata.get('due')
-                try:
-                    due = datetime.datetime.strptime(due, '%Y-%m-%d').date() if due else None
-                except Exception as e:
-                    print(f"Error parsing due date on line {line_number}: {line.strip()}")
-                    raise
-                done_date = metadata.get('done')
+    tasks, current_task_group = [], {}
+    for line in read_snapshot(file_path).lines:
+        if line.kind == 'area':
+            tasks.append({'type': 'area', 'area': line.area, 'content': line.raw.rstrip()})
+        elif line.kind == 'task' and line.status != '%':
+            metadata = line.metadata
+            # Parse recognized metadata
+            priority = metadata.get('priority')
+            due = metadata.get('due')
+            try:
+                due = parse_date(due) if due else None
+            except Exception as e:
+                print(f"Error parsing due date on line {line.number}: {line.raw.strip()}")
+                raise
+            done_date = metadata.get('done')
+            try:
+                done_date = parse_date(done_date) if done_date else None
+            except Exception as e:
+                print(f"Error parsing done date on line {line.number}: {line.raw.strip()}")
+                raise
+            progress = metadata.get('progress')
+            rec = metadata.get('rec')
+            onhold = metadata.get('onhold')
+            # Determine if onhold is active (future date or text condition)
+            is_onhold_active = False
+            if onhold:
                 try:
-                    done_date = datetime.datetime.strptime(done_date, '%Y-%m-%d').date() if done_date else None
-                except Exception as e:
-                    print(f"Error parsing done date on line {line_number}: {line.strip()}")
-                    raise
-                progress = metadata.get('progress')
-                rec = metadata.get('rec')
-                onhold = metadata.get('onhold')
-                # Determine if onhold is active (future date or text condition)
-                is_onhold_active = False
-                if onhold:
-                    try:
-                        # Try to parse as date
-                        onhold_date = datetime.datetime.strptime(onhold, '%Y-%m-%d').date()
-                        today = datetime.date.today()
-                        is_onhold_active = onhold_date > today
-                        onhold = onhold_date if is_onhold_active else None  # Set to None if date has passed
-                    except ValueError:
-                        # Not a date, treat as text condition - always active
-                        is_onhold_active = True
-                # Extract all unique project and context tags from content
-                project_tags = list(dict.fromkeys(re.findall(r'\+(\w+)', content_no_meta)))
-                context_tags = list(dict.fromkeys(re.findall(r'@(\w+)', content_no_meta)))
-                project = project_tags[0] if project_tags else 'NoProject'
-                context = context_tags[0] if context_tags else 'NoContext'
-                extra_projects = project_tags[1:] if len(project_tags) > 1 else []
-                extra_contexts = context_tags[1:] if len(context_tags) > 1 else []
+                    # Try to parse as date
+                    onhold_date = parse_date(onhold)
+                    today = datetime.date.today()
+                    is_onhold_active = onhold_date > today
+                    onhold = onhold_date if is_onhold_active else None  # Set to None if date has passed
+                except ValueError:
+                    # Not a date, treat as text condition - always active
+                    is_onhold_active = True
+            project_tags = line.projects
+            context_tags = line.contexts
 
-                task = {
-                    'type': 'task',
-                    'area': current_area,
-                    'completed': completed == 'x',
-                    'content': re.sub(r'([+@&]\w+)', '', content_no_meta).strip(),
-                    'priority': priority,
-                    'due': due,
-                    'done_date': done_date,
-                    'progress': progress,
-                    'rec': rec,
-                    'onhold': onhold if is_onhold_active else None,
-                    'is_onhold_active': is_onhold_active,
-                    'project': project,
-                    'context': context,
-                    'extra_projects': extra_projects,
-                    'extra_contexts': extra_contexts,
-                    'indent': indent,
-                    'subtasks': [],
-                    'notes': []
-                }
+            task = {
+                'type': 'task',
+                'area': line.area,
+                'completed': line.completed,
+                'content': line.description,
+                'priority': priority,
+                'due': due,
+                'done_date': done_date,
+                'progress': progress,
+                'rec': rec,
+                'onhold': onhold if is_onhold_active else None,
+                'is_onhold_active': is_onhold_active,
+                'project': project_tags[0] if project_tags else 'NoProject',
+                'context': context_tags[0] if context_tags else 'NoContext',
+                'extra_projects': list(project_tags[1:]),
+                'extra_contexts': list(context_tags[1:]),
+                'indent': line.indent,
+                'subtasks': [],
+                'notes': []
+            }
 
-                if len(indent) <= 4:
-                    tasks.append(task)
-                    current_task_group = task
-                else:
-                    current_task_group['subtasks'].append(task)
+            if len(line.indent) <= 4:
+                tasks.append(task)
+                current_task_group = task
+            else:
+                current_task_group['subtasks'].append(task)
 
-            elif note_match:
-                note = {'type': 'note', 'content': stripped, 'indent': note_match.group(1)}
-                current_task_group.setdefault('notes', []).append(note)
+        elif line.kind == 'note' or (line.kind == 'task' and NOTE_PATTERN.match(line.raw)):
+            # Indented [%] follow-ups are carried along like notes
+            note = {'type': 'note', 'content': line.raw.rstrip(), 'indent': NOTE_PATTERN.match(line.raw).group(1)}
+            current_task_group.setdefault('notes', []).append(note)
     return tasks
 
 
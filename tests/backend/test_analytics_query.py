@@ -0,0 +1,88 @@
+"""
+Analytics Query Tests
+=====================
+
+Tests for POST /analytics/query:
+- Mixed sub-queries answered in request order
+- Each data source loaded once per request
+- Per-sub-query errors
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.status_log import StatusLog
+from dashboard.backend.timeseries_store import TimeSeriesStore
+import dashboard.backend.app as app_module
+
+
+class TestAnalyticsQuery:
+    """Test the batched analytics endpoint"""
+
+    @pytest.fixture
+    def log(self, tmp_path):
+        log = StatusLog(str(tmp_path / "recurring_status_log.txt"), app_module.get_adjusted_date, fsync='never')
+        log.append_batch([('a', 'completed', 'Task A'), ('b', 'missed', 'Task B')], datetime(2025, 6, 2, 12, 0, 0))
+        log.append('a', 'missed', 'Task A', datetime(2025, 6, 3, 12, 0, 0))
+        return log
+
+    @pytest.fixture
+    def client(self, tmp_path, log):
+        store = TimeSeriesStore(str(tmp_path / "timeseries"))
+        store.append(datetime(2025, 6, 1, 20, 0, 0), {'total': 10, 'overdue': 1})
+        store.append(datetime(2025, 6, 2, 20, 0, 0), {'total': 12, 'overdue': 2})
+        with patch.object(app_module, 'get_statistics_store', return_value=store), \
+                patch.object(app_module, 'get_status_log', return_value=log):
+            app_module._series_cache.clear()
+            yield TestClient(app_module.app)
+        app_module._series_cache.clear()
+
+    def test_results_match_single_endpoints(self, client):
+        response = client.post("/analytics/query", json={'queries': [
+            {'id': 'series', 'type': 'series', 'metrics': ['overdue', 'compliance_pct']},
+            {'id': 'compliance', 'type': 'compliance'},
+            {'id': 'individual', 'type': 'individual'},
+        ]})
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [result['id'] for result in results] == ['series', 'compliance', 'individual']
+        assert results[0]['data'] == client.get("/statistics/time-series?metrics=overdue,compliance_pct").json()
+        assert results[1]['data'] == client.get("/recurring/compliance?resolution=day").json()
+        assert results[2]['data'] == client.get("/recurring/compliance/individual").json()
+
+    def test_individual_task(self, client):
+        results = client.post("/analytics/query", json={'queries': [
+            {'type': 'individual', 'task_id': 'a'},
+        ]}).json()['results']
+        data = results[0]['data']
+        assert [row['date'] for row in data] == ['2025-06-02', '2025-06-03']
+        assert {row['task_id'] for row in data} == {'a'}
+        assert [row['completed'] for row in data] == [1, 0]
+
+    def test_status_log_read_once(self, client, log):
+        with patch.object(log, 'get_status_data', wraps=log.get_status_data) as status_data:
+            client.post("/analytics/query", json={'queries': [
+                {'type': 'individual'},
+                {'type': 'individual', 'task_id': 'a'},
+                {'type': 'individual', 'task_id': 'b'},
+            ]})
+        assert status_data.call_count == 1
+
+    def test_errors_are_per_query(self, client):
+        results = client.post("/analytics/query", json={'queries': [
+            {'id': 'bad', 'type': 'series', 'metrics': ['bogus']},
+            {'id': 'unknown', 'type': 'heatmap'},
+            {'id': 'ok', 'type': 'series', 'metrics': ['total'], 'resolution': 'month'},
+        ]}).json()['results']
+        assert results[0]['status'] == 400 and 'bogus' in results[0]['error']
+        assert results[1]['status'] == 400
+        assert results[2]['data'] == [{'date': '2025-06-01', 'total': 11}]
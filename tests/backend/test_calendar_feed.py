@@ -0,0 +1,148 @@
+"""
+Calendar Feed Tests
+===================
+
+Tests for calendar_feed.py and GET /calendar.ics:
+- Events for due dates, follow-ups, onhold releases and recurring occurrences
+- Text escaping, line folding and stable UIDs
+- Re-rendering only when the task or occurrence index changes
+- Conditional requests with ETag and Last-Modified
+"""
+
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.calendar_feed import CalendarFeed, escape_text, fold, render_calendar, task_events
+import dashboard.backend.app as app_module
+import parser as task_parser
+from task_index import TaskIndex
+from task_snapshot import snapshot_from_text
+
+TODAY = date(2025, 6, 10)
+NOW = datetime(2025, 6, 10, 9, 30, tzinfo=timezone.utc)
+
+TASKS = """Work:
+    - [ ] Write report, draft (priority:A due:2025-06-17) +Reports
+        - [x] Draft outline (due:2025-06-01 done:2025-05-30)
+    - [ ] Chase invoice (followup:2025-06-12)
+    - [ ] Wait for data (onhold:2025-06-20)
+    - [ ] Wait for budget (onhold:after review)
+"""
+
+RECURRING = "# Daily\n- [ ] Stretch [daily]\n# Weekly\n- [ ] Plan week [weekly:Mon]\n"
+
+
+def index(text=TASKS):
+    return TaskIndex(task_parser.tasks_from_snapshot(snapshot_from_text(text), TODAY))
+
+
+def summaries(body):
+    return [line for line in body.decode('utf-8').split('\r\n') if line.startswith(('SUMMARY', 'DTSTART'))]
+
+
+class TestRendering:
+    """Test the events and their encoding"""
+
+    def test_task_events(self):
+        events = [(event.kind, event.day, event.task['description']) for event in task_events(index())]
+        # Done tasks and text onhold conditions have no event
+        assert events == [('due', date(2025, 6, 17), 'Write report, draft'),
+                          ('followup', date(2025, 6, 12), 'Chase invoice'),
+                          ('release', date(2025, 6, 20), 'Wait for data')]
+
+    def test_render(self):
+        body = render_calendar(task_events(index()), TODAY)
+        text = body.decode('utf-8')
+        assert text.startswith('BEGIN:VCALENDAR\r\nVERSION:2.0\r\n') and text.endswith('END:VCALENDAR\r\n')
+        # Ordered by day, all-day events
+        assert summaries(body) == ['DTSTART;VALUE=DATE:20250612', 'SUMMARY:Follow up: Chase invoice',
+                                   'DTSTART;VALUE=DATE:20250617', 'SUMMARY:Write report\\, draft',
+                                   'DTSTART;VALUE=DATE:20250620', 'SUMMARY:Off hold: Wait for data']
+        assert 'DESCRIPTION:Area: Work\\nPriority: A\\n+Reports' in text
+
+    def test_uids_survive_moved_lines(self):
+        moved = TASKS.replace("Work:\n", "Work:\n    - [ ] New task\n")
+        uids = lambda text: [line for line in render_calendar(task_events(index(text)), TODAY).split(b'\r\n')
+                             if line.startswith(b'UID')]
+        assert uids(moved) == uids(TASKS)
+
+    def test_escape_and_fold(self):
+        assert escape_text('a;b,c\\d\ne') == 'a\\;b\\,c\\\\d\\ne'
+        line = 'SUMMARY:' + 'é' * 60
+        folded = fold(line)
+        assert all(len(part.encode('utf-8')) <= 75 for part in folded.split('\r\n'))
+        assert folded.replace('\r\n ', '') == line
+
+
+class TestFeed:
+    """Test when the feed is re-rendered"""
+
+    def test_only_on_index_change(self):
+        tasks = [{'type': 'area', 'name': 'Daily', 'tasks': []}]
+        occurrences = app_module.OccurrenceIndex([], TODAY)
+        feed = CalendarFeed(30)
+        first = index()
+        assert feed.update(first, occurrences, tasks, TODAY, NOW)
+        etag, modified = feed.etag, feed.last_modified
+        with patch('dashboard.backend.calendar_feed.render_calendar') as render:
+            assert not feed.update(first, occurrences, tasks, TODAY, NOW)
+            render.assert_not_called()
+
+        # A new parse with the same events renders the same body: Last-Modified stays
+        assert not feed.update(index(), occurrences, tasks, TODAY, datetime(2025, 6, 10, 12, tzinfo=timezone.utc))
+        assert (feed.etag, feed.last_modified) == (etag, modified)
+
+        assert feed.update(index(TASKS.replace('2025-06-17', '2025-06-18')), occurrences, tasks, TODAY, NOW)
+        assert feed.etag != etag
+
+
+class TestEndpoint:
+    """Test GET /calendar.ics"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        recurring = tmp_path / "recurring_tasks.txt"
+        recurring.write_text(RECURRING)
+        task_parser.invalidate_tasks_snapshot()
+        task_parser.invalidate_recurring_snapshot()
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.recurring_file', str(recurring)), \
+             patch('parser.get_adjusted_today', return_value=TODAY), \
+             patch.object(app_module, 'get_adjusted_today', return_value=TODAY), \
+             patch.object(app_module, 'CALENDAR_FEED_HORIZON_DAYS', 7), \
+             patch.dict(app_module._calendar_feed, {'feed': None}), \
+             patch.dict(app_module._recurring_index_cache, {'signature': None, 'parsed': None, 'index': None}):
+            yield TestClient(app_module.app)
+        task_parser.invalidate_tasks_snapshot()
+        task_parser.invalidate_recurring_snapshot()
+
+    def test_feed(self, client):
+        response = client.get("/calendar.ics")
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/calendar')
+        text = response.text
+        # 7 daily occurrences from today and one Monday, besides the three task events
+        assert text.count('SUMMARY:Stretch') == 7 and text.count('SUMMARY:Plan week') == 1
+        assert text.count('BEGIN:VEVENT') == 11
+        assert 'DTSTART;VALUE=DATE:20250616\r\nDTEND;VALUE=DATE:20250617\r\nSUMMARY:Plan week' in text
+
+    def test_conditional_get(self, client):
+        response = client.get("/calendar.ics")
+        etag, modified = response.headers['etag'], response.headers['last-modified']
+        assert client.get("/calendar.ics", headers={'If-None-Match': etag}).status_code == 304
+        assert client.get("/calendar.ics", headers={'If-Modified-Since': modified}).status_code == 304
+        # If-None-Match wins over If-Modified-Since
+        assert client.get("/calendar.ics", headers={'If-None-Match': '"old"',
+                                                    'If-Modified-Since': modified}).status_code == 200
+        assert client.get("/calendar.ics", headers={'If-Modified-Since': 'yesterday'}).status_code == 200
+        assert client.get("/calendar.ics", headers={'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}).status_code == 200
@@ -0,0 +1,165 @@
+"""
+Day Boundary Tests
+==================
+
+Tests for day_boundary.py and the date-dependent caches it refreshes:
+- Scheduling views at the start of the next adjusted day they change on
+- Refreshing only the views that are due
+- Cached parse of tasks.txt reused until content changes or an onhold expires
+- A single DAY_START_HOUR shared by parser and app
+"""
+
+import sys
+from datetime import datetime, date
+from pathlib import Path
+from unittest.mock import patch
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.day_boundary import DayBoundaryScheduler, next_day_after
+from dashboard.backend.live_stats import StatisticsAggregator, parse_statistics_tasks
+import dashboard.backend.app as app_module
+import parser as task_parser
+
+NOW = datetime(2025, 6, 10, 12, 0, 0)
+
+
+def adjusted(dt):
+    return (dt.date() if dt.hour >= 3 else date.fromordinal(dt.date().toordinal() - 1))
+
+
+class TestScheduler:
+    """Test planning and running refreshes"""
+
+    def test_next_instant_is_earliest_view(self):
+        scheduler = DayBoundaryScheduler(3, adjusted)
+        scheduler.register('far', lambda today: date(2025, 6, 20), lambda today: None, now=NOW)
+        scheduler.register('near', lambda today: date(2025, 6, 12), lambda today: None, now=NOW)
+        scheduler.register('never', lambda today: None, lambda today: None, now=NOW)
+        assert scheduler.next_instant() == datetime(2025, 6, 12, 3, 0, 0)
+
+    def test_no_views_means_no_wakeup(self):
+        scheduler = DayBoundaryScheduler(3, adjusted)
+        scheduler.register('never', lambda today: None, lambda today: None, now=NOW)
+        assert scheduler.next_instant() is None
+
+    def test_run_due_refreshes_only_due_views(self):
+        refreshed = []
+        scheduler = DayBoundaryScheduler(3, adjusted)
+        scheduler.register('daily', lambda today: next_day_after(today, [date(2025, 6, 11), date(2025, 6, 13)]),
+                           refreshed.append, now=NOW)
+        scheduler.register('later', lambda today: date(2025, 6, 20), lambda today: refreshed.append('later'), now=NOW)
+
+        # 2 AM still belongs to the 10th
+        assert scheduler.run_due(datetime(2025, 6, 11, 2, 0, 0)) == []
+        assert scheduler.run_due(datetime(2025, 6, 11, 3, 0, 0)) == ['daily']
+        assert refreshed == [date(2025, 6, 11)]
+        assert scheduler.next_instant() == datetime(2025, 6, 13, 3, 0, 0)
+
+    def test_errors_do_not_stop_the_scheduler(self):
+        def fail(today):
+            raise RuntimeError("boom")
+        scheduler = DayBoundaryScheduler(3, adjusted)
+        scheduler.register('broken', lambda today: date(2025, 6, 11), fail, now=NOW)
+        assert scheduler.run_due(datetime(2025, 6, 11, 4, 0, 0)) == ['broken']
+        scheduler.register('broken', lambda today: 1 / 0, fail, now=NOW)
+        assert scheduler.next_instant() == datetime(2025, 6, 11, 3, 0, 0)
+
+    def test_reschedule_after_data_change(self):
+        dates = [date(2025, 6, 20)]
+        scheduler = DayBoundaryScheduler(3, adjusted)
+        scheduler.register('view', lambda today: next_day_after(today, dates), lambda today: None, now=NOW)
+        dates.append(date(2025, 6, 12))
+        scheduler.reschedule('view', now=NOW)
+        assert scheduler.next_instant() == datetime(2025, 6, 12, 3, 0, 0)
+
+    def test_thread_starts_and_stops(self):
+        scheduler = DayBoundaryScheduler(3, adjusted)
+        scheduler.start()
+        scheduler.stop(timeout=2)
+        assert scheduler._thread is None
+
+
+class TestStatisticsNextChange:
+    """Test when the due-date counters next change"""
+
+    def test_next_change(self):
+        aggregator = StatisticsAggregator()
+        aggregator.update(parse_statistics_tasks([
+            "- [ ] Report due:2025-06-20\n",
+            "- [ ] Call due:2025-06-12\n",
+            "- [x] Done due:2025-06-11\n",
+        ]))
+        # The 12th enters the week on the 6th, comes due on the 12th and is overdue on the 13th
+        assert aggregator.next_change(date(2025, 6, 1)) == date(2025, 6, 6)
+        assert aggregator.next_change(date(2025, 6, 10)) == date(2025, 6, 12)
+        assert aggregator.next_change(date(2025, 6, 12)) == date(2025, 6, 13)
+        assert aggregator.next_change(date(2025, 6, 21)) is None
+
+
+class TestCachedParse:
+    """Test reuse and invalidation of the parsed tasks.txt"""
+
+    def parse(self, tasks_file, today):
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.get_adjusted_today', return_value=today), \
+             patch('parser.tasks_from_snapshot', wraps=task_parser.tasks_from_snapshot) as parse_lines:
+            tasks = task_parser.parse_tasks_raw()
+        return tasks, parse_lines.call_count
+
+    def test_reused_until_onhold_expires(self, tmp_path):
+        task_parser.invalidate_tasks_snapshot()
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text("Work:\n    - [ ] Wait (onhold:2025-06-12)\n    - [ ] Do it\n")
+
+        first, parsed = self.parse(tasks_file, date(2025, 6, 10))
+        assert parsed == 1 and first[0]['tasks'][0]['status'] == 'onhold'
+        assert task_parser.get_tasks_valid_until() == date(2025, 6, 12)
+
+        second, parsed = self.parse(tasks_file, date(2025, 6, 11))
+        assert parsed == 0 and second == first
+        # Callers get their own copy
+        second[0]['tasks'].clear()
+        assert self.parse(tasks_file, date(2025, 6, 11))[0] == first
+
+        expired, parsed = self.parse(tasks_file, date(2025, 6, 12))
+        assert parsed == 1 and expired[0]['tasks'][0]['status'] == 'incomplete'
+        assert task_parser.get_tasks_valid_until() is None
+
+    def test_content_change_reparses(self, tmp_path):
+        task_parser.invalidate_tasks_snapshot()
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text("Work:\n    - [ ] One\n")
+        assert self.parse(tasks_file, date(2025, 6, 10))[1] == 1
+        tasks_file.write_text("Work:\n    - [x] One\n")
+        tasks, parsed = self.parse(tasks_file, date(2025, 6, 10))
+        assert parsed == 1 and tasks[0]['tasks'][0]['status'] == 'done'
+
+    def test_listener_called_on_parse(self, tmp_path):
+        task_parser.invalidate_tasks_snapshot()
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text("Work:\n    - [ ] One\n")
+        calls = []
+        listener = lambda: calls.append(1)
+        task_parser.add_tasks_listener(listener)
+        try:
+            self.parse(tasks_file, date(2025, 6, 10))
+            self.parse(tasks_file, date(2025, 6, 10))
+        finally:
+            task_parser._tasks_listeners.remove(listener)
+        assert calls == [1]
+
+
+class TestDayStartHour:
+    """Test the shared day boundary setting"""
+
+    def test_app_follows_parser_setting(self):
+        with patch('parser.DAY_START_HOUR', 5):
+            assert app_module.get_adjusted_date(datetime(2025, 6, 10, 4, 0, 0)) == date(2025, 6, 9)
+            assert app_module.get_adjusted_datetime_for_date(date(2025, 6, 10)) == datetime(2025, 6, 10, 5, 0, 0)
+        assert app_module.get_adjusted_date(datetime(2025, 6, 10, 4, 0, 0)) == date(2025, 6, 10)
+
+    def test_registered_views(self):
+        scheduler = app_module.create_day_scheduler()
+        assert set(scheduler._views) == {'tasks', 'statistics', 'recurring'}
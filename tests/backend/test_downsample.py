@@ -0,0 +1,138 @@
+"""
+Downsampling Tests
+==================
+
+Tests for downsample.py and the max_points/resolution parameters:
+- Week/month bucket boundaries
+- Bucket aggregation with missing values
+- LTTB point selection
+- Result cache
+- Bucketed /recurring/compliance
+"""
+
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.downsample import (
+    BucketCache, aggregate_buckets, bucket_starts, downsample, lttb_indices,
+    ordinals_from_strings, ordinals_to_strings
+)
+from dashboard.backend.status_log import StatusLog
+import dashboard.backend.app as app_module
+
+
+def ordinals(*days):
+    return np.array([day.toordinal() for day in days])
+
+
+class TestBuckets:
+    """Test calendar bucketing"""
+
+    def test_week_and_month_starts(self):
+        days = ordinals(date(2025, 6, 1), date(2025, 6, 2), date(2025, 6, 8), date(2025, 6, 9), date(2025, 7, 31))
+        assert ordinals_to_strings(bucket_starts(days, 'week')) == [
+            '2025-05-26', '2025-06-02', '2025-06-02', '2025-06-09', '2025-07-28']
+        assert ordinals_to_strings(bucket_starts(days, 'month')) == [
+            '2025-06-01', '2025-06-01', '2025-06-01', '2025-06-01', '2025-07-01']
+
+    def test_string_round_trip(self):
+        dates = ['2024-02-29', '2025-01-01']
+        assert ordinals_to_strings(ordinals_from_strings(dates)) == dates
+        assert ordinals_from_strings(dates)[0] == date(2024, 2, 29).toordinal()
+
+    def test_aggregations_skip_missing(self):
+        days = ordinals(date(2025, 6, 2), date(2025, 6, 3), date(2025, 6, 4), date(2025, 6, 9))
+        columns = {
+            'level': np.array([1.0, np.nan, 3.0, 10.0]),
+            'count': np.array([1.0, 2.0, np.nan, np.nan]),
+            'latest': np.array([5.0, 6.0, np.nan, 8.0]),
+        }
+        keys, reduced = aggregate_buckets(days, columns, 'week', {'count': 'sum', 'latest': 'last'})
+        assert ordinals_to_strings(keys) == ['2025-06-02', '2025-06-09']
+        assert reduced['level'].tolist() == [2.0, 10.0]
+        assert reduced['count'][0] == 3.0 and np.isnan(reduced['count'][1])
+        assert reduced['latest'].tolist() == [6.0, 8.0]
+
+
+class TestLttb:
+    """Test Largest-Triangle-Three-Buckets selection"""
+
+    def test_keeps_endpoints_and_size(self):
+        x = np.arange(1000)
+        y = np.sin(x / 50.0)
+        rows = lttb_indices(x, y, 50)
+        assert len(rows) == 50
+        assert rows[0] == 0 and rows[-1] == 999
+        assert np.all(np.diff(rows) > 0)
+
+    def test_keeps_spike(self):
+        y = np.zeros(500)
+        y[317] = 100.0
+        assert 317 in lttb_indices(np.arange(500), y, 20)
+
+    def test_short_series_untouched(self):
+        assert lttb_indices(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+    def test_downsample_keeps_columns_aligned(self):
+        x = np.arange(100) + date(2025, 1, 1).toordinal()
+        columns = {'a': np.arange(100, dtype=float), 'b': np.arange(100, dtype=float) * 2}
+        days, reduced = downsample(x, columns, 'day', max_points=10, primary='a')
+        assert len(days) == 10
+        assert (reduced['b'] == reduced['a'] * 2).all()
+        assert (reduced['a'] == days - x[0]).all()
+
+
+class TestBucketCache:
+    """Test the downsampled result cache"""
+
+    def test_hit_and_eviction(self):
+        cache = BucketCache(maxsize=2)
+        calls = []
+        compute = lambda value: (lambda: calls.append(value) or value)
+        assert cache.get_or_compute('a', compute(1)) == 1
+        assert cache.get_or_compute('a', compute(99)) == 1
+        cache.get_or_compute('b', compute(2))
+        cache.get_or_compute('c', compute(3))
+        assert cache.get_or_compute('a', compute(4)) == 4
+        assert calls == [1, 2, 3, 4]
+
+
+class TestComplianceEndpoint:
+    """Test bucketed /recurring/compliance"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        log = StatusLog(str(tmp_path / "recurring_status_log.txt"), app_module.get_adjusted_date, fsync='never')
+        log.append_batch([('a', 'completed', 'A'), ('b', 'missed', 'B')], datetime(2025, 6, 2, 12, 0, 0))
+        log.append_batch([('a', 'completed', 'A'), ('b', 'completed', 'B')], datetime(2025, 6, 4, 12, 0, 0))
+        log.append('a', 'deferred', 'A', datetime(2025, 6, 10, 12, 0, 0))
+        with patch.object(app_module, 'get_status_log', return_value=log):
+            app_module._series_cache.clear()
+            yield TestClient(app_module.app)
+        app_module._series_cache.clear()
+
+    def test_weekly_buckets_sum_counts(self, client):
+        data = client.get("/recurring/compliance?resolution=week").json()
+        assert data == [
+            {'date': '2025-06-02', 'completed': 3, 'missed': 1, 'deferred': 0, 'total': 4, 'compliance_pct': 75.0},
+            {'date': '2025-06-09', 'completed': 0, 'missed': 0, 'deferred': 1, 'total': 1, 'compliance_pct': 0.0},
+        ]
+
+    def test_default_is_daily(self, client):
+        data = client.get("/recurring/compliance").json()
+        assert [row['date'] for row in data] == ['2025-06-02', '2025-06-04', '2025-06-10']
+        assert client.get("/recurring/compliance?start_date=2025-06-03").json() == data[1:]
+
+    def test_bad_parameters(self, client):
+        assert client.get("/recurring/compliance?resolution=year").status_code == 400
+        assert client.get("/recurring/compliance?max_points=1").status_code == 400
@@ -0,0 +1,128 @@
+"""
+Due Calendar Tests
+==================
+
+Tests for due_calendar.py and GET /calendar:
+- Day, week and month buckets and their bounds
+- Bucketing by bisection over the due-date index, without walking the tree
+- The index following changes to tasks.txt
+- Endpoint parameters
+"""
+
+import sys
+from bisect import bisect_left
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.due_calendar import bucket_range, due_calendar
+import dashboard.backend.app as app_module
+import parser as task_parser
+from task_index import TaskIndex
+from task_snapshot import snapshot_from_text
+
+TODAY = date(2025, 6, 10)
+
+TASKS = """Work:
+    - [ ] Write report (priority:A due:2025-06-17) +Reports
+        - [ ] Collect numbers (due:2025-06-09)
+        - [x] Draft outline (due:2025-06-01 done:2025-05-30)
+    - [ ] Call client (due:2025-06-09) @Phone
+    - [ ] Plan offsite
+Home:
+    - [ ] Fix tap (due:2025-07-02)
+    - [ ] Pay rent (due:2025-06-30)
+"""
+
+
+def index(text=TASKS):
+    return TaskIndex(task_parser.tasks_from_snapshot(snapshot_from_text(text), TODAY))
+
+
+def buckets(calendar):
+    return [(bucket['start'], [task['description'] for task in bucket['tasks']])
+            for bucket in calendar['buckets'] if bucket['count']]
+
+
+class TestBuckets:
+    """Test bucketing of the due-date index"""
+
+    def test_bucket_range(self):
+        assert bucket_range(date(2025, 6, 11), date(2025, 6, 11), 'week') == (date(2025, 6, 9), date(2025, 6, 15))
+        assert bucket_range(date(2025, 12, 5), date(2025, 12, 31), 'month') == (date(2025, 12, 1), date(2025, 12, 31))
+
+    def test_day(self):
+        calendar = due_calendar(index(), date(2025, 6, 9), date(2025, 6, 17), 'day')
+        assert len(calendar['buckets']) == 9 and calendar['count'] == 3
+        # Due date then file order, subtasks included
+        assert buckets(calendar) == [('2025-06-09', ['Collect numbers', 'Call client']),
+                                     ('2025-06-17', ['Write report'])]
+
+    def test_week_and_month(self):
+        calendar = due_calendar(index(), date(2025, 6, 1), date(2025, 6, 30), 'week')
+        assert (calendar['from'], calendar['to']) == ('2025-05-26', '2025-07-06')
+        assert [bucket['count'] for bucket in calendar['buckets']] == [1, 0, 2, 1, 0, 2]
+
+        calendar = due_calendar(index(), date(2025, 5, 20), date(2025, 7, 1), 'month')
+        assert [(bucket['start'], bucket['end'], bucket['count']) for bucket in calendar['buckets']] == [
+            ('2025-05-01', '2025-05-31', 0), ('2025-06-01', '2025-06-30', 5), ('2025-07-01', '2025-07-31', 1)]
+        assert calendar['buckets'][1]['tasks'][0] == {
+            'id': calendar['buckets'][1]['tasks'][0]['id'], 'description': 'Draft outline', 'area': 'Work',
+            'status': 'done', 'priority': '', 'due_date': '2025-06-01', 'project': '', 'context': ''}
+
+    def test_bisects_only(self):
+        tree_index = index()
+        assert tree_index.due_between(date(2025, 6, 1), date(2025, 6, 30)) == (0, 5)
+        # One bisect per bucket, each within the slice of the range
+        with patch('dashboard.backend.due_calendar.bisect_left', wraps=bisect_left) as bisect:
+            due_calendar(tree_index, date(2025, 6, 1), date(2025, 7, 31), 'month')
+            assert bisect.call_count == 2
+            assert [call.args[2:] for call in bisect.call_args_list] == [(0, 6), (5, 6)]
+
+
+class TestEndpoint:
+    """Test GET /calendar"""
+
+    @pytest.fixture
+    def tasks_file(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        task_parser.invalidate_tasks_snapshot()
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.get_adjusted_today', return_value=TODAY), \
+             patch.object(app_module, 'get_adjusted_today', return_value=TODAY):
+            yield tasks_file
+        task_parser.invalidate_tasks_snapshot()
+
+    def test_calendar(self, tasks_file):
+        client = TestClient(app_module.app)
+        body = client.get("/calendar?from=2025-06-01&to=2025-06-30&granularity=month").json()
+        assert body['count'] == 5 and len(body['buckets']) == 1
+
+        # Defaults: from the adjusted today, by day
+        body = client.get("/calendar").json()
+        assert body['from'] == '2025-06-10' and len(body['buckets']) == 31
+        assert buckets(body) == [('2025-06-17', ['Write report']), ('2025-06-30', ['Pay rent']), ('2025-07-02', ['Fix tap'])]
+
+    def test_follows_file(self, tasks_file):
+        client = TestClient(app_module.app)
+        client.get("/calendar?from=2025-06-09&to=2025-06-09")
+        built = task_parser.get_task_index()
+        assert client.get("/calendar?from=2025-06-09&to=2025-06-09").json()['count'] == 2
+        assert task_parser.get_task_index() is built
+
+        tasks_file.write_text(TASKS.replace('Plan offsite', 'Plan offsite (due:2025-06-09)'))
+        assert client.get("/calendar?from=2025-06-09&to=2025-06-09").json()['count'] == 3
+
+    def test_invalid_params(self, tasks_file):
+        client = TestClient(app_module.app)
+        assert client.get("/calendar?granularity=year").status_code == 400
+        assert client.get("/calendar?from=June").status_code == 400
+        assert client.get("/calendar?from=2025-06-10&to=2025-06-01").status_code == 400
+        assert client.get("/calendar?from=2025-01-01&to=2030-01-01").status_code == 400
@@ -0,0 +1,101 @@
+"""
+Live Statistics Tests
+=====================
+
+Tests for live_stats.py and /statistics:
+- Subtask metadata inheritance
+- Incremental counter updates from task diffs
+- Re-bucketing of due-date counters on day change
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+from unittest.mock import patch
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.live_stats import StatisticsAggregator, parse_statistics_tasks, statistics_tasks
+import dashboard.backend.app as app_module
+
+TASKS = """Work:
+    - [ ] Write report priority:A +Report @Office due:2025-06-10
+        - [ ] Draft outline
+        - [x] Collect numbers @Home
+    - [ ] Call back due:2025-06-05
+
+Home:
+    - [x] Groceries +Errands due:2025-06-01
+"""
+
+
+def build(text):
+    aggregator = StatisticsAggregator()
+    aggregator.update(parse_statistics_tasks(text.splitlines(True)))
+    return aggregator
+
+
+class TestParsing:
+    """Test statistics records"""
+
+    def test_subtasks_inherit_unset_metadata(self):
+        tasks = parse_statistics_tasks(TASKS.splitlines(True))
+        assert len(tasks) == 5
+        outline, numbers = tasks[1], tasks[2]
+        assert (outline.priority, outline.projects, outline.contexts) == ('A', ('Report',), ('Office',))
+        assert outline.due == date(2025, 6, 10)
+        assert numbers.contexts == ('Home',)
+
+
+class TestAggregator:
+    """Test incremental counters"""
+
+    def test_counts(self):
+        stats = build(TASKS).statistics(date(2025, 6, 5))
+        assert stats == {
+            'total': 5, 'completed': 2, 'incomplete': 3, 'completion_pct': 40.0,
+            'priority_A': 3, 'project_Report': 3, 'project_Errands': 1,
+            'context_Office': 2, 'context_Home': 1,
+            'with_due_date': 5, 'overdue': 0, 'due_today': 1, 'due_this_week': 3,
+        }
+
+    def test_update_matches_full_rebuild(self):
+        aggregator = build(TASKS)
+        aggregator.statistics(date(2025, 6, 5))
+        edited = TASKS.replace("- [ ] Call back", "- [x] Call back").replace("        - [ ] Draft outline\n", "")
+        edited += "    - [ ] Paint fence +House due:2025-06-03\n"
+        assert aggregator.update(parse_statistics_tasks(edited.splitlines(True))) == 4
+        assert aggregator.statistics(date(2025, 6, 5)) == build(edited).statistics(date(2025, 6, 5))
+        assert 'project_House' in aggregator.statistics(date(2025, 6, 5))
+
+    def test_removed_tags_disappear(self):
+        aggregator = build(TASKS)
+        aggregator.update(parse_statistics_tasks(TASKS.replace(" +Errands", "").splitlines(True)))
+        assert 'project_Errands' not in aggregator.statistics(date(2025, 6, 5))
+
+    def test_day_change_rebuckets(self):
+        aggregator = build(TASKS)
+        assert aggregator.statistics(date(2025, 6, 5))['overdue'] == 0
+        stats = aggregator.statistics(date(2025, 6, 11))
+        assert (stats['overdue'], stats['due_today'], stats['due_this_week']) == (3, 0, 0)
+        assert aggregator.statistics(date(2025, 6, 4))['due_this_week'] == 3
+
+
+class TestStatisticsEndpoint:
+    """Test /statistics backed by the live counters"""
+
+    def test_reparses_only_on_change(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        app_module._live_statistics['aggregator'] = None
+        with patch('parser.tasks_file', str(tasks_file)), \
+                patch.object(app_module, 'statistics_tasks', wraps=statistics_tasks) as parse:
+            first = app_module.compute_task_statistics()
+            app_module.compute_task_statistics()
+            assert parse.call_count == 1
+            tasks_file.write_text(TASKS + "    - [ ] New task\n")
+            assert app_module.compute_task_statistics()['total'] == first['total'] + 1
+            assert parse.call_count == 2
+        app_module._live_statistics['aggregator'] = None
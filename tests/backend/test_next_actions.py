@@ -0,0 +1,144 @@
+"""
+Next Actions Tests
+==================
+
+Tests for next_actions.py and GET /tasks/next:
+- Urgency from priority, due proximity, follow-up and onhold state
+- Top-K selection and tie order
+- Scores refreshed only for changed tasks, all of them when the day turns
+- Endpoint parameters
+"""
+
+import heapq
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.next_actions import UrgencyRanking, urgency
+import dashboard.backend.app as app_module
+import parser as task_parser
+from task_index import walk_tasks
+from task_snapshot import snapshot_from_text
+
+TODAY = date(2025, 6, 10)
+WEIGHTS = app_module.URGENCY_WEIGHTS
+
+TASKS = """Work:
+    - [ ] Write report (priority:A due:2025-06-17) +Reports
+        - [ ] Collect numbers (due:2025-06-09)
+        - [x] Draft outline (priority:A due:2025-06-01)
+    - [ ] Chase invoice (followup:2025-06-08)
+    - [ ] Chase supplier (followup:2025-06-20)
+    - [ ] Plan offsite (priority:B)
+    - [ ] Wait (priority:A onhold:2025-06-30)
+Home:
+    - [ ] Fix tap (due:2025-06-24)
+    - [ ] Water plants
+"""
+
+
+def tree(text=TASKS, today=TODAY):
+    return task_parser.tasks_from_snapshot(snapshot_from_text(text), today)
+
+
+def ranking_tasks():
+    return [task for _, task, _ in walk_tasks(tree())]
+
+
+def ranked(ranking, k=10):
+    return [(task['description'], score) for score, task in ranking.top(k)]
+
+
+class TestUrgency:
+    """Test the score of single tasks"""
+
+    def test_components(self):
+        scores = {task['description']: urgency(task, TODAY, WEIGHTS) for task in ranking_tasks()}
+        assert scores['Collect numbers'] == 12.0  # overdue
+        assert scores['Write report'] == 6.0 + 6.0  # priority A, halfway through the horizon
+        assert scores['Fix tap'] == 0.0  # beyond the horizon
+        assert scores['Chase invoice'] == 4.0 and scores['Chase supplier'] == -3.0
+        assert scores['Wait'] == 6.0 - 10.0
+        assert scores['Draft outline'] is None
+
+
+class TestRanking:
+    """Test top-K selection and incremental refresh"""
+
+    def test_top_k(self):
+        ranking = UrgencyRanking(WEIGHTS)
+        ranking.update(tree(), TODAY)
+        assert ranked(ranking, 3) == [('Write report', 12.0), ('Collect numbers', 12.0), ('Chase invoice', 4.0)]
+        # Equal scores keep file order; done tasks are left out
+        assert [name for name, _ in ranked(ranking)][-4:] == ['Fix tap', 'Water plants', 'Chase supplier', 'Wait']
+        assert len(ranking.scores) == 8
+
+    def test_never_sorts_everything(self):
+        ranking = UrgencyRanking(WEIGHTS)
+        ranking.update(tree(), TODAY)
+        with patch('builtins.sorted', side_effect=AssertionError), \
+             patch('dashboard.backend.next_actions.heapq.nsmallest', wraps=heapq.nsmallest) as select:
+            ranking.top(2)
+            assert select.call_args[0][0] == 2
+
+    def test_only_changed_tasks_rescored(self):
+        ranking = UrgencyRanking(WEIGHTS)
+        assert ranking.update(tree(), TODAY) == 9
+        changed = TASKS.replace('Water plants', 'Water plants (priority:A due:2025-06-10)')
+        with patch('dashboard.backend.next_actions.urgency', wraps=urgency) as score:
+            assert ranking.update(tree(changed), TODAY) == 1
+            assert score.call_count == 1
+        assert ranked(ranking, 1) == [('Water plants', 18.0)]
+
+        # Moving lines does not rescore anything, and the tasks returned carry their new IDs
+        moved = "Home:\n    - [ ] New\n" + changed
+        assert ranking.update(tree(moved), TODAY) == 1
+        ids = {task['id'] for task in tree(moved)[0]['tasks']} | {task['id'] for task in tree(moved)[2]['tasks']}
+        assert ranking.top(1)[0][1]['id'] in ids
+
+    def test_day_turn_rescores_everything(self):
+        ranking = UrgencyRanking(WEIGHTS)
+        ranking.update(tree(), TODAY)
+        later = date(2025, 6, 24)
+        assert ranking.update(tree(today=later), later) == 9
+        assert ('Fix tap', 12.0) in ranked(ranking)
+
+
+class TestEndpoint:
+    """Test GET /tasks/next"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        app_module._urgency_ranking.update({'tasks_signature': None, 'ranking': None})
+        task_parser.invalidate_tasks_snapshot()
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.get_adjusted_today', return_value=TODAY), \
+             patch.object(app_module, 'get_adjusted_today', return_value=TODAY):
+            yield TestClient(app_module.app)
+        app_module._urgency_ranking.update({'tasks_signature': None, 'ranking': None})
+        task_parser.invalidate_tasks_snapshot()
+
+    def test_next(self, client):
+        body = client.get("/tasks/next?k=2").json()
+        assert body['today'] == '2025-06-10' and body['candidates'] == 8
+        assert [(task['description'], task['urgency']) for task in body['tasks']] == [
+            ('Write report', 12.0), ('Collect numbers', 12.0)]
+        assert body['tasks'][1]['subtasks'] == []
+
+    def test_weights_configurable(self, client):
+        weights = {**WEIGHTS, 'onhold': 20.0}
+        with patch.object(app_module, 'URGENCY_WEIGHTS', weights):
+            assert client.get("/tasks/next?k=1").json()['tasks'][0]['description'] == 'Wait'
+
+    def test_invalid_k(self, client):
+        assert client.get("/tasks/next?k=0").status_code == 400
+        assert client.get("/tasks/next?k=1000").status_code == 400
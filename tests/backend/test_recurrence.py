@@ -0,0 +1,284 @@
+"""
+Recurrence Rule Tests
+=====================
+
+Tests for recurrence.py and the expected-occurrence compliance join:
+- Pattern compilation
+- Next-occurrence and range queries
+- Vectorized expansion agrees with per-day checks
+- Occurrence horizon index
+- Compliance counts days with nothing logged
+- Recurring snapshot ID lookup and check-off
+"""
+
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.recurrence import (
+    compile_rule, expected_occurrences, parse_filter_window, OccurrenceIndex,
+    DailyRule, WeeklyRule, MonthlyRule, YearlyRule, IntervalRule
+)
+import dashboard.backend.app as app_module
+from dashboard.backend.app import compute_enhanced_compliance
+
+
+PATTERNS = ['daily', 'weekly:Mon,Wed,Fri', 'weekly:Sun', 'monthly:15', 'monthly:31',
+            'yearly:02-29', 'yearly:12-31', 'custom:183d', 'custom:3d']
+
+
+class TestCompileRule:
+    """Test pattern compilation"""
+
+    def test_supported_patterns(self):
+        assert isinstance(compile_rule('daily'), DailyRule)
+        assert compile_rule('weekly:Mon,Wed,Fri').weekdays == [0, 2, 4]
+        assert isinstance(compile_rule('monthly:15'), MonthlyRule)
+        assert isinstance(compile_rule('yearly:07-04'), YearlyRule)
+        assert compile_rule('custom:183d').interval_days == 183
+
+    def test_unsupported_patterns(self):
+        for pattern in ['', 'weekly:Funday', 'monthly:0', 'yearly:Mar', 'quarterly:1', 'custom:abc']:
+            assert compile_rule(pattern) is None
+
+    def test_custom_anchor(self):
+        rule = compile_rule('custom:10d', date(2025, 1, 1))
+        assert isinstance(rule, IntervalRule)
+        assert rule.occurs_on(date(2025, 1, 11))
+        assert not rule.occurs_on(date(2025, 1, 12))
+        # Nothing before the anchor
+        assert not rule.occurs_on(date(2024, 12, 22))
+        assert rule.next_on_or_after(date(2024, 12, 20)) == date(2025, 1, 1)
+        ordinals = np.arange(date(2024, 12, 22).toordinal(), date(2025, 1, 12).toordinal())
+        assert [date.fromordinal(int(o)) for o in ordinals[rule.mask(ordinals)]] == [date(2025, 1, 1), date(2025, 1, 11)]
+
+
+class TestRangeQueries:
+    """next_after/occurrences_between must agree with a day-by-day scan"""
+
+    @pytest.mark.parametrize("pattern", PATTERNS)
+    def test_occurrences_between_matches_scan(self, pattern):
+        rule = compile_rule(pattern)
+        start, end = date(2023, 11, 20), date(2025, 2, 10)
+        scanned = [start + timedelta(days=i) for i in range((end - start).days + 1)
+                   if rule.occurs_on(start + timedelta(days=i))]
+        assert rule.occurrences_between(start, end) == scanned
+
+    @pytest.mark.parametrize("pattern", PATTERNS)
+    def test_next_after_is_strict(self, pattern):
+        rule = compile_rule(pattern)
+        day = date(2024, 12, 30)
+        following = rule.next_after(day)
+        assert following > day
+        assert rule.occurs_on(following)
+        assert not any(rule.occurs_on(day + timedelta(days=i)) for i in range(1, (following - day).days))
+
+    def test_multi_day_weekly(self):
+        rule = compile_rule('weekly:Mon,Wed,Fri')
+        assert rule.next_after(date(2025, 6, 2)) == date(2025, 6, 4)  # Mon -> Wed
+        assert rule.next_after(date(2025, 6, 6)) == date(2025, 6, 9)  # Fri -> Mon
+
+    def test_yearly_across_year_boundary(self):
+        rule = compile_rule('yearly:01-02')
+        assert rule.occurs_between(date(2025, 12, 29), date(2026, 1, 4))
+        assert rule.next_after(date(2025, 12, 29)) == date(2026, 1, 2)
+
+    def test_filter_windows(self):
+        today = date(2025, 6, 2)
+        assert parse_filter_window('today', today) == (today, today)
+        assert parse_filter_window('next7days', today) == (today, date(2025, 6, 8))
+        assert parse_filter_window('next30days', today) == (today, date(2025, 7, 1))
+        assert parse_filter_window('someday', today) is None
+
+
+class TestVectorizedExpansion:
+    """The NumPy mask must agree with occurs_on for every day"""
+
+    @pytest.mark.parametrize("pattern", PATTERNS)
+    def test_mask_matches_occurs_on(self, pattern):
+        rule = compile_rule(pattern)
+        start, end = date(2023, 12, 1), date(2025, 3, 31)
+        ordinals, matrix = expected_occurrences([rule], start, end)
+        expected = [rule.occurs_on(date.fromordinal(int(o))) for o in ordinals]
+        assert matrix[0].tolist() == expected
+
+    def test_month_end_clamping(self):
+        rule = compile_rule('monthly:31')
+        assert rule.occurs_on(date(2025, 2, 28))
+        assert rule.occurs_on(date(2025, 4, 30))
+        assert not rule.occurs_on(date(2025, 5, 30))
+
+    def test_missing_rule_row_is_empty(self):
+        ordinals, matrix = expected_occurrences([None, compile_rule('daily')], date(2025, 1, 1), date(2025, 1, 7))
+        assert not matrix[0].any()
+        assert matrix[1].all()
+
+
+def make_index_tasks():
+    return [
+        {'id': 'daily', 'recurring': 'daily', 'metadata': {}},
+        {'id': 'mwf', 'recurring': 'weekly:Mon,Wed,Fri', 'metadata': {}},
+        {'id': 'mid', 'recurring': 'monthly:15', 'metadata': {}},
+        {'id': 'newyear', 'recurring': 'yearly:01-01', 'metadata': {}},
+        {'id': 'unknown', 'recurring': 'quarterly:1', 'metadata': {}},
+    ]
+
+
+class TestOccurrenceIndex:
+    """Test the precomputed occurrence horizon"""
+
+    def test_index_matches_rules(self):
+        start = date(2025, 12, 1)
+        index = OccurrenceIndex(make_index_tasks(), start, horizon_days=60)
+        assert index.task_ids_on(date(2025, 12, 15)) == ['daily', 'mid', 'mwf']
+        assert index.task_ids_on(date(2026, 1, 1)) == ['daily', 'newyear']
+        assert 'unknown' not in index.rules
+        assert index.task_ids_between(date(2025, 12, 29), date(2026, 1, 4)) == ['daily', 'mwf', 'newyear']
+
+    def test_advance_matches_rebuild(self):
+        tasks = make_index_tasks()
+        index = OccurrenceIndex(tasks, date(2025, 12, 1), horizon_days=30)
+        index.advance(date(2025, 12, 20))
+        rebuilt = OccurrenceIndex(tasks, date(2025, 12, 20), horizon_days=30)
+        assert index.start == rebuilt.start and index.end == rebuilt.end
+        assert index.by_date == rebuilt.by_date
+
+    def test_query_beyond_horizon_uses_rules(self):
+        index = OccurrenceIndex(make_index_tasks(), date(2025, 6, 1), horizon_days=7)
+        assert index.task_ids_between(date(2026, 1, 1), date(2026, 1, 1)) == ['daily', 'newyear']
+
+    def test_rebuilt_when_file_changes(self, tmp_path):
+        recurring = tmp_path / "recurring_tasks.txt"
+        recurring.write_text("# Daily\n- [ ] Stretch [daily]\n")
+        with patch('parser.recurring_file', str(recurring)), \
+                patch.dict(app_module._recurring_index_cache, {'signature': None, 'parsed': None, 'index': None}):
+            _, first = app_module.get_recurring_occurrence_index()
+            _, again = app_module.get_recurring_occurrence_index()
+            assert again is first
+            assert len(first.rules) == 1
+
+            recurring.write_text("# Daily\n- [ ] Stretch [daily]\n- [ ] Run [weekly:Mon,Thu]\n")
+            _, rebuilt = app_module.get_recurring_occurrence_index()
+            assert rebuilt is not first
+            assert len(rebuilt.rules) == 2
+
+
+class TestRecurringSnapshot:
+    """Test the cached recurring snapshot and ID index"""
+
+    def test_snapshot_reused_until_file_changes(self, tmp_path):
+        recurring = tmp_path / "recurring_tasks.txt"
+        recurring.write_text("# Daily\n- [ ] Stretch [daily]\n    - [ ] Neck rolls [daily]\n")
+        task_parser = app_module.task_parser
+        with patch('parser.recurring_file', str(recurring)):
+            task_parser.invalidate_recurring_snapshot()
+            first = task_parser.get_recurring_snapshot()
+            assert task_parser.get_recurring_snapshot() is first
+            assert sorted(task['description'] for task in first['by_id'].values()) == ['Neck rolls', 'Stretch']
+
+            recurring.write_text("# Daily\n- [ ] Stretch [daily]\n- [ ] Run [weekly:Mon,Thu]\n")
+            changed = task_parser.get_recurring_snapshot()
+            assert changed is not first
+            assert len(changed['by_id']) == 2
+
+    def test_check_off_toggles_indexed_line(self, tmp_path):
+        recurring = tmp_path / "recurring_tasks.txt"
+        recurring.write_text("# Daily\n- [ ] Stretch [daily] +Health\n- [ ] Read [daily]\n")
+        task_parser = app_module.task_parser
+        with patch('parser.recurring_file', str(recurring)):
+            task_parser.invalidate_recurring_snapshot()
+            by_description = {task['description']: task_id
+                              for task_id, task in task_parser.get_recurring_snapshot()['by_id'].items()}
+
+            assert task_parser.check_off_recurring_task(by_description['Read'])
+            lines = recurring.read_text().splitlines()
+            assert lines[1] == "- [ ] Stretch [daily] +Health"
+            assert lines[2].startswith("- [x] Read [daily] (done:")
+
+            # The write drops the snapshot, so the next lookup sees the new state
+            assert task_parser.get_recurring_snapshot()['by_id'][by_description['Read']]['completed']
+            assert not task_parser.check_off_recurring_task('missing')
+
+
+class TestEnhancedCompliance:
+    """Test the expected-occurrence compliance join"""
+
+    def make_task(self, task_id, pattern, **metadata):
+        return {'id': task_id, 'type': 'recurring_task', 'description': task_id, 'recurring': pattern,
+                'metadata': metadata}
+
+    def log(self, day, status, hour=12):
+        timestamp = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+        return (day, status, timestamp)
+
+    def test_unlogged_days_lower_compliance(self):
+        start = date(2025, 6, 2)  # Monday
+        end = start + timedelta(days=6)
+        tasks = [self.make_task('daily', 'daily')]
+        status_data = {'daily': [self.log(start, 'COMPLETED'), self.log(start + timedelta(days=1), 'COMPLETED')]}
+
+        result = compute_enhanced_compliance(tasks, status_data, start, end)
+
+        assert result['summary']['expected'] == 7
+        assert result['summary']['completed'] == 2
+        assert result['summary']['unlogged'] == 5
+        assert result['summary']['compliance_pct'] == pytest.approx(28.57)
+        assert len(result['data']) == 7
+
+    def test_latest_status_wins_and_off_days_ignored(self):
+        start = date(2025, 6, 2)  # Monday
+        end = start + timedelta(days=6)
+        tasks = [self.make_task('mwf', 'weekly:Mon,Wed,Fri')]
+        status_data = {'mwf': [
+            self.log(start, 'MISSED', hour=9),
+            self.log(start, 'COMPLETED', hour=20),
+            self.log(start + timedelta(days=1), 'COMPLETED'),  # Tuesday is not expected
+        ]}
+
+        result = compute_enhanced_compliance(tasks, status_data, start, end, task_id='mwf')
+
+        assert [row['date'] for row in result['data']] == ['2025-06-02', '2025-06-04', '2025-06-06']
+        assert result['summary'] == {
+            'expected': 3, 'completed': 1, 'missed': 0, 'deferred': 0, 'unlogged': 2, 'compliance_pct': 33.33
+        }
+        assert result['data'][0]['task_id'] == 'mwf'
+
+    def test_moving_average_and_trend(self):
+        start = date(2025, 6, 1)
+        end = start + timedelta(days=9)
+        tasks = [self.make_task('daily', 'daily', start='2025-06-01')]
+        status_data = {'daily': [self.log(start + timedelta(days=i), 'COMPLETED') for i in range(5, 10)]}
+
+        result = compute_enhanced_compliance(tasks, status_data, start, end, moving_average=2, include_trend=True)
+
+        assert result['data'][5]['moving_average_pct'] == 50.0
+        assert result['data'][6]['moving_average_pct'] == 100.0
+        assert result['summary']['trend']['direction'] == 'improving'
+
+    def test_counted_from_when_task_began(self):
+        start = date(2025, 6, 1)
+        end = start + timedelta(days=9)
+        tasks = [self.make_task('logged', 'daily'), self.make_task('started', 'daily', start='2025-06-08'),
+                 self.make_task('every3', 'custom:3d', due='2025-06-05'), self.make_task('silent', 'daily')]
+        status_data = {'logged': [self.log(date(2025, 6, 7), 'COMPLETED')],
+                       'started': [self.log(date(2025, 6, 6), 'MISSED'), self.log(date(2025, 6, 9), 'COMPLETED')]}
+
+        result = compute_enhanced_compliance(tasks, status_data, start, end)
+
+        expected = {task['task_id']: task['expected'] for task in result['tasks']}
+        # From the first log entry, the start date (or an earlier log entry), the interval anchor;
+        # a task with neither counts over the whole window
+        assert expected == {'logged': 4, 'started': 5, 'every3': 2, 'silent': 10}
+
+    def test_no_tasks(self):
+        result = compute_enhanced_compliance([], {}, date(2025, 1, 1), date(2025, 1, 31))
+        assert result['data'] == []
+        assert result['summary']['expected'] == 0
@@ -0,0 +1,147 @@
+"""
+Saved Views Tests
+=================
+
+Tests for saved_views.py and the /views endpoints:
+- Reading saved_views.txt
+- Results maintained from parse diffs, evaluating only changed tasks
+- Rebuilding when the adjusted day changes
+- GET /views/{name} with ETag and If-None-Match
+"""
+
+import json
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.saved_views import SavedView, SavedViewSet, parse_views_text
+import dashboard.backend.app as app_module
+import parser as task_parser
+from task_snapshot import snapshot_from_text
+
+TODAY = date(2025, 6, 10)
+
+TASKS = """Work:
+    - [ ] Write report (priority:A due:2025-06-12) +Reports @Office
+        - [ ] Call finance (due:2025-06-11) @Phone
+    - [ ] Plan offsite (priority:A) @Office
+Home:
+    - [ ] Call plumber (due:2025-06-30) @Phone
+"""
+
+VIEWS = """# name | query | sort
+phone-this-week | @Phone due<+7d
+work-a | &Work priority:A | priority
+"""
+
+
+def tree(text=TASKS, today=TODAY):
+    return task_parser.tasks_from_snapshot(snapshot_from_text(text), today)
+
+
+def names(view_set, name):
+    body = view_set.get(name)['body']
+    return [task['description'] for task in json.loads(body)['tasks']]
+
+
+class TestConfig:
+    """Test reading saved_views.txt"""
+
+    def test_views_and_errors(self):
+        views, errors = parse_views_text(VIEWS + "bad name | @Home\nwork-a | @Home\nx | @Home | later\nonly-name\n")
+        assert views == [SavedView('phone-this-week', '@Phone due<+7d', 'due'),
+                         SavedView('work-a', '&Work priority:A', 'priority')]
+        assert len(errors) == 4 and errors[1] == "Line 5: duplicate view work-a"
+
+
+class TestMaintenance:
+    """Test results kept up to date from parse diffs"""
+
+    def test_initial_results(self):
+        view_set = SavedViewSet(parse_views_text(VIEWS)[0])
+        assert view_set.update(tree(), TODAY) == ['phone-this-week', 'work-a']
+        assert names(view_set, 'phone-this-week') == ['Call finance']
+        assert names(view_set, 'work-a') == ['Write report', 'Plan offsite']
+
+    def test_only_changed_tasks_evaluated(self):
+        view_set = SavedViewSet(parse_views_text(VIEWS)[0])
+        view_set.update(tree(), TODAY)
+        etag = view_set.get('work-a')['etag']
+        evaluated = []
+        for entry in view_set.views.values():
+            predicate = entry['predicate']
+            entry['predicate'] = lambda task, predicate=predicate: evaluated.append(task['description']) or predicate(task)
+        changed = TASKS.replace('Call plumber (due:2025-06-30)', 'Call plumber (due:2025-06-13)')
+        assert view_set.update(tree(changed), TODAY) == ['phone-this-week']
+        # One predicate call per view, on the edited task only
+        assert evaluated == ['Call plumber', 'Call plumber']
+        assert names(view_set, 'phone-this-week') == ['Call finance', 'Call plumber']
+        assert view_set.get('work-a')['etag'] == etag
+
+    def test_moved_tasks_carry_new_ids(self):
+        view_set = SavedViewSet(parse_views_text(VIEWS)[0])
+        view_set.update(tree(), TODAY)
+        moved = TASKS.replace("Work:\n", "Work:\n    - [ ] New task\n")
+        assert view_set.update(tree(moved), TODAY) == ['phone-this-week', 'work-a']
+        ids = {task['id'] for task in task_parser.tasks_from_snapshot(snapshot_from_text(moved), TODAY)[0]['tasks']}
+        assert names(view_set, 'work-a') == ['Write report', 'Plan offsite']
+        assert {task['id'] for task in json.loads(view_set.get('work-a')['body'])['tasks']} <= ids
+
+    def test_day_change_rebuilds(self):
+        view_set = SavedViewSet(parse_views_text(VIEWS)[0])
+        view_set.update(tree(), TODAY)
+        view_set.update(tree(), date(2025, 6, 24))
+        assert names(view_set, 'phone-this-week') == ['Call finance', 'Call plumber']
+
+    def test_invalid_query(self):
+        view_set = SavedViewSet([SavedView('broken', 'status:later')])
+        view_set.update(tree(), TODAY)
+        assert view_set.get('broken')['error'].startswith('status:')
+        assert view_set.summary()[0]['count'] == 0
+
+
+class TestEndpoints:
+    """Test GET /views and /views/{name}"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        views_file = tmp_path / "saved_views.txt"
+        views_file.write_text(VIEWS + "broken | status:later\n")
+        app_module._saved_views.update({'signature': None, 'tasks_signature': None, 'views': None, 'errors': []})
+        task_parser.invalidate_tasks_snapshot()
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch.object(app_module, 'SAVED_VIEWS_FILE', str(views_file)), \
+             patch('parser.get_adjusted_today', return_value=TODAY), \
+             patch.object(app_module, 'get_adjusted_today', return_value=TODAY):
+            yield TestClient(app_module.app), tasks_file
+        app_module._saved_views.update({'signature': None, 'tasks_signature': None, 'views': None, 'errors': []})
+        task_parser.invalidate_tasks_snapshot()
+
+    def test_view_with_etag(self, client):
+        client, tasks_file = client
+        response = client.get("/views/work-a")
+        assert response.status_code == 200
+        assert [task['description'] for task in response.json()['tasks']] == ['Write report', 'Plan offsite']
+        etag = response.headers['etag']
+        assert client.get("/views/work-a", headers={'If-None-Match': etag}).status_code == 304
+        assert client.get("/views/work-a", headers={'If-None-Match': 'W/' + etag}).status_code == 304
+
+        tasks_file.write_text(TASKS.replace('Plan offsite (priority:A)', 'Plan offsite (priority:B)'))
+        response = client.get("/views/work-a", headers={'If-None-Match': etag})
+        assert response.status_code == 200 and response.json()['count'] == 1
+
+    def test_listing_and_errors(self, client):
+        client, _ = client
+        listing = client.get("/views").json()
+        assert [view['name'] for view in listing['views']] == ['phone-this-week', 'work-a', 'broken']
+        assert client.get("/views/unknown").status_code == 404
+        assert client.get("/views/broken").status_code == 400
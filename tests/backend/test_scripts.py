@@ -131,6 +131,21 @@ Personal:
             # Should not crash
             assert result.returncode in [0, 1]  # Might fail if no output dir
 
+    def test_followups_kept_as_notes(self, tmp_path):
+        """Test that indented [%] follow-ups are carried along with their task"""
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text("""Work:
+    - [ ] Write report (priority:A)
+        - [%] Ask for numbers (followup:2025-06-12)
+        - [ ] Collect numbers
+""")
+        from sort_tasks import parse_tasks
+
+        tasks = parse_tasks(str(tasks_file))
+        report = tasks[1]
+        assert [subtask['content'] for subtask in report['subtasks']] == ['Collect numbers']
+        assert [note['content'] for note in report['notes']] == ['        - [%] Ask for numbers (followup:2025-06-12)']
+
 class TestStatistics:
     """Test statistics.py functionality"""
     
@@ -0,0 +1,122 @@
+"""
+Time-Series Query Tests
+=======================
+
+Tests for series_query.py and /statistics/time-series?metrics=:
+- Date-axis alignment and outer joins
+- Metric list parsing
+- Metric selection across statistics and compliance
+"""
+
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.series_query import align, outer_join, parse_metric_list, union_axis
+from dashboard.backend.status_log import StatusLog
+from dashboard.backend.timeseries_store import TimeSeriesStore
+import dashboard.backend.app as app_module
+
+
+class TestAlignment:
+    """Test the vectorized date-axis join"""
+
+    def test_align_fills_missing_with_nan(self):
+        aligned = align(np.array([1, 2, 3, 5]), np.array([2, 5, 9]), {'v': np.array([20.0, 50.0, 90.0])})
+        assert np.isnan(aligned['v'][[0, 2]]).all()
+        assert aligned['v'][[1, 3]].tolist() == [20.0, 50.0]
+
+    def test_outer_join(self):
+        axis, columns = outer_join((np.array([1, 3]), {'a': np.array([1.0, 3.0])}),
+                                   (np.array([2, 3]), {'b': np.array([20.0, 30.0])}))
+        assert axis.tolist() == [1, 2, 3]
+        assert np.isnan(columns['a'][1]) and np.isnan(columns['b'][0])
+        assert columns['a'][2] == 3.0 and columns['b'][2] == 30.0
+
+    def test_empty_inputs(self):
+        assert union_axis().tolist() == []
+        assert np.isnan(align(np.array([1, 2]), np.array([], dtype=np.int64), {'v': np.array([])})['v']).all()
+
+    def test_parse_metric_list(self):
+        assert parse_metric_list(' overdue, compliance_pct,,overdue ') == ['overdue', 'compliance_pct']
+        assert parse_metric_list(None) == []
+
+
+class TestMetricSelection:
+    """Test /statistics/time-series?metrics="""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        store = TimeSeriesStore(str(tmp_path / "timeseries"))
+        store.append(datetime(2025, 6, 1, 20, 0, 0), {'total': 10, 'overdue': 1, 'project_+Work': 4})
+        store.append(datetime(2025, 6, 2, 20, 0, 0), {'total': 12, 'overdue': 2})
+        log = StatusLog(str(tmp_path / "recurring_status_log.txt"), app_module.get_adjusted_date, fsync='never')
+        log.append_batch([('a', 'completed', 'A'), ('b', 'missed', 'B')], datetime(2025, 6, 2, 12, 0, 0))
+        log.append('a', 'completed', 'A', datetime(2025, 6, 3, 12, 0, 0))
+        with patch.object(app_module, 'get_statistics_store', return_value=store), \
+                patch.object(app_module, 'get_status_log', return_value=log):
+            app_module._series_cache.clear()
+            yield TestClient(app_module.app)
+        app_module._series_cache.clear()
+
+    def test_selected_columns_only(self, client):
+        data = client.get("/statistics/time-series?metrics=overdue,compliance_pct,project_%2BWork").json()
+        assert data == [
+            {'date': '2025-06-01', 'overdue': 1, 'compliance_pct': None, 'project_+Work': 4},
+            {'date': '2025-06-02', 'overdue': 2, 'compliance_pct': 50.0, 'project_+Work': None},
+            {'date': '2025-06-03', 'overdue': None, 'compliance_pct': 100.0, 'project_+Work': None},
+        ]
+
+    def test_compliance_counts_sum_per_bucket(self, client):
+        data = client.get("/statistics/time-series?metrics=compliance_total,compliance_pct&resolution=month").json()
+        assert data == [{'date': '2025-06-01', 'compliance_total': 3, 'compliance_pct': 66.67}]
+
+    def test_default_shape_attaches_compliance(self, client):
+        data = client.get("/statistics/time-series").json()
+        assert [row['date'] for row in data] == ['2025-06-01', '2025-06-02']
+        assert data[0]['compliance'] is None
+        assert data[1]['compliance']['total'] == 2
+
+    def test_unknown_metric(self, client):
+        assert client.get("/statistics/time-series?metrics=overdue,bogus").status_code == 400
+        assert client.get("/statistics/time-series?metrics=").status_code == 400
+
+    def test_days_cutoff_keys_cache_per_day(self, client):
+        with patch.object(app_module, 'get_adjusted_today', return_value=date(2025, 6, 3)):
+            first = client.get("/statistics/time-series/filtered?days=1").json()
+            assert client.get("/statistics/time-series/filtered?days=1").json() == first
+        # Cut at the start of the adjusted day, one cache entry for both requests
+        assert [row['date'] for row in first] == ['2025-06-02']
+        assert len(app_module._series_cache._entries) == 1
+
+
+class TestTagSeries:
+    """Test /statistics/tags/{dimension}/{tag}"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        store = TimeSeriesStore(str(tmp_path / "timeseries"))
+        store.append(datetime(2025, 6, 1, 9, 0, 0), {'total': 10, 'project_+Work': 4})
+        store.append(datetime(2025, 6, 1, 20, 0, 0), {'total': 10, 'project_Work': 3})
+        store.append(datetime(2025, 6, 2, 9, 0, 0), {'total': 10, 'project_Work': 2})
+        store.append(datetime(2025, 6, 2, 20, 0, 0), {'total': 10})  # Work dropped to 0
+        store.append(datetime(2025, 6, 3, 20, 0, 0), {'total': 10})
+        with patch.object(app_module, 'get_statistics_store', return_value=store):
+            yield TestClient(app_module.app)
+
+    def test_latest_snapshot_per_day(self, client):
+        # Spellings with and without the + prefix are one tag; days where it was absent count 0
+        assert client.get("/statistics/tags/project/Work").json() == [
+            {'date': '2025-06-01', 'count': 3}, {'date': '2025-06-02', 'count': 0}, {'date': '2025-06-03', 'count': 0}]
+        with patch.object(app_module, 'get_adjusted_today', return_value=date(2025, 6, 3)):
+            assert [row['date'] for row in client.get("/statistics/tags/project/+Work?days=1").json()] == [
+                '2025-06-02', '2025-06-03']
@@ -0,0 +1,203 @@
+"""
+Shadow Index Tests
+==================
+
+Tests for shadow_index.py and the index query endpoints:
+- Rows mirrored from tasks, recurring tasks, archive and list files
+- Syncing only changed sources and only changed rows
+- Appending status log lines without re-reading the log
+- Read-only queries
+- POST /index/query and "index" analytics sub-queries
+"""
+
+import sqlite3
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.shadow_index import ShadowIndex, archive_rows, task_rows
+import dashboard.backend.app as app_module
+import parser as task_parser
+from task_snapshot import snapshot_from_text
+
+TASKS = """Work:
+    - [ ] Write report (priority:A due:2025-06-10) +Report @Office
+        Remember the appendix
+        - [x] Draft outline (done:2025-06-02)
+    - [ ] Wait (onhold:2025-06-12) +Report
+"""
+
+ARCHIVE = """Archived on 2025-07-08 21:50:21
+    - [ ] Plan trip (priority:B) +Travel @Home &Personal
+        - [x] Book flights (done:2025-07-06)
+
+[2025-06-30] Review milestone (priority:A done:2025-06-30) +Work @Office
+"""
+
+# Never finishes on its own; fetchmany(limit) cannot stop an aggregate
+RUNAWAY_SQL = "WITH RECURSIVE r(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM r) SELECT count(*) FROM r"
+
+
+def tree(text, today=date(2025, 6, 10)):
+    return task_parser.tasks_from_snapshot(snapshot_from_text(text), today)
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ShadowIndex(str(tmp_path / "index.sqlite3"))
+    yield index
+    index.close()
+
+
+class TestRows:
+    """Test the rows built from parsed files"""
+
+    def test_task_rows(self):
+        rows = task_rows(tree(TASKS))
+        report, outline, wait = rows['tasks']
+        assert report[2:8] == ('Work', 1, 'Write report', 'incomplete', 0, 'A') and report[8] == '2025-06-10'
+        assert outline[1] == report[0] and outline[5] == 'done' and outline[9] == '2025-06-02'
+        assert wait[5] == 'onhold' and wait[11] == '2025-06-12'
+        assert rows['task_tags'] == [(report[0], 'project', 'Report'), (report[0], 'context', 'Office'),
+                                     (wait[0], 'project', 'Report')]
+        assert rows['notes'] == [(report[0], 0, 'Remember the appendix')]
+
+    def test_archive_rows(self):
+        plan, flights, review = archive_rows(ARCHIVE)['archive']
+        assert plan[:7] == ('2025-07-08 21:50:21', 0, 1, 0, 'Personal', 'Plan trip', 'B')
+        assert flights[:6] == ('2025-07-08 21:50:21', 1, 2, 1, 'Personal', 'Book flights')
+        assert review == ('2025-06-30', 0, 0, 1, None, 'Review milestone', 'A', None, '2025-06-30', 'Work', 'Office')
+        # A new batch on top leaves the keys of older records unchanged
+        newer = archive_rows("Archived on 2025-07-09 08:00:00\n    - [x] New &Work\n\n" + ARCHIVE)['archive']
+        assert newer[1:] == [plan, flights, review]
+
+
+class TestSync:
+    """Test incremental syncing"""
+
+    def build(self, text, today=date(2025, 6, 10)):
+        tasks = tree(text, today)
+        return lambda: (task_rows(tasks), task_parser.onhold_expiry(tasks))
+
+    def test_unchanged_version_skips_build(self, index):
+        assert index.sync_source('tasks', 'tasks.txt', 'v1', self.build(TASKS), date(2025, 6, 10))
+        assert not index.sync_source('tasks', 'tasks.txt', 'v1', self.build(TASKS), date(2025, 6, 11))
+        assert index.query("SELECT count(*) AS n FROM tasks")[0]['n'] == 3
+
+    def test_expired_rows_resynced(self, index):
+        index.sync_source('tasks', 'tasks.txt', 'v1', self.build(TASKS), date(2025, 6, 10))
+        assert index.sync_source('tasks', 'tasks.txt', 'v1', self.build(TASKS, date(2025, 6, 12)), date(2025, 6, 12))
+        assert [row['status'] for row in index.query("SELECT status FROM tasks WHERE description = 'Wait'")] == ['incomplete']
+
+    def test_only_changed_rows_written(self, index):
+        index.sync_source('tasks', 'tasks.txt', 'v1', self.build(TASKS), date(2025, 6, 10))
+        before = index._conn.total_changes
+        changed = TASKS.replace('(priority:A due:2025-06-10)', '(priority:B due:2025-06-10)')
+        index.sync_source('tasks', 'tasks.txt', 'v2', self.build(changed), date(2025, 6, 10))
+        # One row deleted and re-inserted, plus the source record
+        assert index._conn.total_changes - before == 3
+        rows = index.query("SELECT priority FROM tasks WHERE description = 'Write report'")
+        assert rows == [{'priority': 'B'}]
+
+    def test_status_log_appends(self, index, tmp_path):
+        log_file = tmp_path / "recurring_status_log.txt"
+        log_file.write_text("2025-06-02 02:00:00 | COMPLETED | a1 | Stretch\n")
+        assert index.sync_status_log(str(log_file), app_module.get_adjusted_date) == 1
+        with open(log_file, 'a') as f:
+            f.write("2025-06-02 22:00:00 | MISSED | b2 | Read\n2025-06-03 09:")
+        assert index.sync_status_log(str(log_file)) == 1
+        assert index.sync_status_log(str(log_file)) == 0
+        rows = index.query("SELECT date, status, task_id FROM status_log ORDER BY byte_offset")
+        # The first entry was before 3 AM and counts for the previous day
+        assert rows == [{'date': '2025-06-01', 'status': 'COMPLETED', 'task_id': 'a1'},
+                        {'date': '2025-06-02', 'status': 'MISSED', 'task_id': 'b2'}]
+        # A rewritten log is read again
+        log_file.write_text("2025-06-04 10:00:00 | DEFERRED | c3 | Run\n")
+        assert index.sync_status_log(str(log_file)) == 1
+        assert index.query("SELECT task_id FROM status_log") == [{'task_id': 'c3'}]
+
+    def test_remove_source(self, index):
+        index.sync_source('tasks', 'tasks.txt', 'v1', self.build(TASKS), date(2025, 6, 10))
+        index.remove_source('tasks.txt')
+        assert index.sources() == []
+        assert index.query("SELECT count(*) AS n FROM task_tags")[0]['n'] == 0
+
+
+class TestQuery:
+    """Test read-only querying"""
+
+    @pytest.mark.parametrize("sql", [
+        "DELETE FROM tasks",
+        "CREATE TABLE other (a)",
+        "ATTACH DATABASE 'other.db' AS other",
+        "PRAGMA journal_mode = DELETE",
+    ])
+    def test_writes_refused(self, index, sql):
+        with pytest.raises(sqlite3.DatabaseError):
+            index.query(sql)
+
+    def test_limit_and_params(self, index):
+        index.sync_source('tasks', 'tasks.txt', 'v1', lambda: (task_rows(tree(TASKS)), None))
+        rows = index.query("SELECT t.description FROM tasks t JOIN task_tags g ON g.task_id = t.id "
+                           "WHERE g.kind = ? AND g.tag = ? ORDER BY t.description", ['project', 'Report'])
+        assert [row['description'] for row in rows] == ['Wait', 'Write report']
+        assert len(index.query("SELECT id FROM tasks", limit=2)) == 2
+
+    def test_timeout(self, index):
+        with pytest.raises(sqlite3.OperationalError, match="interrupted"):
+            index.query(RUNAWAY_SQL, timeout=0.05)
+        assert index.query("SELECT 1 AS one", timeout=0.05) == [{'one': 1}]
+
+
+class TestEndpoints:
+    """Test the query endpoints on the app's index"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        app_module._shadow_index.update({'path': None, 'index': None})
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch.object(app_module, 'SHADOW_INDEX_FILE', str(tmp_path / "index.sqlite3")), \
+             patch('parser.get_adjusted_today', return_value=date(2025, 6, 10)), \
+             patch.object(app_module, 'get_adjusted_today', return_value=date(2025, 6, 10)):
+            task_parser.invalidate_tasks_snapshot()
+            yield TestClient(app_module.app)
+        if app_module._shadow_index['index']:
+            app_module._shadow_index['index'].close()
+        app_module._shadow_index.update({'path': None, 'index': None})
+        task_parser.invalidate_tasks_snapshot()
+
+    def test_index_query(self, client):
+        response = client.post("/index/query", json={
+            'sql': "SELECT status, count(*) AS n FROM tasks WHERE source LIKE ? GROUP BY status ORDER BY status",
+            'params': ['%tasks.txt']})
+        assert response.status_code == 200
+        assert response.json()['rows'] == [{'status': 'done', 'n': 1}, {'status': 'incomplete', 'n': 1},
+                                           {'status': 'onhold', 'n': 1}]
+        assert client.post("/index/query", json={'sql': "DROP TABLE tasks"}).status_code == 400
+
+    def test_runaway_query(self, client):
+        with patch.object(app_module, 'SHADOW_INDEX_QUERY_TIMEOUT', 0.05):
+            response = client.post("/index/query", json={'sql': RUNAWAY_SQL})
+        assert response.status_code == 400 and 'interrupted' in response.json()['detail']
+
+    def test_analytics_sub_query(self, client):
+        response = client.post("/analytics/query", json={'queries': [
+            {'id': 'n', 'type': 'index', 'sql': "SELECT count(*) AS n FROM notes"},
+            {'id': 'bad', 'type': 'index'},
+        ]})
+        results = response.json()['results']
+        assert results[0]['data'] == [{'n': 1}]
+        assert results[1]['status'] == 400
+
+    def test_disabled(self, client):
+        with patch.object(app_module, 'SHADOW_INDEX_ENABLED', False):
+            assert client.post("/index/query", json={'sql': "SELECT 1"}).status_code == 404
@@ -0,0 +1,125 @@
+"""
+Snapshot File Tests
+===================
+
+Tests for snapshot_file.py and the parsers storing their output in it:
+- Sections keyed on content digest and parser version
+- Damaged, foreign or disabled snapshots falling back to a parse
+- The task tree, recurring tasks and list items loaded without re-parsing
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+import snapshot_file
+from snapshot_file import cached_parse, content_digest, load_section, snapshot_path, store_section
+import parser as task_parser
+import task_snapshot
+import dashboard.backend.app as app_module
+
+
+class TestSections:
+    """Test storing and loading sections"""
+
+    def test_round_trip(self, tmp_path):
+        data_file = str(tmp_path / "tasks.txt")
+        digest = content_digest("one\n")
+        store_section(data_file, digest, 'lines', 1, [('a', 1)])
+        assert Path(snapshot_path(data_file)).name == ".tasks.txt.snapshot"
+        assert load_section(data_file, digest, 'lines', 1) == [('a', 1)]
+
+    def test_other_content_or_version_misses(self, tmp_path):
+        data_file = str(tmp_path / "tasks.txt")
+        digest = content_digest("one\n")
+        store_section(data_file, digest, 'lines', 1, ['x'])
+        assert load_section(data_file, content_digest("two\n"), 'lines', 1) is None
+        assert load_section(data_file, digest, 'lines', 2) is None
+        assert load_section(data_file, digest, 'tree', 1) is None
+
+    def test_sections_kept_for_same_content(self, tmp_path):
+        data_file = str(tmp_path / "tasks.txt")
+        digest = content_digest("one\n")
+        store_section(data_file, digest, 'lines', 1, 'L')
+        store_section(data_file, digest, 'tree', 1, 'T')
+        assert load_section(data_file, digest, 'lines', 1) == 'L'
+        # New content replaces every section
+        store_section(data_file, content_digest("two\n"), 'tree', 1, 'T2')
+        assert load_section(data_file, digest, 'lines', 1) is None
+
+    def test_damaged_snapshot_ignored(self, tmp_path):
+        data_file = str(tmp_path / "tasks.txt")
+        digest = content_digest("one\n")
+        store_section(data_file, digest, 'lines', 1, 'L')
+        path = Path(snapshot_path(data_file))
+        path.write_bytes(path.read_bytes()[:-5])
+        assert load_section(data_file, digest, 'lines', 1) is None
+        path.write_bytes(b'not a snapshot')
+        assert load_section(data_file, digest, 'lines', 1) is None
+        with patch('snapshot_file.SNAPSHOT_FILE_FORMAT', snapshot_file.SNAPSHOT_FILE_FORMAT + 1):
+            store_section(data_file, digest, 'lines', 1, 'L')
+        assert load_section(data_file, digest, 'lines', 1) is None
+
+    def test_cached_parse_and_disabled(self, tmp_path):
+        data_file = str(tmp_path / "list.txt")
+        calls = []
+        parse = lambda text: calls.append(text) or text.upper()
+        assert cached_parse(data_file, "abc", 'list', 1, parse) == "ABC"
+        assert cached_parse(data_file, "abc", 'list', 1, parse) == "ABC"
+        assert calls == ["abc"]
+        with patch('snapshot_file.PERSISTENT_SNAPSHOTS', False):
+            cached_parse(data_file, "abc", 'list', 1, parse)
+            cached_parse(data_file, "new", 'list', 1, parse)
+        assert calls == ["abc", "abc", "new"]
+        assert load_section(data_file, content_digest("new"), 'list', 1) is None
+
+
+class TestParsers:
+    """Test the parsers loading from snapshots after a restart"""
+
+    def test_task_tree_loaded_after_restart(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text("Work:\n    - [ ] Wait (onhold:2025-06-12)\n    - [ ] Do it\n")
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.get_adjusted_today', return_value=date(2025, 6, 10)):
+            task_parser.invalidate_tasks_snapshot()
+            first = task_parser.parse_tasks_raw()
+            # A new process has neither the tree nor the lines in memory
+            task_parser.invalidate_tasks_snapshot()
+            task_snapshot._snapshots.clear()
+            with patch('parser.tasks_from_snapshot', side_effect=AssertionError("parsed again")):
+                assert task_parser.parse_tasks_raw() == first
+            assert task_parser.get_tasks_valid_until() == date(2025, 6, 12)
+
+        # Once the onhold expires the stored tree is rebuilt
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.get_adjusted_today', return_value=date(2025, 6, 12)), \
+             patch('parser.tasks_from_snapshot', wraps=task_parser.tasks_from_snapshot) as parse:
+            task_parser.invalidate_tasks_snapshot()
+            expired = task_parser.parse_tasks_raw()
+        assert parse.call_count == 1 and expired[0]['tasks'][0]['status'] == 'incomplete'
+
+    def test_recurring_loaded_after_restart(self, tmp_path):
+        recurring_file = tmp_path / "recurring_tasks.txt"
+        recurring_file.write_text("- [ ] Water plants (every:day id:abc123)\n")
+        with patch('parser.recurring_file', str(recurring_file)):
+            task_parser.invalidate_recurring_snapshot()
+            first = task_parser.get_recurring_snapshot()
+            task_parser.invalidate_recurring_snapshot()
+            with patch('parser.parse_recurring_lines', side_effect=AssertionError("parsed again")):
+                second = task_parser.get_recurring_snapshot()
+            task_parser.invalidate_recurring_snapshot()
+        assert second['tasks'] == first['tasks'] and second['by_id'] == first['by_id']
+        assert second['lines'] == first['lines']
+
+    def test_list_items_loaded_after_restart(self, tmp_path):
+        list_file = tmp_path / "groceries.txt"
+        list_file.write_text("Produce:\n    - [ ] Apples (quantity:3)\n    - [x] Pears\n")
+        first = app_module.parse_list_file(str(list_file))
+        assert [item['text'] for item in first] == ['Produce', 'Apples', 'Pears']
+        with patch.object(app_module, 'parse_list_text', side_effect=AssertionError("parsed again")):
+            assert app_module.parse_list_file(str(list_file)) == first
@@ -0,0 +1,138 @@
+"""
+Statistics Backfill Tests
+=========================
+
+Tests for stats_backfill.py and POST /statistics/backfill:
+- Reading tasks.txt history and blobs from git
+- One snapshot per missing adjusted day
+- Rows written to the statistics CSV, surviving a store rebuild
+- Re-runs and worker pools
+"""
+
+import os
+import subprocess
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.stats_backfill import backfill_statistics, read_blobs, select_days, tasks_history
+from dashboard.backend.timeseries_store import TimeSeriesStore
+import dashboard.backend.app as app_module
+
+VERSIONS = [
+    ("2025-06-01T10:00:00", "Work:\n    - [ ] One +Work\n"),
+    ("2025-06-01T18:00:00", "Work:\n    - [ ] One +Work\n    - [x] Two\n"),
+    ("2025-06-03T09:00:00", "Work:\n    - [x] One +Work\n    - [x] Two\n    - [ ] Three due:2025-06-02\n"),
+]
+
+
+def commit(repo, text, when, message="update"):
+    (repo / "tasks.txt").write_text(text)
+    env = dict(os.environ, GIT_AUTHOR_DATE=when, GIT_COMMITTER_DATE=when)
+    subprocess.run(['git', 'add', 'tasks.txt'], cwd=repo, check=True)
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', message],
+                   cwd=repo, check=True, env=env)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    subprocess.run(['git', 'init', '-q'], cwd=repo, check=True)
+    for when, text in VERSIONS:
+        commit(repo, text, when)
+    return repo
+
+
+class TestHistory:
+    """Test reading the file history"""
+
+    def test_history_and_blobs(self, repo):
+        history = tasks_history(str(repo))
+        assert [timestamp for timestamp, _ in history] == [datetime.fromisoformat(when) for when, _ in VERSIONS]
+        blobs = read_blobs(str(repo), [blob_id for _, blob_id in history] + ['0' * 39 + '1'])
+        assert [blobs[blob_id] for _, blob_id in history] == [text for _, text in VERSIONS]
+
+    def test_select_days_keeps_last_commit(self, repo):
+        history = tasks_history(str(repo))
+        assert select_days(history) == [history[1], history[2]]
+        assert select_days(history, {date(2025, 6, 1)}) == [history[2]]
+
+    def test_select_days_by_adjusted_date(self, repo):
+        commit(repo, "Work:\n    - [ ] Late\n", "2025-06-04T01:00:00")
+        history = tasks_history(str(repo))
+        # 1 AM on June 4th still belongs to the adjusted June 3rd
+        assert select_days(history, date_of=app_module.get_adjusted_date) == [history[1], history[3]]
+        assert select_days(history) == [history[1], history[2], history[3]]
+
+
+class TestBackfill:
+    """Test writing snapshots into the statistics CSV and store"""
+
+    def test_one_row_per_missing_day(self, repo, tmp_path):
+        csv_file = str(tmp_path / "task_statistics.csv")
+        store = TimeSeriesStore(str(tmp_path / "timeseries"))
+        store.append(datetime(2025, 6, 3, 20, 0, 0), {'total': 99})
+        result = backfill_statistics(store, csv_file, str(repo), workers=1)
+        assert result == {'commits': 3, 'days': 1, 'written': 1}
+        series = store.daily_series(['total', 'completed', 'project_Work'])
+        assert series['dates'] == ['2025-06-01', '2025-06-03']
+        assert series['total'].tolist() == [2, 99]
+        assert series['completed'][0] == 1 and series['project_Work'][0] == 1
+
+    def test_survives_store_rebuild(self, repo, tmp_path):
+        csv_file = str(tmp_path / "task_statistics.csv")
+        app_module.append_statistics_csv({'total': 7}, datetime(2025, 6, 3, 21, 0), csv_file)
+        backfill_statistics(TimeSeriesStore(str(tmp_path / "first")), csv_file, str(repo), workers=1)
+        with open(csv_file) as f:
+            lines = f.read().splitlines()
+        # The CSV already had June 3rd; June 1st is appended under one new header
+        assert [line.split(',')[0] for line in lines] == ['timestamp', '2025-06-03 21:00:00', 'timestamp',
+                                                          '2025-06-01 18:00:00']
+
+        # A fresh store (a new clone, or a rebuild) gets the backfilled days from the CSV
+        fresh = TimeSeriesStore(str(tmp_path / "fresh"))
+        assert backfill_statistics(fresh, csv_file, str(repo), workers=1)['days'] == 0
+        series = fresh.daily_series(['total', 'project_Work'])
+        assert series['dates'] == ['2025-06-01', '2025-06-03']
+        assert series['total'].tolist() == [2, 7] and series['project_Work'][0] == 1
+
+    def test_rerun_and_pool(self, repo, tmp_path):
+        pooled = TimeSeriesStore(str(tmp_path / "pooled"))
+        serial = TimeSeriesStore(str(tmp_path / "serial"))
+        pooled_csv, serial_csv = str(tmp_path / "pooled.csv"), str(tmp_path / "serial.csv")
+        assert backfill_statistics(pooled, pooled_csv, str(repo), workers=2)['written'] == 2
+        assert backfill_statistics(serial, serial_csv, str(repo), workers=1)['written'] == 2
+        names = ['total', 'completed', 'overdue', 'completion_pct']
+        for name in names:
+            assert np.array_equal(pooled.column(name), serial.column(name), equal_nan=True)
+        # Overdue is relative to the day of the commit
+        assert serial.column('overdue').tolist() == [0, 1]
+        assert backfill_statistics(pooled, pooled_csv, str(repo))['written'] == 0
+
+    def test_scheduled_snapshot_after_backfill(self, repo, tmp_path):
+        csv_file = str(tmp_path / "task_statistics.csv")
+        with patch.object(app_module, 'STATISTICS_CSV_FILE', csv_file), \
+             patch.object(app_module, 'STATISTICS_STORE_DIR', str(tmp_path / "timeseries")), \
+             patch.dict(app_module._statistics_store, {'directory': None, 'store': None}), \
+             patch.object(app_module, 'compute_task_statistics', return_value={'total': 5}):
+            app_module.take_scheduled_snapshot(datetime(2025, 6, 3, 21, 0))
+            # The backfill appends June 1st after June 3rd
+            backfill_statistics(app_module.get_statistics_store(), csv_file, str(repo), workers=1)
+            assert app_module.latest_csv_snapshot(csv_file) == datetime(2025, 6, 3, 21, 0)
+            app_module.take_scheduled_snapshot(datetime(2025, 6, 3, 22, 0))
+
+        with open(csv_file) as f:
+            days = [line.split(',')[0][:10] for line in f if not line.startswith('timestamp')]
+        assert days == ['2025-06-03', '2025-06-01']
+
+    def test_endpoint_validates_workers(self):
+        assert TestClient(app_module.app).post("/statistics/backfill?workers=0").status_code == 400
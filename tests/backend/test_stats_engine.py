@@ -0,0 +1,99 @@
+"""
+Columnar Statistics Engine Tests
+================================
+
+Tests for stats_engine.py:
+- Columnar snapshot layout (dates, priority codes, CSR tags)
+- Parent links and metadata inheritance
+- Identical results to the per-task implementation
+"""
+
+import random
+import sys
+from datetime import date
+from pathlib import Path
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.live_stats import StatisticsAggregator, parse_statistics_tasks
+from dashboard.backend.stats_engine import UNSET, compute_statistics, parse_columns
+
+TASKS = """Work:
+    - [ ] Write report (priority:A due:2025-06-10) +Report @Office
+        - [ ] Draft outline
+            - [x] Find template +Docs
+        - [x] Collect numbers @Home (done:2025-06-02)
+    - [ ] Call back B
+# - [ ] commented out
+- [ ] Top level header:
+
+Home:
+        - [ ] Orphan subtask due:2025-06-01
+"""
+
+
+def reference(text, today):
+    aggregator = StatisticsAggregator()
+    aggregator.update(parse_statistics_tasks(text.splitlines(True)))
+    return aggregator.statistics(today)
+
+
+def random_tasks(rng, count):
+    lines = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.05:
+            lines.append(rng.choice(['Area:', '# note', '', '- [ ] Header task:']))
+            continue
+        indent = ' ' * rng.choice([0, 4, 4, 8, 8, 12, 16, 6])
+        words = ['Task'] + [rng.choice(['+Work', '+Home', '@Phone', '@Desk', 'priority:C', 'E',
+                                        'due:2025-06-%02d' % rng.randint(1, 28)])
+                            for _ in range(rng.randint(0, 3))]
+        lines.append(f"{indent}- [{rng.choice(' x')}] {' '.join(words)}")
+    return '\n'.join(lines) + '\n'
+
+
+class TestColumns:
+    """Test the columnar snapshot"""
+
+    def test_layout(self):
+        columns = parse_columns(TASKS)
+        assert len(columns) == 6
+        assert columns.indent.tolist() == [1, 2, 3, 2, 1, 2]
+        assert columns.completed.tolist() == [False, False, True, True, False, False]
+        assert columns.due[0] == date(2025, 6, 10).toordinal()
+        assert columns.done[3] == date(2025, 6, 2).toordinal()
+        assert columns.done[0] == UNSET
+        assert columns.priority.tolist() == [0, 0, 0, 0, 1, UNSET]
+
+    def test_inheritance(self):
+        columns = parse_columns(TASKS)
+        assert columns.parent.tolist() == [UNSET, 0, 1, 0, UNSET, UNSET]
+        # Nested subtask keeps its own project but inherits the due date two levels up
+        assert columns.due[2] == columns.due[0]
+        names = columns.projects.names
+        projects = [[names[i] for i in columns.projects.ids[start:end]]
+                    for start, end in zip(columns.projects.indptr[:-1], columns.projects.indptr[1:])]
+        assert projects == [['Report'], ['Report'], ['Docs'], ['Report'], [], []]
+
+    def test_matches_reference(self):
+        today = date(2025, 6, 5)
+        assert compute_statistics(parse_columns(TASKS), today) == reference(TASKS, today)
+
+    def test_matches_reference_randomized(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            text = random_tasks(rng, rng.randint(0, 40))
+            today = date(2025, 6, rng.randint(1, 28))
+            expected = reference(text, today)
+            result = compute_statistics(parse_columns(text), today)
+            assert result == expected
+            assert list(result) == list(expected)
+
+    def test_test_data_tasks(self):
+        text = (Path(__file__).parent.parent / "test_data" / "tasks.txt").read_text()
+        assert compute_statistics(parse_columns(text), date(2025, 7, 1)) == reference(text, date(2025, 7, 1))
+
+    def test_empty(self):
+        assert compute_statistics(parse_columns(""), date(2025, 7, 1)) == reference("", date(2025, 7, 1))
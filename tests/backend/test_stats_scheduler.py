@@ -0,0 +1,142 @@
+"""
+Statistics Snapshot Scheduler Tests
+===================================
+
+Tests for stats_scheduler.py and in-process statistics snapshots:
+- Interval marks and day-boundary runs
+- Catch-up snapshot on start
+- CSV/store writing and POST /tasks/save-statistics
+- Scheduled snapshots in the store, with one CSV row per adjusted day
+"""
+
+import csv
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.stats_scheduler import SnapshotScheduler
+from dashboard.backend.timeseries_store import TimeSeriesStore
+import dashboard.backend.app as app_module
+
+
+class TestSchedule:
+    """Test when snapshots are due"""
+
+    def test_hourly_marks(self):
+        scheduler = SnapshotScheduler(lambda timestamp: None, 60, 3)
+        assert scheduler.next_run(datetime(2025, 6, 1, 2, 59, 59)) == datetime(2025, 6, 1, 3, 0)
+        assert scheduler.next_run(datetime(2025, 6, 1, 3, 0)) == datetime(2025, 6, 1, 4, 0)
+        assert scheduler.next_run(datetime(2025, 6, 1, 23, 30)) == datetime(2025, 6, 2, 0, 0)
+
+    def test_day_boundary_between_marks(self):
+        scheduler = SnapshotScheduler(lambda timestamp: None, 360, 3)
+        assert scheduler.next_run(datetime(2025, 6, 1, 1, 0)) == datetime(2025, 6, 1, 3, 0)
+        assert scheduler.next_run(datetime(2025, 6, 1, 3, 0)) == datetime(2025, 6, 1, 6, 0)
+        assert scheduler.next_run(datetime(2025, 6, 1, 18, 0)) == datetime(2025, 6, 2, 0, 0)
+
+    def test_catch_up_uses_adjusted_day(self):
+        last = {'value': None}
+        scheduler = SnapshotScheduler(lambda timestamp: None, 60, 3, app_module.get_adjusted_date,
+                                      lambda: last['value'])
+        assert scheduler.needs_catch_up(datetime(2025, 6, 2, 12, 0))
+        last['value'] = datetime(2025, 6, 2, 1, 0)  # still June 1st before 3 AM
+        assert scheduler.needs_catch_up(datetime(2025, 6, 2, 12, 0))
+        assert not scheduler.needs_catch_up(datetime(2025, 6, 2, 2, 30))
+
+    def test_start_takes_catch_up_snapshot(self):
+        taken = []
+        done = threading.Event()
+        scheduler = SnapshotScheduler(lambda timestamp: (taken.append(timestamp), done.set()), 60)
+        scheduler.start()
+        try:
+            assert done.wait(5)
+        finally:
+            scheduler.stop()
+        assert len(taken) == 1 and taken[0].microsecond == 0
+
+    def test_failures_do_not_raise(self):
+        def fail(timestamp):
+            raise RuntimeError("disk full")
+        SnapshotScheduler(fail).run_once(datetime(2025, 6, 1, 12, 0))
+
+
+class TestSnapshotWriting:
+    """Test recording snapshots in the CSV log and store"""
+
+    def test_append_writes_header_on_column_change(self, tmp_path):
+        csv_file = str(tmp_path / "task_statistics.csv")
+        app_module.append_statistics_csv({'total': 2, 'completion_pct': 50.0}, datetime(2025, 6, 1, 12, 0), csv_file)
+        app_module.append_statistics_csv({'total': 3, 'completion_pct': 1 / 3}, datetime(2025, 6, 1, 13, 0), csv_file)
+        app_module.append_statistics_csv({'total': 4, 'overdue': 1}, datetime(2025, 6, 1, 14, 0), csv_file)
+        app_module.append_statistics_csv({'total': 4, 'overdue': 0}, datetime(2025, 6, 1, 15, 0), csv_file)
+        with open(csv_file, newline='') as f:
+            rows = list(csv.reader(f))
+        assert rows == [
+            ['timestamp', 'total', 'completion_pct'],
+            ['2025-06-01 12:00:00', '2', '50.00'],
+            ['2025-06-01 13:00:00', '3', '0.33'],
+            ['timestamp', 'total', 'overdue'],
+            ['2025-06-01 14:00:00', '4', '1'],
+            ['2025-06-01 15:00:00', '4', '0'],
+        ]
+        store = TimeSeriesStore(str(tmp_path / "timeseries"))
+        store.sync_csv(csv_file)
+        assert len(store) == 4
+
+    def test_append_keeps_header_for_known_columns(self, tmp_path):
+        csv_file = str(tmp_path / "task_statistics.csv")
+        app_module.append_statistics_csv({'total': 2, 'project_Work': 1}, datetime(2025, 6, 1, 12, 0), csv_file)
+        app_module.append_statistics_csv({'project_Work': 2, 'total': 3}, datetime(2025, 6, 2, 12, 0), csv_file)
+        app_module.append_statistics_csv({'total': 4}, datetime(2025, 6, 3, 12, 0), csv_file)
+        with open(csv_file, newline='') as f:
+            rows = list(csv.reader(f))
+        assert rows == [
+            ['timestamp', 'total', 'project_Work'],
+            ['2025-06-01 12:00:00', '2', '1'],
+            ['2025-06-02 12:00:00', '3', '2'],
+            ['2025-06-03 12:00:00', '4', ''],
+        ]
+        assert app_module.latest_csv_snapshot(csv_file) == datetime(2025, 6, 3, 12, 0)
+
+    def test_scheduled_snapshots(self, tmp_path):
+        csv_file = str(tmp_path / "task_statistics.csv")
+        stats = {'total': 4, 'completion_pct': 25.0, 'project_Work': 3}
+        with patch.object(app_module, 'STATISTICS_CSV_FILE', csv_file), \
+             patch.object(app_module, 'STATISTICS_STORE_DIR', str(tmp_path / "timeseries")), \
+             patch.dict(app_module._statistics_store, {'directory': None, 'store': None}), \
+             patch.object(app_module, 'compute_task_statistics', return_value=stats):
+            # June 1st 12:00 to June 2nd 11:00; the adjusted day changes at 3 AM
+            for hour in range(24):
+                app_module.take_scheduled_snapshot(datetime(2025, 6, 1, 12, 0) + timedelta(hours=hour))
+            store = app_module.get_statistics_store()
+            assert len(store) == 24
+            assert store.tags('project') == ['project_Work']
+
+            with open(csv_file, newline='') as f:
+                rows = list(csv.reader(f))
+            assert [row[0] for row in rows] == ['timestamp', '2025-06-01 12:00:00', '2025-06-02 03:00:00']
+
+            # The manual endpoint still writes every snapshot to the CSV
+            app_module.save_statistics_snapshot(datetime(2025, 6, 2, 11, 30))
+            assert app_module.latest_csv_snapshot(csv_file) == datetime(2025, 6, 2, 11, 30)
+            assert len(app_module.get_statistics_store()) == 25
+
+    def test_manual_endpoint_runs_in_process(self):
+        with patch.object(app_module, 'save_statistics_snapshot', return_value={'total': 5, 'completion_pct': 40.0}):
+            result = TestClient(app_module.app).post("/tasks/save-statistics").json()
+        assert result['success']
+        assert 'completion_pct :      40.00' in result['output']
+
+    def test_manual_endpoint_reports_errors(self):
+        with patch.object(app_module, 'save_statistics_snapshot', side_effect=OSError("read-only")):
+            result = TestClient(app_module.app).post("/tasks/save-statistics").json()
+        assert not result['success']
+        assert 'read-only' in result['message']
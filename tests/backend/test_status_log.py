@@ -0,0 +1,132 @@
+"""
+Recurring Status Log Tests
+==========================
+
+Tests for status_log.py and the batch status endpoint:
+- Batched appends produce the same lines as single appends
+- In-memory status history and daily counts track writes
+- External edits to the log are picked up
+- POST /recurring/status/batch
+"""
+
+import sys
+from datetime import datetime, date
+from pathlib import Path
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.status_log import StatusLog, parse_entry
+import dashboard.backend.app as app_module
+
+
+def adjusted(timestamp):
+    return app_module.get_adjusted_date(timestamp)
+
+
+class TestStatusLog:
+    """Test the buffered writer and in-memory store"""
+
+    def test_batch_is_one_write(self, tmp_path):
+        log_file = tmp_path / "recurring_status_log.txt"
+        log = StatusLog(str(log_file), adjusted, fsync='never')
+        when = datetime(2025, 6, 2, 21, 30, 0)
+        entries = [('a1', 'completed', 'Stretch'), ('b2', 'missed', 'Read'), ('c3', 'deferred', 'Run')]
+
+        with patch('builtins.open', wraps=open) as mock_open:
+            assert log.append_batch(entries, when) == 3
+        append_calls = [call for call in mock_open.call_args_list if call.args[1:2] == ('a',)]
+        assert len(append_calls) == 1
+
+        lines = log_file.read_text().splitlines()
+        assert lines == [
+            "2025-06-02 21:30:00 | COMPLETED | a1 | Stretch",
+            "2025-06-02 21:30:00 | MISSED | b2 | Read",
+            "2025-06-02 21:30:00 | DEFERRED | c3 | Run",
+        ]
+        assert parse_entry(lines[0]) == (when, 'COMPLETED', 'a1', 'Stretch')
+
+    def test_store_matches_file(self, tmp_path):
+        log_file = tmp_path / "recurring_status_log.txt"
+        log_file.write_text("2025-06-02 02:00:00 | COMPLETED | a1 | Stretch\n")
+        log = StatusLog(str(log_file), adjusted, fsync='always')
+
+        log.append_batch([('a1', 'missed', 'Stretch'), ('b2', 'completed', 'Read')], datetime(2025, 6, 2, 22, 0, 0))
+
+        status_data = log.get_status_data()
+        assert [entry[:2] for entry in status_data['a1']] == [(date(2025, 6, 1), 'COMPLETED'), (date(2025, 6, 2), 'MISSED')]
+        assert log.get_daily_compliance() == [
+            {'date': '2025-06-01', 'completed': 1, 'missed': 0, 'deferred': 0, 'total': 1, 'compliance_pct': 100.0},
+            {'date': '2025-06-02', 'completed': 1, 'missed': 1, 'deferred': 0, 'total': 2, 'compliance_pct': 50.0},
+        ]
+        # A fresh reader of the same file agrees with the incrementally updated store
+        assert StatusLog(str(log_file), adjusted).get_daily_compliance() == log.get_daily_compliance()
+
+    def test_external_edit_is_reloaded(self, tmp_path):
+        log_file = tmp_path / "recurring_status_log.txt"
+        log = StatusLog(str(log_file), adjusted, fsync='never')
+        log.append('a1', 'completed', 'Stretch', datetime(2025, 6, 2, 12, 0, 0))
+
+        log_file.write_text("2025-06-03 12:00:00 | MISSED | b2 | Read\nnot a log line\n")
+        assert list(log.get_status_data()) == ['b2']
+
+    def test_interval_syncs_tail(self, tmp_path):
+        log = StatusLog(str(tmp_path / "log.txt"), adjusted, fsync='interval', fsync_interval=0.05)
+        with patch('dashboard.backend.status_log.os.fsync') as fsync:
+            log.append('a1', 'completed', 'Stretch', datetime(2025, 6, 2, 12, 0, 0))
+            log.append('b2', 'completed', 'Read', datetime(2025, 6, 2, 12, 0, 1))
+            timer = log._flush_timer
+            assert fsync.call_count == 1
+            # The second append is synced by the timer, without a later write
+            timer.join(1)
+            assert fsync.call_count == 2 and log._flush_timer is None
+            log.flush()
+            assert fsync.call_count == 2
+
+    def test_unknown_fsync_policy(self, tmp_path):
+        with pytest.raises(ValueError):
+            StatusLog(str(tmp_path / "log.txt"), fsync='sometimes')
+
+
+class TestStatusBatchEndpoint:
+    """Test POST /recurring/status/batch"""
+
+    @pytest.fixture
+    def env(self, tmp_path):
+        recurring = tmp_path / "recurring_tasks.txt"
+        recurring.write_text("# Daily\n- [ ] Stretch [daily]\n- [ ] Read [daily]\n")
+        log = StatusLog(str(tmp_path / "recurring_status_log.txt"), adjusted, fsync='never')
+        with patch('parser.recurring_file', str(recurring)), \
+                patch.object(app_module, 'get_status_log', return_value=log):
+            app_module.task_parser.invalidate_recurring_snapshot()
+            by_description = {task['description']: task_id for task_id, task
+                              in app_module.task_parser.get_recurring_snapshot()['by_id'].items()}
+            yield TestClient(app_module.app), log, by_description
+
+    def test_batch_logs_all_updates(self, env):
+        client, log, ids = env
+        response = client.post("/recurring/status/batch", json={"updates": [
+            {"task_id": ids['Stretch'], "status": "completed"},
+            {"task_id": ids['Read'], "status": "missed"},
+        ]})
+        assert response.status_code == 200
+        assert response.json()['count'] == 2
+
+        status_data = log.get_status_data()
+        assert status_data[ids['Stretch']][-1][1] == 'COMPLETED'
+        assert status_data[ids['Read']][-1][1] == 'MISSED'
+        assert log.get_daily_compliance()[-1]['total'] == 2
+
+    def test_unknown_task_rejects_whole_batch(self, env):
+        client, log, ids = env
+        response = client.post("/recurring/status/batch", json={"updates": [
+            {"task_id": ids['Stretch'], "status": "completed"},
+            {"task_id": "missing", "status": "completed"},
+        ]})
+        assert response.status_code == 404
+        assert log.get_status_data() == {}
@@ -0,0 +1,150 @@
+"""
+Task Index Tests
+================
+
+Tests for task_index.py and filtered /tasks:
+- Bitset helpers
+- Matching on tags, status, priority, due ranges and notes
+- Ancestors of matches kept, other branches pruned
+- Index built once per parse
+- GET /tasks filter parameters
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.task_index import TaskFilter, TaskIndex, bit_numbers, bitset
+import dashboard.backend.app as app_module
+import parser as task_parser
+from task_snapshot import snapshot_from_text
+
+TASKS = """Work:
+    - [ ] Write report (priority:A due:2025-06-10) +Report @Office
+        Remember the appendix
+        - [ ] Collect numbers (due:2025-06-08) @Phone
+            - [x] Call finance (done:2025-06-02) @Phone
+    - [ ] Wait (onhold:2025-06-12) +Report +Budget
+Home:
+    - [ ] Fix tap (priority:B due:2025-06-20) @Home
+        - [ ] Buy washer @Shop
+"""
+
+
+def tree(text=TASKS):
+    return task_parser.tasks_from_snapshot(snapshot_from_text(text), date(2025, 6, 10))
+
+
+def descriptions(items):
+    """Descriptions in tree order, indented by depth"""
+    out = []
+
+    def walk(entries, depth):
+        for item in entries:
+            if item['type'] == 'area':
+                out.append(item['area'] + ':')
+                walk(item['tasks'], depth + 1)
+            else:
+                out.append('  ' * depth + item['description'])
+                walk(item['subtasks'], depth + 1)
+
+    walk(items, 0)
+    return out
+
+
+def select(**conditions):
+    tasks = tree()
+    return descriptions(TaskIndex(tasks).select(tasks, TaskFilter(**conditions)))
+
+
+class TestBitsets:
+    """Test the bitset helpers"""
+
+    def test_round_trip(self):
+        numbers = [0, 3, 7, 8, 64, 1000]
+        assert bit_numbers(bitset(numbers)) == numbers
+        assert bitset([]) == 0 and bit_numbers(0) == []
+
+
+class TestMatching:
+    """Test filters against the index"""
+
+    def test_tag_keeps_ancestors(self):
+        assert select(context=('@phone',)) == ['Work:', '  Write report', '    Collect numbers', '      Call finance']
+
+    def test_fields_intersect_and_values_union(self):
+        assert select(project=('Report',), priority=('a',)) == ['Work:', '  Write report']
+        assert select(project=('Budget', 'nothing')) == ['Work:', '  Wait']
+        assert select(context=('Office', 'Shop')) == ['Work:', '  Write report', 'Home:', '  Fix tap', '    Buy washer']
+
+    def test_status_and_area(self):
+        assert select(status=('onhold',)) == ['Work:', '  Wait']
+        assert select(area=('home',), status=('incomplete',)) == ['Home:', '  Fix tap', '    Buy washer']
+
+    def test_due_range_is_exclusive(self):
+        assert select(due_after=date(2025, 6, 8), due_before=date(2025, 6, 20)) == ['Work:', '  Write report']
+        assert select(due_before=date(2025, 6, 10)) == ['Work:', '  Write report', '    Collect numbers']
+
+    def test_notes(self):
+        assert select(has_notes=True) == ['Work:', '  Write report']
+        assert select(has_notes=False, project=('Report',)) == ['Work:', '  Wait']
+
+    def test_no_match(self):
+        assert select(project=('Unknown',)) == []
+        assert TaskFilter().is_empty() and not TaskFilter(has_notes=False).is_empty()
+
+
+class TestParseCache:
+    """Test the index kept with the parse cache"""
+
+    def test_built_once_per_parse(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        task_parser.invalidate_tasks_snapshot()
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.get_adjusted_today', return_value=date(2025, 6, 10)), \
+             patch('parser.TaskIndex', wraps=TaskIndex) as build:
+            task_parser.parse_tasks_filtered(TaskFilter(context=('Phone',)))
+            task_parser.parse_tasks_filtered(TaskFilter(context=('Home',)))
+            assert build.call_count == 1
+            tasks_file.write_text(TASKS + "    - [ ] New @Home\n")
+            filtered = task_parser.parse_tasks_filtered(TaskFilter(context=('Home',)))
+            assert build.call_count == 2
+        task_parser.invalidate_tasks_snapshot()
+        assert descriptions(filtered) == ['Home:', '  Fix tap', '  New']
+
+
+class TestEndpoint:
+    """Test GET /tasks with filter parameters"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        task_parser.invalidate_tasks_snapshot()
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.get_adjusted_today', return_value=date(2025, 6, 10)):
+            yield TestClient(app_module.app)
+        task_parser.invalidate_tasks_snapshot()
+
+    def test_filtered_views(self, client):
+        groups = client.get("/tasks?context=Phone").json()
+        by_title = {group['title']: group['tasks'] for group in groups}
+        assert set(by_title) == {'2025-06-08', '2025-06-10', 'Done'}
+        assert [task['description'] for task in by_title['2025-06-10']] == ['Write report']
+        assert by_title['2025-06-10'][0]['subtasks'][0]['description'] == 'Collect numbers'
+        assert 'Fix tap' not in str(groups)
+
+        areas = client.get("/tasks?sort=none&project=%2BReport,%2BBudget&status=incomplete,onhold").json()
+        assert [group['title'] for group in areas] == ['Work']
+
+    def test_invalid_parameters(self, client):
+        assert client.get("/tasks?status=later").status_code == 400
+        assert client.get("/tasks?due_before=10-06-2025").status_code == 400
@@ -0,0 +1,168 @@
+"""
+Task Query Tests
+================
+
+Tests for task_query.py and GET /tasks?q=:
+- Parsing terms, negation, OR and groups into an AST
+- Syntax errors
+- Planning from the most selective index access
+- Results equal to checking every task
+- q combined with filter parameters, and explain output
+"""
+
+import random
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.task_query import (And, Not, Or, QuerySyntaxError, Term, compile_node, parse_query,
+                                          plan_query, run_query)
+from task_index import TaskIndex, walk_tasks
+import dashboard.backend.app as app_module
+import parser as task_parser
+from task_snapshot import snapshot_from_text
+
+TODAY = date(2025, 6, 10)
+
+TASKS = """Work:
+    - [ ] Write report (priority:A due:2025-06-10) +Reports @Office
+        Remember the appendix
+        - [ ] Collect numbers (due:2025-06-08) @Phone
+            - [x] Call finance (done:2025-06-02) @Phone
+    - [ ] Wait (onhold:2025-06-12) +Reports +Budget @Office
+    - [ ] Present report (priority:A due:2025-08-15) +Reports @Office
+Home:
+    - [ ] Fix tap (priority:B due:2025-06-20) @Home
+        - [ ] Buy washer @Shop
+"""
+
+
+def tree(text=TASKS):
+    return task_parser.tasks_from_snapshot(snapshot_from_text(text), TODAY)
+
+
+def matching(text):
+    """Descriptions of the tasks matching a query, in tree order"""
+    tasks = tree()
+    result, _ = run_query(tasks, TaskIndex(tasks), parse_query(text, TODAY))
+    return [task['description'] for _, task, _ in walk_tasks(result)]
+
+
+class TestParsing:
+    """Test query text to AST"""
+
+    def test_example(self):
+        node = parse_query('+Reports @Office priority:a due<2025-08-01 -status:onhold', TODAY)
+        assert node == And((Term('project', '=', 'reports'), Term('context', '=', 'office'),
+                            Term('priority', '=', 'A'), Term('due', '<', date(2025, 8, 1)),
+                            Not(Term('status', '=', 'onhold'))))
+
+    def test_or_groups_and_text(self):
+        node = parse_query('(@Home OR @Shop) -("buy washer" OR has:notes) tap', TODAY)
+        assert node == And((Or((Term('context', '=', 'home'), Term('context', '=', 'shop'))),
+                            Not(Or((Term('text', '=', 'buy washer'), Term('has', '=', 'notes')))),
+                            Term('text', '=', 'tap')))
+
+    def test_relative_dates(self):
+        assert parse_query('due<=+7d', TODAY) == Term('due', '<=', date(2025, 6, 17))
+        assert parse_query('done:yesterday', TODAY) == Term('done', '=', date(2025, 6, 9))
+
+    @pytest.mark.parametrize("text", ['', 'status:later', 'colour:red', 'due<June', 'priority<A',
+                                      '(@Home', '@Home)', 'OR @Home', '"open', 'has:children', '- @Home'])
+    def test_syntax_errors(self, text):
+        with pytest.raises(QuerySyntaxError):
+            parse_query(text, TODAY)
+
+
+class TestPlanning:
+    """Test the choice of index and the residual predicates"""
+
+    def test_most_selective_access(self):
+        tasks = tree()
+        index = TaskIndex(tasks)
+        plan = plan_query(parse_query('+Reports @Office priority:A due<2025-08-01 -status:onhold', TODAY), index)
+        # Two tasks have priority A, three are due before August
+        assert plan.access == 'priority index [A]' and bin(plan.candidates).count('1') == 2
+        assert Term('priority', '=', 'A') not in plan.residual and len(plan.residual) == 4
+        plan = plan_query(parse_query('+Reports priority:A due<2025-06-09', TODAY), index)
+        assert plan.access == 'due-date array due<2025-06-09' and bin(plan.candidates).count('1') == 1
+
+    def test_full_scan_without_index(self):
+        tasks = tree()
+        plan = plan_query(parse_query('-@Office report', TODAY), TaskIndex(tasks))
+        assert plan.access == 'full scan' and plan.candidates == TaskIndex(tasks).all
+
+    def test_or_of_indexed_terms(self):
+        tasks = tree()
+        plan = plan_query(parse_query('@Home OR @Shop', TODAY), TaskIndex(tasks))
+        assert plan.access == 'context index [home] | context index [shop]' and plan.residual == []
+
+
+class TestResults:
+    """Test query results"""
+
+    def test_example(self):
+        assert matching('+Reports @Office priority:A due<2025-08-01 -status:onhold') == ['Write report']
+
+    def test_ancestors_kept(self):
+        assert matching('@phone done<2025-06-05') == ['Write report', 'Collect numbers', 'Call finance']
+        assert matching('washer') == ['Fix tap', 'Buy washer']
+
+    def test_same_as_checking_every_task(self):
+        rng = random.Random(7)
+        terms = ['+Reports', '+Budget', '@Office', '@Phone', '@Home', '&Work', 'priority:A', 'status:done',
+                 'status:onhold', 'due<2025-06-15', 'due>=2025-06-10', 'due:2025-06-20', 'has:notes', 'has:due',
+                 'report', '-@Office', '-status:incomplete', '(@Shop OR priority:B)']
+        tasks = tree()
+        index = TaskIndex(tasks)
+        for _ in range(200):
+            node = parse_query(' '.join(rng.sample(terms, rng.randint(1, 4))), TODAY)
+            predicate = compile_node(node)
+            expected = [number for number, task, _ in walk_tasks(tasks) if predicate(task)]
+            plan = plan_query(node, index)
+            found = [number for number, task, _ in walk_tasks(tasks)
+                     if plan.candidates >> number & 1 and plan.predicate(task)]
+            assert found == expected
+
+
+class TestEndpoint:
+    """Test GET /tasks?q="""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        task_parser.invalidate_tasks_snapshot()
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.get_adjusted_today', return_value=TODAY), \
+             patch.object(app_module, 'get_adjusted_today', return_value=TODAY):
+            yield TestClient(app_module.app)
+        task_parser.invalidate_tasks_snapshot()
+
+    def test_query(self, client):
+        groups = client.get("/tasks", params={'q': '+Reports -status:onhold', 'sort': 'none'}).json()
+        assert sorted(task['description'] for task in groups[0]['tasks']) == ['Present report', 'Write report']
+
+    def test_combined_with_filters(self, client):
+        groups = client.get("/tasks", params={'q': '+Reports', 'due_after': '2025-06-10', 'sort': 'none'}).json()
+        assert [task['description'] for task in groups[0]['tasks']] == ['Present report']
+
+    def test_explain(self, client):
+        body = client.get("/tasks", params={'q': '@Office priority:A', 'explain': 1}).json()
+        plan = body['plan']
+        assert plan['access'] == 'priority index [A]' and plan['residual'] == ['context:office']
+        assert (plan['tasks'], plan['candidates'], plan['matches']) == (7, 2, 2)
+        assert {'parse_query', 'plan', 'execute', 'build_view'} <= set(plan['timings_ms'])
+        assert 'Present report' in str(body['tasks'])
+
+    def test_invalid_query(self, client):
+        response = client.get("/tasks", params={'q': 'status:later'})
+        assert response.status_code == 400 and 'status:' in response.json()['detail']
+        assert client.get("/tasks?explain=1").status_code == 400
@@ -0,0 +1,126 @@
+"""
+Task Snapshot Tests
+===================
+
+Tests for task_snapshot.py and its consumers:
+- Line classification, metadata, tags and parent links
+- Reusing the parse while the content is unchanged
+- The snapshot stored beside the file
+- Scripts reading from the shared snapshot
+"""
+
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+scripts_path = Path(__file__).parent.parent.parent / "scripts"
+sys.path.insert(0, str(backend_path))
+sys.path.insert(0, str(scripts_path))
+
+import task_snapshot
+from snapshot_file import snapshot_path
+from task_snapshot import NO_PARENT, parse_lines, read_snapshot, snapshot_from_text
+
+TASKS = """Work:
+    - [ ] Write report (priority:A due:2025-06-10) +Report @Office &Work
+        Remember the appendix
+        - [x] Draft outline (done:2025-06-02 note:first pass)
+    - [%] Chase reply +Report +Report
+
+Home:
+- [ ] Top level
+oops
+"""
+
+
+class TestParse:
+    """Test the typed line model"""
+
+    def test_kinds(self):
+        lines = parse_lines(TASKS)
+        assert [line.kind for line in lines] == ['area', 'task', 'note', 'task', 'task', 'blank',
+                                                 'area', 'task', 'other']
+        assert [line.number for line in lines] == list(range(1, 10))
+        assert ''.join(line.raw for line in lines) == TASKS
+
+    def test_task_fields(self):
+        report, _, outline, chase = parse_lines(TASKS)[1:5]
+        assert report.area == 'Work' and report.indent_level == 1 and report.status == ' '
+        assert report.metadata == {'priority': 'A', 'due': '2025-06-10'}
+        assert report.text == 'Write report  +Report @Office &Work'
+        assert report.description == 'Write report'
+        assert (report.projects, report.contexts) == (('Report',), ('Office',))
+        assert outline.completed and outline.metadata == {'done': '2025-06-02', 'note': 'first pass'}
+        assert chase.status == '%' and not chase.completed and chase.projects == ('Report',)
+
+    def test_parents(self):
+        lines = parse_lines(TASKS)
+        assert [line.parent for line in lines] == [NO_PARENT, NO_PARENT, 1, 1, NO_PARENT, NO_PARENT,
+                                                   NO_PARENT, NO_PARENT, 7]
+
+
+class TestReuse:
+    """Test in-process and on-disk reuse"""
+
+    def test_reused_while_unchanged(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        first = read_snapshot(str(tasks_file))
+        assert read_snapshot(str(tasks_file)) is first
+        tasks_file.write_text(TASKS + "- [ ] More\n")
+        second = read_snapshot(str(tasks_file))
+        assert second is not first and len(second) == len(first) + 1
+
+    def test_disk_snapshot_shared_between_processes(self, tmp_path):
+        tasks_file = str(tmp_path / "tasks.txt")
+        snapshot_from_text(TASKS, tasks_file)
+        assert os.path.exists(snapshot_path(tasks_file))
+
+        # A new process starts with an empty in-memory cache
+        task_snapshot._snapshots.clear()
+        with patch('task_snapshot.parse_lines', side_effect=AssertionError("parsed again")):
+            snapshot = snapshot_from_text(TASKS, tasks_file)
+        assert snapshot.lines == parse_lines(TASKS)
+        assert isinstance(snapshot.lines[0], task_snapshot.TaskLine)
+
+    def test_stale_snapshot_ignored(self, tmp_path):
+        tasks_file = str(tmp_path / "tasks.txt")
+        snapshot_from_text(TASKS, tasks_file)
+        task_snapshot._snapshots.clear()
+        with patch('task_snapshot.TASK_LINES_VERSION', task_snapshot.TASK_LINES_VERSION + 1), \
+             patch('task_snapshot.parse_lines', wraps=parse_lines) as parse:
+            snapshot_from_text(TASKS, tasks_file)
+        assert parse.call_count == 1
+        # Other content under the same path is parsed too
+        task_snapshot._snapshots.clear()
+        with patch('task_snapshot.parse_lines', wraps=parse_lines) as parse:
+            snapshot_from_text(TASKS + "x\n", tasks_file)
+        assert parse.call_count == 1
+
+
+class TestScripts:
+    """Test the scripts reading through the snapshot"""
+
+    def test_make_csv_rows(self, tmp_path):
+        from make_csv import parse_tasks_file
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        rows = parse_tasks_file(str(tasks_file))
+        assert [row['line_number'] for row in rows] == [2, 4, 5, 8]
+        assert rows[0]['description'] == 'Write report'
+        assert (rows[0]['area'], rows[0]['project'], rows[0]['context']) == ('Work', 'Report', 'Office')
+        assert (rows[0]['priority'], rows[0]['due_date'], rows[0]['area_tag']) == ('A', '2025-06-10', 'Work')
+        assert rows[1]['completed'] and rows[1]['done_date'] == '2025-06-02' and rows[1]['note'] == 'first pass'
+
+    def test_check_syntax(self, tmp_path, capsys):
+        from check_task_list import check_syntax
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        check_syntax(str(tasks_file))
+        assert capsys.readouterr().out.splitlines() == [
+            "Line 8: Task under-indented. Should be indented exactly 4 spaces from its parent.",
+            "Line 9: Does not match task, note, or area format. Suggestion: Ensure line starts with '-', "
+            "'[ ]' or '[x]', or is properly indented as a note.",
+        ]
@@ -0,0 +1,142 @@
+"""
+Task Views Tests
+================
+
+Tests for task_views.py and the /tasks sort modes:
+- Group order and entry order of the due, priority and area views
+- Subtask filters and partial hierarchies in the On Hold and Done groups
+- The context, project and due_week groupings
+- Entries copied, not shared with the source tree
+- GET /tasks?sort=
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.task_views import VIEWS, build_view, upcoming_first
+import dashboard.backend.app as app_module
+import parser as task_parser
+from task_snapshot import snapshot_from_text
+
+TODAY = date(2025, 6, 10)
+
+TASKS = """Work:
+    - [ ] Write report (priority:B due:2025-06-12) +Reports @Office
+        - [x] Draft outline (done:2025-06-02)
+        - [ ] Wait for data (onhold:2025-06-20)
+        - [ ] Check figures @Phone
+    - [ ] Call client (priority:A due:2025-06-12) @Phone @Office
+    - [x] Send invoice (done:2025-06-05) +Billing
+    - [ ] Chase payment (followup:2025-06-15) +Billing
+Home:
+    - [ ] Fix tap (due:2025-06-16) @Home
+    - [ ] Paint fence (onhold:2025-07-01) +Garden
+"""
+
+
+def tree():
+    return task_parser.tasks_from_snapshot(snapshot_from_text(TASKS), TODAY)
+
+
+def view(sort):
+    return build_view(tree(), VIEWS[sort], TODAY)
+
+
+def titles(groups):
+    return [group['title'] for group in groups]
+
+
+def entries(groups, title):
+    return [task['description'] for task in next(group for group in groups if group['title'] == title)['tasks']]
+
+
+class TestExistingViews:
+    """Test the due, priority and area views"""
+
+    def test_due_groups(self):
+        groups = view('due')
+        assert titles(groups) == ['2025-06-12', '2025-06-16', 'No Due Date', 'On Hold', 'Follow-up Required', 'Done']
+        # Priority then description within a due date
+        assert entries(groups, '2025-06-12') == ['Call client', 'Write report']
+        # Subtasks only open their group: they are listed under their top-level task
+        assert entries(groups, 'No Due Date') == []
+        # Open subtasks stay under their parent; done and onhold subtasks go to their own groups
+        report = groups[0]['tasks'][1]
+        assert [task['description'] for task in report['subtasks']] == ['Check figures']
+
+    def test_partial_hierarchies(self):
+        groups = view('due')
+        assert entries(groups, 'On Hold') == ['Paint fence', 'Write report']
+        assert [task['description'] for task in groups[3]['tasks'][1]['subtasks']] == ['Wait for data']
+        # Done is ordered by priority, so the partial copy of the B task comes first
+        assert entries(groups, 'Done') == ['Write report', 'Send invoice']
+        assert [task['description'] for task in groups[5]['tasks'][0]['subtasks']] == ['Draft outline']
+
+    def test_priority_groups(self):
+        groups = view('priority')
+        assert titles(groups) == ['Priority A', 'Priority B', 'No Priority', 'Follow-up Required', 'Done']
+        # Onhold tasks are open tasks in this view
+        assert entries(groups, 'No Priority') == ['Fix tap', 'Paint fence']
+
+    def test_area_groups(self):
+        groups = view('none')
+        assert titles(groups) == ['Work', 'Home']
+        assert entries(groups, 'Work') == ['Call client', 'Write report', 'Chase payment', 'Send invoice']
+
+    def test_entries_are_copies(self):
+        source = tree()
+        groups = build_view(source, VIEWS['due'], TODAY)
+        groups[0]['tasks'][1]['subtasks'].clear()
+        assert len(source[0]['tasks'][0]['subtasks']) == 3
+
+    def test_upcoming_first(self):
+        keys = [upcoming_first(value, TODAY) for value in ['2025-06-12', '2025-06-10', '2025-06-01', 'later', '']]
+        assert sorted(keys) == [keys[1], keys[0], keys[2], keys[3], keys[4]]
+
+
+class TestNewViews:
+    """Test the context, project and due_week views"""
+
+    def test_context(self):
+        groups = view('context')
+        assert titles(groups) == ['@Home', '@Office', '@Phone', 'No Context', 'Follow-up Required', 'Done']
+        # A task with several contexts is listed under each of them
+        assert entries(groups, '@Office') == ['Call client', 'Write report']
+        assert entries(groups, '@Phone') == ['Call client']
+
+    def test_project(self):
+        groups = view('project')
+        assert titles(groups) == ['+Garden', '+Reports', 'No Project', 'Follow-up Required', 'Done']
+        assert entries(groups, 'Follow-up Required') == ['Chase payment']
+
+    def test_due_week(self):
+        groups = view('due_week')
+        assert titles(groups) == ['Week of 2025-06-09', 'Week of 2025-06-16', 'No Due Date', 'On Hold', 'Follow-up Required', 'Done']
+        assert entries(groups, 'Week of 2025-06-09') == ['Call client', 'Write report']
+
+
+class TestEndpoint:
+    """Test GET /tasks?sort="""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        tasks_file = tmp_path / "tasks.txt"
+        tasks_file.write_text(TASKS)
+        task_parser.invalidate_tasks_snapshot()
+        with patch('parser.tasks_file', str(tasks_file)), \
+             patch('parser.get_adjusted_today', return_value=TODAY):
+            yield TestClient(app_module.app)
+        task_parser.invalidate_tasks_snapshot()
+
+    def test_sort_modes(self, client):
+        assert titles(client.get("/tasks?sort=context").json())[:3] == ['@Home', '@Office', '@Phone']
+        assert titles(client.get("/tasks?sort=due_week").json())[0] == 'Week of 2025-06-09'
+        assert titles(client.get("/tasks?sort=project&context=Phone").json()) == ['+Reports', 'No Project']
@@ -0,0 +1,148 @@
+"""
+Statistics Time-Series Store Tests
+==================================
+
+Tests for timeseries_store.py:
+- CSV import with repeated headers and new columns
+- Incremental import of appended CSV rows
+- Range filtering and latest-per-day reduction
+- Out-of-order appends and reopening from disk
+- Long-format project/context tag counts
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+backend_path = Path(__file__).parent.parent.parent / "dashboard" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from dashboard.backend.timeseries_store import TimeSeriesStore
+
+
+CSV_TEXT = (
+    "timestamp,total,completed,completion_pct,project_+Work\n"
+    "2025-05-09 08:00:00,10,1,10.0,4\n"
+    "2025-05-09 20:00:00,12,3,25.0,5\n"
+    "2025-05-10 20:00:00,12,4,33.33,5\n"
+    "timestamp,total,completed,completion_pct,project_+Work,context_@Home,overdue\n"
+    "timestamp,total,completed,completion_pct,project_+Work,context_@Home,overdue\n"
+    "2025-05-11 20:00:00,14,4,28.57,,2,7\n"
+    "2025-05-12 20:00:00,bad,row\n"
+)
+
+
+@pytest.fixture
+def store_and_csv(tmp_path):
+    csv_file = tmp_path / "task_statistics.csv"
+    csv_file.write_text(CSV_TEXT)
+    store = TimeSeriesStore(str(tmp_path / "timeseries"))
+    store.sync_csv(str(csv_file))
+    return store, csv_file
+
+
+class TestCsvImport:
+    """Test importing the legacy wide CSV"""
+
+    def test_rows_and_schema_evolution(self, store_and_csv):
+        store, _ = store_and_csv
+        assert len(store) == 4
+        assert store.columns() == ['total', 'completed', 'completion_pct', 'overdue']
+        assert store.tags() == ['project_+Work', 'context_@Home']
+        assert store.kind('total') == 'i' and store.kind('completion_pct') == 'f'
+        # The new column is backfilled with NaN
+        assert np.isnan(store.column('overdue')[:3]).all()
+        assert store.column('overdue')[3] == 7
+        assert isinstance(store.column('total'), np.memmap)
+
+    def test_only_appended_rows_are_imported(self, store_and_csv):
+        store, csv_file = store_and_csv
+        assert store.sync_csv(str(csv_file)) == 0
+
+        with open(csv_file, 'a') as f:
+            f.write("2025-05-13 20:00:00,15,6,40.0,6,3,1\n")
+        assert store.sync_csv(str(csv_file)) == 1
+        assert store.column('total')[-1] == 15
+
+    def test_reopen_reads_same_data(self, store_and_csv, tmp_path):
+        store, csv_file = store_and_csv
+        reopened = TimeSeriesStore(str(tmp_path / "timeseries"))
+        assert reopened.sync_csv(str(csv_file)) == 0
+        assert reopened.timestamps().tolist() == store.timestamps().tolist()
+        assert reopened.columns() == store.columns()
+
+
+class TestQueries:
+    """Test range filters and the per-day reduction"""
+
+    def test_latest_per_day(self, store_and_csv):
+        store, _ = store_and_csv
+        series = store.daily_series(['total', 'completed'])
+        assert series['dates'] == ['2025-05-09', '2025-05-10', '2025-05-11']
+        assert series['total'].tolist() == [12, 12, 14]
+        assert series['completed'].tolist() == [3, 4, 4]
+
+    def test_range_filter(self, store_and_csv):
+        store, _ = store_and_csv
+        lo, hi = store.range_indices(datetime(2025, 5, 9, 12, 0, 0), datetime(2025, 5, 10, 20, 0, 0))
+        assert (lo, hi) == (1, 3)
+        series = store.daily_series(['total'], start=datetime(2025, 5, 10))
+        assert series['dates'] == ['2025-05-10', '2025-05-11']
+
+    def test_unknown_metric_is_missing(self, store_and_csv):
+        store, _ = store_and_csv
+        assert np.isnan(store.daily_series(['nope'])['nope']).all()
+
+
+class TestAppend:
+    """Test direct appends"""
+
+    def test_out_of_order_append_keeps_rows_sorted(self, tmp_path):
+        store = TimeSeriesStore(str(tmp_path / "timeseries"))
+        store.append(datetime(2025, 1, 3, 12, 0, 0), {'total': 3})
+        store.append(datetime(2025, 1, 1, 12, 0, 0), {'total': 1, 'completion_pct': 50.0})
+        store.append(datetime(2025, 1, 2, 12, 0, 0), {'total': 2})
+        assert store.append(datetime(2025, 1, 2, 12, 0, 0), {'total': 99}) == 0  # duplicate timestamp
+
+        assert np.all(np.diff(store.timestamps()) > 0)
+        assert store.column('total').tolist() == [1, 2, 3]
+        assert store.column('completion_pct')[0] == 50.0
+        assert store.kind('completion_pct') == 'f'
+
+
+class TestTagStorage:
+    """Test the dictionary-encoded long table for project/context counts"""
+
+    def test_only_present_counts_are_stored(self, store_and_csv):
+        store, _ = store_and_csv
+        # 3 project_+Work counts + 1 context_@Home count; blank and backfilled cells add no rows
+        assert store.schema['tag_rows'] == 4
+        assert store.schema['tags'] == [['project', '+Work'], ['context', '@Home']]
+
+    def test_dense_view_matches_wide_layout(self, store_and_csv):
+        store, _ = store_and_csv
+        assert store.column('project_+Work')[:3].tolist() == [4, 5, 5]
+        assert np.isnan(store.column('project_+Work')[3])
+        series = store.daily_series(['context_@Home', 'project_+Work'])
+        assert np.isnan(series['context_@Home'][:2]).all()
+        assert series['context_@Home'][2] == 2
+        assert series['project_+Work'][:2].tolist() == [5, 5]
+
+    def test_tag_series_range(self, store_and_csv):
+        store, _ = store_and_csv
+        timestamps, counts = store.tag_series('project_+Work', start=datetime(2025, 5, 9, 12, 0, 0))
+        assert counts.tolist() == [5, 5]
+        assert len(timestamps) == 2
+        empty_timestamps, empty_counts = store.tag_series('project_+Nope')
+        assert len(empty_timestamps) == 0 and len(empty_counts) == 0
+
+    def test_out_of_order_tag_rows(self, tmp_path):
+        store = TimeSeriesStore(str(tmp_path / "timeseries"))
+        store.append(datetime(2025, 1, 3, 12, 0, 0), {'total': 3, 'project_+A': 3, 'context_@B': 1})
+        store.append(datetime(2025, 1, 1, 12, 0, 0), {'total': 1, 'project_+A': 1})
+        timestamps, counts = store.tag_series('project_+A')
+        assert counts.tolist() == [1, 3]
+        assert np.all(np.diff(timestamps) > 0)